@@ -414,6 +414,10 @@ class TranslatorPipeline:
         except Exception as e:
             self.logger.error(f"合并翻译流程失败: {str(e)}")
             raise TranslationPipelineError(f"合并翻译流程失败: {str(e)}")
+        finally:
+            # 条形码数字只在本次合并内有效；中途失败时也要清掉，避免实例复用时带入下一次合并
+            if hasattr(self, '_barcode_number'):
+                delattr(self, '_barcode_number')
     
     def _generate_output_path(self, input_path: str, output_dir: str = None) -> str:
         """
@@ -240,6 +240,7 @@ def _safe_resolve(file_path: str) -> Path:
 
 
 def _task_to_dict(task) -> dict:
+    live_progress = task_queue_service.get_live_progress(task.task_id) if task.status == "running" else None
     return {
         "task_id": task.task_id,
         "display_no": task.display_no,
@@ -248,8 +249,8 @@ def _task_to_dict(task) -> dict:
         "filename": task.filename,
         "client_ip": task.client_ip,
         "status": task.status,
-        "progress": task.progress,
-        "message": task.message or "",
+        "progress": live_progress["progress"] if live_progress else task.progress,
+        "message": (live_progress["message"] if live_progress else task.message) or "",
         "error": task.error_message,
         "cancel_requested": bool(task.cancel_requested),
         "batch": {
@@ -445,6 +446,7 @@ async def cancel_task(task_id: str):
         if task.status in {"done", "failed", "cancelled"}:
             return {"status": task.status, "message": f"Task already in terminal state: {task.status}"}
         task_repo.cancel_task(db, task_id)
+    task_queue_service.request_cancel(task_id)
     return {"status": "ok", "message": "Cancel request submitted"}
 
 
@@ -523,6 +525,7 @@ async def batch_cancel(body: BatchCancelBody):
                 skipped += 1
                 continue
             task_repo.cancel_task(db, task.task_id)
+            task_queue_service.request_cancel(task.task_id)
             cancelled += 1
     return {"status": "ok", "cancelled": cancelled, "skipped": skipped, "missing": missing}
 
@@ -565,6 +568,7 @@ async def batch_group_cancel(batch_id: str):
                 skipped += 1
                 continue
             task_repo.cancel_task(db, task.task_id)
+            task_queue_service.request_cancel(task.task_id)
             cancelled += 1
     return {"status": "ok", "batch_id": batch_id, "cancelled": cancelled, "skipped": skipped}
 
@@ -917,6 +921,7 @@ async def run_alignment(
     threshold_7: int = Query(150000),
     threshold_8: int = Query(175000),
     buffer_chars: int = Query(2000),
+    fail_fast: bool = Query(False),
 ):
     allowed_ext = {".docx", ".doc", ".pptx", ".xlsx", ".xls"}
     if os.path.splitext(original_file.filename or "")[1].lower() not in allowed_ext:
@@ -941,6 +946,7 @@ async def run_alignment(
         threshold_7=threshold_7,
         threshold_8=threshold_8,
         buffer_chars=buffer_chars,
+        fail_fast=fail_fast,
     )
     return {"status": "ACCEPTED", "task_id": submit_result.task_id, "message": "Task submitted", "deduped": submit_result.deduped}
 
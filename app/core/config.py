@@ -71,6 +71,7 @@ class Settings(BaseSettings):
     GEMINI_EMBEDDING_DIMENSIONS: int = int(os.getenv("GEMINI_EMBEDDING_DIMENSIONS", "768"))
     ALIGNMENT_DEFAULT_MODE: str = os.getenv("ALIGNMENT_DEFAULT_MODE", "hybrid")
     ALIGNMENT_EMBEDDING_CONFIDENCE: float = float(os.getenv("ALIGNMENT_EMBEDDING_CONFIDENCE", "0.55"))
+    ALIGNMENT_PART_CONCURRENCY: int = int(os.getenv("ALIGNMENT_PART_CONCURRENCY", "4"))
 
     VERTEX_PROJECT_ID: str = os.getenv("VERTEX_PROJECT_ID", "gen-lang-client-0128671098")
     VERTEX_LOCATION: str = os.getenv("VERTEX_LOCATION", "global")
@@ -97,8 +98,15 @@ class Settings(BaseSettings):
     ALLOWED_ORIGINS: str = os.getenv("ALLOWED_ORIGINS", "*")
     TASK_QUEUE_MAX_CONCURRENT_TASKS: int = int(os.getenv("TASK_QUEUE_MAX_CONCURRENT_TASKS", "2"))
     TASK_QUEUE_EXECUTOR_MAX_WORKERS: int = int(os.getenv("TASK_QUEUE_EXECUTOR_MAX_WORKERS", "4"))
-    TASK_QUEUE_POLL_INTERVAL_SECONDS: float = float(os.getenv("TASK_QUEUE_POLL_INTERVAL_SECONDS", "0.5"))
-    TASK_QUEUE_CANDIDATE_BATCH_SIZE: int = int(os.getenv("TASK_QUEUE_CANDIDATE_BATCH_SIZE", "20"))
+    TASK_QUEUE_RESYNC_INTERVAL_SECONDS: float = float(os.getenv("TASK_QUEUE_RESYNC_INTERVAL_SECONDS", "30"))
+    TASK_PROGRESS_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("TASK_PROGRESS_FLUSH_INTERVAL_SECONDS", "0.3"))
+    SPECIALIST_WORKER_PROCESSES: int = int(os.getenv("SPECIALIST_WORKER_PROCESSES", "2"))
+    NUMBER_CHECK_AI_CONCURRENCY: int = int(os.getenv("NUMBER_CHECK_AI_CONCURRENCY", "4"))
+    NUMBER_CHECK_AI_PROVIDER_RPM: str = os.getenv("NUMBER_CHECK_AI_PROVIDER_RPM", "")
+    ZHONGFANYI_CHUNK_CONCURRENCY: int = int(os.getenv("ZHONGFANYI_CHUNK_CONCURRENCY", "6"))
+    DOC_TRANSLATE_CONCURRENCY: int = int(os.getenv("DOC_TRANSLATE_CONCURRENCY", "6"))
+    DOC_TRANSLATE_PROVIDER_RPM: str = os.getenv("DOC_TRANSLATE_PROVIDER_RPM", "")
+    DOC_TRANSLATE_PROVIDER_TPM: str = os.getenv("DOC_TRANSLATE_PROVIDER_TPM", "")
     TASK_QUEUE_TYPE_LIMITS_JSON: str = os.getenv("TASK_QUEUE_TYPE_LIMITS_JSON", "")
     WORD_COUNT_ALLOWED_ROOTS_JSON: str = os.getenv("WORD_COUNT_ALLOWED_ROOTS_JSON", "")
     WORD_COUNT_UNC_MOUNT_MAP_JSON: str = os.getenv("WORD_COUNT_UNC_MOUNT_MAP_JSON", "")
@@ -110,12 +118,42 @@ class Settings(BaseSettings):
     WORD_COUNT_MAX_FILES: int = int(os.getenv("WORD_COUNT_MAX_FILES", "5000"))
     WORD_COUNT_MAX_FILE_MB: int = int(os.getenv("WORD_COUNT_MAX_FILE_MB", "200"))
     WORD_COUNT_UPLOAD_MAX_MB: int = int(os.getenv("WORD_COUNT_UPLOAD_MAX_MB", "50"))
+    WORD_COUNT_PROCESS_WORKERS: int = int(os.getenv("WORD_COUNT_PROCESS_WORKERS", "4"))
+    WORD_COUNT_OCR_FILE_CONCURRENCY: int = int(os.getenv("WORD_COUNT_OCR_FILE_CONCURRENCY", "2"))
+    WORD_COUNT_CACHE: str = os.getenv("WORD_COUNT_CACHE", "True")
+    WORD_COUNT_CACHE_PATH: str = os.getenv(
+        "WORD_COUNT_CACHE_PATH", str(_ROOT_DIR / "data" / "word_count_cache.sqlite3")
+    )
+    WORD_COUNT_CACHE_MAX_MB: int = int(os.getenv("WORD_COUNT_CACHE_MAX_MB", "512"))
+    WORD_COUNT_CACHE_MAX_AGE_DAYS: float = float(os.getenv("WORD_COUNT_CACHE_MAX_AGE_DAYS", "30"))
+    WORD_COUNT_CACHE_HASH: str = os.getenv("WORD_COUNT_CACHE_HASH", "False")
+    LIBREOFFICE_WORKERS: int = int(os.getenv("LIBREOFFICE_WORKERS", "2"))
+    LIBREOFFICE_UNO_PYTHON: str = os.getenv("LIBREOFFICE_UNO_PYTHON", "")
+    LIBREOFFICE_CONVERT_TIMEOUT_SECONDS: float = float(os.getenv("LIBREOFFICE_CONVERT_TIMEOUT_SECONDS", "300"))
+    LIBREOFFICE_WORKER_MAX_JOBS: int = int(os.getenv("LIBREOFFICE_WORKER_MAX_JOBS", "200"))
+    FIXED_LAYOUT_BROWSERS: int = int(os.getenv("FIXED_LAYOUT_BROWSERS", "1"))
+    FIXED_LAYOUT_BROWSER_MAX_TABS: int = int(os.getenv("FIXED_LAYOUT_BROWSER_MAX_TABS", "4"))
+    DRIVERS_LICENSE_PIPELINES: int = int(os.getenv("DRIVERS_LICENSE_PIPELINES", "1"))
+    DIRECTORY_SCAN_WORKERS: int = int(os.getenv("DIRECTORY_SCAN_WORKERS", "8"))
+    DIRECTORY_SCAN_CACHE_SECONDS: float = float(os.getenv("DIRECTORY_SCAN_CACHE_SECONDS", "60"))
     PDF_MERGE_MAX_FILES: int = int(os.getenv("PDF_MERGE_MAX_FILES", "200"))
     PDF_MERGE_MAX_FILE_MB: int = int(os.getenv("PDF_MERGE_MAX_FILE_MB", "500"))
     PDF_MERGE_MAX_TOTAL_MB: int = int(os.getenv("PDF_MERGE_MAX_TOTAL_MB", "2048"))
     MSG_CONVERT_UPLOAD_MAX_MB: int = int(os.getenv("MSG_CONVERT_UPLOAD_MAX_MB", "95"))
     ENGLISH_VARIANT_UPLOAD_MAX_MB: int = int(os.getenv("ENGLISH_VARIANT_UPLOAD_MAX_MB", "95"))
     AUDIO_CHECK_MAX_MB: int = int(os.getenv("AUDIO_CHECK_MAX_MB", "20"))
+    OCR_PAGE_CONCURRENCY: int = int(os.getenv("OCR_PAGE_CONCURRENCY", "4"))
+    OCR_ROUTE_MIN_INTERVAL_SECONDS: float = float(os.getenv("OCR_ROUTE_MIN_INTERVAL_SECONDS", "1"))
+    OCR_CACHE: str = os.getenv("OCR_CACHE", "True")
+    OCR_CACHE_PATH: str = os.getenv("OCR_CACHE_PATH", str(_ROOT_DIR / "data" / "ocr_cache.sqlite3"))
+    OCR_CACHE_MAX_MB: int = int(os.getenv("OCR_CACHE_MAX_MB", "1024"))
+    TRANSLATION_MEMORY: str = os.getenv("TRANSLATION_MEMORY", "True")
+    TRANSLATION_MEMORY_PATH: str = os.getenv(
+        "TRANSLATION_MEMORY_PATH", str(_ROOT_DIR / "data" / "translation_memory.sqlite3")
+    )
+    TRANSLATION_MEMORY_MAX_MB: int = int(os.getenv("TRANSLATION_MEMORY_MAX_MB", "512"))
+    EMBEDDING_CACHE: str = os.getenv("EMBEDDING_CACHE", "True")
+    EMBEDDING_CACHE_DIR: str = os.getenv("EMBEDDING_CACHE_DIR", str(_ROOT_DIR / "data" / "embedding_cache"))
     WORD_COUNT_FOLLOW_SYMLINKS: str = os.getenv("WORD_COUNT_FOLLOW_SYMLINKS", "False")
     ODA_FILE_CONVERTER_PATH: str = os.getenv("ODA_FILE_CONVERTER_PATH", "")
     WORD_COUNT_CAD_CONVERT_TIMEOUT_SECONDS: int = int(
@@ -142,6 +180,26 @@ class Settings(BaseSettings):
     def GEMINI_ENABLE_OPENROUTER_FALLBACK_ENABLED(self) -> bool:
         return str(self.GEMINI_ENABLE_OPENROUTER_FALLBACK).strip().lower() in {"1", "true", "yes", "on"}
 
+    @property
+    def OCR_CACHE_ENABLED(self) -> bool:
+        return str(self.OCR_CACHE).strip().lower() in {"1", "true", "yes", "on"}
+
+    @property
+    def TRANSLATION_MEMORY_ENABLED(self) -> bool:
+        return str(self.TRANSLATION_MEMORY).strip().lower() in {"1", "true", "yes", "on"}
+
+    @property
+    def WORD_COUNT_CACHE_ENABLED(self) -> bool:
+        return str(self.WORD_COUNT_CACHE).strip().lower() in {"1", "true", "yes", "on"}
+
+    @property
+    def WORD_COUNT_CACHE_HASH_ENABLED(self) -> bool:
+        return str(self.WORD_COUNT_CACHE_HASH).strip().lower() in {"1", "true", "yes", "on"}
+
+    @property
+    def EMBEDDING_CACHE_ENABLED(self) -> bool:
+        return str(self.EMBEDDING_CACHE).strip().lower() in {"1", "true", "yes", "on"}
+
     @property
     def TASK_QUEUE_TYPE_LIMITS(self) -> dict[str, int]:
         raw = (self.TASK_QUEUE_TYPE_LIMITS_JSON or "").strip()
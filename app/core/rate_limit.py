@@ -0,0 +1,84 @@
+import threading
+import time
+
+
+class RouteRateLimiter:
+    """按路由（或服务商）限制请求发起间隔，供多个并发线程共享。
+
+    每个 key 维护“下一次允许发起请求”的时间点；调用方排队领取时间片后在锁外等待，
+    因此不同 key 之间互不阻塞，同一 key 的请求按领取顺序依次间隔发出。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._next_slot: dict[str, float] = {}
+
+    def wait(self, key: str, min_interval_seconds: float) -> float:
+        """阻塞到该 key 的下一个可用时间片，返回实际等待秒数。"""
+        interval = max(float(min_interval_seconds or 0), 0.0)
+        if interval <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(key, 0.0))
+            self._next_slot[key] = slot + interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return max(delay, 0.0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._next_slot.clear()
+
+
+def parse_provider_limits(spec: object) -> dict[str, float]:
+    """ "deepseek=60, gemini=120" → {"deepseek": 60.0, "gemini": 120.0}；非正数或无法解析的项忽略。"""
+    if not spec:
+        return {}
+    if isinstance(spec, dict):
+        items = spec.items()
+    else:
+        items = (part.split("=", 1) for part in str(spec).split(",") if "=" in part)
+    limits: dict[str, float] = {}
+    for key, value in items:
+        try:
+            parsed = float(value)
+        except (TypeError, ValueError):
+            continue
+        if parsed > 0:
+            limits[str(key).strip().lower()] = parsed
+    return limits
+
+
+class TokenBudget:
+    """按 key 的每分钟 token 预算（令牌桶），供多个并发线程共享。
+
+    桶容量为一分钟的额度，按秒匀速回填；单次请求超过整桶额度时按整桶计，避免永远等不到。
+    与 RouteRateLimiter 一样先在锁内记账、再在锁外等待，额度可以暂时透支，后来者顺延。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def acquire(self, key: str, tokens: float, tokens_per_minute: float) -> float:
+        """扣除 tokens 个额度，不足时阻塞到回填足够，返回实际等待秒数。"""
+        capacity = max(float(tokens_per_minute or 0), 0.0)
+        if capacity <= 0:
+            return 0.0
+        cost = min(max(float(tokens or 0), 0.0), capacity)
+        refill_per_second = capacity / 60.0
+        with self._lock:
+            now = time.monotonic()
+            available, updated_at = self._buckets.get(key, (capacity, now))
+            available = min(capacity, available + (now - updated_at) * refill_per_second) - cost
+            self._buckets[key] = (available, now)
+        delay = -available / refill_per_second if available < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
@@ -1,7 +1,8 @@
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import func
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
 from app.core.file_naming import build_display_no
@@ -129,6 +130,42 @@ def claim_queued_task_by_task_id(db: Session, task_id: str) -> Optional[Task]:
     return get_task_by_task_id(db, task.task_id)
 
 
+def list_ready_task_refs(db: Session) -> List[Row]:
+    """返回所有可调度排队任务的 (id, task_id, task_type, created_at)，供调度器重建内存就绪队列。"""
+    return (
+        _dispatchable_queued_query(db)
+        .with_entities(Task.id, Task.task_id, Task.task_type, Task.created_at)
+        .order_by(Task.created_at.asc(), Task.id.asc())
+        .all()
+    )
+
+
+def claim_queued_task_by_id(db: Session, task_pk: int) -> Optional[Row]:
+    """单条 UPDATE ... RETURNING 原子认领任务；已被取消、认领或输入未就绪时返回 None。"""
+    now = _now()
+    row = db.execute(
+        update(Task)
+        .where(
+            Task.id == task_pk,
+            Task.status == 'queued',
+            Task.cancel_requested.is_(False),
+            Task.input_files_json.isnot(None),
+            Task.input_files_json.notin_(('', '{}')),
+        )
+        .values(
+            status='running',
+            progress=1,
+            message='Processing',
+            started_at=now,
+            updated_at=now,
+            error_message=None,
+        )
+        .returning(Task.task_id, Task.task_type)
+    ).first()
+    db.commit()
+    return row
+
+
 def claim_next_queued_task(db: Session, task_type: Optional[str] = None) -> Optional[Task]:
     tasks = list_queued_tasks(db, limit=1, task_type=task_type)
     task = tasks[0] if tasks else None
@@ -153,6 +190,24 @@ def update_task_progress(db: Session, task_id: str, *, progress: Optional[int] =
     return task
 
 
+def bulk_update_running_progress(db: Session, rows: List[Tuple[str, int, str]]) -> None:
+    """一次事务写入多条 (task_id, progress, message)；只更新仍在运行的任务，不覆盖终态。"""
+    if not rows:
+        return
+    table = Task.__table__
+    now = _now()
+    db.execute(
+        update(table)
+        .where(table.c.task_id == bindparam('b_task_id'), table.c.status == 'running')
+        .values(progress=bindparam('b_progress'), message=bindparam('b_message'), updated_at=now),
+        [
+            {'b_task_id': task_id, 'b_progress': progress, 'b_message': message}
+            for task_id, progress, message in rows
+        ],
+    )
+    db.commit()
+
+
 def complete_task(db: Session, task_id: str, *, result_json: Optional[str] = None, output_path: Optional[str] = None, output_files_json: Optional[str] = None, message: str = 'Completed') -> Optional[Task]:
     task = get_task_by_task_id(db, task_id)
     if not task:
@@ -5,14 +5,12 @@
 
 import os
 import re
-import shutil
 import asyncio
-import time
 import uuid
 import traceback
 import threading
 import importlib.util
-from concurrent.futures import Executor
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -34,6 +32,7 @@ from app.service.gemini_service import (
     ensure_gemini_route_configured,
     generate_text,
 )
+from app.service.docx_part_splitter import write_element_range_parts
 from app.service.libreoffice_service import convert_doc_to_docx_via_libreoffice
 
 # ── 全局配置 ──────────────────────────────────────────────
@@ -181,6 +180,9 @@ def _install_log_patches():
 
     def _safe_log_stream(content):
         _orig_log_stream(content)
+        if memory_module.log_manager.stream_buffered():
+            # 并发分句任务的输出先缓存，结束时由 buffered_stream 整段再写一次
+            return
         tid = getattr(_stream_task_id, "task_id", None)
         if tid:
             with _progress_lock:
@@ -214,9 +216,20 @@ def _install_log_patches():
                     cur = _task_progress[tid].get("stream_log", "")
                     _task_progress[tid]["stream_log"] = cur + line + "\n"
 
+    def _capture_stream_task_id():
+        # memory 内部线程池（如并发后处理分句）的日志沿用提交线程的任务路由
+        tid = getattr(_stream_task_id, "task_id", None)
+
+        def _apply():
+            if tid:
+                _stream_task_id.task_id = tid
+
+        return _apply
+
     memory_module.log_manager.log_stream = _safe_log_stream
     memory_module.log_manager.log = _safe_log
     memory_module.log_manager.log_exception = _safe_log_exception
+    memory_module.register_thread_context_hook(_capture_stream_task_id)
     _log_patch_installed = True
     print("[alignment] ✅ 日志补丁已永久安装（线程安全模式）")
 
@@ -1049,19 +1062,6 @@ def _extract_text_from_elements(elements, start_idx, end_idx):
     return "\n".join(texts)
 
 
-def _delete_elements_in_range(doc, start_idx, end_idx):
-    all_elements = _get_all_content_elements(doc)
-    to_delete = []
-    for i in range(len(all_elements)):
-        if start_idx <= i < end_idx:
-            if isinstance(all_elements[i], (Paragraph, Table)):
-                to_delete.append(all_elements[i]._element)
-    for el in to_delete:
-        parent = el.getparent()
-        if parent is not None:
-            parent.remove(el)
-
-
 def _smart_split_with_buffer(src_path, num_parts, output_dir, lang_type, buffer_chars=2000,
                              split_element_ratios=None):
     src_path = os.path.abspath(src_path)
@@ -1114,14 +1114,10 @@ def _smart_split_with_buffer(src_path, num_parts, output_dir, lang_type, buffer_
 
     generated_files = []
     part_info = []
+    dest_paths = [os.path.join(output_dir, f"{base_name}_Part{i + 1}.docx") for i in range(len(split_ranges))]
+    write_element_range_parts(doc, src_path, [elem._element for elem in elements], split_ranges, dest_paths)
     for i, (s, e) in enumerate(split_ranges):
-        dest = os.path.join(output_dir, f"{base_name}_Part{i + 1}.docx")
-        shutil.copy2(src_path, dest)
-        doc_copy = Document(dest)
-        total_elems = len(_get_all_content_elements(doc_copy))
-        _delete_elements_in_range(doc_copy, e, total_elems + 5000)
-        _delete_elements_in_range(doc_copy, 0, s)
-        doc_copy.save(dest)
+        dest = dest_paths[i]
         first_text = _extract_text_from_elements(elements, s, min(s + 3, e))
         last_text = _extract_text_from_elements(elements, max(s, e - 3), e)
         part_info.append({
@@ -1690,6 +1686,149 @@ def _finalize_alignment_output(output_path: str | Path, task_dir: str | Path, or
     return _normalize_output_path(source)
 
 
+def _run_parts_concurrently(part_count: int, run_part, concurrency: int, fail_fast: bool = False,
+                            on_part_done=None) -> list:
+    """
+    用有界线程池执行各分块，返回按分块序号排列的结果（True/False，fail_fast 取消的分块为 None）。
+
+    run_part(idx, stop_event) 在工作线程中执行；stop_event 在 fail_fast 触发后置位，
+    重试等待中的分块据此提前放弃。on_part_done(done, total) 在调用线程中按完成顺序回调。
+    """
+    results = [None] * part_count
+    if part_count == 0:
+        return results
+    stop_event = threading.Event()
+    workers = max(1, min(int(concurrency or 1), part_count))
+    done = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="align-part") as pool:
+        futures = {pool.submit(run_part, idx, stop_event): idx for idx in range(part_count)}
+        for future in as_completed(futures):
+            idx = futures[future]
+            if future.cancelled():
+                continue
+            try:
+                results[idx] = bool(future.result())
+            except Exception:
+                traceback.print_exc()
+                results[idx] = False
+            done += 1
+            if on_part_done is not None:
+                on_part_done(done, part_count)
+            if fail_fast and not results[idx] and not stop_event.is_set():
+                stop_event.set()
+                for pending in futures:
+                    pending.cancel()
+    return results
+
+
+def _align_part(
+    memory_module,
+    task: dict,
+    idx: int,
+    total: int,
+    *,
+    task_id: str,
+    runtime_route: str,
+    mode: str,
+    conf: float,
+    model_id: str,
+    source_lang: str,
+    target_lang: str,
+    enable_post_split: bool,
+    reuse_existing: bool,
+    max_retries: int,
+    stop_event: threading.Event,
+) -> bool:
+    """在工作线程中对齐单个分块；线程局部的任务日志路由与 LLM 通道在这里设置。"""
+    _stream_task_id.task_id = task_id
+    _set_current_gemini_route(runtime_route)
+    _log = memory_module.log_manager.log
+    try:
+        _log(f"处理任务 {idx + 1}/{total}: {os.path.basename(task['output'])}")
+        print(f"[alignment] 处理任务 {idx + 1}/{total}")
+        print(f"[alignment]   original: {task['original']}")
+        print(f"[alignment]   trans: {task['trans']}")
+        print(f"[alignment]   output: {task['output']}")
+        if reuse_existing and _is_reusable_alignment_excel(task['output']):
+            _log(f"任务 {idx + 1} 复用已有结果: {os.path.basename(task['output'])}")
+            return True
+
+        # 诊断：直接用 memory 的 read_file_content 测试读取
+        try:
+            test_orig = memory_module.read_file_content(task['original'])
+            test_trans = memory_module.read_file_content(task['trans'])
+            print(f"[alignment]   read_file_content 原文: {len(test_orig)} 字符")
+            print(f"[alignment]   read_file_content 译文: {len(test_trans)} 字符")
+            if test_orig:
+                print(f"[alignment]   原文前200字: {test_orig[:200]}")
+            if test_trans:
+                print(f"[alignment]   译文前200字: {test_trans[:200]}")
+        except Exception as diag_e:
+            print(f"[alignment]   read_file_content 诊断异常: {diag_e}")
+
+        success = False
+        for attempt in range(1, max_retries + 1):
+            if attempt > 1:
+                _log(
+                    f"任务 {idx + 1} 重试 {attempt}/{max_retries}: "
+                    f"{os.path.basename(task['output'])}"
+                )
+
+            memory_module.set_gemini_route(runtime_route)
+            if mode in {"hybrid", "embedding"}:
+                success = memory_module.run_hybrid_alignment(
+                    task['original'],
+                    task['trans'],
+                    task['output'],
+                    model_id,
+                    anchor_info_orig=task.get('anchor_orig'),
+                    anchor_info_trans=task.get('anchor_trans'),
+                    system_prompt_override=task.get('system_prompt_override'),
+                    source_lang=source_lang,
+                    target_lang=target_lang,
+                    enable_post_split=enable_post_split,
+                    alignment_mode=mode,
+                    embedding_confidence=conf,
+                    gemini_route=runtime_route if runtime_route != "deepseek" else "openrouter",
+                )
+            else:
+                success = memory_module.run_llm_alignment(
+                    task['original'],
+                    task['trans'],
+                    task['output'],
+                    model_id,
+                    anchor_info_orig=task.get('anchor_orig'),
+                    anchor_info_trans=task.get('anchor_trans'),
+                    system_prompt_override=task.get('system_prompt_override'),
+                    source_lang=source_lang,
+                    target_lang=target_lang,
+                    enable_post_split=enable_post_split,
+                )
+
+            if success and os.path.exists(task['output']):
+                break
+
+            if attempt < max_retries:
+                _log(
+                    f"任务 {idx + 1} 失败，{PART_TASK_RETRY_DELAY_SECONDS} 秒后重试: "
+                    f"{os.path.basename(task['output'])}"
+                )
+                # 只阻塞本分块的工作线程；fail_fast 触发后不再重试
+                if stop_event.wait(PART_TASK_RETRY_DELAY_SECONDS):
+                    break
+
+        ok = bool(success) and os.path.exists(task['output'])
+        print(f"[alignment] 任务 {idx + 1} 结果: success={success}, output_exists={os.path.exists(task['output'])}")
+        if ok:
+            _log(f"任务 {idx + 1} 成功: {os.path.basename(task['output'])}")
+        else:
+            _log(f"任务 {idx + 1} 失败: {os.path.basename(task['output'])}")
+        return ok
+    finally:
+        if hasattr(_stream_task_id, "task_id"):
+            del _stream_task_id.task_id
+
+
 def _run_alignment_sync(
     original_path: str,
     translated_path: str,
@@ -1712,6 +1851,7 @@ def _run_alignment_sync(
     translated_filename: Optional[str] = None,
     alignment_mode: str = DEFAULT_ALIGNMENT_MODE,
     embedding_confidence: float = DEFAULT_EMBEDDING_CONFIDENCE,
+    fail_fast: bool = False,
 ):
     """同步执行对齐任务 - 线程安全版，支持多任务并发"""
     try:
@@ -1848,7 +1988,6 @@ def _run_alignment_sync(
         _update_progress(task_id, 20, f"分割策略: {split_parts} 份")
 
         tasks_queue = []
-        generated_excel_paths = []
 
         if split_parts > 1 and file_type == 'docx':
             _update_progress(task_id, 25, f"正在分割文档（{split_parts} 份，缓冲区 {buffer_chars} 字）...")
@@ -1880,106 +2019,50 @@ def _run_alignment_sync(
         align_label = "向量对齐" if mode in {"hybrid", "embedding"} else "AI 对齐"
         _update_progress(task_id, 30, f"{align_label}中（共 {len(tasks_queue)} 个任务）...")
         _log(f"待处理任务数: {len(tasks_queue)}")
-        progress_per_task = 50 / len(tasks_queue) if tasks_queue else 50
-        stop_following_tasks = False
-        failed_task_names = []
-
-        for idx, task in enumerate(tasks_queue):
-            if stop_following_tasks:
-                break
-            progress = 30 + int((idx + 1) * progress_per_task)
-            _update_progress(task_id, progress,
-                             f"{align_label}中 ({idx + 1}/{len(tasks_queue)})...")
-
-            _log(f"处理任务 {idx + 1}/{len(tasks_queue)}: {os.path.basename(task['output'])}")
-            print(f"[alignment] 处理任务 {idx + 1}/{len(tasks_queue)}")
-            print(f"[alignment]   original: {task['original']}")
-            print(f"[alignment]   trans: {task['trans']}")
-            print(f"[alignment]   output: {task['output']}")
-            if split_parts > 1 and _is_reusable_alignment_excel(task['output']):
-                _log(f"任务 {idx + 1} 复用已有结果: {os.path.basename(task['output'])}")
-                if task['output'] not in generated_excel_paths:
-                    generated_excel_paths.append(task['output'])
-                continue
-
-            # 诊断：直接用 memory 的 read_file_content 测试读取
-            try:
-                test_orig = memory_module.read_file_content(task['original'])
-                test_trans = memory_module.read_file_content(task['trans'])
-                print(f"[alignment]   read_file_content 原文: {len(test_orig)} 字符")
-                print(f"[alignment]   read_file_content 译文: {len(test_trans)} 字符")
-                if test_orig:
-                    print(f"[alignment]   原文前200字: {test_orig[:200]}")
-                if test_trans:
-                    print(f"[alignment]   译文前200字: {test_trans[:200]}")
-            except Exception as diag_e:
-                print(f"[alignment]   read_file_content 诊断异常: {diag_e}")
-
-            max_retries = PART_TASK_MAX_RETRIES if split_parts > 1 else 1
-            success = False
-            for attempt in range(1, max_retries + 1):
-                if attempt > 1:
-                    _log(
-                        f"任务 {idx + 1} 重试 {attempt}/{max_retries}: "
-                        f"{os.path.basename(task['output'])}"
-                    )
-
-                memory_module.set_gemini_route(runtime_route)
-                if mode in {"hybrid", "embedding"}:
-                    success = memory_module.run_hybrid_alignment(
-                        task['original'],
-                        task['trans'],
-                        task['output'],
-                        model_id,
-                        anchor_info_orig=task.get('anchor_orig'),
-                        anchor_info_trans=task.get('anchor_trans'),
-                        system_prompt_override=task.get('system_prompt_override'),
-                        source_lang=source_lang,
-                        target_lang=target_lang,
-                        enable_post_split=enable_post_split,
-                        alignment_mode=mode,
-                        embedding_confidence=conf,
-                        gemini_route=runtime_route if runtime_route != "deepseek" else "openrouter",
-                    )
-                else:
-                    success = memory_module.run_llm_alignment(
-                        task['original'],
-                        task['trans'],
-                        task['output'],
-                        model_id,
-                        anchor_info_orig=task.get('anchor_orig'),
-                        anchor_info_trans=task.get('anchor_trans'),
-                        system_prompt_override=task.get('system_prompt_override'),
-                        source_lang=source_lang,
-                        target_lang=target_lang,
-                        enable_post_split=enable_post_split,
-                    )
-
-                if success and os.path.exists(task['output']):
-                    break
+        part_concurrency = max(1, settings.ALIGNMENT_PART_CONCURRENCY) if split_parts > 1 else 1
+        if len(tasks_queue) > 1:
+            _log(
+                f"分块并发: {min(part_concurrency, len(tasks_queue))}"
+                f"（{'任一分块失败即取消未开始的分块' if fail_fast else '单个分块失败不影响其他分块'}）"
+            )
 
-                if attempt < max_retries:
-                    _log(
-                        f"任务 {idx + 1} 失败，{PART_TASK_RETRY_DELAY_SECONDS} 秒后重试: "
-                        f"{os.path.basename(task['output'])}"
-                    )
-                    time.sleep(PART_TASK_RETRY_DELAY_SECONDS)
+        def _run_part(idx, stop_event):
+            return _align_part(
+                memory_module, tasks_queue[idx], idx, len(tasks_queue),
+                task_id=task_id,
+                runtime_route=runtime_route,
+                mode=mode,
+                conf=conf,
+                model_id=model_id,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                enable_post_split=enable_post_split,
+                reuse_existing=split_parts > 1,
+                max_retries=PART_TASK_MAX_RETRIES if split_parts > 1 else 1,
+                stop_event=stop_event,
+            )
 
-            print(f"[alignment] 任务 {idx + 1} 结果: success={success}, output_exists={os.path.exists(task['output'])}")
-            if success and os.path.exists(task['output']):
-                _log(f"任务 {idx + 1} 成功: {os.path.basename(task['output'])}")
-                if task['output'] not in generated_excel_paths:
-                    generated_excel_paths.append(task['output'])
-            else:
-                _log(f"任务 {idx + 1} 失败: {os.path.basename(task['output'])}")
-                failed_task_names.append(os.path.basename(task['output']))
-                if split_parts > 1:
-                    stop_following_tasks = True
-                    next_part_num = idx + 2
-                    if next_part_num <= len(tasks_queue):
-                        _log(
-                            f"Part{idx + 1} 多次失败，停止继续处理 Part{next_part_num}"
-                        )
+        def _on_part_done(done, total):
+            _update_progress(task_id, 30 + int(done * 50 / total), f"{align_label}中（已完成 {done}/{total}）...")
+
+        part_results = _run_parts_concurrently(
+            len(tasks_queue), _run_part, part_concurrency,
+            fail_fast=fail_fast, on_part_done=_on_part_done,
+        )
+
+        # 按分块顺序收集，合并阶段与完成先后无关
+        generated_excel_paths = [
+            task['output'] for task, ok in zip(tasks_queue, part_results) if ok
+        ]
+        failed_task_names = [
+            os.path.basename(task['output']) for task, ok in zip(tasks_queue, part_results) if ok is False
+        ]
+        skipped_task_names = [
+            os.path.basename(task['output']) for task, ok in zip(tasks_queue, part_results) if ok is None
+        ]
+        if skipped_task_names:
+            _log(f"fail_fast：已取消未开始的分块 {', '.join(skipped_task_names)}")
+        parts_incomplete = split_parts > 1 and bool(failed_task_names or skipped_task_names)
 
         _update_progress(task_id, 85, "合并与去重...")
         if generated_excel_paths:
@@ -1987,7 +2070,7 @@ def _run_alignment_sync(
             for path in generated_excel_paths:
                 _log(f"  - {os.path.basename(path)}")
 
-        if stop_following_tasks:
+        if parts_incomplete:
             partial_error = "分块对齐未全部完成"
             if generated_excel_paths:
                 partial_error += "，已保留成功的中间结果。"
@@ -2005,6 +2088,7 @@ def _run_alignment_sync(
                 error=(
                     partial_error
                     + f"失败分块：{', '.join(failed_task_names)}"
+                    + (f"；未执行分块：{', '.join(skipped_task_names)}" if skipped_task_names else "")
                 ),
             )
             return
@@ -2095,6 +2179,7 @@ async def run_alignment_task(
     translated_filename: Optional[str] = None,
     alignment_mode: str = DEFAULT_ALIGNMENT_MODE,
     embedding_confidence: float = DEFAULT_EMBEDDING_CONFIDENCE,
+    fail_fast: bool = False,
     executor: Optional[Executor] = None,
 ):
     """在后台线程池中执行对齐任务"""
@@ -2112,5 +2197,6 @@ async def run_alignment_task(
             threshold_8=threshold_8, buffer_chars=buffer_chars,
             original_filename=original_filename, translated_filename=translated_filename,
             alignment_mode=alignment_mode, embedding_confidence=embedding_confidence,
+            fail_fast=fail_fast,
         ),
     )
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""共享目录文件发现：基于 os.scandir 按目录并发列举，候选文件按遍历顺序流式产出。
+
+os.walk 每个文件还要单独 is_symlink/stat，SMB 挂载的 UNC 目录上十万级条目光扫描就要数分钟。
+这里每个目录在线程池中 scandir 一次，类型判断用 DirEntry 自带的结果，命中筛选的文件在工作线程
+里顺带取 stat，子目录列举提交后立即在后台进行；调用方按“当前目录文件 → 各子目录递归”的
+顺序拿到结果，与原先 os.walk + 排序的顺序一致。最近的扫描结果按参数短时缓存，
+网页“扫描”与随后的“提交”复用同一份目录列表，不必再逐个文件访问共享盘。
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Hashable, Iterator, Optional
+
+from app.core.config import settings
+
+
+_LISTING_CACHE_MAX_ENTRIES = 32
+
+
+@dataclass(frozen=True)
+class ScannedFile:
+    path: Path
+    relative_path: str
+    is_symlink: bool
+    size: Optional[int]
+    mtime: Optional[float]
+
+
+@dataclass(frozen=True)
+class _ScanOptions:
+    recursive: bool
+    skip_name: Callable[[str], bool]
+    match_file: Callable[[str], bool]
+    sort_key: Callable[[str], Any]
+    follow_dir_symlinks: bool
+    include_symlinked_files: bool
+
+
+def _list_directory(
+    directory: str,
+    relative_prefix: str,
+    options: _ScanOptions,
+    submit: Callable[[str, str], Optional[Future]],
+) -> tuple[list[ScannedFile], list[Future]]:
+    """列举单个目录：返回命中筛选的文件（已取 stat）以及已提交的子目录列举任务。"""
+    files: list[tuple[str, os.DirEntry]] = []
+    subdirs: list[tuple[str, os.DirEntry]] = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if options.skip_name(name):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=options.follow_dir_symlinks):
+                        if options.recursive:
+                            subdirs.append((name, entry))
+                        continue
+                    if not options.match_file(name) or not entry.is_file():
+                        continue
+                    if not options.include_symlinked_files and entry.is_symlink():
+                        continue
+                except OSError:
+                    continue
+                files.append((name, entry))
+    except OSError:
+        # 与 os.walk 默认行为一致：无权限或瞬时不可访问的目录按空目录处理
+        return [], []
+
+    child_futures: list[Future] = []
+    for name, entry in sorted(subdirs, key=lambda item: options.sort_key(item[0])):
+        future = submit(entry.path, f"{relative_prefix}{name}/")
+        if future is None:
+            break
+        child_futures.append(future)
+
+    scanned: list[ScannedFile] = []
+    for name, entry in sorted(files, key=lambda item: options.sort_key(item[0])):
+        try:
+            file_stat = entry.stat()
+            size, mtime = int(file_stat.st_size), float(file_stat.st_mtime)
+        except OSError:
+            size, mtime = None, None
+        try:
+            is_symlink = entry.is_symlink()
+        except OSError:
+            is_symlink = False
+        scanned.append(ScannedFile(Path(entry.path), f"{relative_prefix}{name}", is_symlink, size, mtime))
+    return scanned, child_futures
+
+
+def iter_directory_files(
+    root: Path,
+    *,
+    recursive: bool,
+    skip_name: Callable[[str], bool],
+    match_file: Callable[[str], bool],
+    sort_key: Callable[[str], Any] = str.lower,
+    follow_dir_symlinks: bool = False,
+    include_symlinked_files: bool = False,
+    max_workers: Optional[int] = None,
+) -> Iterator[ScannedFile]:
+    """
+    按 root 下的遍历顺序流式产出文件；子目录在线程池中并发列举。
+
+    Args:
+        skip_name:               返回 True 的目录/文件名整体跳过（如隐藏文件）
+        match_file:              文件名筛选（如扩展名）
+        sort_key:                同一目录内子目录与文件的排序键
+        follow_dir_symlinks:     是否进入指向目录的符号链接
+        include_symlinked_files: 是否产出文件符号链接本身
+    """
+    workers = max(1, int(max_workers if max_workers is not None else settings.DIRECTORY_SCAN_WORKERS or 1))
+    options = _ScanOptions(
+        recursive=recursive,
+        skip_name=skip_name,
+        match_file=match_file,
+        sort_key=sort_key,
+        follow_dir_symlinks=follow_dir_symlinks,
+        include_symlinked_files=include_symlinked_files,
+    )
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dir-scan")
+    stopped = threading.Event()
+
+    def submit(directory: str, relative_prefix: str) -> Optional[Future]:
+        if stopped.is_set():
+            return None
+        try:
+            return executor.submit(_list_directory, directory, relative_prefix, options, submit)
+        except RuntimeError:
+            # 调用方已停止消费、线程池已关闭
+            return None
+
+    try:
+        stack = [submit(str(root), "")]
+        while stack:
+            future = stack.pop()
+            if future is None:
+                continue
+            files, child_futures = future.result()
+            yield from files
+            stack.extend(reversed(child_futures))
+    finally:
+        stopped.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+@dataclass
+class _ListingEntry:
+    created_at: float
+    files: list[ScannedFile]
+    complete: bool
+    by_relative_path: Optional[dict[str, ScannedFile]] = None
+
+
+class DirectoryListingCache:
+    """按扫描参数缓存最近的目录列表；未扫完（调用方提前停止）的结果作为有序前缀保存。"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = _LISTING_CACHE_MAX_ENTRIES) -> None:
+        self.ttl_seconds = max(float(ttl_seconds), 0.0)
+        self.max_entries = max(int(max_entries), 1)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _ListingEntry]" = OrderedDict()
+
+    def _live_entry_locked(self, key: Hashable) -> Optional[_ListingEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.created_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def lookup(self, key: Hashable, limit: Optional[int] = None) -> Optional[list[ScannedFile]]:
+        """缓存能覆盖所需的前 limit 个文件（limit 为空表示全部）时返回列表。"""
+        with self._lock:
+            entry = self._live_entry_locked(key)
+            if entry is None:
+                return None
+            if entry.complete or (limit is not None and len(entry.files) >= limit):
+                return entry.files
+            return None
+
+    def find(self, key: Hashable, relative_path: str) -> Optional[ScannedFile]:
+        with self._lock:
+            entry = self._live_entry_locked(key)
+            if entry is None:
+                return None
+            if entry.by_relative_path is None:
+                entry.by_relative_path = {item.relative_path: item for item in entry.files}
+            return entry.by_relative_path.get(relative_path)
+
+    def store(self, key: Hashable, files: list[ScannedFile], complete: bool) -> None:
+        if not self.ttl_seconds:
+            return
+        with self._lock:
+            existing = self._live_entry_locked(key)
+            if existing is not None and (existing.complete or len(existing.files) >= len(files)) and not complete:
+                return
+            self._entries[key] = _ListingEntry(time.monotonic(), files, complete)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_listing_cache_lock = threading.Lock()
+_listing_cache: Optional[DirectoryListingCache] = None
+
+
+def get_directory_listing_cache() -> DirectoryListingCache:
+    """返回进程内共享的目录列表缓存；有效期随配置更新，为 0 时不缓存。"""
+    global _listing_cache
+    ttl_seconds = max(float(settings.DIRECTORY_SCAN_CACHE_SECONDS or 0), 0.0)
+    with _listing_cache_lock:
+        if _listing_cache is None:
+            _listing_cache = DirectoryListingCache(ttl_seconds)
+        else:
+            _listing_cache.ttl_seconds = ttl_seconds
+        return _listing_cache
+
+
+def scan_directory_files(
+    root: Path,
+    *,
+    cache_key: Hashable,
+    limit: Optional[int] = None,
+    **scan_options: Any,
+) -> Iterator[ScannedFile]:
+    """
+    带短时缓存的 iter_directory_files：缓存可覆盖时直接回放，否则边扫描边产出并在结束时写回。
+
+    cache_key 需唯一描述 root 与全部筛选参数（调用方自定义的 skip_name/match_file 无法自动比较）；
+    limit 为调用方最多需要的文件数，取满即停止扫描。
+    """
+    cache = get_directory_listing_cache()
+    cached = cache.lookup(cache_key, limit)
+    if cached is not None:
+        yield from (cached if limit is None else cached[:limit])
+        return
+
+    files: list[ScannedFile] = []
+    complete = False
+    try:
+        for scanned in iter_directory_files(root, **scan_options):
+            files.append(scanned)
+            yield scanned
+            if limit is not None and len(files) >= limit:
+                return
+        complete = True
+    finally:
+        cache.store(cache_key, files, complete)
+
+
+def find_cached_file(cache_key: Hashable, relative_path: str) -> Optional[ScannedFile]:
+    """在最近一次同参数扫描结果中查找相对路径（正斜杠分隔）；未缓存或已过期返回 None。"""
+    return get_directory_listing_cache().find(cache_key, relative_path)
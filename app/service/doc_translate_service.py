@@ -12,12 +12,12 @@
 import asyncio
 import posixpath
 import re
-import time
 import zipfile
 from concurrent.futures import Executor
+from functools import lru_cache, partial
 from io import BytesIO
 from pathlib import Path
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
 from xml.etree import ElementTree as ET
 
 from openai import OpenAI
@@ -33,6 +33,14 @@ from app.service.docx_structured_translation import (
 from app.service.fixed_layout_docx_service import convert_html_to_fixed_layout_docx
 from app.service.gemini_service import GEMINI_ROUTE_OPENROUTER, ensure_gemini_route_configured, generate_text
 from app.service.libreoffice_service import convert_doc_to_docx_via_libreoffice
+from app.service.sqlite_lru_store import CacheHitStats
+from app.service.translation_memory_service import get_translation_memory
+from app.service.translation_scheduler import (
+    TranslationJob,
+    estimate_request_tokens,
+    run_translation_jobs,
+    throttle_provider_request,
+)
 from pdf2docx import convert_text_to_word_via_libreoffice, normalize_to_word_html, ocr_file
 
 ProgressCallback = Callable[[int, str], Awaitable[None]]
@@ -173,6 +181,8 @@ DOC_TRANSLATE_TRANSLATION_REQUEST_MAX_TOKENS = 384000
 DOC_TRANSLATE_GEMINI_TRANSLATION_MAX_TOKENS = 65536
 DOC_TRANSLATE_OPENROUTER_TRANSLATION_MAX_TOKENS = 65536
 DOC_TRANSLATE_TRANSLATION_RULES_MAX_CHARS = 4000
+# 单次翻译请求的原文上限（字符），超长文本按分页/段落切块后并发翻译
+DOC_TRANSLATE_CHUNK_SIZE = 6000
 DOC_TRANSLATE_TRANSLATION_ENGINES: Dict[str, Dict[str, Any]] = {
     "google/gemini-3-flash-preview": {
         "label": "Gemini 3 Flash Preview",
@@ -717,6 +727,12 @@ def _write_text_segments(output_dir: Path, segments: List[str]) -> List[Path]:
 _PAGE_BREAK_PATTERN = re.compile(r"\s*<page_break\s*/>\s*", flags=re.IGNORECASE)
 
 
+def _accumulate_ocr_cache_stats(stats: Dict[str, int], ocr_payload: Dict[str, Any]) -> None:
+    cache = ocr_payload.get("cache") or {}
+    stats["hits"] += int(cache.get("hits") or 0)
+    stats["misses"] += int(cache.get("misses") or 0)
+
+
 def _split_ocr_text_segments(raw_text: str) -> List[str]:
     text = "" if raw_text is None else str(raw_text)
     if "<page_break" not in text.lower():
@@ -825,6 +841,16 @@ def _get_translation_engine_max_tokens(engine_config: Dict[str, Any]) -> int:
     )
 
 
+@lru_cache(maxsize=4)
+def _get_deepseek_client(api_key: str, base_url: str) -> OpenAI:
+    """同一组密钥/地址在进程内复用一个 DeepSeek 客户端（连接池跨请求、跨任务共享）。"""
+    return OpenAI(api_key=api_key, base_url=base_url)
+
+
+def _deepseek_client() -> OpenAI:
+    return _get_deepseek_client(settings.DEEPSEEK_API_KEY, settings.DEEPSEEK_BASE_URL)
+
+
 def _build_structured_translation_callback(
     *,
     translation_engine: str,
@@ -836,14 +862,13 @@ def _build_structured_translation_callback(
     engine_provider = str(engine_config.get("provider") or "deepseek")
     engine_model = str(engine_config.get("model") or resolved_engine)
     max_tokens = _get_translation_engine_max_tokens(engine_config)
-    deepseek_client = None
-    if engine_provider == "deepseek":
-        deepseek_client = OpenAI(
-            api_key=settings.DEEPSEEK_API_KEY,
-            base_url=settings.DEEPSEEK_BASE_URL,
-        )
+    deepseek_client = _deepseek_client() if engine_provider == "deepseek" else None
 
     def call_llm(messages: List[Dict[str, str]], require_json: bool) -> str:
+        throttle_provider_request(
+            engine_provider,
+            estimate_request_tokens("", "".join(item.get("content", "") for item in messages)),
+        )
         if engine_provider == "deepseek":
             if deepseek_client is None:
                 raise RuntimeError("DeepSeek 客户端未初始化")
@@ -886,26 +911,64 @@ def _build_structured_translation_callback(
     return call_llm
 
 
-def _translate_text_with_llm(
+def _request_chunk_translation(
+    chunk_text: str,
+    *,
+    system_prompt: str,
+    engine_provider: str,
+    engine_model: str,
+    max_tokens: int,
+    gemini_route: str,
+) -> str:
+    """单次调用翻译引擎翻译一个分块（不含重试与限速，由调度器负责）。"""
+    if engine_provider == "deepseek":
+        response = _deepseek_client().chat.completions.create(
+            model=engine_model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": chunk_text},
+            ],
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content or ""
+    if engine_provider == "gemini":
+        route = gemini_route
+    elif engine_provider == "openrouter":
+        route = GEMINI_ROUTE_OPENROUTER
+    else:
+        raise RuntimeError(f"不支持的翻译引擎类型: {engine_provider}")
+    return generate_text(
+        system_prompt=system_prompt,
+        user_prompt=chunk_text,
+        model=engine_model,
+        route=route,
+        temperature=0.1,
+        max_output_tokens=max_tokens,
+    )
+
+
+def _plan_text_translation(
     raw_text: str,
+    *,
+    key: Hashable,
     source_lang: str,
     target_lang: str,
-    retries: int = 3,
     translate_mode: str = DOC_TRANSLATE_DEFAULT_MODE,
     translation_engine: str = DOC_TRANSLATE_DEFAULT_TRANSLATION_ENGINE,
     gemini_route: str = DOC_TRANSLATE_DEFAULT_GEMINI_ROUTE,
     translation_rules: str = "",
-) -> str:
+) -> Tuple[List[Optional[Hashable]], List[TranslationJob]]:
     """
-    调用指定翻译引擎翻译文本。
-    分段处理防止超长文本导致单次调用失败。
+    把一段文本拆成翻译作业。
+
+    返回 (分块槽位, 作业列表)：槽位按分块顺序给出作业 key（空白分块为 None，译文记为空串），
+    用 _assemble_text_translation 按槽位拼回译文。
     """
     resolved_translate_mode = normalize_doc_translate_mode(translate_mode)
     resolved_translation_engine = normalize_doc_translate_translation_engine(translation_engine)
     engine_config = DOC_TRANSLATE_TRANSLATION_ENGINES[resolved_translation_engine]
     engine_provider = str(engine_config.get("provider") or "deepseek")
     engine_model = str(engine_config.get("model") or resolved_translation_engine)
-    engine_label = str(engine_config.get("label") or engine_model)
     max_tokens = _get_translation_engine_max_tokens(engine_config)
 
     if resolved_translate_mode == "bilingual":
@@ -913,67 +976,73 @@ def _translate_text_with_llm(
     else:
         system_prompt = _build_translation_system_prompt(source_lang, target_lang, translation_rules)
 
-    MAX_CHUNK_SIZE = 6000
-    chunks = _split_text_into_chunks(raw_text, MAX_CHUNK_SIZE)
-    translated_parts = []
-    client = None
-    if engine_provider == "deepseek":
-        client = OpenAI(
-            api_key=settings.DEEPSEEK_API_KEY,
-            base_url=settings.DEEPSEEK_BASE_URL,
-        )
-
-    for i, chunk in enumerate(chunks):
+    slots: List[Optional[Hashable]] = []
+    jobs: List[TranslationJob] = []
+    for chunk_index, chunk in enumerate(_split_text_into_chunks(raw_text, DOC_TRANSLATE_CHUNK_SIZE)):
         chunk_text = chunk.strip()
         if not chunk_text:
-            translated_parts.append("")
+            slots.append(None)
             continue
+        job_key = (key, chunk_index)
+        slots.append(job_key)
+        jobs.append(
+            TranslationJob(
+                key=job_key,
+                provider=engine_provider,
+                run=partial(
+                    _request_chunk_translation,
+                    chunk_text,
+                    system_prompt=system_prompt,
+                    engine_provider=engine_provider,
+                    engine_model=engine_model,
+                    max_tokens=max_tokens,
+                    gemini_route=gemini_route,
+                ),
+                estimated_tokens=estimate_request_tokens(system_prompt, chunk_text),
+            )
+        )
+    return slots, jobs
 
-        for attempt in range(retries):
-            try:
-                if engine_provider == "deepseek":
-                    if client is None:
-                        raise RuntimeError("DeepSeek 客户端未初始化")
-                    response = client.chat.completions.create(
-                        model=engine_model,
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": chunk_text},
-                        ],
-                        max_tokens=max_tokens,
-                    )
-                    result = response.choices[0].message.content or ""
-                elif engine_provider == "gemini":
-                    result = generate_text(
-                        system_prompt=system_prompt,
-                        user_prompt=chunk_text,
-                        model=engine_model,
-                        route=gemini_route,
-                        temperature=0.1,
-                        max_output_tokens=max_tokens,
-                    )
-                elif engine_provider == "openrouter":
-                    result = generate_text(
-                        system_prompt=system_prompt,
-                        user_prompt=chunk_text,
-                        model=engine_model,
-                        route=GEMINI_ROUTE_OPENROUTER,
-                        temperature=0.1,
-                        max_output_tokens=max_tokens,
-                    )
-                else:
-                    raise RuntimeError(f"不支持的翻译引擎类型: {engine_provider}")
-                translated_parts.append(result)
-                break
-            except Exception as e:
-                if attempt < retries - 1:
-                    wait = 3 * (attempt + 1)
-                    print(f"⚠️ {engine_label} 翻译请求失败({e.__class__.__name__})，{wait}秒后重试 [{attempt + 1}/{retries}]...")
-                    time.sleep(wait)
-                else:
-                    raise RuntimeError(f"翻译失败（已重试 {retries} 次）: {e}")
 
-    return "\n\n".join(translated_parts)
+def _assemble_text_translation(slots: List[Optional[Hashable]], results: Dict[Hashable, str]) -> str:
+    return "\n\n".join(results[slot] if slot is not None else "" for slot in slots)
+
+
+def _translation_engine_label(translation_engine: str) -> str:
+    engine_config = DOC_TRANSLATE_TRANSLATION_ENGINES[normalize_doc_translate_translation_engine(translation_engine)]
+    return str(engine_config.get("label") or engine_config.get("model") or translation_engine)
+
+
+def _translate_text_with_llm(
+    raw_text: str,
+    source_lang: str,
+    target_lang: str,
+    retries: int = 3,
+    translate_mode: str = DOC_TRANSLATE_DEFAULT_MODE,
+    translation_engine: str = DOC_TRANSLATE_DEFAULT_TRANSLATION_ENGINE,
+    gemini_route: str = DOC_TRANSLATE_DEFAULT_GEMINI_ROUTE,
+    translation_rules: str = "",
+) -> str:
+    """
+    调用指定翻译引擎翻译文本。
+    分段处理防止超长文本导致单次调用失败，各分块经翻译调度器并发请求后按原顺序拼接。
+    """
+    slots, jobs = _plan_text_translation(
+        raw_text,
+        key=target_lang,
+        source_lang=source_lang,
+        target_lang=target_lang,
+        translate_mode=translate_mode,
+        translation_engine=translation_engine,
+        gemini_route=gemini_route,
+        translation_rules=translation_rules,
+    )
+    results = run_translation_jobs(
+        jobs,
+        retries=retries,
+        label=_translation_engine_label(translation_engine),
+    )
+    return _assemble_text_translation(slots, results)
 
 
 def _split_text_into_chunks(text: str, max_size: int) -> List[str]:
@@ -1082,6 +1151,7 @@ async def execute_doc_translate_task(
     ocr_segments: List[str] = []
     raw_part_paths: List[str] = []
     processing_warnings: List[str] = []
+    ocr_cache_stats = {"hits": 0, "misses": 0}
     source_segment_label = "页"
     prepared_word_path: Optional[Path] = None
     structured_word_sentence_count = 0
@@ -1160,6 +1230,7 @@ async def execute_doc_translate_task(
                         file_path=path,
                         model=ocr_model,
                         gemini_route=gemini_route,
+                        return_metadata=True,
                     ),
                 )
             except Exception as exc:
@@ -1170,7 +1241,8 @@ async def execute_doc_translate_task(
                 ocr_segments.append("")
                 continue
 
-            ocr_segments.append(part_text or "")
+            _accumulate_ocr_cache_stats(ocr_cache_stats, part_text)
+            ocr_segments.append(part_text["text"] or "")
 
         if not any(segment.strip() for segment in ocr_segments):
             if failed_image_count:
@@ -1185,14 +1257,17 @@ async def execute_doc_translate_task(
         raw_text = _join_text_segments(ocr_segments)
     else:
         await _maybe_report(progress_callback, 5, "正在调用视觉模型进行 OCR 识别...")
-        raw_text = await loop.run_in_executor(
+        ocr_payload = await loop.run_in_executor(
             executor,
             lambda: ocr_file(
                 file_path=input_path,
                 model=ocr_model,
                 gemini_route=gemini_route,
+                return_metadata=True,
             ),
         )
+        _accumulate_ocr_cache_stats(ocr_cache_stats, ocr_payload)
+        raw_text = ocr_payload["text"]
         ocr_segments = _split_ocr_text_segments(raw_text)
         if len(ocr_segments) > 1:
             raw_part_paths = [
@@ -1206,23 +1281,94 @@ async def execute_doc_translate_task(
     await _maybe_report(progress_callback, 35, "OCR 识别完成，准备翻译...")
 
     # ----------------------------------------------------------
-    # Step 2: 逐语种翻译 + 生成 DOCX
+    # Step 2: 翻译（各语种各分块并发）+ 逐语种生成 DOCX
     # ----------------------------------------------------------
     total_langs = len(target_langs)
     results_per_lang: Dict[str, Dict[str, Any]] = {}
+    use_structured_word = (
+        prepared_word_path is not None
+        and structured_word_sentence_count > 0
+        and translate_mode == "standard"
+    )
+    translated_segments_per_lang: Dict[str, List[str]] = {}
+    translated_text_per_lang: Dict[str, str] = {}
+    translation_memory = get_translation_memory() if use_structured_word else None
+    translation_memory_stats = CacheHitStats(enabled=translation_memory is not None)
+
+    if not use_structured_word:
+        # 多段（多页 / Word 片段）逐段翻译，单段整体翻译；所有语种的分块作为一批作业交给调度器
+        text_segments = ocr_segments if len(ocr_segments) > 1 else [raw_text]
+        segment_slots: Dict[Tuple[str, int], Optional[List[Optional[Hashable]]]] = {}
+        translation_jobs: List[TranslationJob] = []
+        for lang in target_langs:
+            for segment_index, segment_text in enumerate(text_segments):
+                if len(ocr_segments) > 1 and not segment_text.strip():
+                    segment_slots[(lang, segment_index)] = None
+                    continue
+                slots, jobs = _plan_text_translation(
+                    segment_text,
+                    key=(lang, segment_index),
+                    source_lang=source_lang,
+                    target_lang=lang,
+                    translate_mode=translate_mode,
+                    translation_engine=translation_engine,
+                    gemini_route=gemini_route,
+                    translation_rules=translation_rules,
+                )
+                segment_slots[(lang, segment_index)] = slots
+                translation_jobs.extend(jobs)
+
+        segment_hint = f"{len(text_segments)} {source_segment_label}、" if len(ocr_segments) > 1 else ""
+        await _maybe_report(
+            progress_callback,
+            35,
+            f"正在翻译为 {total_langs} 种语言（{segment_hint}共 {len(translation_jobs)} 个翻译片段）...",
+        )
+
+        def report_translation_progress(done: int, total: int) -> None:
+            if progress_callback is None:
+                return
+            asyncio.run_coroutine_threadsafe(
+                progress_callback(
+                    35 + int(done / max(total, 1) * 35),
+                    f"正在翻译：已完成 {done}/{total} 个翻译片段（{total_langs} 种语言）",
+                ),
+                loop,
+            )
+
+        translation_results = await loop.run_in_executor(
+            executor,
+            lambda: run_translation_jobs(
+                translation_jobs,
+                progress_callback=report_translation_progress,
+                label=_translation_engine_label(translation_engine),
+            ),
+        )
+        for lang in target_langs:
+            translated_segments = [
+                _assemble_text_translation(slots, translation_results) if slots is not None else ""
+                for slots in (
+                    segment_slots[(lang, segment_index)]
+                    for segment_index in range(len(text_segments))
+                )
+            ]
+            if len(ocr_segments) > 1:
+                translated_segments_per_lang[lang] = translated_segments
+                translated_text_per_lang[lang] = _join_text_segments(translated_segments)
+            else:
+                translated_text_per_lang[lang] = translated_segments[0]
 
     for idx, lang in enumerate(target_langs):
         lang_name = SUPPORTED_LANGUAGES.get(lang, {}).get("name", lang)
-        lang_progress_base = 35 + int((idx / max(total_langs, 1)) * 55)
+        if use_structured_word:
+            lang_progress_base = 35 + int((idx / max(total_langs, 1)) * 55)
+        else:
+            lang_progress_base = 70 + int((idx / max(total_langs, 1)) * 20)
         translated_part_paths: List[str] = []
         structured_docx_path: Optional[Path] = None
         fixed_layout_used = False
 
-        if (
-            prepared_word_path is not None
-            and structured_word_sentence_count > 0
-            and translate_mode == "standard"
-        ):
+        if use_structured_word:
             await _maybe_report(
                 progress_callback,
                 lang_progress_base,
@@ -1245,10 +1391,31 @@ async def execute_doc_translate_task(
                             gemini_route=gemini_route,
                         ),
                         translation_rules=translation_rules,
+                        translation_memory=(
+                            translation_memory.scoped(
+                                source_lang=source_lang,
+                                target_lang=l,
+                                engine=translation_engine,
+                                translation_rules=translation_rules,
+                            )
+                            if translation_memory is not None
+                            else None
+                        ),
+                        max_concurrency=settings.DOC_TRANSLATE_CONCURRENCY,
                     )
                 ),
             )
             translated_text = structured_result.translated_text
+            translation_memory_stats.add(structured_result.memory_hits, structured_result.memory_misses)
+            if structured_result.memory_hits:
+                await _maybe_report(
+                    progress_callback,
+                    lang_progress_base,
+                    (
+                        f"{lang_name}：翻译记忆命中 {structured_result.memory_hits}/"
+                        f"{len(structured_result.source_sentences)} 个句段"
+                    ),
+                )
             translated_part_paths = [
                 _normalize_path(path)
                 for path in _write_text_segments(
@@ -1259,61 +1426,24 @@ async def execute_doc_translate_task(
                     ],
                 )
             ]
-        elif len(ocr_segments) > 1:
-            total_segments = len(ocr_segments)
-            translated_segments: List[str] = []
-            segment_label = source_segment_label
-            for segment_index, segment_text in enumerate(ocr_segments, start=1):
-                segment_progress = lang_progress_base + int((segment_index - 1) / max(total_segments, 1) * 20)
-                await _maybe_report(
-                    progress_callback,
-                    min(segment_progress, 54),
-                    f"正在翻译为{lang_name}（{segment_label} {segment_index}/{total_segments}）... ({idx + 1}/{total_langs})",
-                )
-                translated_segment = await loop.run_in_executor(
-                    executor,
-                    lambda txt=segment_text, l=lang, mode=translate_mode, engine=translation_engine, rules=translation_rules: _translate_text_with_llm(
-                        txt,
-                        source_lang,
-                        l,
-                        translate_mode=mode,
-                        translation_engine=engine,
-                        gemini_route=gemini_route,
-                        translation_rules=rules,
-                    ) if txt.strip() else "",
-                )
-                translated_segments.append(translated_segment)
-
-            translated_text = _join_text_segments(translated_segments)
-            translated_part_paths = [
-                _normalize_path(path)
-                for path in _write_text_segments(task_output_dir / f"{stem}_{lang}_parts", translated_segments)
-            ]
         else:
-            await _maybe_report(
-                progress_callback,
-                lang_progress_base,
-                f"正在翻译为{lang_name}... ({idx + 1}/{total_langs})",
-            )
-            translated_text = await loop.run_in_executor(
-                executor,
-                lambda l=lang, mode=translate_mode, engine=translation_engine, rules=translation_rules: _translate_text_with_llm(
-                    raw_text,
-                    source_lang,
-                    l,
-                    translate_mode=mode,
-                    translation_engine=engine,
-                    gemini_route=gemini_route,
-                    translation_rules=rules,
-                ),
-            )
+            translated_text = translated_text_per_lang[lang]
+            if lang in translated_segments_per_lang:
+                translated_part_paths = [
+                    _normalize_path(path)
+                    for path in _write_text_segments(
+                        task_output_dir / f"{stem}_{lang}_parts",
+                        translated_segments_per_lang[lang],
+                    )
+                ]
 
+        docx_progress = lang_progress_base + int((30 if use_structured_word else 10) / max(total_langs, 1))
         translated_txt_path = task_output_dir / f"{stem}_{lang}.txt"
         translated_txt_path.write_text(translated_text, encoding="utf-8")
 
         await _maybe_report(
             progress_callback,
-            lang_progress_base + int(30 / max(total_langs, 1)),
+            docx_progress,
             f"正在生成{lang_name} Word 文档...",
         )
 
@@ -1332,7 +1462,7 @@ async def execute_doc_translate_task(
                 try:
                     await _maybe_report(
                         progress_callback,
-                        lang_progress_base + int(30 / max(total_langs, 1)),
+                        docx_progress,
                         f"正在按浏览器实际排版生成{lang_name} Word 文档...",
                     )
                     await loop.run_in_executor(
@@ -1418,6 +1548,11 @@ async def execute_doc_translate_task(
         "source_image_count": len(source_images),
         "source_images": source_images,
         "warnings": processing_warnings,
+        "ocr_cache_hits": ocr_cache_stats["hits"],
+        "ocr_cache_misses": ocr_cache_stats["misses"],
+        "translation_memory_hits": translation_memory_stats.hits,
+        "translation_memory_misses": translation_memory_stats.misses,
+        "translation_memory_hit_rate": translation_memory_stats.hit_rate,
         "translations": results_per_lang,
     }
 
@@ -0,0 +1,94 @@
+"""
+DOCX 按元素区间拆分写出（对照记忆大文档分块使用）
+
+原做法每个分块都 copy2 源文件 → Document() 重新解析 → 删除区间外元素 → 整包重新序列化，
+8 份拆分要把同一份 docx 解析/写出 9 次。这里源文件只解析一次：
+  - 主文档 document.xml：在内容元素前后临时插入处理指令作分隔标记，整棵树只序列化一次，
+    各份按区间拼接对应字节片段（摘除大表格要逐节点修正命名空间，远比拼接慢）；
+  - 其余包内文件（styles / numbering / media / 页眉页脚等）按原始字节直接写入新包，不再解析。
+序列化方式与 python-docx 保存主文档时一致，各份 document.xml 与原做法逐字节相同。
+"""
+
+import re
+import uuid
+import zipfile
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from lxml import etree
+
+
+def _read_package_entries(src_path: str) -> List[Tuple[zipfile.ZipInfo, bytes]]:
+    with zipfile.ZipFile(src_path) as src_zip:
+        return [(info, src_zip.read(info.filename)) for info in src_zip.infolist()]
+
+
+def _write_package(dest_path: str, entries, main_part_name: str, main_xml: bytes) -> None:
+    with zipfile.ZipFile(dest_path, "w", zipfile.ZIP_DEFLATED) as dest_zip:
+        for info, data in entries:
+            target = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+            target.compress_type = info.compress_type
+            target.external_attr = info.external_attr
+            dest_zip.writestr(target, main_xml if info.filename == main_part_name else data)
+
+
+def _serialize_with_marks(root, parents) -> Tuple[bytes, List[Tuple[Optional[object], bytes]]]:
+    """
+    在 parents 的每个子节点前、以及每个 parent 末尾插入标记后序列化，返回
+    (标记前的前缀, [(标记后紧跟的子节点或 None, 到下一个标记为止的字节), ...])。
+    子节点的 tail 留在它自己的片段里，与 python-docx 删除元素时连同 tail 一起移除一致。
+    """
+    target = f"docx-part-split-{uuid.uuid4().hex}"
+    marks = []
+    try:
+        for parent in parents:
+            for child in list(parent):
+                mark = etree.ProcessingInstruction(target, str(len(marks)))
+                child.addprevious(mark)
+                marks.append((mark, child))
+            mark = etree.ProcessingInstruction(target, str(len(marks)))
+            parent.append(mark)
+            marks.append((mark, None))
+        xml = etree.tostring(root, encoding="UTF-8", standalone=True)
+    finally:
+        for mark, _child in marks:
+            mark.getparent().remove(mark)
+
+    pieces = re.split(rb"<\?" + re.escape(target.encode("ascii")) + rb" (\d+)\?>", xml)
+    segments = [(marks[int(pieces[i])][1], pieces[i + 1]) for i in range(1, len(pieces), 2)]
+    return pieces[0], segments
+
+
+def write_element_range_parts(
+    document,
+    src_path: str,
+    content_elements: Sequence,
+    ranges: Iterable[Tuple[int, int]],
+    dest_paths: Iterable[str],
+) -> List[str]:
+    """
+    把已解析的 document 按 content_elements 上的 [start, end) 区间逐份写出。
+
+    Args:
+        document:         python-docx Document（由 src_path 打开，调用结束后树结构保持不变）
+        src_path:         源 docx，用于原样复制主文档以外的包内文件
+        content_elements: 参与编号的内容元素（lxml 元素，如 body 下的 w:p / w:tbl）
+        ranges:           每份保留的元素区间
+        dest_paths:       与 ranges 一一对应的输出路径
+    """
+    main_part_name = str(document.part.partname).lstrip("/")
+    entries = _read_package_entries(src_path)
+
+    parents = []
+    for element in content_elements:
+        parent = element.getparent()
+        if parent is not None and parent not in parents:
+            parents.append(parent)
+    prefix, segments = _serialize_with_marks(document.element, parents)
+
+    written = []
+    for (start, end), dest_path in zip(ranges, dest_paths):
+        dropped = set(content_elements[:start]) | set(content_elements[end:])
+        main_xml = prefix + b"".join(data for child, data in segments if child is None or child not in dropped)
+        _write_package(dest_path, entries, main_part_name, main_xml)
+        written.append(dest_path)
+    return written
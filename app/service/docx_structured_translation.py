@@ -11,10 +11,14 @@ from __future__ import annotations
 import hashlib
 import json
 import re
+import threading
+import time
 import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Callable, Iterable, Sequence
+from typing import Callable, Iterable, Protocol, Sequence
 
 from lxml import etree
 
@@ -56,6 +60,11 @@ ROMAN_NUMERAL_RE = re.compile(r"^[ivxlcdm]+$", re.IGNORECASE)
 
 MAX_GROUP_ITEMS = 15
 MAX_GROUP_SOURCE_CHARS = 3000
+DEFAULT_GROUP_CONCURRENCY = 4
+# 单组请求耗时超过该秒数时按比例缩小后续分组
+GROUP_LATENCY_TARGET_SECONDS = 30.0
+# 连续成功多少组后放大一档分组
+GROUP_GROWTH_STREAK = 3
 
 
 class StructuredTranslationError(RuntimeError):
@@ -111,6 +120,8 @@ class DocxTranslationResult:
     output_path: Path
     source_sentences: list[DocxSentence]
     translations: dict[str, str]
+    memory_hits: int = 0
+    memory_misses: int = 0
 
     @property
     def translated_text(self) -> str:
@@ -123,6 +134,14 @@ class DocxTranslationResult:
 LLMMessageCallback = Callable[[list[dict[str, str]], bool], str]
 
 
+class SentenceMemory(Protocol):
+    """句段翻译记忆（已绑定语言对/引擎/规则）：按规范化原文查询与回写译文。"""
+
+    def lookup(self, source_texts: Iterable[str]) -> dict[str, str]: ...
+
+    def store(self, pairs: Iterable[tuple[str, str]]) -> None: ...
+
+
 def normalize_text(text: str) -> str:
     if not text:
         return ""
@@ -250,8 +269,14 @@ def translate_docx_preserving_format(
     translation_rules: str = "",
     bilingual: bool = False,
     retries: int = 2,
+    translation_memory: SentenceMemory | None = None,
+    max_concurrency: int = DEFAULT_GROUP_CONCURRENCY,
 ) -> DocxTranslationResult:
-    """按句翻译 DOCX，并在原 OpenXML 上回写译文。"""
+    """按句翻译 DOCX，并在原 OpenXML 上回写译文。
+
+    传入 translation_memory 时，记忆中已有的句段直接复用译文，只有未命中的句段发给模型，
+    新译文在每组完成后写回记忆。句段分组最多 max_concurrency 组同时请求（call_llm 需线程安全）。
+    """
     source = Path(source_path)
     output = Path(output_path)
     output.parent.mkdir(parents=True, exist_ok=True)
@@ -260,13 +285,15 @@ def translate_docx_preserving_format(
         blocks, sentences = _parse_package_blocks(package)
         if not sentences:
             raise StructuredTranslationError("Word 文档中未找到可编辑的文本句段。")
-        translations = _translate_sentence_groups(
+        translations, memory_hits = _translate_sentence_groups(
             sentences,
             source_language=source_language,
             target_language=target_language,
             call_llm=call_llm,
             translation_rules=translation_rules,
             retries=max(int(retries), 1),
+            translation_memory=translation_memory,
+            max_concurrency=max_concurrency,
         )
         replacements = {
             sentence.sentence_id: (
@@ -283,6 +310,8 @@ def translate_docx_preserving_format(
         output_path=output,
         source_sentences=sentences,
         translations=translations,
+        memory_hits=memory_hits,
+        memory_misses=len(sentences) - memory_hits if translation_memory is not None else 0,
     )
 
 
@@ -407,6 +436,44 @@ def _span_text(tokens: Sequence[_TextToken], span: SentenceSpan) -> str:
     return "".join(pieces)
 
 
+class _GroupSizer:
+    """按模型的实际表现调整句段分组上限：失败减半、超时按比例缩小、连续成功逐档放大。"""
+
+    def __init__(
+        self,
+        max_items: int = MAX_GROUP_ITEMS,
+        max_chars: int = MAX_GROUP_SOURCE_CHARS,
+        latency_target_seconds: float = GROUP_LATENCY_TARGET_SECONDS,
+    ) -> None:
+        self.max_items = max(int(max_items), 1)
+        self.max_chars = max(int(max_chars), 1)
+        self.latency_target_seconds = latency_target_seconds
+        self.items_limit = self.max_items
+        self._streak = 0
+        self._lock = threading.Lock()
+
+    @property
+    def chars_limit(self) -> int:
+        return max(self.max_chars * self.items_limit // self.max_items, 1)
+
+    def record_success(self, size: int, elapsed_seconds: float) -> None:
+        with self._lock:
+            if self.latency_target_seconds and elapsed_seconds > self.latency_target_seconds and size > 1:
+                scaled = int(size * self.latency_target_seconds / elapsed_seconds)
+                self.items_limit = max(1, min(self.items_limit, scaled))
+                self._streak = 0
+                return
+            self._streak += 1
+            if self._streak >= GROUP_GROWTH_STREAK and self.items_limit < self.max_items:
+                self.items_limit += 1
+                self._streak = 0
+
+    def record_failure(self, size: int) -> None:
+        with self._lock:
+            self.items_limit = max(1, min(self.items_limit, size // 2))
+            self._streak = 0
+
+
 def _translate_sentence_groups(
     sentences: list[DocxSentence],
     *,
@@ -415,59 +482,130 @@ def _translate_sentence_groups(
     call_llm: LLMMessageCallback,
     translation_rules: str,
     retries: int,
-) -> dict[str, str]:
+    translation_memory: SentenceMemory | None = None,
+    max_concurrency: int = DEFAULT_GROUP_CONCURRENCY,
+) -> tuple[dict[str, str], int]:
+    """
+    并发翻译句段分组，返回 (句段译文, 记忆命中句数)。
+
+    分组仍只在同一段落/表格区域内划分，按当前分组上限逐组取出后提交；某组不符合协议时
+    对半拆开重新排队（优先于新分组），拆到单句仍失败才整体报错。
+    """
+    results: dict[str, str] = {}
+    pending = sentences
+    if translation_memory is not None:
+        results, pending = _apply_sentence_memory(sentences, translation_memory)
+    memory_hits = len(sentences) - len(pending)
+
     grouped: dict[tuple[str, int], list[DocxSentence]] = {}
-    for sentence in sentences:
+    for sentence in pending:
         grouped.setdefault((sentence.part_name, sentence.block_index), []).append(sentence)
+    blocks = deque(deque(block_sentences) for block_sentences in grouped.values())
+    split_groups: deque[list[DocxSentence]] = deque()
+    sizer = _GroupSizer()
+
+    def next_group() -> list[DocxSentence] | None:
+        if split_groups:
+            return split_groups.popleft()
+        while blocks:
+            group = _take_group(blocks[0], sizer.items_limit, sizer.chars_limit)
+            if not blocks[0]:
+                blocks.popleft()
+            if group:
+                return group
+        return None
+
+    def translate_group(group: list[DocxSentence]) -> tuple[dict[str, str], float]:
+        started = time.monotonic()
+        translated = _translate_one_group(
+            group,
+            source_language=source_language,
+            target_language=target_language,
+            call_llm=call_llm,
+            translation_rules=translation_rules,
+            retries=retries,
+        )
+        return translated, time.monotonic() - started
 
-    results: dict[str, str] = {}
-    for block_sentences in grouped.values():
-        for group in _split_group(block_sentences):
-            try:
-                results.update(
-                    _translate_one_group(
-                        group,
-                        source_language=source_language,
-                        target_language=target_language,
-                        call_llm=call_llm,
-                        translation_rules=translation_rules,
-                        retries=retries,
-                    )
-                )
-            except StructuredResponseError:
-                if len(group) == 1:
-                    raise
-                for sentence in group:
-                    results.update(
-                        _translate_one_group(
-                            [sentence],
-                            source_language=source_language,
-                            target_language=target_language,
-                            call_llm=call_llm,
-                            translation_rules=translation_rules,
-                            retries=retries,
-                        )
+    workers = max(int(max_concurrency or 1), 1)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="docx-translate")
+    running: dict[Future, list[DocxSentence]] = {}
+    try:
+        while True:
+            while len(running) < workers:
+                group = next_group()
+                if group is None:
+                    break
+                running[executor.submit(translate_group, group)] = group
+            if not running:
+                break
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                group = running.pop(future)
+                try:
+                    translated, elapsed = future.result()
+                except StructuredResponseError:
+                    if len(group) == 1:
+                        raise
+                    sizer.record_failure(len(group))
+                    middle = len(group) // 2
+                    split_groups.appendleft(group[middle:])
+                    split_groups.appendleft(group[:middle])
+                    continue
+                sizer.record_success(len(group), elapsed)
+                results.update(translated)
+                if translation_memory is not None:
+                    translation_memory.store(
+                        (sentence.source_text, translated[sentence.sentence_id]) for sentence in group
                     )
-    return results
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return {sentence.sentence_id: results[sentence.sentence_id] for sentence in sentences}, memory_hits
+
 
+def _apply_sentence_memory(
+    sentences: list[DocxSentence],
+    translation_memory: SentenceMemory,
+) -> tuple[dict[str, str], list[DocxSentence]]:
+    """用记忆译文填充命中的句段，返回 (已有译文, 仍需翻译的句段)。
 
-def _split_group(sentences: Iterable[DocxSentence]) -> list[list[DocxSentence]]:
-    groups: list[list[DocxSentence]] = []
-    current: list[DocxSentence] = []
-    current_chars = 0
+    记忆按规范化原文命中，版式换行或特殊符号与本句对不上的旧译文视为未命中。
+    """
+    remembered = translation_memory.lookup(sentence.source_text for sentence in sentences)
+    results: dict[str, str] = {}
+    pending: list[DocxSentence] = []
     for sentence in sentences:
-        if current and (
-            len(current) >= MAX_GROUP_ITEMS
-            or current_chars + len(sentence.source_text) > MAX_GROUP_SOURCE_CHARS
+        target = remembered.get(sentence.source_text)
+        if target is not None:
+            try:
+                _validate_translation(sentence, target)
+            except StructuredResponseError:
+                target = None
+        if target is None:
+            pending.append(sentence)
+        else:
+            results[sentence.sentence_id] = target
+    return results, pending
+
+
+def _take_group(
+    block_sentences: deque[DocxSentence],
+    max_items: int,
+    max_chars: int,
+) -> list[DocxSentence]:
+    """从同一段落的剩余句段头部取出一组：至少一句，不超过条数与字符上限。"""
+    group: list[DocxSentence] = []
+    group_chars = 0
+    while block_sentences:
+        sentence = block_sentences[0]
+        if group and (
+            len(group) >= max_items
+            or group_chars + len(sentence.source_text) > max_chars
         ):
-            groups.append(current)
-            current = []
-            current_chars = 0
-        current.append(sentence)
-        current_chars += len(sentence.source_text)
-    if current:
-        groups.append(current)
-    return groups
+            break
+        group.append(block_sentences.popleft())
+        group_chars += len(sentence.source_text)
+    return group
 
 
 def _translate_one_group(
@@ -1,11 +1,14 @@
 ﻿import asyncio
+import atexit
 import contextlib
 import io
 import os
 import sys
+import threading
+import time
 from concurrent.futures import Executor
 from pathlib import Path
-from typing import Any, Awaitable, Callable, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
 
 from app.core.config import settings
 from app.core.file_naming import build_user_visible_filename, ensure_unique_path
@@ -75,20 +78,156 @@ def get_drivers_license_config() -> Dict[str, Any]:
     }
 
 
-def _build_pipeline():
-    _prepare_drivers_license_path()
-    os.environ["GLM_API_KEY"] = settings.GLM_API_KEY or os.getenv("GLM_API_KEY", "")
-    os.environ["DEEPSEEK_API_KEY"] = settings.DEEPSEEK_API_KEY or os.getenv("DEEPSEEK_API_KEY", "")
+# 预热人脸检测用的空白图（MTCNN 首次推理会构建 TensorFlow 计算图）
+_WARM_UP_IMAGE_SIZE = 160
 
-    from src.config import TranslatorConfig
-    from src.translator_pipeline import TranslatorPipeline
 
-    config = TranslatorConfig.from_env()
-    if not config.glm_api_key:
+def _preload_face_detector(pipeline: Any) -> None:
+    """提前加载 ImageExtractor 延迟创建的 MTCNN 并在空白图上推理一次。"""
+    import numpy as np
+
+    try:
+        detector = pipeline.image_extractor.mtcnn
+    except ImportError as exc:
+        print(f"[drivers-license] 跳过人脸检测器预加载: {exc}", flush=True)
+        return
+    detector.detect_faces(np.zeros((_WARM_UP_IMAGE_SIZE, _WARM_UP_IMAGE_SIZE, 3), dtype=np.uint8))
+
+
+def _build_pipeline(glm_api_key: str, deepseek_api_key: str):
+    """创建驾驶证翻译流水线并预加载人脸检测器；密钥显式传入，不改写进程环境变量。"""
+    if not glm_api_key:
         raise ValueError("未配置全局 .env 中的 GLM_API_KEY")
-    if not config.deepseek_api_key:
+    if not deepseek_api_key:
         raise ValueError("未配置全局 .env 中的 DEEPSEEK_API_KEY")
-    return TranslatorPipeline(config.glm_api_key, config.deepseek_api_key)
+    _prepare_drivers_license_path()
+
+    from src.translator_pipeline import TranslatorPipeline
+
+    pipeline = TranslatorPipeline(glm_api_key, deepseek_api_key)
+    _preload_face_detector(pipeline)
+    return pipeline
+
+
+class DriversLicensePipelinePool:
+    """
+    常驻驾驶证翻译流水线：按需创建至多 size 个实例，每个任务独占借用一个，用完归还。
+
+    TranslatorPipeline 内的 MTCNN/TensorFlow 加载耗时数秒，实例跨任务复用后只在首次创建时付出；
+    同一实例不会被两个任务同时使用。实例创建失败时会唤醒等待者，由等待者重新尝试创建。
+    """
+
+    def __init__(self, size: int, factory: Callable[[], Any], *, api_keys: Tuple[str, str] = ("", "")) -> None:
+        self.size = max(int(size), 1)
+        self.api_keys = api_keys
+        self._factory = factory
+        self._idle: List[Any] = []
+        self._created = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _create(self) -> Tuple[Any, float]:
+        """在已占用创建名额的前提下创建实例；失败时归还名额并唤醒一个等待者。"""
+        started = time.perf_counter()
+        try:
+            pipeline = self._factory()
+        except BaseException:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+        return pipeline, time.perf_counter() - started
+
+    def _release(self, pipeline: Any) -> None:
+        # 池已关闭时也归还，避免仍在等待的任务卡住；池对象释放后实例随之回收
+        with self._cond:
+            self._idle.append(pipeline)
+            self._cond.notify()
+
+    def warm_up(self) -> None:
+        while True:
+            with self._cond:
+                if self._closed or self._created >= self.size:
+                    return
+                self._created += 1
+            pipeline, _ = self._create()
+            self._release(pipeline)
+
+    @contextlib.contextmanager
+    def checkout(self) -> Iterator[Tuple[Any, float]]:
+        """借用一个流水线，返回 (实例, 本次为创建实例花费的秒数；复用已加载实例时为 0)。"""
+        with self._cond:
+            while not self._idle and self._created >= self.size:
+                self._cond.wait()
+            if self._idle:
+                pipeline, load_seconds = self._idle.pop(), 0.0
+            else:
+                self._created += 1
+                pipeline = None
+        if pipeline is None:
+            pipeline, load_seconds = self._create()
+        try:
+            yield pipeline, load_seconds
+        finally:
+            self._release(pipeline)
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._closed = True
+            # 丢弃空闲实例并让出名额，仍持有旧池引用的任务可以重新创建而不会卡住
+            self._created -= len(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+
+
+_pool_lock = threading.Lock()
+_pool: Optional[DriversLicensePipelinePool] = None
+
+
+def drivers_license_pool_enabled() -> bool:
+    return int(settings.DRIVERS_LICENSE_PIPELINES or 0) > 0
+
+
+def _configured_api_keys() -> Tuple[str, str]:
+    glm_api_key = settings.GLM_API_KEY or os.getenv("GLM_API_KEY", "")
+    deepseek_api_key = settings.DEEPSEEK_API_KEY or os.getenv("DEEPSEEK_API_KEY", "")
+    return glm_api_key.strip(), deepseek_api_key.strip()
+
+
+def get_drivers_license_pipeline_pool() -> DriversLicensePipelinePool:
+    """返回进程内共享的流水线池；未启用常驻时每次返回只容纳一个实例的新池（即每个任务新建）。"""
+    global _pool
+    api_keys = _configured_api_keys()
+    factory = lambda: _build_pipeline(*api_keys)  # noqa: E731
+    if not drivers_license_pool_enabled():
+        return DriversLicensePipelinePool(1, factory, api_keys=api_keys)
+    with _pool_lock:
+        if _pool is None or _pool.api_keys != api_keys:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = DriversLicensePipelinePool(settings.DRIVERS_LICENSE_PIPELINES, factory, api_keys=api_keys)
+        return _pool
+
+
+def warm_up_drivers_license_pipelines() -> None:
+    started = time.perf_counter()
+    try:
+        get_drivers_license_pipeline_pool().warm_up()
+    except (FileNotFoundError, ImportError, ValueError) as exc:
+        print(f"[drivers-license] 跳过预热: {exc}", flush=True)
+        return
+    print(f"[drivers-license] 流水线预热完成，耗时 {time.perf_counter() - started:.1f}s", flush=True)
+
+
+def shutdown_drivers_license_pipelines() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+atexit.register(shutdown_drivers_license_pipelines)
 
 
 @contextlib.contextmanager
@@ -98,25 +237,32 @@ def _capture_stdout():
         yield stream
 
 
-def _run_single_sync(input_path: str, output_dir: Path) -> tuple[str, str]:
-    pipeline = _build_pipeline()
-    with _capture_stdout() as logs:
-        output_path = pipeline.translate_image(input_path, str(output_dir))
-    return output_path, logs.getvalue()
+def _run_single_sync(input_path: str, output_dir: Path) -> tuple[str, str, float]:
+    with get_drivers_license_pipeline_pool().checkout() as (pipeline, load_seconds):
+        with _capture_stdout() as logs:
+            output_path = pipeline.translate_image(input_path, str(output_dir))
+    return output_path, logs.getvalue(), load_seconds
+
+
+def _run_merge_sync(input_paths: List[str], output_dir: Path) -> tuple[str, str, float]:
+    with get_drivers_license_pipeline_pool().checkout() as (pipeline, load_seconds):
+        with _capture_stdout() as logs:
+            output_path = pipeline.translate_merge(input_paths, str(output_dir))
+    return output_path, logs.getvalue(), load_seconds
 
 
-def _run_merge_sync(input_paths: List[str], output_dir: Path) -> tuple[str, str]:
-    pipeline = _build_pipeline()
-    with _capture_stdout() as logs:
-        output_path = pipeline.translate_merge(input_paths, str(output_dir))
-    return output_path, logs.getvalue()
+def _run_batch_sync(input_paths: List[str], output_dir: Path) -> tuple[Dict[str, str], str, float]:
+    # 批量模式下所有图片共用同一个已加载的流水线实例
+    with get_drivers_license_pipeline_pool().checkout() as (pipeline, load_seconds):
+        with _capture_stdout() as logs:
+            result = pipeline.translate_batch(input_paths, str(output_dir))
+    return result, logs.getvalue(), load_seconds
 
 
-def _run_batch_sync(input_paths: List[str], output_dir: Path) -> tuple[Dict[str, str], str]:
-    pipeline = _build_pipeline()
-    with _capture_stdout() as logs:
-        result = pipeline.translate_batch(input_paths, str(output_dir))
-    return result, logs.getvalue()
+def _pipeline_load_message(load_seconds: float) -> str:
+    if load_seconds:
+        return f"驾驶证识别模型加载完成（耗时 {load_seconds:.1f}s）"
+    return "已复用预加载的驾驶证识别模型"
 
 
 async def execute_drivers_license_task(
@@ -145,7 +291,10 @@ async def execute_drivers_license_task(
 
     if processing_mode == "single":
         await _maybe_report(progress_callback, 15, "正在识别并生成驾驶证 Word...")
-        output_path, logs = await loop.run_in_executor(executor, lambda: _run_single_sync(input_paths[0], output_dir))
+        output_path, logs, load_seconds = await loop.run_in_executor(
+            executor, lambda: _run_single_sync(input_paths[0], output_dir)
+        )
+        await _maybe_report(progress_callback, 90, _pipeline_load_message(load_seconds))
         output_path = _finalize_output_docx(output_path, output_dir, original_filenames[0])
         await _maybe_report(progress_callback, 95, "正在整理输出结果...")
         return {
@@ -162,11 +311,15 @@ async def execute_drivers_license_task(
                 }
             ],
             "stream_log": logs,
+            "pipeline_load_seconds": round(load_seconds, 3),
         }
 
     if processing_mode == "merge":
         await _maybe_report(progress_callback, 15, f"正在合并处理 {len(input_paths)} 张驾驶证图片...")
-        output_path, logs = await loop.run_in_executor(executor, lambda: _run_merge_sync(input_paths, output_dir))
+        output_path, logs, load_seconds = await loop.run_in_executor(
+            executor, lambda: _run_merge_sync(input_paths, output_dir)
+        )
+        await _maybe_report(progress_callback, 90, _pipeline_load_message(load_seconds))
         output_path = _finalize_output_docx(output_path, output_dir, original_filenames[0])
         await _maybe_report(progress_callback, 95, "正在整理输出结果...")
         return {
@@ -183,10 +336,14 @@ async def execute_drivers_license_task(
                 for name in original_filenames
             ],
             "stream_log": logs,
+            "pipeline_load_seconds": round(load_seconds, 3),
         }
 
     await _maybe_report(progress_callback, 15, f"正在批量处理 {len(input_paths)} 张驾驶证图片...")
-    result_map, logs = await loop.run_in_executor(executor, lambda: _run_batch_sync(input_paths, output_dir))
+    result_map, logs, load_seconds = await loop.run_in_executor(
+        executor, lambda: _run_batch_sync(input_paths, output_dir)
+    )
+    await _maybe_report(progress_callback, 90, _pipeline_load_message(load_seconds))
     await _maybe_report(progress_callback, 95, "正在整理批量输出结果...")
 
     items: List[Dict[str, Any]] = []
@@ -224,4 +381,5 @@ async def execute_drivers_license_task(
         "failed_count": fail_count,
         "items": items,
         "stream_log": logs,
+        "pipeline_load_seconds": round(load_seconds, 3),
     }
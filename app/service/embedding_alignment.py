@@ -98,6 +98,56 @@ def _pair_score(
     return sim
 
 
+# 回溯操作码：0 表示该格不可达
+_OP_NONE = 0
+_OP_SPANS = {
+    1: (1, 1),
+    2: (1, 2),
+    3: (2, 1),
+    4: (1, 0),
+    5: (0, 1),
+}
+
+
+def _normalized_block_means(matrix: np.ndarray, span: int) -> np.ndarray:
+    """批量计算每个连续 ``span`` 行块的单位化均值，逐位等同于逐块调用 ``_mean_rows``。"""
+    dim = int(matrix.shape[1])
+    count = int(matrix.shape[0]) - span + 1
+    if count <= 0:
+        return np.zeros((0, dim), dtype=np.float32)
+    if not np.issubdtype(matrix.dtype, np.floating):
+        matrix = matrix.astype(np.float64)
+    if span == 1:
+        block = matrix.copy()
+    else:
+        block = (matrix[:-1] + matrix[1:]) / 2
+    # 范数逐行求，保持与 np.linalg.norm(vec) 完全相同的累加顺序
+    norms = np.array([float(np.linalg.norm(row)) for row in block], dtype=block.dtype)
+    positive = norms > 0
+    block[positive] = block[positive] / norms[positive, None]
+    return np.ascontiguousarray(block.astype(np.float32))
+
+
+def _diagonal_dots(
+    left: np.ndarray,
+    right: np.ndarray,
+    left_start: int,
+    right_start: int,
+    count: int,
+) -> np.ndarray:
+    """返回 ``left[left_start + k] · right[right_start - k]``（k < count）。
+
+    两侧都用跨步视图取反对角线上的行，不复制数据；批量 matmul 的逐对点积与
+    ``np.dot`` 结果逐位一致（普通矩阵乘法会改变 float32 累加顺序，影响对齐结果）。
+    """
+    if count <= 0:
+        return np.zeros(0, dtype=np.float64)
+    lhs = left[left_start:left_start + count]
+    stop = right_start - count
+    rhs = right[right_start:stop if stop >= 0 else None:-1]
+    return np.matmul(lhs[:, None, :], rhs[:, :, None])[:, 0, 0].astype(np.float64)
+
+
 def dp_align_embeddings(
     src_emb: np.ndarray,
     tgt_emb: np.ndarray,
@@ -108,6 +158,211 @@ def dp_align_embeddings(
 ) -> List[AlignmentLink]:
     """
     带状 DP 对齐，支持 (1,1)/(1,2)/(2,1)/(1,0)/(0,1)。
+
+    按反对角线推进：同一条反对角线上的格子互不依赖，整条线的候选分数一次向量化求出；
+    DP 只保留最近三条反对角线，回溯指针以 int8 存在带内。结果与逐格实现完全一致。
+    """
+    m = int(src_emb.shape[0])
+    n = int(tgt_emb.shape[0])
+    if m == 0 and n == 0:
+        return []
+    if m == 0:
+        return [
+            AlignmentLink(0, 0, j, j + 1, 0.0, True)
+            for j in range(n)
+        ]
+    if n == 0:
+        return [
+            AlignmentLink(i, i + 1, 0, 0, 0.0, True)
+            for i in range(m)
+        ]
+
+    band = max(min_band, int(max(m, n) * band_ratio))
+    neg = -1e9
+    neg32 = np.float32(neg)
+
+    j_lo = np.array(
+        [0 if i == 0 else max(0, int(i * n / m) - band) for i in range(m + 1)],
+        dtype=np.int32,
+    )
+    j_hi = np.array(
+        [n if i == m else min(n, int(i * n / m) + band) for i in range(m + 1)],
+        dtype=np.int32,
+    )
+    rows = np.arange(m + 1, dtype=np.int64)
+    diag_lo = rows + j_lo
+    diag_hi = rows + j_hi
+    width = int((j_hi - j_lo).max()) + 1
+    back = np.zeros((m + 1, width), dtype=np.int8)
+    row_best = np.full(m + 1, neg32, dtype=np.float32)
+    row_best_j = np.zeros(m + 1, dtype=np.int32)
+
+    src_1 = _normalized_block_means(src_emb, 1)
+    src_2 = _normalized_block_means(src_emb, 2)
+    tgt_1 = _normalized_block_means(tgt_emb, 1)
+    tgt_2 = _normalized_block_means(tgt_emb, 2)
+
+    # 反对角线 d -> (起始行, 该线上各行的 dp 值)
+    diagonals = {0: (0, np.zeros(1, dtype=np.float32))}
+
+    def previous(d: int, row_idx: np.ndarray) -> np.ndarray:
+        entry = diagonals.get(d)
+        if entry is None:
+            return np.full(row_idx.shape[0], neg)
+        start, values = entry
+        pos = row_idx - start
+        inside = (pos >= 0) & (pos < values.shape[0])
+        out = np.full(row_idx.shape[0], neg32, dtype=np.float32)
+        out[inside] = values[pos[inside]]
+        return out.astype(np.float64)
+
+    def relax(best, ops, lo, hi, cand, code) -> None:
+        if hi <= lo:
+            return
+        window = best[lo:hi]
+        better = cand > window
+        window[better] = cand[better]
+        ops[lo:hi][better] = code
+
+    for d in range(1, m + n + 1):
+        ia = int(np.searchsorted(diag_hi, d, side="left"))
+        ib = int(np.searchsorted(diag_lo, d, side="right")) - 1
+        if ib < ia:
+            diagonals[d] = (ia, np.zeros(0, dtype=np.float32))
+            diagonals.pop(d - 3, None)
+            continue
+        i_idx = rows[ia:ib + 1]
+        count = i_idx.shape[0]
+        best = np.full(count, neg)
+        ops = np.zeros(count, dtype=np.int8)
+
+        # (1,1): i>=1, j>=1
+        lo = max(ia, 1)
+        hi = min(ib, d - 1)
+        if hi >= lo:
+            score = _diagonal_dots(src_1, tgt_1, lo - 1, d - lo - 1, hi - lo + 1) + _MATCH_BONUS
+            cand = previous(d - 2, i_idx[lo - ia:hi - ia + 1] - 1) + score
+            relax(best, ops, lo - ia, hi - ia + 1, cand, 1)
+
+        # (1,2): i>=1, j>=2
+        hi = min(ib, d - 2)
+        if hi >= lo:
+            score = _diagonal_dots(src_1, tgt_2, lo - 1, d - lo - 2, hi - lo + 1)
+            cand = previous(d - 3, i_idx[lo - ia:hi - ia + 1] - 1) + score * 0.98
+            relax(best, ops, lo - ia, hi - ia + 1, cand, 2)
+
+        # (2,1): i>=2, j>=1
+        lo2 = max(ia, 2)
+        hi = min(ib, d - 1)
+        if hi >= lo2:
+            score = _diagonal_dots(src_2, tgt_1, lo2 - 2, d - lo2 - 1, hi - lo2 + 1)
+            cand = previous(d - 3, i_idx[lo2 - ia:hi - ia + 1] - 2) + score * 0.98
+            relax(best, ops, lo2 - ia, hi - ia + 1, cand, 3)
+
+        # (1,0): i>=1
+        if ib >= lo:
+            cand = previous(d - 1, i_idx[lo - ia:] - 1) - _SKIP_PENALTY
+            relax(best, ops, lo - ia, count, cand, 4)
+
+        # (0,1): j>=1
+        hi = min(ib, d - 1)
+        if hi >= ia:
+            cand = previous(d - 1, i_idx[:hi - ia + 1]) - _SKIP_PENALTY
+            relax(best, ops, 0, hi - ia + 1, cand, 5)
+
+        reached = ops != _OP_NONE
+        values = np.where(reached, best.astype(np.float32), neg32).astype(np.float32)
+        j_idx = d - i_idx
+        back[i_idx, j_idx - j_lo[i_idx]] = ops
+
+        improved = values > row_best[i_idx]
+        row_best[i_idx[improved]] = values[improved]
+        row_best_j[i_idx[improved]] = j_idx[improved]
+
+        diagonals[d] = (ia, values)
+        diagonals.pop(d - 3, None)
+
+    def op_at(i: int, j: int) -> int:
+        if j_lo[i] <= j <= j_hi[i]:
+            return int(back[i, j - j_lo[i]])
+        return _OP_NONE
+
+    def op_score(op: int, pi: int, pj: int) -> float:
+        if op == 1:
+            return float(np.dot(src_1[pi], tgt_1[pj])) + _MATCH_BONUS
+        if op == 2:
+            return float(np.dot(src_1[pi], tgt_2[pj]))
+        if op == 3:
+            return float(np.dot(src_2[pi], tgt_1[pj]))
+        return 0.0
+
+    # 若终点不可达，取 dp 最大（行优先首个）的可达格子作为近似终点
+    i, j = m, n
+    if op_at(i, j) == _OP_NONE:
+        best_val = row_best.max()
+        if best_val > 0:
+            best_row = int(np.flatnonzero(row_best == best_val)[0])
+            i, j = best_row, int(row_best_j[best_row])
+        else:
+            i, j = 0, 0
+
+    links_rev: List[AlignmentLink] = []
+    while i > 0 or j > 0:
+        op = op_at(i, j)
+        if op == _OP_NONE:
+            if i > 0:
+                links_rev.append(AlignmentLink(i - 1, i, j, j, 0.0, True))
+                i -= 1
+                continue
+            if j > 0:
+                links_rev.append(AlignmentLink(i, i, j - 1, j, 0.0, True))
+                j -= 1
+                continue
+            break
+        src_len, tgt_len = _OP_SPANS[op]
+        pi, pj = i - src_len, j - tgt_len
+        score = op_score(op, pi, pj)
+        low = (
+            (src_len == 0 or tgt_len == 0)
+            or score < confidence_threshold
+            or score < _MIN_ABS_SIM
+        )
+        links_rev.append(
+            AlignmentLink(
+                src_start=pi,
+                src_end=pi + src_len,
+                tgt_start=pj,
+                tgt_end=pj + tgt_len,
+                score=float(score),
+                low_confidence=low,
+            )
+        )
+        i, j = pi, pj
+
+    links = list(reversed(links_rev))
+
+    # 补上未覆盖尾部（近似终点导致）
+    covered_src = max((link.src_end for link in links), default=0)
+    covered_tgt = max((link.tgt_end for link in links), default=0)
+    while covered_src < m:
+        links.append(AlignmentLink(covered_src, covered_src + 1, n, n, 0.0, True))
+        covered_src += 1
+    while covered_tgt < n:
+        links.append(AlignmentLink(m, m, covered_tgt, covered_tgt + 1, 0.0, True))
+        covered_tgt += 1
+    return links
+
+
+def _dp_align_embeddings_cellwise(
+    src_emb: np.ndarray,
+    tgt_emb: np.ndarray,
+    *,
+    band_ratio: float = 0.12,
+    min_band: int = 8,
+    confidence_threshold: float = 0.55,
+) -> List[AlignmentLink]:
+    """
+    逐格计算的带状 DP（旧实现），仅作为向量化版本的对拍与基准参照。
     """
     m = int(src_emb.shape[0])
     n = int(tgt_emb.shape[0])
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""句向量本地缓存：float32 向量顺序追加到可内存映射的数据文件，SQLite 记录文本到行号的索引。
+
+多个进程可共用同一缓存目录：行数总是由数据文件大小推出，追加在 SQLite 写事务内进行，
+写事务本身就是跨进程的文件锁。"""
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embedding_index (
+    namespace TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    row_index INTEGER NOT NULL,
+    PRIMARY KEY (namespace, text_hash)
+)
+"""
+
+
+def normalize_embedding_text(text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", str(text or ""))).strip()
+
+
+def embedding_text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_embedding_text(text).encode("utf-8")).hexdigest()
+
+
+def embedding_namespace(model: str, dimensions: int, task_type: str) -> str:
+    return f"{model}|{int(dimensions)}|{task_type}"
+
+
+class EmbeddingVectorStore:
+    """按 (模型, 维度, task_type) 分命名空间存放向量；同一命名空间的向量行宽固定。"""
+
+    def __init__(self, root_dir: str | Path) -> None:
+        self.root_dir = Path(root_dir)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._views: Dict[str, np.memmap] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.root_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.root_dir / "index.sqlite3"), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _vector_path(self, namespace: str) -> Path:
+        digest = hashlib.sha256(namespace.encode("utf-8")).hexdigest()[:24]
+        return self.root_dir / f"{digest}.f32"
+
+    def _row_count(self, namespace: str, dimensions: int) -> int:
+        path = self._vector_path(namespace)
+        size = path.stat().st_size if path.exists() else 0
+        return size // (dimensions * 4)
+
+    def _trim_partial_row(self, namespace: str, dimensions: int) -> int:
+        """进程异常退出可能留下半行，截掉后从整行处继续追加；须在写事务内调用。"""
+        path = self._vector_path(namespace)
+        rows = self._row_count(namespace, dimensions)
+        if path.exists() and path.stat().st_size != rows * dimensions * 4:
+            with path.open("r+b") as handle:
+                handle.truncate(rows * dimensions * 4)
+        return rows
+
+    def _view_locked(self, namespace: str, dimensions: int) -> Optional[np.memmap]:
+        rows = self._row_count(namespace, dimensions)
+        if rows == 0:
+            return None
+        view = self._views.get(namespace)
+        if view is None or view.shape[0] != rows:
+            view = np.memmap(self._vector_path(namespace), dtype=np.float32, mode="r", shape=(rows, dimensions))
+            self._views[namespace] = view
+        return view
+
+    @staticmethod
+    def _indexed_rows_locked(conn: sqlite3.Connection, namespace: str, text_hashes: List[str]) -> Dict[str, int]:
+        rows: Dict[str, int] = {}
+        # SQLite 默认最多 999 个绑定参数，分批查询
+        for start in range(0, len(text_hashes), 500):
+            chunk = text_hashes[start:start + 500]
+            placeholders = ",".join("?" for _ in chunk)
+            for text_hash, row_index in conn.execute(
+                f"SELECT text_hash, row_index FROM embedding_index "
+                f"WHERE namespace = ? AND text_hash IN ({placeholders})",
+                (namespace, *chunk),
+            ):
+                rows[text_hash] = int(row_index)
+        return rows
+
+    def lookup(self, namespace: str, dimensions: int, text_hashes: Sequence[str]) -> Dict[str, List[float]]:
+        """返回已缓存的 {text_hash: vector}，未命中的哈希不出现在结果中。"""
+        unique = list(dict.fromkeys(text_hashes))
+        if not unique:
+            return {}
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            rows = self._indexed_rows_locked(self._connection(), namespace, unique)
+            if not rows:
+                return {}
+            view = self._view_locked(namespace, dimensions)
+            if view is None:
+                return {}
+            for text_hash, row_index in rows.items():
+                if row_index < view.shape[0]:
+                    found[text_hash] = view[row_index].astype(float).tolist()
+        return found
+
+    def store(self, namespace: str, dimensions: int, items: Sequence[tuple[str, Sequence[float]]]) -> None:
+        pending: Dict[str, Sequence[float]] = {}
+        for text_hash, vector in items:
+            if len(vector) == dimensions:
+                pending.setdefault(text_hash, vector)
+        if not pending:
+            return
+        with self._lock:
+            conn = self._connection()
+            # BEGIN IMMEDIATE 取得数据库写锁，其他进程的追加会等到本事务提交
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = set(self._indexed_rows_locked(conn, namespace, list(pending)))
+                fresh = [(text_hash, vector) for text_hash, vector in pending.items() if text_hash not in existing]
+                if not fresh:
+                    conn.rollback()
+                    return
+                start_row = self._trim_partial_row(namespace, dimensions)
+                matrix = np.asarray([vector for _, vector in fresh], dtype=np.float32)
+                with self._vector_path(namespace).open("ab") as handle:
+                    handle.write(matrix.tobytes())
+                conn.executemany(
+                    "INSERT OR IGNORE INTO embedding_index (namespace, text_hash, row_index) VALUES (?, ?, ?)",
+                    [(namespace, text_hash, start_row + offset) for offset, (text_hash, _) in enumerate(fresh)],
+                )
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            self._views.pop(namespace, None)
+
+    def close(self) -> None:
+        with self._lock:
+            self._views.clear()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_store_lock = threading.Lock()
+_store_instance: Optional[EmbeddingVectorStore] = None
+
+
+def get_embedding_vector_store() -> Optional[EmbeddingVectorStore]:
+    """返回进程内共享的向量库；配置关闭时返回 None。"""
+    global _store_instance
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return None
+    root_dir = Path(settings.EMBEDDING_CACHE_DIR)
+    with _store_lock:
+        if _store_instance is None or _store_instance.root_dir != root_dir:
+            if _store_instance is not None:
+                _store_instance.close()
+            _store_instance = EmbeddingVectorStore(root_dir)
+        return _store_instance
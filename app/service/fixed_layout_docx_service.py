@@ -2,25 +2,28 @@
 """
 将浏览器已经排版完成的 HTML 转换为固定布局 DOCX。
 
-这里不让 OCR/视觉模型猜测 bbox，而是启动本机 Chrome/Edge，通过 DevTools
+这里不让 OCR/视觉模型猜测 bbox，而是在本机 Chrome/Edge 中打开页面，通过 DevTools
 协议读取 DOM 的实际渲染坐标，再把每一行文字写入 Word 的绝对定位文本框。
-非文字内容（图片、底色、边框等）会作为页面背景保留。
+非文字内容（图片、底色、边框等）会作为页面背景保留。浏览器常驻复用（见 BrowserPool），
+每次转换只新开一个标签页。
 """
 
 from __future__ import annotations
 
+import atexit
 import base64
 import json
 import os
 import shutil
-import socket
 import subprocess
 import tempfile
+import threading
 import time
+import urllib.parse
 import urllib.request
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable, TypeVar
 
 from docx import Document
 from docx.enum.section import WD_SECTION
@@ -29,8 +32,11 @@ from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
 from docx.shared import Pt
 from lxml import etree
+from websockets.exceptions import ConnectionClosed
 from websockets.sync.client import connect
 
+from app.core.config import settings
+
 
 CSS_PX_PER_INCH = 96.0
 POINTS_PER_INCH = 72.0
@@ -42,6 +48,13 @@ NS_OFFICE = "urn:schemas-microsoft-com:office:office"
 DEFAULT_PAGE_WIDTH_PX = 210 / 25.4 * CSS_PX_PER_INCH
 DEFAULT_PAGE_HEIGHT_PX = 297 / 25.4 * CSS_PX_PER_INCH
 
+_BROWSER_START_TIMEOUT_SECONDS = 15
+_BROWSER_EXIT_GRACE_SECONDS = 1.0
+# 单个浏览器进程累计打开的标签页数达到该值后，在空闲时重启以回收内存
+_BROWSER_MAX_TABS_PER_PROCESS = 200
+
+T = TypeVar("T")
+
 
 class FixedLayoutConversionError(RuntimeError):
     """固定布局转换无法完成。"""
@@ -172,12 +185,6 @@ def resolve_browser_path(configured_path: str | Path | None = None) -> str:
     )
 
 
-def _find_free_port() -> int:
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-        sock.bind(("127.0.0.1", 0))
-        return int(sock.getsockname()[1])
-
-
 class _CdpClient:
     def __init__(self, websocket_url: str):
         self._socket = connect(websocket_url, open_timeout=10, close_timeout=3)
@@ -221,22 +228,37 @@ class _CdpClient:
         return (result.get("result") or {}).get("value")
 
 
-def _extract_browser_layout(
-    *,
-    html_file: Path,
-    background_dir: Path,
-    browser_path: str | Path | None,
-    page_width_px: float,
-    page_height_px: float,
-) -> BrowserLayout:
-    browser = resolve_browser_path(browser_path)
-    port = _find_free_port()
-    with tempfile.TemporaryDirectory(
-        prefix="fixed-layout-browser-",
-        ignore_cleanup_errors=True,
-    ) as profile_dir:
+class _BrowserProcess:
+    """一个常驻无头浏览器（独立 profile），通过 DevTools HTTP 接口开关标签页。"""
+
+    def __init__(self, browser: str, profile_root: Path, window_size: tuple[int, int]):
+        self.browser = browser
+        self.profile_root = profile_root
+        self.window_size = window_size
+        self.process: subprocess.Popen | None = None
+        self.profile_dir: Path | None = None
+        self.port = 0
+        self.tabs_opened = 0
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def exited(self, timeout: float) -> bool:
+        """连接中断时确认进程是否已退出（崩溃的进程可能稍后才被回收）。"""
+        if self.process is None:
+            return True
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return False
+        return True
+
+    def start(self) -> None:
+        self.profile_root.mkdir(parents=True, exist_ok=True)
+        self.profile_dir = Path(tempfile.mkdtemp(prefix="browser-", dir=self.profile_root))
+        width, height = self.window_size
         command = [
-            browser,
+            self.browser,
             "--headless=new",
             "--disable-gpu",
             "--hide-scrollbars",
@@ -244,67 +266,71 @@ def _extract_browser_layout(
             "--no-default-browser-check",
             "--allow-file-access-from-files",
             "--force-device-scale-factor=1",
-            f"--remote-debugging-port={port}",
-            f"--user-data-dir={profile_dir}",
-            f"--window-size={int(page_width_px)},{int(page_height_px)}",
-            html_file.as_uri(),
+            # 端口由浏览器自选并写入 profile 下的 DevToolsActivePort，避免抢占端口的竞态
+            "--remote-debugging-port=0",
+            f"--user-data-dir={self.profile_dir}",
+            f"--window-size={width},{height}",
+            "about:blank",
         ]
-        creation_flags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
-        process = subprocess.Popen(
+        self.process = subprocess.Popen(
             command,
+            stdin=subprocess.DEVNULL,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
-            creationflags=creation_flags,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
         )
-        client: _CdpClient | None = None
+        self.tabs_opened = 0
         try:
-            websocket_url = _wait_for_page_websocket(port, html_file)
-            client = _CdpClient(websocket_url)
-            client.call("Page.enable")
-            client.call("Runtime.enable")
-            client.call(
-                "Emulation.setDeviceMetricsOverride",
-                {
-                    "width": int(round(page_width_px)),
-                    "height": int(round(page_height_px)),
-                    "deviceScaleFactor": 1,
-                    "mobile": False,
-                },
-            )
-            client.evaluate(
-                "document.fonts && document.fonts.ready "
-                "? document.fonts.ready.then(() => true) : Promise.resolve(true)"
-            )
-            raw_layout = client.evaluate(
-                _browser_layout_script(page_width_px, page_height_px)
-            )
-            if not isinstance(raw_layout, dict):
-                raise FixedLayoutConversionError("浏览器未返回有效的 DOM 布局数据")
-
-            pages = _parse_browser_pages(raw_layout)
-            background_images = _capture_page_backgrounds(
-                client=client,
-                background_dir=background_dir,
-                page_count=len(pages),
-                page_width_px=page_width_px,
-                page_height_px=page_height_px,
-            )
-            return BrowserLayout(
-                page_width_px=page_width_px,
-                page_height_px=page_height_px,
-                pages=pages,
-                background_images=background_images,
-            )
-        finally:
-            if client is not None:
-                try:
-                    client.call("Browser.close")
-                except Exception:
-                    pass
-                try:
-                    client.close()
-                except Exception:
-                    pass
+            self.port = self._wait_for_devtools_port()
+        except Exception:
+            self.stop()
+            raise
+
+    def _wait_for_devtools_port(self) -> int:
+        assert self.profile_dir is not None
+        port_file = self.profile_dir / "DevToolsActivePort"
+        deadline = time.monotonic() + _BROWSER_START_TIMEOUT_SECONDS
+        last_error: Exception | None = None
+        while time.monotonic() < deadline:
+            if not self.alive():
+                raise FixedLayoutConversionError(
+                    f"浏览器启动后立即退出，returncode={self.process.returncode if self.process else None}"
+                )
+            try:
+                port = int(port_file.read_text(encoding="utf-8").splitlines()[0])
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=1):
+                    return port
+            except (OSError, ValueError, IndexError) as exc:
+                last_error = exc
+            time.sleep(0.05)
+        raise FixedLayoutConversionError(f"浏览器启动超时: {last_error}")
+
+    def _devtools(self, path: str, method: str = "GET") -> Any:
+        request = urllib.request.Request(f"http://127.0.0.1:{self.port}{path}", method=method)
+        with urllib.request.urlopen(request, timeout=10) as response:
+            body = response.read().decode("utf-8")
+        try:
+            return json.loads(body)
+        except json.JSONDecodeError:
+            return body
+
+    def open_tab(self, url: str) -> tuple[str, str]:
+        """新开标签页并导航到 url，返回 (target_id, 页面级 websocket 地址)。"""
+        target = self._devtools(f"/json/new?{urllib.parse.quote(url, safe='')}", method="PUT")
+        if not isinstance(target, dict) or not target.get("webSocketDebuggerUrl"):
+            raise FixedLayoutConversionError(f"浏览器未能新建标签页: {target}")
+        self.tabs_opened += 1
+        return str(target["id"]), str(target["webSocketDebuggerUrl"])
+
+    def close_tab(self, target_id: str) -> None:
+        try:
+            self._devtools(f"/json/close/{target_id}")
+        except Exception:
+            pass
+
+    def stop(self) -> None:
+        process, self.process = self.process, None
+        if process is not None:
             if process.poll() is None:
                 process.terminate()
             try:
@@ -312,29 +338,222 @@ def _extract_browser_layout(
             except subprocess.TimeoutExpired:
                 process.kill()
                 process.wait(timeout=5)
+        if self.profile_dir is not None:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            self.profile_dir = None
 
 
-def _wait_for_page_websocket(port: int, html_file: Path) -> str:
-    endpoint = f"http://127.0.0.1:{port}/json/list"
-    deadline = time.monotonic() + 15
-    last_error: Exception | None = None
-    while time.monotonic() < deadline:
+class BrowserPool:
+    """
+    常驻无头浏览器池：每次转换在已启动的浏览器里新开一个标签页，字体与渲染缓存跨转换复用。
+
+    同时打开的标签页总数受 max_tabs 限制；浏览器进程退出后在下次取用时重启，
+    转换途中浏览器崩溃的会在新进程上重试一次。每个进程开满一定数量标签页后空闲时重启，回收内存。
+    """
+
+    def __init__(
+        self,
+        size: int,
+        browser: str,
+        *,
+        max_tabs: int,
+        profile_root: Path | None = None,
+        window_size: tuple[int, int] = (int(DEFAULT_PAGE_WIDTH_PX), int(DEFAULT_PAGE_HEIGHT_PX)),
+    ):
+        self.browser = browser
+        self.profile_root = profile_root or Path(tempfile.gettempdir()) / f"fixed-layout-browsers-{os.getpid()}"
+        self._processes = [
+            _BrowserProcess(browser, self.profile_root, window_size) for _ in range(max(int(size), 1))
+        ]
+        self._active = [0] * len(self._processes)
+        self._lock = threading.Lock()
+        # 每个进程单独的启动锁：启动/重启可能阻塞十几秒，只拦住要用这个进程的调用方
+        self._start_locks = [threading.Lock() for _ in self._processes]
+        self._tab_slots = threading.BoundedSemaphore(max(int(max_tabs), 1))
+        self._closed = False
+
+    def warm_up(self) -> None:
+        for index in range(len(self._processes)):
+            self._ensure_started(index, reserved=0)
+
+    def _ensure_started(self, index: int, *, reserved: int) -> _BrowserProcess:
+        """必要时启动或回收重启第 index 个浏览器；reserved 为调用方自己已计入的占用数。"""
+        browser = self._processes[index]
+        with self._start_locks[index]:
+            with self._lock:
+                if self._closed:
+                    raise FixedLayoutConversionError("浏览器池已关闭")
+                idle = self._active[index] <= reserved
+            recycle = browser.tabs_opened >= _BROWSER_MAX_TABS_PER_PROCESS and idle
+            if not browser.alive() or recycle:
+                browser.stop()
+                browser.start()
+        return browser
+
+    def _acquire(self) -> tuple[int, _BrowserProcess]:
+        with self._lock:
+            if self._closed:
+                raise FixedLayoutConversionError("浏览器池已关闭")
+            index = min(range(len(self._processes)), key=lambda item: self._active[item])
+            self._active[index] += 1
         try:
-            with urllib.request.urlopen(endpoint, timeout=1) as response:
-                pages = json.loads(response.read().decode("utf-8"))
-            html_uri = html_file.as_uri()
-            for page in pages:
-                if page.get("type") != "page":
-                    continue
-                if page.get("url") == html_uri and page.get("webSocketDebuggerUrl"):
-                    return str(page["webSocketDebuggerUrl"])
-            for page in pages:
-                if page.get("type") == "page" and page.get("webSocketDebuggerUrl"):
-                    return str(page["webSocketDebuggerUrl"])
+            return index, self._ensure_started(index, reserved=1)
+        except BaseException:
+            self._release(index)
+            raise
+
+    def _release(self, index: int) -> None:
+        with self._lock:
+            self._active[index] -= 1
+
+    def run_in_tab(self, url: str, action: Callable[[_CdpClient], T]) -> T:
+        """在新标签页中打开 url，用同一个 CDP 会话执行 action，结束后关闭标签页。"""
+        with self._tab_slots:
+            for attempt in range(2):
+                index, browser = self._acquire()
+                target_id: str | None = None
+                client: _CdpClient | None = None
+                try:
+                    target_id, websocket_url = browser.open_tab(url)
+                    client = _CdpClient(websocket_url)
+                    return action(client)
+                except (OSError, ConnectionClosed):
+                    if attempt == 0 and browser.exited(timeout=_BROWSER_EXIT_GRACE_SECONDS):
+                        print("[browser-pool] 浏览器进程已退出，重启后重试", flush=True)
+                        continue
+                    raise
+                finally:
+                    if client is not None:
+                        try:
+                            client.close()
+                        except Exception:
+                            pass
+                    if target_id is not None and browser.alive():
+                        browser.close_tab(target_id)
+                    self._release(index)
+        raise FixedLayoutConversionError("浏览器反复退出，无法完成排版")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+        for start_lock, browser in zip(self._start_locks, self._processes):
+            with start_lock:
+                browser.stop()
+        shutil.rmtree(self.profile_root, ignore_errors=True)
+
+
+_pool_lock = threading.Lock()
+_pool: BrowserPool | None = None
+
+
+def browser_pool_enabled() -> bool:
+    return int(settings.FIXED_LAYOUT_BROWSERS or 0) > 0
+
+
+def get_browser_pool(browser: str | None = None) -> BrowserPool | None:
+    """返回进程内共享的浏览器池；未启用或浏览器路径与池不一致时返回 None。"""
+    global _pool
+    if not browser_pool_enabled():
+        return None
+    browser = browser or resolve_browser_path()
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(
+                settings.FIXED_LAYOUT_BROWSERS,
+                browser,
+                max_tabs=settings.FIXED_LAYOUT_BROWSER_MAX_TABS,
+            )
+        return _pool if _pool.browser == browser else None
+
+
+def warm_up_browser_pool() -> None:
+    try:
+        pool = get_browser_pool()
+    except FileNotFoundError as exc:
+        print(f"[browser-pool] 跳过预热: {exc}", flush=True)
+        return
+    if pool is not None:
+        try:
+            pool.warm_up()
         except Exception as exc:
-            last_error = exc
-        time.sleep(0.1)
-    raise FixedLayoutConversionError(f"浏览器启动超时: {last_error}")
+            print(f"[browser-pool] 预热失败: {exc}", flush=True)
+
+
+def shutdown_browser_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+atexit.register(shutdown_browser_pool)
+
+
+def _extract_browser_layout(
+    *,
+    html_file: Path,
+    background_dir: Path,
+    browser_path: str | Path | None,
+    page_width_px: float,
+    page_height_px: float,
+) -> BrowserLayout:
+    browser = resolve_browser_path(browser_path)
+
+    def measure(client: _CdpClient) -> BrowserLayout:
+        client.call("Page.enable")
+        client.call("Runtime.enable")
+        client.call(
+            "Emulation.setDeviceMetricsOverride",
+            {
+                "width": int(round(page_width_px)),
+                "height": int(round(page_height_px)),
+                "deviceScaleFactor": 1,
+                "mobile": False,
+            },
+        )
+        # 标签页创建时即开始加载，等页面与字体都就绪再测量
+        client.evaluate(
+            "(document.readyState === 'complete' ? Promise.resolve() : "
+            "new Promise(resolve => window.addEventListener('load', resolve, {once: true})))"
+            ".then(() => document.fonts && document.fonts.ready ? document.fonts.ready : null)"
+            ".then(() => true)"
+        )
+        raw_layout = client.evaluate(_browser_layout_script(page_width_px, page_height_px))
+        if not isinstance(raw_layout, dict):
+            raise FixedLayoutConversionError("浏览器未返回有效的 DOM 布局数据")
+
+        pages = _parse_browser_pages(raw_layout)
+        background_images = _capture_page_backgrounds(
+            client=client,
+            background_dir=background_dir,
+            page_count=len(pages),
+            page_width_px=page_width_px,
+            page_height_px=page_height_px,
+        )
+        return BrowserLayout(
+            page_width_px=page_width_px,
+            page_height_px=page_height_px,
+            pages=pages,
+            background_images=background_images,
+        )
+
+    pool = get_browser_pool(browser)
+    if pool is not None:
+        return pool.run_in_tab(html_file.as_uri(), measure)
+
+    # 未启用常驻池（或指定了其它浏览器）时，为本次转换临时启动一个浏览器
+    transient = BrowserPool(
+        1,
+        browser,
+        max_tabs=1,
+        profile_root=Path(tempfile.mkdtemp(prefix="fixed-layout-browser-")),
+        window_size=(int(page_width_px), int(page_height_px)),
+    )
+    try:
+        return transient.run_in_tab(html_file.as_uri(), measure)
+    finally:
+        transient.shutdown()
 
 
 def _browser_layout_script(page_width_px: float, page_height_px: float) -> str:
@@ -4,6 +4,7 @@ import base64
 import math
 import os
 import random
+import threading
 import time
 from typing import Callable, Dict, List, Optional, Sequence
 
@@ -15,6 +16,11 @@ from google.genai.errors import ClientError
 from openai import OpenAI
 
 from app.core.config import settings
+from app.service.embedding_cache_service import (
+    embedding_namespace,
+    embedding_text_hash,
+    get_embedding_vector_store,
+)
 
 _RETRYABLE_NETWORK_ERRORS = (
     ConnectionError,
@@ -679,6 +685,30 @@ def _embed_google_batch(
     return vectors
 
 
+_embedding_client_lock = threading.Lock()
+_embedding_clients: Dict[tuple, object] = {}
+
+
+def _get_pooled_embedding_client(route: str, timeout: float):
+    """同一路由 + 超时复用一个客户端（及其连接池），避免每个批次重新握手。"""
+    key = (route, float(timeout))
+    with _embedding_client_lock:
+        client = _embedding_clients.get(key)
+        if client is None:
+            if route == GEMINI_ROUTE_OPENROUTER:
+                client = OpenAI(
+                    base_url=settings.OPENROUTER_BASE_URL,
+                    api_key=settings.OPENROUTER_API_KEY,
+                    timeout=timeout,
+                )
+            elif route == GEMINI_ROUTE_GOOGLE:
+                client = _get_vertex_client(timeout=timeout)
+            else:
+                client = _get_aistudio_client(timeout=timeout)
+            _embedding_clients[key] = client
+        return client
+
+
 def _embed_openrouter_batch(
     *,
     texts: Sequence[str],
@@ -689,11 +719,7 @@ def _embed_openrouter_batch(
 ) -> List[List[float]]:
     if not settings.OPENROUTER_API_KEY:
         raise ValueError("未配置 OPENROUTER_API_KEY，无法使用 OpenRouter Embedding。")
-    client = OpenAI(
-        base_url=settings.OPENROUTER_BASE_URL,
-        api_key=settings.OPENROUTER_API_KEY,
-        timeout=timeout,
-    )
+    client = _get_pooled_embedding_client(GEMINI_ROUTE_OPENROUTER, timeout)
     if log_callback:
         log_callback(f"[embedding-openrouter] model={model}, batch={len(texts)}, dims={dimensions}")
     kwargs = {
@@ -739,10 +765,13 @@ def embed_texts(
     batch_size: int = 64,
     timeout: float = DEFAULT_GEMINI_TIMEOUT_SECONDS,
     log_callback: GeminiLogCallback = None,
+    use_cache: bool = True,
 ) -> List[List[float]]:
     """
     Embed texts with gemini-embedding-001 (or configured model).
     Returns L2-normalized vectors in the same order as inputs.
+    Vectors are cached locally by (normalized text, model, dimensions, task_type);
+    only cache misses are sent to the API.
     """
     cleaned = [str(text or "").strip() or " " for text in texts]
     if not cleaned:
@@ -752,15 +781,38 @@ def embed_texts(
     normalized_route = resolve_embedding_route(route)
     raw_model = (model or DEFAULT_EMBEDDING_MODEL).strip() or DEFAULT_EMBEDDING_MODEL
 
+    store = get_embedding_vector_store() if use_cache else None
+    namespace = embedding_namespace(normalize_google_model(raw_model), dims, task_type)
+    text_hashes = [embedding_text_hash(text) for text in cleaned]
+    cached: Dict[str, List[float]] = {}
+    if store is not None:
+        try:
+            cached = store.lookup(namespace, dims, text_hashes)
+        except Exception as exc:
+            if log_callback:
+                log_callback(f"[embedding-cache] 读取失败，全部重新请求: {exc}")
+            cached = {}
+
+    # 同一次调用内重复的文本只请求一次
+    miss_positions: Dict[str, List[int]] = {}
+    for index, text_hash in enumerate(text_hashes):
+        if text_hash not in cached:
+            miss_positions.setdefault(text_hash, []).append(index)
+    hit_count = len(cleaned) - sum(len(positions) for positions in miss_positions.values())
+
     if log_callback:
+        hit_rate = hit_count / len(cleaned) * 100
         log_callback(
             f"[embedding] route={normalized_route}, model={raw_model}, "
-            f"count={len(cleaned)}, dims={dims}, task_type={task_type}"
+            f"count={len(cleaned)}, dims={dims}, task_type={task_type}, "
+            f"cache_hits={hit_count}/{len(cleaned)} ({hit_rate:.1f}%)"
         )
 
-    vectors: List[List[float]] = []
-    for start in range(0, len(cleaned), max(1, batch_size)):
-        batch = cleaned[start:start + max(1, batch_size)]
+    miss_hashes = list(miss_positions)
+    miss_texts = [cleaned[miss_positions[text_hash][0]] for text_hash in miss_hashes]
+    fetched: List[List[float]] = []
+    for start in range(0, len(miss_texts), max(1, batch_size)):
+        batch = miss_texts[start:start + max(1, batch_size)]
         if normalized_route == GEMINI_ROUTE_OPENROUTER:
             openrouter_model = raw_model if "/" in raw_model else f"google/{raw_model}"
             batch_vectors = _embed_openrouter_batch(
@@ -772,10 +824,7 @@ def embed_texts(
             )
         else:
             google_model = normalize_google_model(raw_model)
-            client_factory = (
-                _get_vertex_client if normalized_route == GEMINI_ROUTE_GOOGLE else _get_aistudio_client
-            )
-            client = client_factory(timeout=timeout)
+            client = _get_pooled_embedding_client(normalized_route, timeout)
             batch_vectors = _embed_google_batch(
                 client=client,
                 model=google_model,
@@ -787,6 +836,14 @@ def embed_texts(
             raise RuntimeError(
                 f"embedding batch size mismatch: got {len(batch_vectors)} for {len(batch)} texts"
             )
-        vectors.extend(batch_vectors)
+        if store is not None:
+            try:
+                store.store(namespace, dims, list(zip(miss_hashes[start:start + len(batch)], batch_vectors)))
+            except Exception as exc:
+                if log_callback:
+                    log_callback(f"[embedding-cache] 写入失败: {exc}")
+        fetched.extend(batch_vectors)
 
-    return vectors
+    resolved = dict(cached)
+    resolved.update(zip(miss_hashes, fetched))
+    return [list(resolved[text_hash]) for text_hash in text_hashes]
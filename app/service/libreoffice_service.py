@@ -1,15 +1,31 @@
+import atexit
+import collections
+import json
 import os
+import queue
 import shutil
+import signal
 import subprocess
+import tempfile
 import threading
+import time
 import uuid
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterator
+from typing import Any, Iterator, Optional
+
+from app.core.config import settings
 
 
 LIBREOFFICE_PATH = os.getenv("LIBREOFFICE_PATH", "").strip()
-_LIBREOFFICE_LOCK = threading.Lock()
+_UNO_WORKER_SCRIPT = Path(__file__).with_name("libreoffice_uno_worker.py")
+_WORKER_START_TIMEOUT_SECONDS = 90
+_WORKER_HEALTH_CHECK_IDLE_SECONDS = 30
+_WORKER_PING_TIMEOUT_SECONDS = 10
+_WORKER_QUIT_TIMEOUT_SECONDS = 15
+_POOL_RETRY_AFTER_FAILURE_SECONDS = 60
+# HTML 需按 Writer 文档导入，才能导出为 DOCX（默认会以 Writer/Web 打开）
+_UNO_INPUT_FILTERS = {".html": "HTML (StarWriter)", ".htm": "HTML (StarWriter)"}
 
 
 def resolve_libreoffice_path(configured_path: str | None = None) -> str:
@@ -54,6 +70,332 @@ def _temporary_profile_dir(base_dir: Path) -> Iterator[Path]:
         shutil.rmtree(profile_dir, ignore_errors=True)
 
 
+class _UnoConversionWorker:
+    """一个常驻 headless soffice（独立 profile，启动时初始化一次）及其 UNO 转换桥进程。"""
+
+    def __init__(self, slot: int, soffice: str, uno_python: str, profile_root: Path) -> None:
+        self.slot = slot
+        self.soffice = soffice
+        self.uno_python = uno_python
+        self.profile_root = profile_root
+        self.jobs = 0
+        self.last_used = 0.0
+        self._process: Optional[subprocess.Popen] = None
+        self._profile_dir: Optional[Path] = None
+        self._responses: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._stderr_tail: collections.deque = collections.deque(maxlen=20)
+        self._next_id = 0
+
+    def start(self) -> None:
+        token = uuid.uuid4().hex[:12]
+        self._profile_dir = self.profile_root / f"slot-{self.slot}-{os.getpid()}-{token}"
+        self._profile_dir.mkdir(parents=True, exist_ok=True)
+        command = [
+            self.uno_python,
+            str(_UNO_WORKER_SCRIPT),
+            "--soffice",
+            self.soffice,
+            "--profile-uri",
+            self._profile_dir.resolve().as_uri(),
+            "--pipe-name",
+            f"ocr_trans_lo_{os.getpid()}_{self.slot}_{token}",
+        ]
+        self._responses = queue.Queue()
+        self._process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+            # 独立进程组：桥接进程卡死时连同它拉起的 soffice（及 soffice.bin）一起结束
+            start_new_session=os.name != "nt",
+        )
+        threading.Thread(
+            target=self._pump,
+            args=(self._process.stdout, self._responses.put, lambda responses=self._responses: responses.put(None)),
+            name=f"libreoffice-worker-{self.slot}-stdout",
+            daemon=True,
+        ).start()
+        threading.Thread(
+            target=self._pump,
+            args=(self._process.stderr, self._stderr_tail.append),
+            name=f"libreoffice-worker-{self.slot}-stderr",
+            daemon=True,
+        ).start()
+        try:
+            ready = self._read(_WORKER_START_TIMEOUT_SECONDS)
+            if not ready.get("ready"):
+                raise RuntimeError(ready.get("error") or "LibreOffice 常驻进程未就绪")
+        except BaseException:
+            # 握手超时或桥接进程提前退出时，一并结束它拉起的 soffice，避免残留进程被当作可用
+            self.stop()
+            raise
+        self.jobs = 0
+        self.last_used = time.monotonic()
+
+    @staticmethod
+    def _pump(stream, sink, on_eof=None) -> None:
+        try:
+            for line in stream:
+                sink(line)
+        except (OSError, ValueError):
+            pass
+        if on_eof is not None:
+            on_eof()
+
+    def _read(self, timeout: float) -> dict[str, Any]:
+        try:
+            line = self._responses.get(timeout=timeout)
+        except queue.Empty as exc:
+            raise TimeoutError(f"LibreOffice 常驻进程 {timeout:.0f} 秒内无响应") from exc
+        if line is None:
+            stderr = "".join(self._stderr_tail).strip()
+            raise RuntimeError(f"LibreOffice 常驻进程已退出: {stderr[-1000:]}")
+        return json.loads(line)
+
+    def alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def request(self, payload: dict[str, Any], timeout: float) -> dict[str, Any]:
+        if not self.alive():
+            raise RuntimeError("LibreOffice 常驻进程未运行")
+        self._next_id += 1
+        request_id = self._next_id
+        self._process.stdin.write(json.dumps({**payload, "id": request_id}) + "\n")
+        self._process.stdin.flush()
+        deadline = time.monotonic() + timeout
+        while True:
+            response = self._read(max(deadline - time.monotonic(), 0.01))
+            # 超时后迟到的旧响应直接丢弃
+            if response.get("id") == request_id:
+                self.last_used = time.monotonic()
+                return response
+
+    def stop(self) -> None:
+        process, self._process = self._process, None
+        if process is not None:
+            try:
+                process.stdin.write(json.dumps({"op": "quit"}) + "\n")
+                process.stdin.flush()
+                process.stdin.close()
+            except (OSError, ValueError):
+                pass
+            try:
+                process.wait(timeout=_WORKER_QUIT_TIMEOUT_SECONDS)
+            except subprocess.TimeoutExpired:
+                # 卡在 loadComponentFromURL 的桥接进程读不到 quit，强杀又会跳过它关闭 soffice 的 finally
+                self._kill_process_tree(process)
+                process.wait(timeout=5)
+        if self._profile_dir is not None:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+            self._profile_dir = None
+
+    @staticmethod
+    def _kill_process_tree(process: subprocess.Popen) -> None:
+        if os.name == "nt":
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=False,
+            )
+            process.kill()
+            return
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            process.kill()
+
+
+class LibreOfficeWorkerPool:
+    """
+    常驻 LibreOffice 转换进程池：每个槽位一个预热好的 soffice，转换请求经 UNO 下发，省去每次 2–4 秒的冷启动。
+
+    借出槽位时检查进程存活，空闲较久的先 ping；进程崩溃、超时或累计转换数达到上限时自动重启。
+    常驻进程无法启动（如缺少 python3-uno）时 convert 返回 None，由调用方改走命令行转换，
+    一段时间后再尝试启动。
+    """
+
+    def __init__(
+        self,
+        size: int,
+        soffice: str,
+        uno_python: str,
+        *,
+        profile_root: Optional[Path] = None,
+        timeout_seconds: float = 300,
+        max_jobs_per_worker: int = 200,
+    ) -> None:
+        self.size = max(1, int(size))
+        self.soffice = soffice
+        self.uno_python = uno_python
+        self.profile_root = profile_root or Path(tempfile.gettempdir()) / "ocr-trans-libreoffice"
+        self.timeout_seconds = max(float(timeout_seconds), 1.0)
+        self.max_jobs_per_worker = max(int(max_jobs_per_worker), 1)
+        self._slots: "queue.Queue[_UnoConversionWorker]" = queue.Queue()
+        for slot in range(self.size):
+            self._slots.put(_UnoConversionWorker(slot, soffice, uno_python, self.profile_root))
+        self._state_lock = threading.Lock()
+        self._retry_after = 0.0
+        self._closed = False
+
+    def available(self) -> bool:
+        with self._state_lock:
+            return not self._closed and time.monotonic() >= self._retry_after
+
+    def _mark_start_failure(self, exc: Exception) -> None:
+        with self._state_lock:
+            self._retry_after = time.monotonic() + _POOL_RETRY_AFTER_FAILURE_SECONDS
+        print(f"[libreoffice-pool] 常驻进程启动失败，{_POOL_RETRY_AFTER_FAILURE_SECONDS} 秒内改用命令行转换: {exc}", flush=True)
+
+    def _ensure_healthy(self, worker: _UnoConversionWorker) -> None:
+        if worker.alive() and worker.jobs >= self.max_jobs_per_worker:
+            worker.stop()
+        if worker.alive() and time.monotonic() - worker.last_used > _WORKER_HEALTH_CHECK_IDLE_SECONDS:
+            try:
+                healthy = bool(worker.request({"op": "ping"}, _WORKER_PING_TIMEOUT_SECONDS).get("ok"))
+            except (OSError, RuntimeError, TimeoutError, ValueError):
+                healthy = False
+            if not healthy:
+                worker.stop()
+        if not worker.alive():
+            worker.stop()
+            worker.start()
+
+    def warm_up(self) -> None:
+        """预先启动全部槽位。"""
+        workers = [self._slots.get() for _ in range(self.size)]
+        try:
+            for worker in workers:
+                if not self.available():
+                    break
+                try:
+                    self._ensure_healthy(worker)
+                except Exception as exc:
+                    self._mark_start_failure(exc)
+        finally:
+            for worker in workers:
+                self._slots.put(worker)
+
+    def convert(self, input_file: Path, output_file: Path, filter_name: str) -> Optional[subprocess.CompletedProcess]:
+        if not self.available():
+            return None
+        worker = self._slots.get()
+        try:
+            if not self.available():
+                return None
+            try:
+                self._ensure_healthy(worker)
+            except Exception as exc:
+                self._mark_start_failure(exc)
+                return None
+            payload = {
+                "op": "convert",
+                "input": str(input_file),
+                "output": str(output_file),
+                "filter": filter_name,
+                "input_filter": _UNO_INPUT_FILTERS.get(input_file.suffix.lower(), ""),
+            }
+            try:
+                response = worker.request(payload, self.timeout_seconds)
+            except (OSError, RuntimeError, TimeoutError, ValueError) as exc:
+                worker.stop()
+                print(f"[libreoffice-pool] 槽位 {worker.slot} 转换中断，已重启: {exc}", flush=True)
+                return None
+            worker.jobs += 1
+            if response.get("fatal"):
+                worker.stop()
+            args = ["libreoffice-pool", str(worker.slot), str(input_file)]
+            if not response.get("ok"):
+                return subprocess.CompletedProcess(args, 1, stdout="", stderr=str(response.get("error") or ""))
+            return subprocess.CompletedProcess(args, 0, stdout=f"convert {input_file} -> {output_file}", stderr="")
+        finally:
+            self._slots.put(worker)
+
+    def shutdown(self) -> None:
+        with self._state_lock:
+            self._closed = True
+        for _ in range(self.size):
+            worker = self._slots.get()
+            try:
+                worker.stop()
+            finally:
+                self._slots.put(worker)
+
+
+_pool_lock = threading.Lock()
+_pool: Optional[LibreOfficeWorkerPool] = None
+_cli_slots: Optional[threading.BoundedSemaphore] = None
+
+
+def _resolve_uno_python(soffice: str) -> Optional[str]:
+    configured = str(settings.LIBREOFFICE_UNO_PYTHON or "").strip()
+    if configured:
+        return configured
+    program_dir = Path(soffice).resolve().parent
+    for candidate in (program_dir / "python.exe", program_dir / "python", Path("/usr/bin/python3")):
+        if candidate.exists():
+            return str(candidate)
+    return None
+
+
+def libreoffice_pool_enabled() -> bool:
+    return int(settings.LIBREOFFICE_WORKERS or 0) > 0
+
+
+def get_libreoffice_worker_pool(soffice: Optional[str] = None) -> Optional[LibreOfficeWorkerPool]:
+    """返回进程内共享的常驻转换池；未启用、找不到 UNO Python 或 soffice 路径与池不一致时返回 None。"""
+    global _pool
+    if not libreoffice_pool_enabled():
+        return None
+    soffice = soffice or resolve_libreoffice_path()
+    with _pool_lock:
+        if _pool is None:
+            uno_python = _resolve_uno_python(soffice)
+            if uno_python is None:
+                return None
+            _pool = LibreOfficeWorkerPool(
+                settings.LIBREOFFICE_WORKERS,
+                soffice,
+                uno_python,
+                timeout_seconds=settings.LIBREOFFICE_CONVERT_TIMEOUT_SECONDS,
+                max_jobs_per_worker=settings.LIBREOFFICE_WORKER_MAX_JOBS,
+            )
+        return _pool if _pool.soffice == soffice else None
+
+
+def warm_up_libreoffice_pool() -> None:
+    try:
+        pool = get_libreoffice_worker_pool()
+    except FileNotFoundError as exc:
+        print(f"[libreoffice-pool] 跳过预热: {exc}", flush=True)
+        return
+    if pool is not None:
+        pool.warm_up()
+
+
+def shutdown_libreoffice_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+atexit.register(shutdown_libreoffice_pool)
+
+
+def _cli_slot_semaphore() -> threading.BoundedSemaphore:
+    global _cli_slots
+    with _pool_lock:
+        if _cli_slots is None:
+            _cli_slots = threading.BoundedSemaphore(max(1, int(settings.LIBREOFFICE_WORKERS or 0)))
+        return _cli_slots
+
+
 def _run_libreoffice_convert(
     input_path: str | Path,
     output_dir: str | Path,
@@ -66,6 +408,15 @@ def _run_libreoffice_convert(
     target_dir.mkdir(parents=True, exist_ok=True)
 
     soffice = resolve_libreoffice_path(libreoffice_path)
+    pool = get_libreoffice_worker_pool(soffice)
+    if pool is not None:
+        output_ext, _, filter_name = convert_to.partition(":")
+        result = pool.convert(input_file, target_dir / f"{input_file.stem}.{output_ext}", filter_name)
+        if result is not None and result.returncode == 0:
+            return result
+        if result is not None:
+            print(f"[libreoffice-pool] 常驻进程转换失败，改用命令行重试: {result.stderr}", flush=True)
+
     with _temporary_profile_dir(target_dir) as profile_dir:
         command = [
             str(soffice),
@@ -77,7 +428,8 @@ def _run_libreoffice_convert(
             str(target_dir),
             str(input_file),
         ]
-        with _LIBREOFFICE_LOCK:
+        # 每次调用使用独立临时 profile，可按槽位数并行
+        with _cli_slot_semaphore():
             return subprocess.run(
                 command,
                 capture_output=True,
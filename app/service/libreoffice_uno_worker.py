@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""常驻 LibreOffice 转换桥（由带 uno 模块的 Python 以脚本方式运行，不导入 app 包）。
+
+启动一个 headless soffice（独立 profile，通过 UNO 管道接受连接），之后从 stdin 逐行读取 JSON 请求、
+向 stdout 逐行写 JSON 响应：
+    {"id": 1, "op": "convert", "input": "...", "output": "...", "filter": "MS Word 2007 XML", "input_filter": ""}
+    {"id": 2, "op": "ping"}
+    {"op": "quit"}
+就绪时先输出 {"ready": true, "pid": <soffice pid>}。soffice 崩溃或桥接断开时以非零状态退出，
+由父进程重启；stdin 关闭（父进程退出）时关闭 soffice 后退出。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import uno
+from com.sun.star.beans import PropertyValue
+from com.sun.star.connection import NoConnectException
+from com.sun.star.lang import DisposedException
+
+_CONNECT_TIMEOUT_SECONDS = 60
+_UPDATE_DOC_MODE_NO_UPDATE = 0
+_MACRO_EXECUTION_NEVER = 0
+
+
+class _OfficeExited(Exception):
+    pass
+
+
+def _properties(**values):
+    props = []
+    for name, value in values.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        props.append(prop)
+    return tuple(props)
+
+
+def _emit(payload):
+    sys.stdout.write(json.dumps(payload) + "\n")
+    sys.stdout.flush()
+
+
+def _start_office(soffice, profile_uri, pipe_name):
+    command = [
+        soffice,
+        f"-env:UserInstallation={profile_uri}",
+        "--headless",
+        "--invisible",
+        "--nocrashreport",
+        "--nodefault",
+        "--nologo",
+        "--nofirststartwizard",
+        "--norestore",
+        "--nolockcheck",
+        f"--accept=pipe,name={pipe_name};urp;StarOffice.ComponentContext",
+    ]
+    return subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _connect(office, pipe_name):
+    local_context = uno.getComponentContext()
+    resolver = local_context.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local_context
+    )
+    deadline = time.monotonic() + _CONNECT_TIMEOUT_SECONDS
+    while True:
+        if office.poll() is not None:
+            raise RuntimeError(f"soffice 启动后立即退出，returncode={office.returncode}")
+        try:
+            context = resolver.resolve(f"uno:pipe,name={pipe_name};urp;StarOffice.ComponentContext")
+            return context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+        except NoConnectException:
+            if time.monotonic() > deadline:
+                raise RuntimeError("连接 soffice 超时")
+            time.sleep(0.2)
+
+
+def _convert(desktop, request):
+    input_url = uno.systemPathToFileUrl(os.path.abspath(request["input"]))
+    output_url = uno.systemPathToFileUrl(os.path.abspath(request["output"]))
+    load_options = {
+        "Hidden": True,
+        "ReadOnly": True,
+        "UpdateDocMode": _UPDATE_DOC_MODE_NO_UPDATE,
+        "MacroExecutionMode": _MACRO_EXECUTION_NEVER,
+    }
+    if request.get("input_filter"):
+        load_options["FilterName"] = request["input_filter"]
+    document = desktop.loadComponentFromURL(input_url, "_blank", 0, _properties(**load_options))
+    if document is None:
+        raise RuntimeError("LibreOffice 无法打开文档")
+    try:
+        store_options = {"Overwrite": True}
+        if request.get("filter"):
+            store_options["FilterName"] = request["filter"]
+        document.storeToURL(output_url, _properties(**store_options))
+    finally:
+        try:
+            document.close(True)
+        except Exception:
+            document.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--soffice", required=True)
+    parser.add_argument("--profile-uri", required=True)
+    parser.add_argument("--pipe-name", required=True)
+    args = parser.parse_args()
+
+    office = _start_office(args.soffice, args.profile_uri, args.pipe_name)
+    exit_code = 0
+    desktop = None
+    try:
+        desktop = _connect(office, args.pipe_name)
+        _emit({"ready": True, "pid": office.pid})
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            request = json.loads(line)
+            op = request.get("op")
+            if op == "quit":
+                break
+            response = {"id": request.get("id")}
+            try:
+                if office.poll() is not None:
+                    raise _OfficeExited(f"soffice 已退出，returncode={office.returncode}")
+                if op == "ping":
+                    desktop.getFrames()
+                elif op == "convert":
+                    _convert(desktop, request)
+                else:
+                    raise ValueError(f"未知操作: {op}")
+                response["ok"] = True
+            except (DisposedException, _OfficeExited) as exc:
+                response.update(ok=False, fatal=True, error=f"soffice 连接已断开: {exc}")
+                _emit(response)
+                exit_code = 3
+                break
+            except Exception as exc:
+                response.update(ok=False, error=f"{type(exc).__name__}: {getattr(exc, 'Message', '') or exc}")
+            _emit(response)
+    except Exception as exc:
+        _emit({"ready": False, "error": str(exc)})
+        exit_code = 2
+    finally:
+        if desktop is not None:
+            try:
+                desktop.terminate()
+            except Exception:
+                pass
+        try:
+            office.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            office.kill()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
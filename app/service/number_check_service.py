@@ -23,12 +23,19 @@ from app.service.gemini_service import (
     resolve_model_for_route,
 )
 from app.service.libreoffice_service import convert_doc_to_docx_via_libreoffice
+from app.service.specialist_worker_pool import (
+    NUMBER_CHECK_JOB,
+    run_specialist_job,
+    specialist_worker_pool_enabled,
+)
 
 
 logger = logging.getLogger("app.number_check")
 
 _task_progress: Dict[str, Dict[str, Any]] = {}
 _specialist_import_lock = threading.Lock()
+# 专检子进程启动时预加载的主程序；主进程内为 None，每次任务仍按原方式重新加载
+_warm_main_module = None
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 NUMBER_CHECK_LATEST_ROOT = REPO_ROOT / "专检" / "数检_程序-AIV2"
@@ -189,6 +196,25 @@ def _update_progress(
         _emit_log(task_id, f"  - {item}")
 
 
+def _make_block_progress_callback(task_id: str, current_step: int, total_steps: int):
+    """AI 复核按块回报进度：正文把进度从第 current_step 步平滑推进到下一步，页眉/页脚只更新提示。"""
+
+    def _callback(label: str, done: int, total: int) -> None:
+        entry = _task_progress.get(task_id)
+        if entry is None or total <= 0:
+            return
+        updates: Dict[str, Any] = {
+            "message": f"AI 复核中（{label} {done}/{total} 块）",
+            "updated_at": datetime.now().isoformat(),
+        }
+        if label == "正文":
+            progress = int(((current_step + done / total) / total_steps) * 100)
+            updates["progress"] = max(entry.get("progress", 0), min(progress, 99))
+        entry.update(updates)
+
+    return _callback
+
+
 def _complete_task(task_id: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
     if task_id not in _task_progress:
         return
@@ -214,10 +240,15 @@ def _cleanup_task(task_id: str) -> None:
 
 
 class _TaskLogWriter(io.TextIOBase):
+    """把 stdout/stderr 按行写入任务日志；每个线程各自缓存未换行的部分，多线程打印时行不会互相拼接。"""
+
+    # stdout、stderr 两个写入器共用一把锁，任务日志的追加也在锁内进行
+    _lock = threading.Lock()
+
     def __init__(self, task_id: str, original_stream) -> None:
         self.task_id = task_id
         self.original_stream = original_stream
-        self._buffer = ""
+        self._buffers: Dict[int, str] = {}
 
     def writable(self) -> bool:
         return True
@@ -236,17 +267,34 @@ class _TaskLogWriter(io.TextIOBase):
                 self.original_stream.flush()
             except Exception:
                 pass
-        self._buffer += text
-        while "\n" in self._buffer:
-            line, self._buffer = self._buffer.split("\n", 1)
-            _append_stream_log(self.task_id, line)
+        thread_id = threading.get_ident()
+        with self._lock:
+            buffer = self._buffers.pop(thread_id, "") + text
+            *lines, rest = buffer.split("\n")
+            for line in lines:
+                _append_stream_log(self.task_id, line)
+            if rest:
+                self._buffers[thread_id] = rest
         return len(text)
 
+    def _flush_buffers(self, thread_ids) -> None:
+        with self._lock:
+            for thread_id in thread_ids:
+                rest = self._buffers.pop(thread_id, "")
+                if rest.strip():
+                    _append_stream_log(self.task_id, rest)
+
     def flush(self) -> None:
         self.original_stream.flush()
-        if self._buffer.strip():
-            _append_stream_log(self.task_id, self._buffer)
-        self._buffer = ""
+        self._flush_buffers([threading.get_ident()])
+
+    def close(self) -> None:
+        """任务结束时写出所有线程残留的未换行内容。"""
+        if not self.closed:
+            with self._lock:
+                thread_ids = list(self._buffers)
+            self._flush_buffers(thread_ids)
+        super().close()
 
 
 def _validate_upload(file: UploadFile, label: str, allowed: set[str]) -> None:
@@ -271,7 +319,7 @@ def _convert_doc_input_if_needed(source: Path, work_dir: Path, role: str) -> Pat
     return Path(convert_doc_to_docx_via_libreoffice(source, target))
 
 
-def _set_llm_env(model_name: str) -> str:
+def _resolve_llm_config(model_name: str) -> tuple[str, Optional[str], str]:
     api_key = (
         settings.OPENROUTER_API_KEY
         or os.getenv("API_KEY")
@@ -287,8 +335,11 @@ def _set_llm_env(model_name: str) -> str:
         or os.getenv("OPENAI_BASE_URL")
         or os.getenv("OPENROUTER_BASE_URL")
     )
-    resolved_model_name = resolve_model_for_route(model_name, GEMINI_ROUTE_OPENROUTER)
+    return api_key, base_url, resolve_model_for_route(model_name, GEMINI_ROUTE_OPENROUTER)
+
 
+def _set_llm_env(model_name: str) -> str:
+    api_key, base_url, resolved_model_name = _resolve_llm_config(model_name)
     os.environ["API_KEY"] = api_key
     os.environ["OPENAI_API_KEY"] = api_key
     os.environ["OPENROUTER_API_KEY"] = api_key
@@ -360,6 +411,13 @@ def _load_latest_main_module():
     return module
 
 
+def warm_up_specialist_worker() -> None:
+    """专检子进程初始化时调用：只导入一次主程序，之后的任务直接复用。"""
+    global _warm_main_module
+    with _specialist_import_lock:
+        _warm_main_module = _load_latest_main_module()
+
+
 def _relative_output_path(path: Path, output_dir: Path) -> str:
     return f"outputs/number_check/{output_dir.name}/{path.relative_to(output_dir).as_posix()}"
 
@@ -477,12 +535,19 @@ def _run_latest_number_check_sync(
     if source_hf_path:
         source_hf_path = _convert_doc_input_if_needed(source_hf_path, converted_dir, "source_header_footer")
 
-    resolved_model_name = _set_llm_env(model_name)
+    if _warm_main_module is None:
+        resolved_model_name = _set_llm_env(model_name)
+    else:
+        # 子进程的密钥与地址在进程启动时已写入，这里只校验并解析本次任务的模型
+        _, _, resolved_model_name = _resolve_llm_config(model_name)
     _emit_log(task_id, f"[config] mode={mode}, route={effective_route}, model={resolved_model_name}")
 
     _update_progress(task_id, 3, total_steps, "正在加载新版数检主程序...")
-    with _specialist_import_lock:
-        main_module = _load_latest_main_module()
+    if _warm_main_module is not None:
+        main_module = _warm_main_module
+    else:
+        with _specialist_import_lock:
+            main_module = _load_latest_main_module()
 
     revised_output_path: Optional[Path] = None
     if target_path:
@@ -508,6 +573,9 @@ def _run_latest_number_check_sync(
         "use_total_normalizer": True,
         "force_mode_b": mode == NUMBER_CHECK_MODE_DIRECT,
         "ai_check_all": False,
+        "ai_concurrency": settings.NUMBER_CHECK_AI_CONCURRENCY,
+        "ai_provider_rpm": settings.NUMBER_CHECK_AI_PROVIDER_RPM or None,
+        "progress_callback": _make_block_progress_callback(task_id, 4, total_steps),
     }
 
     _update_progress(
@@ -527,8 +595,8 @@ def _run_latest_number_check_sync(
         with contextlib.redirect_stdout(stdout_writer), contextlib.redirect_stderr(stderr_writer):
             body_rows, header_rows, footer_rows = main_module.run(**run_kwargs)
     finally:
-        stdout_writer.flush()
-        stderr_writer.flush()
+        stdout_writer.close()
+        stderr_writer.close()
 
     _update_progress(task_id, 5, total_steps, "正在整理输出文件...")
     reports, report_counts, files = _collect_outputs(
@@ -563,6 +631,13 @@ def _run_latest_number_check_sync(
     return result
 
 
+def run_number_check_in_worker(*, task_id: str, **kwargs: Any) -> Dict[str, Any]:
+    """专检子进程入口：进度由父进程的快照接续，直接执行同步流程。"""
+    if task_id not in _task_progress:
+        _init_task_progress(task_id, total_steps=6)
+    return _run_latest_number_check_sync(task_id=task_id, **kwargs)
+
+
 async def run_number_check_task(
     alignment_file: Optional[UploadFile] = None,
     source_file: Optional[UploadFile] = None,
@@ -633,21 +708,22 @@ async def run_number_check_task(
             ext = Path(source_hf_file.filename or "source_hf.docx").suffix.lower() or ".docx"
             saved_source_hf = await _save_upload(source_hf_file, upload_dir / f"source_hf{ext}")
 
-        return await asyncio.to_thread(
-            _run_latest_number_check_sync,
-            task_id=task_id,
-            mode=normalized_mode,
-            alignment_path=saved_alignment,
-            source_path=saved_source,
-            target_path=saved_target,
-            source_hf_path=saved_source_hf,
-            output_dir=output_dir,
-            gemini_route=gemini_route,
-            model_name=model_name,
-            alignment_filename=alignment_file.filename if alignment_file else None,
-            source_filename=source_file.filename if source_file else None,
-            target_filename=target_file.filename if target_file else None,
-        )
+        run_kwargs = {
+            "mode": normalized_mode,
+            "alignment_path": saved_alignment,
+            "source_path": saved_source,
+            "target_path": saved_target,
+            "source_hf_path": saved_source_hf,
+            "output_dir": output_dir,
+            "gemini_route": gemini_route,
+            "model_name": model_name,
+            "alignment_filename": alignment_file.filename if alignment_file else None,
+            "source_filename": source_file.filename if source_file else None,
+            "target_filename": target_file.filename if target_file else None,
+        }
+        if specialist_worker_pool_enabled():
+            return await run_specialist_job(NUMBER_CHECK_JOB, task_id, run_kwargs)
+        return await asyncio.to_thread(_run_latest_number_check_sync, task_id=task_id, **run_kwargs)
     except Exception as exc:
         _emit_log(task_id, f"[error] 任务失败: {type(exc).__name__}: {exc}", level="error")
         _complete_task(task_id, error=str(exc))
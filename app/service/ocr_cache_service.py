@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""OCR 结果磁盘缓存：按渲染后的页面图片内容寻址，跨任务复用视觉模型输出。"""
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+from app.service.sqlite_lru_store import SharedStore, SqliteLruStore
+
+
+def build_prompt_version(system_prompt: str) -> str:
+    """用系统提示词内容摘要作为版本号，提示词一改旧缓存自动失效。"""
+    return hashlib.sha256((system_prompt or "").encode("utf-8")).hexdigest()[:16]
+
+
+def build_ocr_cache_key(image_bytes: bytes, model: str, prompt_version: str) -> str:
+    image_digest = hashlib.sha256(image_bytes).hexdigest()
+    return hashlib.sha256(f"{image_digest}\n{model}\n{prompt_version}".encode("utf-8")).hexdigest()
+
+
+class OcrResultCache(SqliteLruStore):
+    """OCR 结果缓存：键为页面图片 + 模型 + 提示词版本的摘要，内容为模型输出文本。"""
+
+    table = "ocr_result"
+    payload_columns = ("text",)
+
+    def get(self, cache_key: str) -> Optional[str]:
+        row = self._get_payload((cache_key,))
+        return row[0] if row is not None else None
+
+    def put(self, cache_key: str, text: str) -> None:
+        self._put_rows([((cache_key,), (text or "",))])
+
+
+_shared_cache: SharedStore[OcrResultCache] = SharedStore(OcrResultCache)
+
+
+def get_ocr_result_cache() -> Optional[OcrResultCache]:
+    """返回进程内共享的缓存实例；配置关闭时返回 None。"""
+    if not settings.OCR_CACHE_ENABLED:
+        return None
+    max_bytes = max(int(settings.OCR_CACHE_MAX_MB), 0) * 1024 * 1024
+    return _shared_cache.get(Path(settings.OCR_CACHE_PATH), max_bytes=max_bytes)
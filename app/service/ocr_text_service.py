@@ -7,7 +7,7 @@ from typing import Any, Callable, Iterable, Optional
 from bs4 import BeautifulSoup
 from markdown_it import MarkdownIt
 
-from pdf2docx import ocr_file
+from pdf2docx import ocr_file, ocr_pdf_document
 
 
 _PAGE_BREAK_RE = re.compile(r"\s*<page_break\s*/>\s*", flags=re.IGNORECASE)
@@ -71,18 +71,34 @@ def extract_ocr_plain_text(
     page_progress_callback: Optional[Callable[[int, int], None]] = None,
     status_callback: Optional[Callable[[str], None]] = None,
     continue_on_error: bool = True,
+    pdf_document: Any = None,
 ) -> dict[str, Any]:
-    """复用 PDF2DOCX OCR，并返回可直接统计的逐页纯文本。"""
-    payload = ocr_file(
-        file_path=file_path,
-        model=model,
-        gemini_route=gemini_route,
-        page_progress_callback=page_progress_callback,
-        return_metadata=True,
-        ocr_status_callback=status_callback,
-        page_numbers=page_numbers,
-        continue_on_error=continue_on_error,
-    )
+    """复用 PDF2DOCX OCR，并返回可直接统计的逐页纯文本。
+
+    传入调用方已打开的 PyMuPDF 文档 ``pdf_document`` 时直接在该句柄上渲染，
+    ``page_numbers`` 可以是边扫描边产出的页码迭代器，需要 OCR 的页一出现就开始识别。
+    """
+    if pdf_document is not None:
+        payload = ocr_pdf_document(
+            pdf_document,
+            model=model,
+            gemini_route=gemini_route,
+            page_progress_callback=page_progress_callback,
+            ocr_status_callback=status_callback,
+            page_numbers=page_numbers,
+            continue_on_error=continue_on_error,
+        )
+    else:
+        payload = ocr_file(
+            file_path=file_path,
+            model=model,
+            gemini_route=gemini_route,
+            page_progress_callback=page_progress_callback,
+            return_metadata=True,
+            ocr_status_callback=status_callback,
+            page_numbers=page_numbers,
+            continue_on_error=continue_on_error,
+        )
     if not isinstance(payload, dict):
         payload = {"text": str(payload or ""), "page_results": []}
 
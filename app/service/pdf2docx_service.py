@@ -129,11 +129,14 @@ def _normalize_ocr_payload(ocr_result: Any, fallback_total_pages: int = 0) -> Di
         except (TypeError, ValueError):
             total_pages = fallback_total_pages
 
+        cache = ocr_result.get("cache") if isinstance(ocr_result.get("cache"), dict) else {}
         return {
             "text": raw_text,
             "total_pages": max(total_pages, 0),
             "blank_page_count": max(blank_page_count, len(blank_pages), 0),
             "blank_pages": blank_pages,
+            "ocr_cache_hits": int(cache.get("hits") or 0),
+            "ocr_cache_misses": int(cache.get("misses") or 0),
         }
 
     return {
@@ -141,6 +144,8 @@ def _normalize_ocr_payload(ocr_result: Any, fallback_total_pages: int = 0) -> Di
         "total_pages": max(int(fallback_total_pages or 0), 0),
         "blank_page_count": 0,
         "blank_pages": [],
+        "ocr_cache_hits": 0,
+        "ocr_cache_misses": 0,
     }
 
 
@@ -343,6 +348,8 @@ async def execute_pdf2docx_task_from_path(
             pages_msg = f"OCR 完成（共 {total_pages} 页，未检测到空白页），正在整理中间文本"
     else:
         pages_msg = "OCR 完成，正在整理中间文本"
+    if ocr_payload["ocr_cache_hits"]:
+        pages_msg = f"{pages_msg}（缓存命中 {ocr_payload['ocr_cache_hits']} 页）"
     await _maybe_report(progress_callback, 70, pages_msg)
     raw_output_path.write_text(raw_text, encoding="utf-8")
 
@@ -378,4 +385,6 @@ async def execute_pdf2docx_task_from_path(
         "total_pages": total_pages,
         "blank_page_count": blank_page_count,
         "blank_pages": blank_pages,
+        "ocr_cache_hits": ocr_payload["ocr_cache_hits"],
+        "ocr_cache_misses": ocr_payload["ocr_cache_misses"],
     }
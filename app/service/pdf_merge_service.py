@@ -11,6 +11,7 @@ from typing import Any, Awaitable, Callable, Iterable, Optional
 from pypdf import PdfReader, PdfWriter
 
 from app.core.config import settings
+from app.service.directory_scan_service import scan_directory_files
 from app.service.word_count_service import (
     get_word_count_config,
     resolve_allowed_shared_input_path,
@@ -47,39 +48,36 @@ def discover_pdf_files(*, directory_path: str, recursive: bool = True) -> dict[s
     candidates: list[dict[str, Any]] = []
     truncated = False
 
-    for current_dir, dir_names, file_names in os.walk(root, followlinks=False):
-        current = Path(current_dir)
-        dir_names[:] = sorted(
-            [name for name in dir_names if not _is_hidden_or_temporary(name)],
-            key=_natural_sort_key,
+    scanned_files = scan_directory_files(
+        root,
+        cache_key=("pdf_merge", str(root), bool(recursive)),
+        recursive=recursive,
+        skip_name=_is_hidden_or_temporary,
+        match_file=lambda name: os.path.splitext(name)[1].lower() == PDF_EXTENSION,
+        sort_key=_natural_sort_key,
+        include_symlinked_files=True,
+    )
+    for scanned in scanned_files:
+        # 目录符号链接不会进入；文件符号链接解析后仍须位于所选目录内
+        candidate = scanned.path.resolve(strict=False) if scanned.is_symlink else scanned.path
+        if not _is_relative_to(candidate, root) or scanned.size is None:
+            continue
+        relative_path = candidate.relative_to(root).as_posix()
+        page_count = _read_pdf_page_count(candidate)
+        candidates.append(
+            {
+                "relative_path": relative_path,
+                "name": candidate.name,
+                "size": scanned.size,
+                "size_mb": round(scanned.size / (1024 * 1024), 2),
+                "page_count": page_count,
+                "modified_at": datetime.fromtimestamp(scanned.mtime).isoformat(timespec="seconds"),
+            }
         )
-        for filename in sorted(file_names, key=_natural_sort_key):
-            if _is_hidden_or_temporary(filename) or Path(filename).suffix.lower() != PDF_EXTENSION:
-                continue
-            candidate = (current / filename).resolve(strict=False)
-            if not _is_relative_to(candidate, root) or not candidate.is_file():
-                continue
-            try:
-                stat = candidate.stat()
-            except OSError:
-                continue
-            relative_path = candidate.relative_to(root).as_posix()
-            page_count = _read_pdf_page_count(candidate)
-            candidates.append(
-                {
-                    "relative_path": relative_path,
-                    "name": candidate.name,
-                    "size": stat.st_size,
-                    "size_mb": round(stat.st_size / (1024 * 1024), 2),
-                    "page_count": page_count,
-                    "modified_at": datetime.fromtimestamp(stat.st_mtime).isoformat(timespec="seconds"),
-                }
-            )
-            if len(candidates) > max_files:
-                truncated = True
-                break
-        if truncated or not recursive:
+        if len(candidates) > max_files:
+            truncated = True
             break
+    scanned_files.close()
 
     candidates.sort(key=lambda item: _natural_sort_key(item["relative_path"]))
     visible = candidates[:max_files]
@@ -0,0 +1,281 @@
+"""专检（数字专检 / 中翻译专检）子进程池。
+
+两个专检程序都以脚本目录方式导入（改 sys.path、清 sys.modules、靠环境变量传模型和密钥），
+同进程内只能串行执行。这里为每种专检各开一组常驻子进程：子进程启动时只导入一次对应专检包，
+之后每次调用通过参数传入模型配置；子进程内的任务进度快照经队列回传父进程，
+父进程照常从各服务模块的 _task_progress 读取进度与日志。
+"""
+import asyncio
+import importlib
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class SpecialistJobSpec:
+    kind: str
+    module: str
+    function: str
+    warm_up: str
+    progress_attr: str = '_task_progress'
+
+
+NUMBER_CHECK_JOB = SpecialistJobSpec(
+    kind='number_check',
+    module='app.service.number_check_service',
+    function='run_number_check_in_worker',
+    warm_up='warm_up_specialist_worker',
+)
+ZHONGFANYI_JOB = SpecialistJobSpec(
+    kind='zhongfanyi',
+    module='app.service.zhongfanyi_service',
+    function='run_zhongfanyi_task',
+    warm_up='warm_up_specialist_worker',
+)
+
+_PROGRESS_REPORT_INTERVAL_SECONDS = 0.5
+
+# 只在子进程内使用：进度快照回传队列
+_worker_event_queue = None
+
+
+def _runtime_credentials_env() -> Dict[str, str]:
+    """子进程启动时写入一次的密钥/地址（进程内全局，与单次任务无关）。"""
+    env: Dict[str, str] = {}
+    if settings.GOOGLE_API_KEY:
+        env['GOOGLE_API_KEY'] = settings.GOOGLE_API_KEY
+    if settings.OPENROUTER_API_KEY:
+        for key in ('OPENROUTER_API_KEY', 'OPENAI_API_KEY', 'API_KEY'):
+            env[key] = settings.OPENROUTER_API_KEY
+    if settings.OPENROUTER_BASE_URL:
+        for key in ('OPENROUTER_BASE_URL', 'OPENAI_BASE_URL', 'BASE_URL'):
+            env[key] = settings.OPENROUTER_BASE_URL
+    return env
+
+
+def _init_worker(spec: SpecialistJobSpec, event_queue, env: Dict[str, str]) -> None:
+    global _worker_event_queue
+    _worker_event_queue = event_queue
+    os.environ.update(env)
+    try:
+        module = importlib.import_module(spec.module)
+        getattr(module, spec.warm_up)()
+    except Exception as exc:
+        # 预热失败不让进程退出：执行任务时会按原路径重新加载并报出具体错误
+        print(f'[specialist-pool] {spec.kind} worker warm up failed: {type(exc).__name__}: {exc}')
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class _ProgressReporter:
+    """子进程内定时把 _task_progress[task_id] 的变化推给父进程。"""
+
+    def __init__(self, task_id: str, store: Dict[str, Dict[str, Any]]):
+        self.task_id = task_id
+        self.store = store
+        self._stop = threading.Event()
+        self._last_sent: Optional[tuple] = None
+        self._thread = threading.Thread(target=self._run, name='specialist-progress', daemon=True)
+
+    def _snapshot(self) -> Optional[Dict[str, Any]]:
+        current = self.store.get(self.task_id)
+        return dict(current) if current is not None else None
+
+    def _send_if_changed(self) -> None:
+        snapshot = self._snapshot()
+        if snapshot is None or _worker_event_queue is None:
+            return
+        marker = (snapshot.get('updated_at'), snapshot.get('progress'), len(snapshot.get('stream_log') or ''))
+        if marker == self._last_sent:
+            return
+        self._last_sent = marker
+        try:
+            _worker_event_queue.put((self.task_id, snapshot))
+        except Exception:
+            pass
+
+    def _run(self) -> None:
+        while not self._stop.wait(_PROGRESS_REPORT_INTERVAL_SECONDS):
+            self._send_if_changed()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Optional[Dict[str, Any]]:
+        self._stop.set()
+        self._thread.join()
+        return self._snapshot()
+
+
+def _picklable_error(exc: BaseException) -> BaseException:
+    try:
+        pickle.loads(pickle.dumps(exc))
+        return exc
+    except Exception:
+        return RuntimeError(f'{type(exc).__name__}: {exc}')
+
+
+def _run_job(
+    spec: SpecialistJobSpec,
+    task_id: str,
+    kwargs: Dict[str, Any],
+    initial_snapshot: Optional[Dict[str, Any]] = None,
+):
+    module = importlib.import_module(spec.module)
+    store = getattr(module, spec.progress_attr)
+    if initial_snapshot is not None:
+        # 接续父进程已写入的进度与日志（如上传保存阶段）
+        store[task_id] = dict(initial_snapshot)
+    reporter = _ProgressReporter(task_id, store)
+    reporter.start()
+    try:
+        result = getattr(module, spec.function)(task_id=task_id, **kwargs)
+    except Exception as exc:
+        return False, _picklable_error(exc), reporter.stop()
+    return True, result, reporter.stop()
+
+
+class SpecialistWorkerPool:
+    def __init__(self, spec: SpecialistJobSpec, max_workers: int):
+        self.spec = spec
+        self.max_workers = max(1, int(max_workers))
+        self._lock = threading.Lock()
+        self._context = multiprocessing.get_context('spawn')
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._event_queue = None
+        self._listener: Optional[threading.Thread] = None
+        self._listener_stop = threading.Event()
+        self._tracked: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def _ensure_started_locked(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._event_queue = self._context.Queue()
+            self._listener_stop = threading.Event()
+            self._listener = threading.Thread(
+                target=self._drain_events,
+                args=(self._event_queue, self._listener_stop),
+                name=f'specialist-{self.spec.kind}-events',
+                daemon=True,
+            )
+            self._listener.start()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=self._context,
+                initializer=_init_worker,
+                initargs=(self.spec, self._event_queue, _runtime_credentials_env()),
+            )
+        return self._executor
+
+    def _drain_events(self, event_queue, stop_event: threading.Event) -> None:
+        while not stop_event.is_set():
+            try:
+                task_id, snapshot = event_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            store = self._tracked.get(task_id)
+            if store is not None:
+                store[task_id] = snapshot
+
+    def warm_up(self) -> None:
+        """预先拉起全部子进程并完成专检包导入（spawn 模式下进程按需创建，这里并发提交占满进程数）。"""
+        with self._lock:
+            executor = self._ensure_started_locked()
+        futures = [executor.submit(_ping) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result()
+
+    async def run(self, task_id: str, kwargs: Dict[str, Any]) -> Any:
+        module = importlib.import_module(self.spec.module)
+        store = getattr(module, self.spec.progress_attr)
+        initial_snapshot = store.get(task_id)
+        with self._lock:
+            executor = self._ensure_started_locked()
+            self._tracked[task_id] = store
+        try:
+            future = executor.submit(
+                _run_job,
+                self.spec,
+                task_id,
+                kwargs,
+                dict(initial_snapshot) if initial_snapshot is not None else None,
+            )
+            ok, payload, final_snapshot = await asyncio.wrap_future(future)
+        except BrokenProcessPool as exc:
+            # 子进程异常退出会让整个进程池失效，丢弃后下次调用重建
+            self.shutdown(wait=False)
+            raise RuntimeError(f'{self.spec.kind} 子进程异常退出: {exc}') from exc
+        finally:
+            with self._lock:
+                self._tracked.pop(task_id, None)
+        # 队列里可能还有迟到的中间快照，已取消跟踪会被丢弃；以子进程返回的最终快照为准
+        if final_snapshot is not None:
+            store[task_id] = final_snapshot
+        if not ok:
+            raise payload
+        return payload
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            listener, self._listener = self._listener, None
+            stop_event = self._listener_stop
+            event_queue, self._event_queue = self._event_queue, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        stop_event.set()
+        if listener is not None and wait:
+            listener.join(timeout=2)
+        if event_queue is not None:
+            event_queue.close()
+
+
+_pools_lock = threading.Lock()
+_pools: Dict[str, SpecialistWorkerPool] = {}
+
+
+def specialist_worker_pool_enabled() -> bool:
+    return settings.SPECIALIST_WORKER_PROCESSES > 0
+
+
+def get_specialist_worker_pool(spec: SpecialistJobSpec) -> SpecialistWorkerPool:
+    with _pools_lock:
+        pool = _pools.get(spec.kind)
+        if pool is None:
+            pool = SpecialistWorkerPool(spec, settings.SPECIALIST_WORKER_PROCESSES)
+            _pools[spec.kind] = pool
+        return pool
+
+
+async def run_specialist_job(spec: SpecialistJobSpec, task_id: str, kwargs: Dict[str, Any]) -> Any:
+    return await get_specialist_worker_pool(spec).run(task_id, kwargs)
+
+
+def warm_up_specialist_worker_pools() -> None:
+    if not specialist_worker_pool_enabled():
+        return
+    for spec in (NUMBER_CHECK_JOB, ZHONGFANYI_JOB):
+        try:
+            get_specialist_worker_pool(spec).warm_up()
+        except Exception as exc:
+            print(f'[specialist-pool] {spec.kind} warm up failed: {exc}')
+
+
+def shutdown_specialist_worker_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False)
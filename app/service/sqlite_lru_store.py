@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""SQLite 磁盘缓存的公共部分：单表存储、按总大小 LRU 淘汰、命中统计与进程内共享实例。
+
+OCR 结果缓存、字数统计结果缓存与句段翻译记忆都基于这里的 SqliteLruStore，各自只声明键列/内容列，
+并补充自己的编码方式与额外的淘汰规则。
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Generic, Iterable, Optional, Sequence, TypeVar
+
+
+@dataclass
+class CacheHitStats:
+    """单个任务（或一次 OCR 调用）内的缓存命中统计。"""
+
+    enabled: bool = False
+    hits: int = 0
+    misses: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, hit: bool) -> None:
+        self.add(1 if hit else 0, 0 if hit else 1)
+
+    def add(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return round(self.hits / total, 4) if total else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"enabled": self.enabled, "hits": self.hits, "misses": self.misses}
+
+
+class SqliteLruStore:
+    """
+    单表 SQLite 缓存：键列 + 内容列（均为 TEXT），外加 size_bytes / created_at / last_access，
+    总大小超过 max_bytes 时按最近访问时间淘汰（LRU）；max_bytes 为 0 表示不限。
+
+    子类设置 table、key_columns、payload_columns；需要直接读写时在持有 _lock 的情况下使用 _connection()。
+    """
+
+    table = ""
+    key_columns: tuple[str, ...] = ("cache_key",)
+    payload_columns: tuple[str, ...] = ()
+
+    def __init__(self, db_path: str | Path, max_bytes: int) -> None:
+        self.db_path = Path(db_path)
+        self.max_bytes = max(int(max_bytes), 0)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = ",\n    ".join(f"{name} TEXT NOT NULL" for name in (*self.key_columns, *self.payload_columns))
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} (\n    {columns},\n"
+                "    size_bytes INTEGER NOT NULL,\n    created_at REAL NOT NULL,\n    last_access REAL NOT NULL,\n"
+                f"    PRIMARY KEY ({', '.join(self.key_columns)})\n)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{self.table}_last_access ON {self.table} (last_access)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @property
+    def _key_filter(self) -> str:
+        return " AND ".join(f"{name} = ?" for name in self.key_columns)
+
+    def _is_expired(self, last_access: float, now: float) -> bool:
+        return False
+
+    def _get_payload(self, key: Sequence[str]) -> Optional[tuple[str, ...]]:
+        """按完整键读取内容列并刷新访问时间；未命中或已过期返回 None。"""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                f"SELECT {', '.join(self.payload_columns)}, last_access FROM {self.table} WHERE {self._key_filter}",
+                tuple(key),
+            ).fetchone()
+            if row is None:
+                return None
+            if self._is_expired(float(row[-1]), now):
+                conn.execute(f"DELETE FROM {self.table} WHERE {self._key_filter}", tuple(key))
+                conn.commit()
+                return None
+            conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE {self._key_filter}", (now, *key))
+            conn.commit()
+        return tuple(str(value) for value in row[:-1])
+
+    def _touch_locked(self, conn: sqlite3.Connection, keys: Iterable[Sequence[str]], now: float) -> None:
+        conn.executemany(
+            f"UPDATE {self.table} SET last_access = ? WHERE {self._key_filter}",
+            [(now, *key) for key in keys],
+        )
+
+    def _put_rows(self, rows: Iterable[tuple[Sequence[str], Sequence[str]]]) -> int:
+        """写入 (键, 内容) 行，同键覆盖；单条超过 max_bytes 的不写。返回写入条数。"""
+        now = time.time()
+        values = []
+        for key, payload in rows:
+            size_bytes = sum(len(text.encode("utf-8")) for text in payload)
+            if self.max_bytes and size_bytes > self.max_bytes:
+                continue
+            values.append((*key, *payload, size_bytes, now, now))
+        if not values:
+            return 0
+        columns = (*self.key_columns, *self.payload_columns, "size_bytes", "created_at", "last_access")
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                values,
+            )
+            self._evict_locked(conn, now)
+            conn.commit()
+        return len(values)
+
+    def _evict_locked(self, conn: sqlite3.Connection, now: float) -> None:
+        if not self.max_bytes:
+            return
+        total = int(conn.execute(f"SELECT COALESCE(SUM(size_bytes), 0) FROM {self.table}").fetchone()[0])
+        if total <= self.max_bytes:
+            return
+        overflow = total - self.max_bytes
+        stale_rowids: list[int] = []
+        for rowid, size_bytes in conn.execute(
+            f"SELECT rowid, size_bytes FROM {self.table} ORDER BY last_access ASC"
+        ):
+            stale_rowids.append(rowid)
+            overflow -= int(size_bytes)
+            if overflow <= 0:
+                break
+        conn.executemany(f"DELETE FROM {self.table} WHERE rowid = ?", [(rowid,) for rowid in stale_rowids])
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            conn = self._connection()
+            count, total = conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM {self.table}"
+            ).fetchone()
+        return {"entries": int(count), "size_bytes": int(total), "max_bytes": self.max_bytes}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+StoreT = TypeVar("StoreT", bound=SqliteLruStore)
+
+
+class SharedStore(Generic[StoreT]):
+    """进程内共享的存储实例：数据库路径变化时关闭旧实例重建，其余限额参数就地更新。"""
+
+    def __init__(self, factory: Callable[..., StoreT]) -> None:
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._instance: Optional[StoreT] = None
+
+    def get(self, db_path: Path, **limits: Any) -> StoreT:
+        with self._lock:
+            if self._instance is None or self._instance.db_path != db_path:
+                if self._instance is not None:
+                    self._instance.close()
+                self._instance = self._factory(db_path, **limits)
+            else:
+                for name, value in limits.items():
+                    setattr(self._instance, name, value)
+            return self._instance
@@ -0,0 +1,53 @@
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.repository import task_repo
+
+
+class TaskProgressWriter:
+    """合并任务进度写入：内存里只保留每个任务的最新进度，由调度器定时一次事务批量落库。
+
+    进度回调只改内存，不再每次打开会话；查询接口通过 snapshot() 读到尚未落库的最新值。
+    """
+
+    def __init__(self, session_factory: Callable[[], Any]):
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._latest: Dict[str, Tuple[int, str]] = {}
+        self._dirty: set[str] = set()
+
+    def record(self, task_id: str, progress: int, message: str) -> None:
+        with self._lock:
+            if self._latest.get(task_id) == (progress, message):
+                return
+            self._latest[task_id] = (progress, message)
+            self._dirty.add(task_id)
+
+    def snapshot(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            latest = self._latest.get(task_id)
+        if latest is None:
+            return None
+        return {'progress': latest[0], 'message': latest[1]}
+
+    def discard(self, task_id: str) -> None:
+        """任务进入终态前调用，避免之后的批量写入覆盖终态。"""
+        with self._lock:
+            self._latest.pop(task_id, None)
+            self._dirty.discard(task_id)
+
+    def flush(self) -> int:
+        with self._lock:
+            if not self._dirty:
+                return 0
+            rows = [(task_id, *self._latest[task_id]) for task_id in self._dirty]
+            self._dirty.clear()
+        try:
+            with self._session_factory() as db:
+                task_repo.bulk_update_running_progress(db, rows)
+        except Exception:
+            # 落库失败时把这批重新标脏，下个周期重试；若期间已有更新的值则以内存中的为准
+            with self._lock:
+                self._dirty.update(task_id for task_id, _, _ in rows if task_id in self._latest)
+            raise
+        return len(rows)
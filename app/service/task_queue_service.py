@@ -1,11 +1,14 @@
 ﻿import asyncio
 import hashlib
+import heapq
 import io
 import json
+import threading
 import traceback
 import uuid
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable, Dict, Optional
 
@@ -31,11 +34,26 @@ from app.service.doc_translate_service import (
     execute_doc_translate_task,
 )
 from app.service.english_variant_service import get_converter
-from app.service.drivers_license_service import execute_drivers_license_task
+from app.service.drivers_license_service import (
+    drivers_license_pool_enabled,
+    execute_drivers_license_task,
+    shutdown_drivers_license_pipelines,
+    warm_up_drivers_license_pipelines,
+)
 from app.service.file_rename_service import (
     execute_file_rename_copy_task,
     prepare_file_rename_request,
 )
+from app.service.fixed_layout_docx_service import (
+    browser_pool_enabled,
+    shutdown_browser_pool,
+    warm_up_browser_pool,
+)
+from app.service.libreoffice_service import (
+    libreoffice_pool_enabled,
+    shutdown_libreoffice_pool,
+    warm_up_libreoffice_pool,
+)
 from app.service.msg_convert_service import (
     MSG_CONVERT_DEFAULT_OUTPUT_FORMAT,
     execute_msg_convert_task,
@@ -56,6 +74,14 @@ from app.service.pdf2docx_service import (
 )
 from app.service.pdf_merge_service import execute_pdf_merge_task, prepare_pdf_merge_request
 from app.service.pdf_tools_service import execute_pdf_tools_task, prepare_pdf_tools_request
+from app.service.specialist_worker_pool import (
+    ZHONGFANYI_JOB,
+    run_specialist_job,
+    shutdown_specialist_worker_pools,
+    specialist_worker_pool_enabled,
+    warm_up_specialist_worker_pools,
+)
+from app.service.task_progress_writer import TaskProgressWriter
 from app.service.word_count_service import (
     execute_word_count_task,
     prepare_word_count_request,
@@ -131,17 +157,41 @@ class TaskQueueService:
         self._running_counts: Dict[str, int] = {}
         self._running_group_counts: Dict[str, int] = {}
         self._max_concurrent_tasks = max(1, settings.TASK_QUEUE_MAX_CONCURRENT_TASKS)
-        self._poll_interval_seconds = max(0.1, settings.TASK_QUEUE_POLL_INTERVAL_SECONDS)
-        self._candidate_batch_size = max(1, settings.TASK_QUEUE_CANDIDATE_BATCH_SIZE)
+        self._resync_interval_seconds = max(1.0, settings.TASK_QUEUE_RESYNC_INTERVAL_SECONDS)
         self._task_type_limits = self._build_task_type_limits()
+        self._shared_group_limits = self._build_shared_group_limits()
+        # 内存就绪队列：每个任务类型一个按 (created_at, id) 排序的小根堆；
+        # _ready_task_types 记录仍有效的条目，取消/认领后只删这里，堆里的旧条目在出堆时跳过
+        self._ready_lock = threading.Lock()
+        self._ready_heaps: Dict[str, list] = {}
+        self._ready_task_types: Dict[str, str] = {}
+        self._progress_flush_interval_seconds = max(0.05, settings.TASK_PROGRESS_FLUSH_INTERVAL_SECONDS)
+        self._progress_writer = TaskProgressWriter(lambda: SessionLocal())
+        self._progress_flush_task: Optional[asyncio.Task] = None
+        # 取消接口直接置位，运行中的任务在下一次进度回调时就能感知，无需回库轮询
+        self._cancel_flags: set[str] = set()
 
     @classmethod
     def _build_task_type_limits(cls) -> Dict[str, int]:
         limits = dict(cls.DEFAULT_TASK_TYPE_LIMITS)
+        if specialist_worker_pool_enabled():
+            # 专检在独立子进程池中执行，默认并发随进程数放大
+            for task_type in cls.SHARED_TASK_GROUPS:
+                limits[task_type] = settings.SPECIALIST_WORKER_PROCESSES
         for task_type, limit in settings.TASK_QUEUE_TYPE_LIMITS.items():
             limits[task_type] = limit
         return limits
 
+    @classmethod
+    def _build_shared_group_limits(cls) -> Dict[str, int]:
+        limits = dict(cls.SHARED_GROUP_LIMITS)
+        if specialist_worker_pool_enabled():
+            # 每种专检各有一组子进程，组上限 = 每组进程数 × 组内专检种类数
+            for group_name in limits:
+                members = [task_type for task_type, group in cls.SHARED_TASK_GROUPS.items() if group == group_name]
+                limits[group_name] = settings.SPECIALIST_WORKER_PROCESSES * max(1, len(members))
+        return limits
+
     @staticmethod
     def _normalize_for_fingerprint(value: Any) -> Any:
         if value is None or isinstance(value, (str, int, float, bool)):
@@ -316,6 +366,7 @@ class TaskQueueService:
         self._running_task_types = {}
         self._running_counts = {}
         self._running_group_counts = {}
+        self._cancel_flags = set()
         if self._task_executor is None:
             executor_workers = max(
                 1,
@@ -324,7 +375,21 @@ class TaskQueueService:
             )
             self._task_executor = ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix='task-queue')
         self._requeue_interrupted_tasks()
+        self._rebuild_ready_index()
         self._worker_task = asyncio.create_task(self._worker_loop(), name='task-queue-dispatcher')
+        self._progress_flush_task = asyncio.create_task(self._progress_flush_loop(), name='task-progress-flush')
+        if specialist_worker_pool_enabled():
+            # 后台拉起专检子进程并预导入专检包，不阻塞服务启动
+            asyncio.get_running_loop().run_in_executor(None, warm_up_specialist_worker_pools)
+        if libreoffice_pool_enabled():
+            # 后台预热常驻 LibreOffice 转换进程
+            asyncio.get_running_loop().run_in_executor(None, warm_up_libreoffice_pool)
+        if browser_pool_enabled():
+            # 后台预热固定布局排版用的常驻无头浏览器
+            asyncio.get_running_loop().run_in_executor(None, warm_up_browser_pool)
+        if drivers_license_pool_enabled():
+            # 后台加载驾驶证流水线与 MTCNN 人脸检测模型
+            asyncio.get_running_loop().run_in_executor(None, warm_up_drivers_license_pipelines)
 
     async def stop(self):
         if not self._worker_task:
@@ -332,6 +397,8 @@ class TaskQueueService:
         self._stop_event.set()
         self._dispatch_event.set()
         self._worker_task.cancel()
+        if self._progress_flush_task is not None:
+            self._progress_flush_task.cancel()
         running_tasks = list(self._running_tasks.values())
         for running_task in running_tasks:
             running_task.cancel()
@@ -342,6 +409,10 @@ class TaskQueueService:
         except asyncio.CancelledError:
             pass
         finally:
+            if self._progress_flush_task is not None:
+                await asyncio.gather(self._progress_flush_task, return_exceptions=True)
+                self._progress_flush_task = None
+            self._flush_progress_quietly()
             self._worker_task = None
             self._running_tasks = {}
             self._running_task_types = {}
@@ -350,6 +421,10 @@ class TaskQueueService:
             if self._task_executor is not None:
                 self._task_executor.shutdown(wait=False, cancel_futures=True)
                 self._task_executor = None
+            shutdown_specialist_worker_pools()
+            shutdown_libreoffice_pool()
+            shutdown_browser_pool()
+            shutdown_drivers_license_pipelines()
 
     async def submit_number_check_task(
         self,
@@ -474,9 +549,9 @@ class TaskQueueService:
                 self._fail_reserved_task(reserved_task.task_id, exc)
             raise
 
-    async def submit_alignment_task(self, *, original_file: UploadFile, translated_file: UploadFile, source_lang: str, target_lang: str, model_name: str, gemini_route: str, enable_post_split: bool, threshold_2: int, threshold_3: int, threshold_4: int, threshold_5: int, threshold_6: int, threshold_7: int, threshold_8: int, buffer_chars: int, alignment_mode: str = 'hybrid', embedding_confidence: float = 0.55) -> TaskSubmitResult:
+    async def submit_alignment_task(self, *, original_file: UploadFile, translated_file: UploadFile, source_lang: str, target_lang: str, model_name: str, gemini_route: str, enable_post_split: bool, threshold_2: int, threshold_3: int, threshold_4: int, threshold_5: int, threshold_6: int, threshold_7: int, threshold_8: int, buffer_chars: int, alignment_mode: str = 'hybrid', embedding_confidence: float = 0.55, fail_fast: bool = False) -> TaskSubmitResult:
         display_name = f'{original_file.filename} | {translated_file.filename}'
-        params = {'source_lang': source_lang, 'target_lang': target_lang, 'model_name': model_name, 'gemini_route': gemini_route, 'enable_post_split': enable_post_split, 'alignment_mode': alignment_mode, 'embedding_confidence': embedding_confidence, 'threshold_2': threshold_2, 'threshold_3': threshold_3, 'threshold_4': threshold_4, 'threshold_5': threshold_5, 'threshold_6': threshold_6, 'threshold_7': threshold_7, 'threshold_8': threshold_8, 'buffer_chars': buffer_chars}
+        params = {'source_lang': source_lang, 'target_lang': target_lang, 'model_name': model_name, 'gemini_route': gemini_route, 'enable_post_split': enable_post_split, 'alignment_mode': alignment_mode, 'embedding_confidence': embedding_confidence, 'threshold_2': threshold_2, 'threshold_3': threshold_3, 'threshold_4': threshold_4, 'threshold_5': threshold_5, 'threshold_6': threshold_6, 'threshold_7': threshold_7, 'threshold_8': threshold_8, 'buffer_chars': buffer_chars, 'fail_fast': fail_fast}
         staged_uploads = await self._stage_uploads(
             'alignment',
             [('original', original_file, 'original.docx'), ('translated', translated_file, 'translated.docx')],
@@ -1067,6 +1142,10 @@ class TaskQueueService:
                 self._fail_reserved_task(reserved_task.task_id, exc)
             raise
 
+    def get_live_progress(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """运行中任务尚未落库的最新进度；没有时返回 None。"""
+        return self._progress_writer.snapshot(task_id)
+
     def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
         with SessionLocal() as db:
             task = task_repo.get_task_by_task_id(db, task_id)
@@ -1074,7 +1153,10 @@ class TaskQueueService:
                 return None
             result = json.loads(task.result_json) if task.result_json else None
             tasks_ahead = task_repo.count_tasks_ahead(db, task) if task.status == 'queued' else 0
-            payload = {'display_no': task.display_no, 'task_id': task.task_id, 'status': {'queued': 'queued', 'running': 'processing', 'done': 'done', 'failed': 'failed', 'cancelled': 'cancelled'}.get(task.status, task.status), 'progress': task.progress, 'message': task.message or '', 'details': [], 'result': result, 'error': task.error_message, 'stream_log': self._task_logs.get(task_id, ''), 'created_at': task.created_at.isoformat() if task.created_at else None, 'started_at': task.started_at.isoformat() if task.started_at else None, 'finished_at': task.finished_at.isoformat() if task.finished_at else None}
+            live_progress = self.get_live_progress(task_id) if task.status == 'running' else None
+            progress = live_progress['progress'] if live_progress else task.progress
+            message = live_progress['message'] if live_progress else task.message
+            payload = {'display_no': task.display_no, 'task_id': task.task_id, 'status': {'queued': 'queued', 'running': 'processing', 'done': 'done', 'failed': 'failed', 'cancelled': 'cancelled'}.get(task.status, task.status), 'progress': progress, 'message': message or '', 'details': [], 'result': result, 'error': task.error_message, 'stream_log': self._task_logs.get(task_id, ''), 'created_at': task.created_at.isoformat() if task.created_at else None, 'started_at': task.started_at.isoformat() if task.started_at else None, 'finished_at': task.finished_at.isoformat() if task.finished_at else None}
             if task.status == 'queued':
                 payload['queue_position'] = tasks_ahead + 1
                 payload['tasks_ahead'] = tasks_ahead
@@ -1089,7 +1171,9 @@ class TaskQueueService:
 
     def _update_task_input_files(self, task_id: str, input_files: Dict[str, Any]) -> None:
         with SessionLocal() as db:
-            task_repo.update_task_input_files(db, task_id, json.dumps(input_files, ensure_ascii=False))
+            task = task_repo.update_task_input_files(db, task_id, json.dumps(input_files, ensure_ascii=False))
+            if task and input_files and task.status == 'queued' and not task.cancel_requested:
+                self._index_ready_task(task.id, task.task_id, task.task_type, task.created_at)
 
     def _update_task_params(self, task_id: str, params: Dict[str, Any]) -> None:
         with SessionLocal() as db:
@@ -1242,7 +1326,7 @@ class TaskQueueService:
         if not group_name:
             return True
 
-        group_limit = self.SHARED_GROUP_LIMITS.get(group_name, task_limit)
+        group_limit = self._shared_group_limits.get(group_name, task_limit)
         return self._running_group_counts.get(group_name, 0) < group_limit
 
     def _reserve_task_slot(self, task_id: str, task_type: str) -> None:
@@ -1272,16 +1356,78 @@ class TaskQueueService:
             else:
                 self._running_group_counts.pop(group_name, None)
 
-    def _claim_next_dispatchable_task(self):
+    def _index_ready_task(self, task_pk: int, task_id: str, task_type: str, created_at: Optional[datetime]) -> None:
+        with self._ready_lock:
+            if task_id in self._ready_task_types:
+                return
+            self._ready_task_types[task_id] = task_type
+            heapq.heappush(
+                self._ready_heaps.setdefault(task_type, []),
+                (created_at or datetime.min, task_pk, task_id),
+            )
+
+    def _rebuild_ready_index(self) -> None:
         with SessionLocal() as db:
-            queued_tasks = task_repo.list_queued_tasks(db, limit=self._candidate_batch_size)
-            for queued_task in queued_tasks:
-                if not self._can_start_task_type(queued_task.task_type):
+            refs = task_repo.list_ready_task_refs(db)
+        heaps: Dict[str, list] = {}
+        task_types: Dict[str, str] = {}
+        for ref in refs:
+            task_types[ref.task_id] = ref.task_type
+            heaps.setdefault(ref.task_type, []).append((ref.created_at or datetime.min, ref.id, ref.task_id))
+        for heap in heaps.values():
+            heapq.heapify(heap)
+        with self._ready_lock:
+            self._ready_heaps = heaps
+            self._ready_task_types = task_types
+
+    def forget_ready_task(self, task_id: str) -> None:
+        with self._ready_lock:
+            self._ready_task_types.pop(task_id, None)
+
+    def request_cancel(self, task_id: str) -> None:
+        """取消接口在数据库标记 cancel_requested 后调用：排队中的移出就绪队列，运行中的置内存取消标记。"""
+        self.forget_ready_task(task_id)
+        if task_id in self._running_tasks:
+            self._cancel_flags.add(task_id)
+
+    def _flush_progress_quietly(self) -> None:
+        try:
+            self._progress_writer.flush()
+        except Exception as exc:
+            print(f'[task-progress] flush failed: {exc}')
+
+    async def _progress_flush_loop(self):
+        loop = asyncio.get_running_loop()
+        while not self._stop_event.is_set():
+            await asyncio.sleep(self._progress_flush_interval_seconds)
+            await loop.run_in_executor(None, self._flush_progress_quietly)
+
+    def _pop_next_ready_ref(self):
+        """在允许启动的任务类型中取最早入队的一条，保持跨类型的先来先服务。"""
+        with self._ready_lock:
+            best_type = None
+            for task_type, heap in self._ready_heaps.items():
+                while heap and self._ready_task_types.get(heap[0][2]) != task_type:
+                    heapq.heappop(heap)
+                if not heap or not self._can_start_task_type(task_type):
                     continue
-                claimed_task = task_repo.claim_queued_task_by_task_id(db, queued_task.task_id)
-                if claimed_task:
-                    return claimed_task
-        return None
+                if best_type is None or heap[0] < self._ready_heaps[best_type][0]:
+                    best_type = task_type
+            if best_type is None:
+                return None
+            _, task_pk, task_id = heapq.heappop(self._ready_heaps[best_type])
+            self._ready_task_types.pop(task_id, None)
+            return task_pk
+
+    def _claim_next_dispatchable_task(self):
+        while True:
+            task_pk = self._pop_next_ready_ref()
+            if task_pk is None:
+                return None
+            with SessionLocal() as db:
+                claimed_task = task_repo.claim_queued_task_by_id(db, task_pk)
+            if claimed_task:
+                return claimed_task
 
     def _start_claimed_task(self, task_id: str, task_type: str) -> None:
         self._reserve_task_slot(task_id, task_type)
@@ -1290,6 +1436,8 @@ class TaskQueueService:
 
         def _on_done(done_task: asyncio.Task, *, claimed_task_id: str):
             self._running_tasks.pop(claimed_task_id, None)
+            self._cancel_flags.discard(claimed_task_id)
+            self._progress_writer.discard(claimed_task_id)
             self._release_task_slot(claimed_task_id)
             try:
                 done_task.result()
@@ -1323,9 +1471,10 @@ class TaskQueueService:
                 continue
             self._dispatch_event.clear()
             try:
-                await asyncio.wait_for(self._dispatch_event.wait(), timeout=self._poll_interval_seconds)
+                await asyncio.wait_for(self._dispatch_event.wait(), timeout=self._resync_interval_seconds)
             except asyncio.TimeoutError:
-                continue
+                # 提交/取消/完成都会唤醒调度；长时间无事件时才回库对账一次，兜底外部改动
+                self._rebuild_ready_index()
 
     async def _execute_task(self, task_id: str):
         with SessionLocal() as db:
@@ -1339,14 +1488,14 @@ class TaskQueueService:
             display_no = task.display_no
 
         async def update(progress: int, message: str):
-            with SessionLocal() as db:
-                if task_repo.is_cancel_requested(db, task_id):
+            if task_id in self._cancel_flags:
+                self._progress_writer.discard(task_id)
+                with SessionLocal() as db:
                     task_repo.mark_cancelled(db, task_id)
-                    self._append_task_log(task_id, '[cancel] user cancelled')
-                    raise TaskCancelledError('user cancelled')
+                self._append_task_log(task_id, '[cancel] user cancelled')
+                raise TaskCancelledError('user cancelled')
             self._append_task_log(task_id, f'[{progress:>3}%] {message}')
-            with SessionLocal() as db:
-                task_repo.update_task_progress(db, task_id, progress=progress, message=message, status='running')
+            self._progress_writer.record(task_id, progress, message)
 
         try:
             self._append_task_log(task_id, f'[start] {task_type}')
@@ -1399,8 +1548,9 @@ class TaskQueueService:
             else:
                 raise ValueError(f'unsupported task type: {task_type}')
             output_files = self._extract_output_files(task_type, result, output_path, filename)
+            self._progress_writer.discard(task_id)
             with SessionLocal() as db:
-                if task_repo.is_cancel_requested(db, task_id):
+                if task_id in self._cancel_flags or task_repo.is_cancel_requested(db, task_id):
                     task_repo.mark_cancelled(db, task_id)
                     self._append_task_log(task_id, '[cancel] user cancelled before completion')
                     raise TaskCancelledError('user cancelled')
@@ -1413,6 +1563,7 @@ class TaskQueueService:
             brief_tb = traceback.format_exc(limit=5)
             if brief_tb:
                 self._append_task_log(task_id, brief_tb.rstrip())
+            self._progress_writer.discard(task_id)
             with SessionLocal() as db:
                 task_repo.fail_task(db, task_id, str(exc))
 
@@ -1449,26 +1600,29 @@ class TaskQueueService:
 
     async def _execute_zhongfanyi(self, task_id: str, display_no: str, input_files: Dict[str, Any], params: Dict[str, Any], update: Callable[[int, str], Any]) -> Dict[str, Any]:
         await update(5, 'zhongfanyi started')
-        loop = asyncio.get_running_loop()
-        job = loop.run_in_executor(
-            self._task_executor,
-            lambda: zf_service.run_zhongfanyi_task(
-                task_id=task_id,
-                display_no=display_no,
-                mode=params.get('mode', zf_service.ZHONGFANYI_MODE_DOUBLE),
-                original_path=input_files.get('original_path'),
-                translated_path=input_files.get('translated_path'),
-                single_path=input_files.get('single_path'),
-                original_filename=input_files.get('original_filename'),
-                translated_filename=input_files.get('translated_filename'),
-                single_filename=input_files.get('single_filename'),
-                use_ai_rule=params.get('use_ai_rule', False),
-                gemini_route=params.get('gemini_route', 'openrouter'),
-                model_name=params.get('model_name', zf_service.ZHONGFANYI_DEFAULT_MODEL),
-                ai_rule_file_path=params.get('ai_rule_file_path'),
-                session_rule_text=params.get('session_rule_text'),
+        run_kwargs = {
+            'display_no': display_no,
+            'mode': params.get('mode', zf_service.ZHONGFANYI_MODE_DOUBLE),
+            'original_path': input_files.get('original_path'),
+            'translated_path': input_files.get('translated_path'),
+            'single_path': input_files.get('single_path'),
+            'original_filename': input_files.get('original_filename'),
+            'translated_filename': input_files.get('translated_filename'),
+            'single_filename': input_files.get('single_filename'),
+            'use_ai_rule': params.get('use_ai_rule', False),
+            'gemini_route': params.get('gemini_route', 'openrouter'),
+            'model_name': params.get('model_name', zf_service.ZHONGFANYI_DEFAULT_MODEL),
+            'ai_rule_file_path': params.get('ai_rule_file_path'),
+            'session_rule_text': params.get('session_rule_text'),
+        }
+        if specialist_worker_pool_enabled():
+            job = asyncio.ensure_future(run_specialist_job(ZHONGFANYI_JOB, task_id, run_kwargs))
+        else:
+            loop = asyncio.get_running_loop()
+            job = loop.run_in_executor(
+                self._task_executor,
+                lambda: zf_service.run_zhongfanyi_task(task_id=task_id, **run_kwargs),
             )
-        )
         await self._mirror_progress(task_id, job, lambda: zf_service.get_task_progress(task_id), update)
         return await job
 
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""句段翻译记忆：按规范化原文 + 语言对 + 引擎 + 翻译规则缓存已确认的句段译文。
+
+合同类文档的新版本、同批次的兄弟文件大量重复句段，命中的句段直接复用译文，
+只把未命中的句段打包交给模型。记忆库是单个 SQLite 文件，可导出/导入为 JSONL 供多台机器共享。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from app.core.config import settings
+from app.service.sqlite_lru_store import SharedStore, SqliteLruStore
+
+
+_LOOKUP_BATCH = 500
+_EXPORT_FIELDS = ("source_lang", "target_lang", "engine", "rules_hash", "source_text", "target_text")
+
+
+def normalize_memory_source(text: str) -> str:
+    """记忆键使用的原文形式：合并空白、去掉首尾空白（与句段提取的 normalize_text 一致）。"""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def source_text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_memory_source(text).encode("utf-8")).hexdigest()
+
+
+def translation_rules_hash(rules: str) -> str:
+    """用户自定义规则的摘要；规则变更后旧译文不再命中。"""
+    return hashlib.sha256((rules or "").strip().encode("utf-8")).hexdigest()[:16]
+
+
+class TranslationMemory(SqliteLruStore):
+    """句段翻译记忆：键为原文摘要 + 语言对 + 引擎 + 规则摘要，内容为规范化原文与译文。"""
+
+    table = "translation_memory"
+    key_columns = ("source_hash", "source_lang", "target_lang", "engine", "rules_hash")
+    payload_columns = ("source_text", "target_text")
+
+    def lookup(
+        self,
+        source_texts: Iterable[str],
+        *,
+        source_lang: str,
+        target_lang: str,
+        engine: str,
+        rules_hash: str,
+    ) -> dict[str, str]:
+        """批量查询，返回 {规范化原文: 译文}；只返回命中的句段。"""
+        by_hash = {source_text_hash(text): normalize_memory_source(text) for text in source_texts}
+        by_hash.pop(source_text_hash(""), None)
+        found: dict[str, str] = {}
+        if not by_hash:
+            return found
+        hashes = list(by_hash)
+        with self._lock:
+            conn = self._connection()
+            for offset in range(0, len(hashes), _LOOKUP_BATCH):
+                batch = hashes[offset:offset + _LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    "SELECT source_hash, source_text, target_text FROM translation_memory "
+                    "WHERE source_lang = ? AND target_lang = ? AND engine = ? AND rules_hash = ? "
+                    f"AND source_hash IN ({placeholders})",
+                    (source_lang, target_lang, engine, rules_hash, *batch),
+                ).fetchall()
+                for source_hash, source_text, target_text in rows:
+                    # 摘要碰撞概率可忽略，但原文一并存储，顺手核对
+                    if by_hash.get(source_hash) == source_text:
+                        found[source_text] = str(target_text)
+            if found:
+                self._touch_locked(
+                    conn,
+                    [(source_text_hash(text), source_lang, target_lang, engine, rules_hash) for text in found],
+                    time.time(),
+                )
+                conn.commit()
+        return found
+
+    def store(
+        self,
+        pairs: Iterable[tuple[str, str]],
+        *,
+        source_lang: str,
+        target_lang: str,
+        engine: str,
+        rules_hash: str,
+    ) -> int:
+        """写入 (原文, 译文) 对，同键覆盖，返回写入条数。"""
+        rows = []
+        for source_text, target_text in pairs:
+            normalized = normalize_memory_source(source_text)
+            if not normalized or not (target_text or "").strip():
+                continue
+            key = (source_text_hash(normalized), source_lang, target_lang, engine, rules_hash)
+            rows.append((key, (normalized, target_text)))
+        return self._put_rows(rows)
+
+    def export_jsonl(self, output_path: str | Path, *, target_lang: Optional[str] = None) -> int:
+        """导出为 JSONL（每行一条，可选只导出某个目标语种），返回条数。"""
+        query = f"SELECT {', '.join(_EXPORT_FIELDS)} FROM translation_memory"
+        params: tuple[Any, ...] = ()
+        if target_lang:
+            query += " WHERE target_lang = ?"
+            params = (target_lang,)
+        query += " ORDER BY source_lang, target_lang, engine, rules_hash, source_text"
+        output = Path(output_path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        count = 0
+        with self._lock, output.open("w", encoding="utf-8") as handle:
+            for row in self._connection().execute(query, params):
+                handle.write(json.dumps(dict(zip(_EXPORT_FIELDS, row)), ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+    def import_jsonl(self, input_path: str | Path) -> int:
+        """导入 export_jsonl 生成的文件；同键条目以导入内容为准，返回导入条数。"""
+        grouped: dict[tuple[str, str, str, str], list[tuple[str, str]]] = {}
+        with Path(input_path).open("r", encoding="utf-8") as handle:
+            for line_no, line in enumerate(handle, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    item = json.loads(line)
+                    scope = (
+                        str(item["source_lang"]), str(item["target_lang"]),
+                        str(item["engine"]), str(item["rules_hash"]),
+                    )
+                    pair = (str(item["source_text"]), str(item["target_text"]))
+                except (json.JSONDecodeError, KeyError, TypeError) as exc:
+                    raise ValueError(f"翻译记忆导入文件第 {line_no} 行格式错误: {exc}") from exc
+                grouped.setdefault(scope, []).append(pair)
+        imported = 0
+        for (source_lang, target_lang, engine, rules_hash), pairs in grouped.items():
+            imported += self.store(
+                pairs,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                engine=engine,
+                rules_hash=rules_hash,
+            )
+        return imported
+
+    def scoped(
+        self,
+        *,
+        source_lang: str,
+        target_lang: str,
+        engine: str,
+        translation_rules: str = "",
+    ) -> "ScopedTranslationMemory":
+        return ScopedTranslationMemory(
+            self,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            engine=engine,
+            rules_hash=translation_rules_hash(translation_rules),
+        )
+
+
+class ScopedTranslationMemory:
+    """绑定语言对、引擎与规则的记忆视图，供句段翻译按原文查询/回写。"""
+
+    def __init__(
+        self,
+        memory: TranslationMemory,
+        *,
+        source_lang: str,
+        target_lang: str,
+        engine: str,
+        rules_hash: str,
+    ) -> None:
+        self.memory = memory
+        self.scope = dict(source_lang=source_lang, target_lang=target_lang, engine=engine, rules_hash=rules_hash)
+
+    def lookup(self, source_texts: Iterable[str]) -> dict[str, str]:
+        return self.memory.lookup(source_texts, **self.scope)
+
+    def store(self, pairs: Iterable[tuple[str, str]]) -> None:
+        self.memory.store(pairs, **self.scope)
+
+
+_shared_memory: SharedStore[TranslationMemory] = SharedStore(TranslationMemory)
+
+
+def get_translation_memory() -> Optional[TranslationMemory]:
+    """返回进程内共享的翻译记忆；配置关闭时返回 None。"""
+    if not settings.TRANSLATION_MEMORY_ENABLED:
+        return None
+    max_bytes = max(int(settings.TRANSLATION_MEMORY_MAX_MB), 0) * 1024 * 1024
+    return _shared_memory.get(Path(settings.TRANSLATION_MEMORY_PATH), max_bytes=max_bytes)
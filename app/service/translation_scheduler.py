@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""文本翻译调度：把“分块 × 目标语种”的 LLM 请求放进同一个线程池并发执行。
+
+每个作业是一次独立的模型调用，结果按作业 key 回收，由调用方按原顺序拼回。
+同一引擎的请求共享每分钟请求数（RPM）与 token 预算（TPM），在工作线程发起请求前领取；
+失败的作业带退避时间重新排队，等待期间其它作业照常执行，不占用工作线程。
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.rate_limit import RouteRateLimiter, TokenBudget, parse_provider_limits
+
+
+_PROVIDER_RATE_LIMITER = RouteRateLimiter()
+_PROVIDER_TOKEN_BUDGET = TokenBudget()
+
+
+@dataclass(frozen=True)
+class TranslationJob:
+    key: Hashable
+    provider: str
+    run: Callable[[], str]
+    estimated_tokens: int = 0
+
+
+def estimate_request_tokens(system_prompt: str, text: str) -> int:
+    """粗估一次翻译请求的 token 数：输入按约 2 字符/token，输出按与原文等长计。"""
+    return (len(system_prompt or "") + 2 * len(text or "")) // 2
+
+
+def throttle_provider_request(provider: str, estimated_tokens: int = 0) -> None:
+    """按 DOC_TRANSLATE_PROVIDER_RPM / DOC_TRANSLATE_PROVIDER_TPM 为该引擎领取请求时间片与 token 额度。"""
+    key = (provider or "").strip().lower()
+    rpm = parse_provider_limits(settings.DOC_TRANSLATE_PROVIDER_RPM).get(key)
+    if rpm:
+        _PROVIDER_RATE_LIMITER.wait(key, 60.0 / rpm)
+    tpm = parse_provider_limits(settings.DOC_TRANSLATE_PROVIDER_TPM).get(key)
+    if tpm:
+        _PROVIDER_TOKEN_BUDGET.acquire(key, estimated_tokens, tpm)
+
+
+def _run_job(job: TranslationJob) -> str:
+    throttle_provider_request(job.provider, job.estimated_tokens)
+    return job.run()
+
+
+def run_translation_jobs(
+    jobs: Sequence[TranslationJob],
+    *,
+    concurrency: Optional[int] = None,
+    retries: int = 3,
+    retry_backoff_seconds: float = 3.0,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    label: str = "翻译",
+) -> Dict[Hashable, str]:
+    """
+    并发执行全部作业，返回 {key: 译文}。
+
+    Args:
+        concurrency:           同时在途的请求数，缺省读 DOC_TRANSLATE_CONCURRENCY
+        retries:               每个作业最多尝试次数；第 n 次失败后等待 retry_backoff_seconds * n 秒重排
+        progress_callback:     每完成一个作业回调 (已完成数, 总数)，在调用线程中执行
+    任一作业重试用尽即取消尚未开始的作业并抛出 RuntimeError。
+    """
+    total = len(jobs)
+    results: Dict[Hashable, str] = {}
+    if not total:
+        return results
+    attempts = max(int(retries or 1), 1)
+    workers = max(1, min(int(concurrency or settings.DOC_TRANSLATE_CONCURRENCY or 1), total))
+    sequence = itertools.count()
+    # (可开始时间, 入队序号, 已失败次数, 作业)；入队序号保证同一时刻按原顺序派发
+    pending: List[Tuple[float, int, int, TranslationJob]] = [
+        (0.0, next(sequence), 0, job) for job in jobs
+    ]
+    heapq.heapify(pending)
+    running: Dict[Future, Tuple[int, TranslationJob]] = {}
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="translate")
+    try:
+        while pending or running:
+            now = time.monotonic()
+            while pending and len(running) < workers and pending[0][0] <= now:
+                _, _, failures, job = heapq.heappop(pending)
+                running[executor.submit(_run_job, job)] = (failures, job)
+
+            timeout = None
+            if pending and len(running) < workers:
+                timeout = max(pending[0][0] - now, 0.0)
+            if not running:
+                time.sleep(timeout or 0.0)
+                continue
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                failures, job = running.pop(future)
+                try:
+                    results[job.key] = future.result()
+                except Exception as exc:
+                    failures += 1
+                    if failures >= attempts:
+                        raise RuntimeError(f"翻译失败（已重试 {attempts} 次）: {exc}") from exc
+                    delay = max(float(retry_backoff_seconds), 0.0) * failures
+                    print(
+                        f"⚠️ {label} 翻译请求失败({exc.__class__.__name__})，{delay:g}秒后重试 "
+                        f"[{failures}/{attempts}]..."
+                    )
+                    heapq.heappush(pending, (time.monotonic() + delay, next(sequence), failures, job))
+                    continue
+                if progress_callback is not None:
+                    progress_callback(len(results), total)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
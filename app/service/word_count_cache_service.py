@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""字数统计单文件结果缓存：按 (路径, 大小, 修改时间, 可选内容摘要, 统计规则版本, OCR 参数) 寻址，
+同一目录重复统计时未变化的文件直接复用上次结果，不再重新解析。"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.service.sqlite_lru_store import SharedStore, SqliteLruStore
+
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_sha256(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_word_count_cache_key(
+    *,
+    resolved_path: str,
+    size_bytes: int,
+    mtime_ns: int,
+    content_sha256: str,
+    rules_version: str,
+    options: dict[str, Any],
+) -> str:
+    """options 为影响统计结果的参数（OCR 开关/模型、行数统计方式等），按键排序后参与摘要。"""
+    material = "\n".join(
+        [
+            resolved_path,
+            str(int(size_bytes)),
+            str(int(mtime_ns)),
+            content_sha256 or "",
+            rules_version,
+            json.dumps(options, ensure_ascii=False, sort_keys=True),
+        ]
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class WordCountResultCache(SqliteLruStore):
+    """单文件统计结果缓存，内容为 JSON：超过保留天数的条目先淘汰，总大小仍超限时按最近访问时间淘汰。"""
+
+    table = "word_count_result"
+    payload_columns = ("payload",)
+
+    def __init__(self, db_path: str | Path, max_bytes: int, max_age_seconds: float) -> None:
+        super().__init__(db_path, max_bytes)
+        self.max_age_seconds = max(float(max_age_seconds), 0.0)
+
+    def get(self, cache_key: str) -> Optional[dict[str, Any]]:
+        row = self._get_payload((cache_key,))
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, cache_key: str, payload: dict[str, Any]) -> None:
+        self._put_rows([((cache_key,), (json.dumps(payload, ensure_ascii=False),))])
+
+    def _is_expired(self, last_access: float, now: float) -> bool:
+        return bool(self.max_age_seconds) and now - last_access > self.max_age_seconds
+
+    def _evict_locked(self, conn: sqlite3.Connection, now: float) -> None:
+        if self.max_age_seconds:
+            conn.execute(f"DELETE FROM {self.table} WHERE last_access < ?", (now - self.max_age_seconds,))
+        super()._evict_locked(conn, now)
+
+    def stats(self) -> dict[str, Any]:
+        return {**super().stats(), "max_age_seconds": self.max_age_seconds}
+
+
+_shared_cache: SharedStore[WordCountResultCache] = SharedStore(WordCountResultCache)
+
+
+def get_word_count_result_cache() -> Optional[WordCountResultCache]:
+    """返回进程内共享的缓存实例；配置关闭时返回 None。"""
+    if not settings.WORD_COUNT_CACHE_ENABLED:
+        return None
+    return _shared_cache.get(
+        Path(settings.WORD_COUNT_CACHE_PATH),
+        max_bytes=max(int(settings.WORD_COUNT_CACHE_MAX_MB), 0) * 1024 * 1024,
+        max_age_seconds=max(float(settings.WORD_COUNT_CACHE_MAX_AGE_DAYS), 0.0) * 86400,
+    )
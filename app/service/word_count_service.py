@@ -1,15 +1,20 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import hashlib
+import itertools
 import json
+import multiprocessing
 import os
 import re
 import unicodedata
 from collections import Counter, defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Awaitable, Callable, Iterable, Optional
+from typing import Any, Awaitable, Callable, Iterable, Iterator, Optional
 from zipfile import ZIP_DEFLATED, ZipFile
 
 from lxml import etree
@@ -29,12 +34,19 @@ from app.service.cad_text_service import (
     extract_cad_text,
     get_cad_support_info,
 )
+from app.service.directory_scan_service import ScannedFile, find_cached_file, scan_directory_files
 from app.service.libreoffice_service import (
     convert_doc_to_docx_via_libreoffice,
     convert_presentation_to_pptx_via_libreoffice,
     convert_spreadsheet_to_xlsx_via_libreoffice,
 )
 from app.service.ocr_text_service import extract_ocr_plain_text
+from app.service.word_count_cache_service import (
+    WordCountResultCache,
+    build_word_count_cache_key,
+    file_sha256,
+    get_word_count_result_cache,
+)
 from app.service.pdf2docx_service import (
     PDF2DOCX_DEFAULT_GEMINI_ROUTE,
     PDF2DOCX_DEFAULT_MODEL,
@@ -416,20 +428,28 @@ def discover_word_count_files(
         candidates = [input_path] if input_path.suffix.lower() in scan_extensions else []
         relative_root = input_path.parent
     else:
-        candidates = list(_iter_candidate_files(input_path, recursive, include_hidden, scan_extensions))
+        candidates = list(
+            _scan_candidate_files(input_path, recursive, include_hidden, scan_extensions, limit=max_files + 1)
+        )
         relative_root = input_path
 
     truncated = len(candidates) > max_files
     visible = candidates[:max_files]
     files: list[dict[str, Any]] = []
     for candidate in visible:
-        try:
-            file_stat = candidate.stat()
-        except OSError:
-            continue
-        size = file_stat.st_size
+        if isinstance(candidate, ScannedFile):
+            if candidate.size is None:
+                continue
+            size, mtime = candidate.size, candidate.mtime
+            candidate, relative_path = candidate.path, candidate.relative_path
+        else:
+            try:
+                file_stat = candidate.stat()
+            except OSError:
+                continue
+            size, mtime = file_stat.st_size, file_stat.st_mtime
+            relative_path = candidate.relative_to(relative_root).as_posix()
         extension = candidate.suffix.lower()
-        relative_path = candidate.relative_to(relative_root).as_posix()
         selectable = size <= max_bytes
         files.append(
             {
@@ -438,7 +458,7 @@ def discover_word_count_files(
                 "extension": extension,
                 "size": size,
                 "size_mb": round(size / (1024 * 1024), 2),
-                "modified_at": datetime.fromtimestamp(file_stat.st_mtime).isoformat(timespec="seconds"),
+                "modified_at": datetime.fromtimestamp(mtime).isoformat(timespec="seconds"),
                 "category": (
                     "图片 OCR"
                     if extension in IMAGE_EXTENSIONS
@@ -646,6 +666,7 @@ def run_word_count_task_sync(
     ocr_text_dir = output_dir / "OCR识别文本"
 
     _report(progress_callback, 5, "正在扫描文件..." if input_kind == "file" else "正在扫描目录...")
+    max_files = max(1, int(settings.WORD_COUNT_MAX_FILES or 5000))
     normalized_relative_paths: Optional[list[str]] = None
     if input_kind == "file":
         candidates = [input_path] if input_path.suffix.lower() in scan_extensions else []
@@ -661,9 +682,13 @@ def run_word_count_task_sync(
         )
         relative_root = input_path
     else:
-        candidates = list(_iter_candidate_files(input_path, recursive, include_hidden, scan_extensions))
+        candidates = [
+            scanned.path
+            for scanned in _scan_candidate_files(
+                input_path, recursive, include_hidden, scan_extensions, limit=max_files + 1
+            )
+        ]
         relative_root = input_path
-    max_files = max(1, int(settings.WORD_COUNT_MAX_FILES or 5000))
     truncated = len(candidates) > max_files
     if truncated:
         candidates = candidates[:max_files]
@@ -678,31 +703,57 @@ def run_word_count_task_sync(
     if total == 0:
         _report(progress_callback, 80, "未发现可统计的候选文件，正在生成空报告...")
 
-    for index, file_path in enumerate(candidates, start=1):
-        progress = 8 + int(index / max(total, 1) * 72)
-        _report(progress_callback, min(progress, 80), f"正在统计 {index}/{total}: {file_path.name}")
-        result, rows, ocr_text_path = _count_single_file(
-            file_path=file_path,
-            root=relative_root,
-            converted_dir=converted_dir,
-            max_bytes=max_bytes,
-            use_word_native_line_count=(total == 1),
-            ocr_enabled=ocr_enabled,
-            ocr_model=normalized_ocr_model,
-            ocr_route=ocr_route,
-            ocr_text_dir=ocr_text_dir,
-            ocr_status_callback=lambda message, name=file_path.name, pct=min(progress, 80): _report(
-                progress_callback, pct, f"{name}: {message}"
-            ),
-            display_relative_path=(
-                str(original_filename or "").replace("\\", "/").rsplit("/", 1)[-1]
-                if normalized_input_source == "upload" and input_kind == "file"
-                else None
-            ),
-            language_fragments=language_fragments,
+    display_relative_path = (
+        str(original_filename or "").replace("\\", "/").rsplit("/", 1)[-1]
+        if normalized_input_source == "upload" and input_kind == "file"
+        else None
+    )
+    count_options = {
+        "root": relative_root,
+        "converted_dir": converted_dir,
+        "max_bytes": max_bytes,
+        "use_word_native_line_count": total == 1,
+        "ocr_enabled": ocr_enabled,
+        "ocr_model": normalized_ocr_model,
+        "ocr_route": ocr_route,
+        "ocr_text_dir": ocr_text_dir,
+        "display_relative_path": display_relative_path,
+    }
+    cache = get_word_count_result_cache()
+    cache_keys: list[Optional[str]] = [None] * total
+    cached_outcomes: list[Optional[CountOutcome]] = [None] * total
+    if cache is not None:
+        for index, file_path in enumerate(candidates):
+            cache_keys[index] = _word_count_cache_key(file_path, count_options)
+            cached_outcomes[index] = _load_cached_outcome(cache, cache_keys[index], file_path, count_options)
+    pending_indexes = [index for index, outcome in enumerate(cached_outcomes) if outcome is None]
+    pending = [candidates[index] for index in pending_indexes]
+    if len(pending) < total:
+        _report(progress_callback, 8, f"{total - len(pending)} 个文件未变化，直接复用缓存结果")
+
+    process_workers = max(1, int(settings.WORD_COUNT_PROCESS_WORKERS or 1))
+    if process_workers > 1 and len(pending) >= PARALLEL_COUNT_MIN_FILES:
+        counted = _count_candidates_in_parallel(
+            pending,
+            count_options,
+            process_workers=process_workers,
+            ocr_workers=max(1, int(settings.WORD_COUNT_OCR_FILE_CONCURRENCY or 1)),
+            progress_callback=progress_callback,
         )
+    else:
+        counted = _count_candidates_serially(pending, count_options, progress_callback=progress_callback)
+
+    outcomes = list(cached_outcomes)
+    for index, outcome in zip(pending_indexes, counted):
+        outcomes[index] = outcome
+        if cache is not None:
+            _store_cached_outcome(cache, cache_keys[index], outcome)
+
+    # 结果按候选文件原顺序合并，JSON / Excel 行序与串行统计一致
+    for result, rows, ocr_text_path, fragments in outcomes:
         file_results.append(result)
         source_rows.extend(rows)
+        language_fragments.extend(fragments)
         if ocr_text_path is not None:
             ocr_text_files.append(ocr_text_path)
 
@@ -784,6 +835,212 @@ def run_word_count_task_sync(
     return report_payload
 
 
+CountOutcome = tuple[dict[str, Any], list[dict[str, Any]], Optional[Path], list[dict[str, Any]]]
+LIBREOFFICE_CONVERTED_EXTENSIONS = {".doc", ".xls", ".ppt"}
+# 子进程以 spawn 启动并各自导入本模块（数秒），文件数少时并行收益抵不过启动开销
+PARALLEL_COUNT_MIN_FILES = 8
+
+
+# 统计口径版本：计数规则或结果字段有不兼容调整时递增；本模块源码摘要同时参与缓存键，代码一改旧缓存自动失效
+WORD_COUNT_RULES_VERSION = "1"
+CACHEABLE_STATUSES = {STATUS_COUNTED, STATUS_NEEDS_OCR}
+
+
+@lru_cache(maxsize=1)
+def _count_rules_version() -> str:
+    digest = hashlib.sha256(WORD_COUNT_RULES_VERSION.encode("utf-8"))
+    digest.update(Path(__file__).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _word_count_cache_key(file_path: Path, options: dict[str, Any]) -> Optional[str]:
+    try:
+        stat = file_path.stat()
+        content_sha256 = file_sha256(file_path) if settings.WORD_COUNT_CACHE_HASH_ENABLED else ""
+        resolved_path = str(file_path.resolve())
+    except OSError:
+        return None
+    ocr_enabled = bool(options.get("ocr_enabled"))
+    return build_word_count_cache_key(
+        resolved_path=resolved_path,
+        size_bytes=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        content_sha256=content_sha256,
+        rules_version=_count_rules_version(),
+        options={
+            "ocr_enabled": ocr_enabled,
+            "ocr_model": options.get("ocr_model") if ocr_enabled else "",
+            "use_word_native_line_count": bool(options.get("use_word_native_line_count")),
+            "max_bytes": int(options.get("max_bytes") or 0),
+        },
+    )
+
+
+def _load_cached_outcome(
+    cache: WordCountResultCache,
+    cache_key: Optional[str],
+    file_path: Path,
+    options: dict[str, Any],
+) -> Optional[CountOutcome]:
+    """命中时把缓存结果中的路径字段换成本次任务的路径与相对路径，OCR 文本重新写入本次输出目录。"""
+    if not cache_key:
+        return None
+    try:
+        payload = cache.get(cache_key)
+    except Exception as exc:
+        print(f"[word-count] 读取统计缓存失败: {type(exc).__name__}: {exc}")
+        return None
+    if payload is None:
+        return None
+
+    relative_path = str(options.get("display_relative_path") or _relative_path(file_path, options["root"]))
+    result = dict(payload["result"])
+    result.update(
+        file_path=str(file_path),
+        relative_path=relative_path,
+        filename=Path(relative_path).name or file_path.name,
+        counted_at=_now_iso(),
+        cache_hit=True,
+    )
+    rows = [{**row, "file_path": str(file_path), "relative_path": relative_path} for row in payload["rows"]]
+    fragments = [{**fragment, "relative_path": relative_path} for fragment in payload["fragments"]]
+    ocr_text_path: Optional[Path] = None
+    ocr_text_dir = options.get("ocr_text_dir")
+    if payload.get("ocr_text") is not None and ocr_text_dir is not None:
+        ocr_text_path = _write_ocr_text_file(
+            ocr_text_dir=Path(ocr_text_dir),
+            relative_path=relative_path,
+            text=payload["ocr_text"],
+        )
+        result["ocr_text_path"] = _output_web_path(ocr_text_path)
+    return result, rows, ocr_text_path, fragments
+
+
+def _store_cached_outcome(cache: WordCountResultCache, cache_key: Optional[str], outcome: CountOutcome) -> None:
+    """只缓存确定性的结果；失败、跳过、缺少 CAD 工具等状态下次仍重新统计。"""
+    result, rows, ocr_text_path, fragments = outcome
+    if not cache_key or result.get("status") not in CACHEABLE_STATUSES:
+        return
+    try:
+        ocr_text = ocr_text_path.read_text(encoding="utf-8") if ocr_text_path is not None else None
+        cache.put(cache_key, {"result": result, "rows": rows, "fragments": fragments, "ocr_text": ocr_text})
+    except Exception as exc:
+        print(f"[word-count] 写入统计缓存失败: {type(exc).__name__}: {exc}")
+
+
+def _count_file_with_fragments(file_path: Path, options: dict[str, Any]) -> CountOutcome:
+    """统计单个文件，分语系片段单独收集后随结果返回；也是进程池子进程的入口。"""
+    fragments: list[dict[str, Any]] = []
+    result, rows, ocr_text_path = _count_single_file(file_path=file_path, language_fragments=fragments, **options)
+    return result, rows, ocr_text_path, fragments
+
+
+def _uses_ocr_budget(file_path: Path, ocr_enabled: bool) -> bool:
+    ext = file_path.suffix.lower()
+    return bool(ocr_enabled) and (ext in IMAGE_EXTENSIONS or ext == ".pdf")
+
+
+def _count_candidates_serially(
+    candidates: list[Path],
+    options: dict[str, Any],
+    *,
+    progress_callback: Optional[Callable[[int, str], None]] = None,
+) -> list[CountOutcome]:
+    total = len(candidates)
+    outcomes: list[CountOutcome] = []
+    for index, file_path in enumerate(candidates, start=1):
+        progress = min(8 + int(index / max(total, 1) * 72), 80)
+        _report(progress_callback, progress, f"正在统计 {index}/{total}: {file_path.name}")
+        outcomes.append(
+            _count_file_with_fragments(
+                file_path,
+                {
+                    **options,
+                    "ocr_status_callback": lambda message, name=file_path.name, pct=progress: _report(
+                        progress_callback, pct, f"{name}: {message}"
+                    ),
+                },
+            )
+        )
+    return outcomes
+
+
+def _count_candidates_in_parallel(
+    candidates: list[Path],
+    options: dict[str, Any],
+    *,
+    process_workers: int,
+    ocr_workers: int,
+    progress_callback: Optional[Callable[[int, str], None]] = None,
+) -> list[CountOutcome]:
+    """
+    Office/PDF/TXT/CAD 解析是 CPU 密集型，分发到 spawn 子进程池；需要 OCR 的图片/PDF 主要在等远端模型，
+    留在本进程线程池中，按 WORD_COUNT_OCR_FILE_CONCURRENCY 单独限流，不占用解析进程。
+    完成一个回报一次进度，结果按候选顺序返回；子进程异常（含进程池崩溃）时该文件回退到本进程重新统计。
+    """
+    total = len(candidates)
+    outcomes: list[Optional[CountOutcome]] = [None] * total
+    ocr_enabled = bool(options.get("ocr_enabled"))
+    parse_indexes = [index for index, path in enumerate(candidates) if not _uses_ocr_budget(path, ocr_enabled)]
+    ocr_indexes = [index for index, path in enumerate(candidates) if _uses_ocr_budget(path, ocr_enabled)]
+
+    def _options_for(index: int) -> dict[str, Any]:
+        file_path = candidates[index]
+        ext = file_path.suffix.lower()
+        if ext in LIBREOFFICE_CONVERTED_EXTENSIONS or ext in CAD_EXTENSIONS:
+            # 不同目录下的同名文件会并发转换，各用独立转换目录避免互相覆盖
+            converted_dir = Path(options["converted_dir"]) / f"{index + 1:05d}"
+            converted_dir.mkdir(parents=True, exist_ok=True)
+            return {**options, "converted_dir": converted_dir}
+        return options
+
+    process_pool = (
+        ProcessPoolExecutor(
+            max_workers=min(process_workers, len(parse_indexes)),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        if parse_indexes
+        else None
+    )
+    ocr_pool = (
+        ThreadPoolExecutor(max_workers=min(ocr_workers, len(ocr_indexes)), thread_name_prefix="word-count-ocr")
+        if ocr_indexes
+        else None
+    )
+    current_progress = [8]
+
+    def _ocr_status(name: str) -> Callable[[str], None]:
+        return lambda message: _report(progress_callback, current_progress[0], f"{name}: {message}")
+
+    def _local_options_for(index: int) -> dict[str, Any]:
+        # 在本进程内统计时才能带回调（子进程无法序列化闭包），OCR 进度照常回报
+        return {**_options_for(index), "ocr_status_callback": _ocr_status(candidates[index].name)}
+
+    futures: dict[Future, int] = {}
+    try:
+        for index in parse_indexes:
+            futures[process_pool.submit(_count_file_with_fragments, candidates[index], _options_for(index))] = index
+        for index in ocr_indexes:
+            futures[ocr_pool.submit(_count_file_with_fragments, candidates[index], _local_options_for(index))] = index
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            file_path = candidates[index]
+            try:
+                outcomes[index] = future.result()
+            except Exception as exc:
+                print(f"[word-count] 并行统计 {file_path.name} 失败，改为本进程统计: {type(exc).__name__}: {exc}")
+                outcomes[index] = _count_file_with_fragments(file_path, _local_options_for(index))
+            current_progress[0] = min(8 + int(done / total * 72), 80)
+            _report(progress_callback, current_progress[0], f"已统计 {done}/{total}: {file_path.name}")
+    finally:
+        if process_pool is not None:
+            process_pool.shutdown(wait=True, cancel_futures=True)
+        if ocr_pool is not None:
+            ocr_pool.shutdown(wait=True, cancel_futures=True)
+    return [outcome for outcome in outcomes if outcome is not None]
+
+
 def count_words_word_like(text: str) -> int:
     return _count_text(text).word_count
 
@@ -1084,35 +1341,38 @@ def _unc_relative_parts(candidate_unc: str, root_unc: str) -> Optional[list[str]
     return candidate_parts[len(root_parts):]
 
 
-def _iter_candidate_files(
+def _word_count_scan_key(root: Path, recursive: bool, include_hidden: bool, extensions: set[str]) -> tuple:
+    return (
+        "word_count",
+        str(root),
+        bool(recursive),
+        bool(include_hidden),
+        settings.WORD_COUNT_FOLLOW_SYMLINKS_ENABLED,
+        tuple(sorted(extensions)),
+    )
+
+
+def _scan_candidate_files(
     root: Path,
     recursive: bool,
     include_hidden: bool,
     extensions: set[str],
-) -> Iterable[Path]:
+    *,
+    limit: Optional[int] = None,
+) -> Iterator[ScannedFile]:
+    """按目录顺序流式产出候选文件（同目录内按名称不区分大小写排序），扫描结果短时缓存供提交时复用。"""
     followlinks = settings.WORD_COUNT_FOLLOW_SYMLINKS_ENABLED
-
-    if not recursive:
-        for child in sorted(root.iterdir(), key=lambda item: item.name.lower()):
-            if not include_hidden and _is_hidden_name(child.name):
-                continue
-            if child.is_file() and child.suffix.lower() in extensions:
-                if followlinks or not child.is_symlink():
-                    yield child
-        return
-
-    for current_dir, dir_names, file_names in os.walk(root, followlinks=followlinks):
-        if not include_hidden:
-            dir_names[:] = [name for name in dir_names if not _is_hidden_name(name)]
-            file_names = [name for name in file_names if not _is_hidden_name(name)]
-        dir_names.sort(key=str.lower)
-        for file_name in sorted(file_names, key=str.lower):
-            file_path = Path(current_dir) / file_name
-            if file_path.suffix.lower() not in extensions:
-                continue
-            if not followlinks and file_path.is_symlink():
-                continue
-            yield file_path
+    return scan_directory_files(
+        root,
+        cache_key=_word_count_scan_key(root, recursive, include_hidden, extensions),
+        limit=limit,
+        recursive=recursive,
+        skip_name=(lambda _name: False) if include_hidden else _is_hidden_name,
+        match_file=lambda name: os.path.splitext(name)[1].lower() in extensions,
+        sort_key=str.lower,
+        follow_dir_symlinks=followlinks,
+        include_symlinked_files=followlinks,
+    )
 
 
 def _normalize_selected_word_count_paths(relative_paths: Iterable[str]) -> list[str]:
@@ -1155,12 +1415,20 @@ def _resolve_selected_word_count_files(
     max_bytes = max(1, int(settings.WORD_COUNT_MAX_FILE_MB or 200)) * 1024 * 1024
     resolved: list[Path] = []
     followlinks = settings.WORD_COUNT_FOLLOW_SYMLINKS_ENABLED
+    scan_key = _word_count_scan_key(root, recursive, include_hidden, extensions)
     for relative_path in relative_paths:
         parts = relative_path.replace("\\", "/").split("/")
         if not include_hidden and any(_is_hidden_name(part) for part in parts):
             raise ValueError(f"未启用隐藏文件扫描: {relative_path}")
         if not recursive and len(parts) > 1:
             raise ValueError(f"未启用子目录扫描: {relative_path}")
+        # 刚扫描过的目录直接用列表里的结果（扫描时已排除符号链接、校验类型与扩展名），不再逐个访问共享盘
+        scanned = None if followlinks else find_cached_file(scan_key, "/".join(parts))
+        if scanned is not None and not scanned.is_symlink and scanned.size is not None:
+            if scanned.size > max_bytes:
+                raise ValueError(f"文件超过 {settings.WORD_COUNT_MAX_FILE_MB} MB 限制: {relative_path}")
+            resolved.append(scanned.path)
+            continue
         unresolved_candidate = root.joinpath(*parts)
         if not followlinks:
             current = root
@@ -1249,6 +1517,7 @@ def _count_single_file(
         "ocr_page_count": 0,
         "ocr_model": "",
         "ocr_failed_pages": [],
+        "ocr_cache_hit_pages": 0,
     }
     try:
         if ext in IMAGE_EXTENSIONS:
@@ -1527,7 +1796,9 @@ def _base_file_result(
         "ocr_page_count": 0,
         "ocr_model": "",
         "ocr_failed_pages": [],
+        "ocr_cache_hit_pages": 0,
         "ocr_text_path": "",
+        "cache_hit": False,
         "warning": "",
         "error": error,
         **script_counts,
@@ -1742,27 +2013,57 @@ def _extract_pdf_content_with_ocr(
 
     page_data: list[dict[str, Any]] = []
     image_count = 0
+    payload: Optional[dict[str, Any]] = None
     with fitz.open(str(path)) as doc:
         page_count = doc.page_count
-        for page_index, page in enumerate(doc, start=1):
-            text = page.get_text("text").strip()
-            word_count = _count_text(text).word_count
-            image_count += len(page.get_images(full=True))
-            image_coverage = _max_pdf_page_image_coverage(page)
-            needs_ocr = word_count == 0 or (
-                word_count < PDF_OCR_SPARSE_WORD_THRESHOLD
-                and image_coverage >= PDF_OCR_IMAGE_COVERAGE_THRESHOLD
-            )
-            page_data.append(
-                {
-                    "page_number": page_index,
-                    "text": text,
-                    "needs_ocr": needs_ocr,
-                }
+
+        def probe_ocr_pages() -> Iterator[int]:
+            """逐页探测文本层；需要 OCR 的页一发现就产出给 OCR 流水线，文本层页继续在本线程统计。"""
+            nonlocal image_count
+            for page_index in range(1, page_count + 1):
+                page = doc[page_index - 1]
+                text = page.get_text("text").strip()
+                word_count = _count_text(text).word_count
+                image_count += len(page.get_images(full=True))
+                image_coverage = _max_pdf_page_image_coverage(page)
+                needs_ocr = word_count == 0 or (
+                    word_count < PDF_OCR_SPARSE_WORD_THRESHOLD
+                    and image_coverage >= PDF_OCR_IMAGE_COVERAGE_THRESHOLD
+                )
+                page_data.append(
+                    {
+                        "page_number": page_index,
+                        "text": text,
+                        "needs_ocr": needs_ocr,
+                    }
+                )
+                if needs_ocr:
+                    yield page_index
+
+        # 探测与 OCR 渲染共用同一文档句柄、同一线程；首个需 OCR 的页出现前不启动 OCR
+        probe = probe_ocr_pages()
+        first_ocr_page = next(probe, None)
+        if first_ocr_page is not None:
+            payload = extract_ocr_plain_text(
+                file_path=str(path),
+                model=model,
+                gemini_route=gemini_route,
+                page_numbers=itertools.chain([first_ocr_page], probe),
+                page_progress_callback=(
+                    (lambda current, total: status_callback(f"正在 OCR 第 {current}/{total} 页"))
+                    if status_callback
+                    else None
+                ),
+                status_callback=status_callback,
+                continue_on_error=True,
+                pdf_document=doc,
             )
+            # OCR 流水线提前结束时补完剩余页的探测，未识别的页按无结果处理
+            for _ in probe:
+                pass
 
     ocr_pages = [int(item["page_number"]) for item in page_data if item["needs_ocr"]]
-    if not ocr_pages:
+    if payload is None:
         items = _pdf_text_layer_items(page_data)
         return (
             ExtractedContent(
@@ -1774,22 +2075,15 @@ def _extract_pdf_content_with_ocr(
                 stat_method="PDF文本层解析+Word近似计数",
                 file_type="PDF",
             ),
-            {"ocr_used": False, "ocr_page_count": 0, "ocr_model": "", "ocr_failed_pages": []},
+            {
+                "ocr_used": False,
+                "ocr_page_count": 0,
+                "ocr_model": "",
+                "ocr_failed_pages": [],
+                "ocr_cache_hit_pages": 0,
+            },
         )
 
-    payload = extract_ocr_plain_text(
-        file_path=str(path),
-        model=model,
-        gemini_route=gemini_route,
-        page_numbers=ocr_pages,
-        page_progress_callback=(
-            (lambda current, total: status_callback(f"正在 OCR 第 {current}/{total} 页"))
-            if status_callback
-            else None
-        ),
-        status_callback=status_callback,
-        continue_on_error=True,
-    )
     ocr_results = {
         int(item.get("page_number") or 0): item
         for item in (payload.get("page_results") or [])
@@ -1896,6 +2190,7 @@ def _ocr_info_from_payload(payload: dict[str, Any], model: str) -> dict[str, Any
         "ocr_page_count": len(processed_pages),
         "ocr_model": model,
         "ocr_failed_pages": failed_pages,
+        "ocr_cache_hit_pages": int((payload.get("cache") or {}).get("hits") or 0),
     }
 
 
@@ -2538,122 +2833,176 @@ def _stat_method_for_extension(extension: str) -> str:
     return ""
 
 
+# === 单遍计数引擎 ===
+# 每个码位先按下列类别映射成一个 ASCII 字符（结果按字符缓存，str.translate 一次完成整段映射），
+# 之后的分词、分桶、候选片段判定都在类别串上用正则和 str.count 完成，不再逐字符调用 Python 函数。
+# 类别与逐字符判定函数一一对应：_cjk_script_field / _is_token_char / _letter_script /
+# _consume_word_like_token 的连接符 / _is_word_count_cjk_punctuation。
+_KIND_HAN = "H"
+_KIND_KANA = "K"
+_KIND_HANGUL = "G"
+_KIND_SEPARATOR = "n"  # \t \r \n：候选字符数按它切分文本片段
+_KIND_SPACE = "s"
+_KIND_NUMBER = "D"
+_LETTER_KIND_BY_SCRIPT = {
+    "latin": "L",
+    "cyrillic": "C",
+    "arabic": "A",
+    "greek": "E",
+    "hebrew": "B",
+    "thai": "T",
+    "other": "O",
+}
+_SCRIPT_BY_LETTER_KIND = {kind: script for script, kind in _LETTER_KIND_BY_SCRIPT.items()}
+_KIND_CONNECTOR = "c"  # 只在词内部延续 token：' - _ . /
+_KIND_CONNECTOR_QUOTE = "r"  # ’ 既是词内连接符，也是词外的中文语境标点
+_KIND_CJK_PUNCT = "P"  # 全角/中文标点，总是计入 cjk_punct_count
+_KIND_CONTEXT_PUNCT = "q"  # “ ” ‘ — – … ·：紧邻中日韩文字时才计入
+_KIND_OTHER = "x"
+_WORD_CONNECTORS = {"'", "-", "_", ".", "/"}
+_CHINESE_CONTEXT_PUNCTUATION = {"“", "”", "‘", "’", "—", "–", "…", "·"}
+_CJK_KINDS = _KIND_HAN + _KIND_KANA + _KIND_HANGUL
+_TOKEN_START_KINDS = _KIND_NUMBER + "".join(_LETTER_KIND_BY_SCRIPT.values())
+_TOKEN_OR_PUNCT_PATTERN = re.compile(
+    f"[{_TOKEN_START_KINDS}][{_TOKEN_START_KINDS}{_KIND_CONNECTOR}{_KIND_CONNECTOR_QUOTE}]*"
+    f"|[{_KIND_CONTEXT_PUNCT}{_KIND_CONNECTOR_QUOTE}]"
+)
+_SEGMENT_SPLIT_PATTERN = re.compile(f"({_KIND_SEPARATOR}+)")
+_CHAR_KINDS: dict[int, str] = {}
+_TOKEN_FIELD_BY_KINDS: dict[str, str] = {}
+
+
+def _char_kind(char: str) -> str:
+    cjk_field = _cjk_script_field(char)
+    if cjk_field:
+        return {"han_count": _KIND_HAN, "kana_count": _KIND_KANA, "hangul_count": _KIND_HANGUL}[cjk_field]
+    if char in "\t\r\n":
+        return _KIND_SEPARATOR
+    if char.isspace():
+        return _KIND_SPACE
+    if _is_token_char(char):
+        if unicodedata.category(char)[0] == "N":
+            return _KIND_NUMBER
+        return _LETTER_KIND_BY_SCRIPT[_letter_script(char)]
+    if char == "’":
+        return _KIND_CONNECTOR_QUOTE
+    if char in _WORD_CONNECTORS:
+        return _KIND_CONNECTOR
+    if _is_word_count_cjk_punctuation(char):
+        return _KIND_CJK_PUNCT
+    if char in _CHINESE_CONTEXT_PUNCTUATION and unicodedata.category(char)[0] in {"P", "S"}:
+        return _KIND_CONTEXT_PUNCT
+    return _KIND_OTHER
+
+
+def _text_kinds(text: str) -> str:
+    missing = {ord(char) for char in set(text)}.difference(_CHAR_KINDS)
+    for code in missing:
+        _CHAR_KINDS[code] = _char_kind(chr(code))
+    return text.translate(_CHAR_KINDS)
+
+
+def _token_field_from_kinds(token_kinds: str) -> str:
+    """与 _token_count_field 同口径：按 token 内出现的字母文字体系和数字判定分桶。"""
+    field = _TOKEN_FIELD_BY_KINDS.get(token_kinds)
+    if field is not None:
+        return field
+    scripts = {_SCRIPT_BY_LETTER_KIND[kind] for kind in set(token_kinds) if kind in _SCRIPT_BY_LETTER_KIND}
+    has_number = _KIND_NUMBER in token_kinds
+    if not scripts and has_number:
+        field = "number_token_count"
+    elif len(scripts) == 1:
+        script = next(iter(scripts))
+        if script == "latin":
+            field = "mixed_latin_number_count" if has_number else "latin_word_count"
+        else:
+            field = {
+                "cyrillic": "cyrillic_word_count",
+                "arabic": "arabic_word_count",
+                "greek": "greek_word_count",
+                "hebrew": "hebrew_word_count",
+                "thai": "thai_word_count",
+            }.get(script, "other_count")
+    else:
+        field = "other_count"
+    if len(_TOKEN_FIELD_BY_KINDS) < 65536:
+        _TOKEN_FIELD_BY_KINDS[token_kinds] = field
+    return field
+
+
 def _count_text(text: str) -> TextMetrics:
+    """
+    一遍得到全部脚本分桶、非空白字符数和中日韩/拉丁候选字符数。
+
+    候选字符数按制表符和换行切成片段，只统计由该语系主导的片段：
+      - 中日韩主导：中日韩字符数 > 0 且不少于非数字 token 数；
+      - 拉丁主导：拉丁/拉丁数字混合 token 数多于中日韩字符与其他文字 token 之和（平票归中日韩）。
+    分隔符两侧片段属于同一候选语系时，分隔符才计入“计空格”。
+    """
     content = text or ""
     counts = {field: 0 for field in SCRIPT_COUNT_FIELDS}
-    index = 0
-    while index < len(content):
-        char = content[index]
-        cjk_field = _cjk_script_field(char)
-        if cjk_field:
-            counts[cjk_field] += 1
-            index += 1
-            continue
-        if _is_token_char(char):
-            token, index = _consume_word_like_token(content, index)
-            counts[_token_count_field(token)] += 1
-            continue
-        previous_char = content[index - 1] if index > 0 else ""
-        next_char = content[index + 1] if index + 1 < len(content) else ""
-        if _is_word_count_cjk_punctuation(char, previous_char, next_char):
-            counts["cjk_punct_count"] += 1
-            index += 1
-            continue
-        index += 1
-    word_count = sum(counts.values())
-    cjk_char_count_no_spaces, cjk_char_count_with_spaces = _count_cjk_candidate_characters(content)
-    latin_char_count_no_spaces, latin_char_count_with_spaces = _count_latin_candidate_characters(content)
-    return TextMetrics(
-        word_count=word_count,
-        non_space_chars=sum(1 for char in text or "" if not char.isspace()),
-        raw_chars=len(text or ""),
-        cjk_char_count_no_spaces=cjk_char_count_no_spaces,
-        cjk_char_count_with_spaces=cjk_char_count_with_spaces,
-        latin_char_count_no_spaces=latin_char_count_no_spaces,
-        latin_char_count_with_spaces=latin_char_count_with_spaces,
-        **counts,
-    )
-
-
-def _count_cjk_candidate_characters(text: str) -> tuple[int, int]:
-    """只统计中日韩主导文本片段的字符数，避免把整篇拉丁文本并入候选值。"""
-    return _count_candidate_characters(text, _is_cjk_dominant_segment)
-
-
-def _count_latin_candidate_characters(text: str) -> tuple[int, int]:
-    """只统计拉丁文字主导文本片段的字符数。"""
-    return _count_candidate_characters(text, _is_latin_dominant_segment)
-
-
-def _count_candidate_characters(
-    text: str,
-    is_selected_segment: Callable[[str], bool],
-) -> tuple[int, int]:
-    parts = re.split(r"([\t\r\n]+)", text or "")
+    parts = _SEGMENT_SPLIT_PATTERN.split(_text_kinds(content))
     segments = parts[::2]
     separators = parts[1::2]
-    selected = [is_selected_segment(segment) for segment in segments]
-
-    no_spaces = sum(
-        sum(1 for char in segment if not char.isspace())
-        for segment, is_selected in zip(segments, selected)
-        if is_selected
-    )
-    with_spaces = sum(
-        len(segment)
-        for segment, is_selected in zip(segments, selected)
-        if is_selected
-    )
-    # 只有分隔符两侧都属于同一候选语系时，才把制表符或换行计入“计空格”。
-    with_spaces += sum(
-        len(separator)
-        for index, separator in enumerate(separators)
-        if selected[index] and selected[index + 1]
-    )
-    return no_spaces, with_spaces
-
-
-def _is_cjk_dominant_segment(text: str) -> bool:
-    cjk_count = sum(1 for char in text if _is_cjk(char))
-    if cjk_count == 0:
-        return False
-
-    non_cjk_word_count = 0
-    index = 0
-    while index < len(text):
-        char = text[index]
-        if _is_cjk(char):
-            index += 1
-            continue
-        if _is_token_char(char):
-            token, index = _consume_word_like_token(text, index)
-            if _token_count_field(token) != "number_token_count":
-                non_cjk_word_count += 1
-            continue
-        index += 1
-    return cjk_count >= non_cjk_word_count
-
-
-def _is_latin_dominant_segment(text: str) -> bool:
-    latin_word_count = 0
-    other_language_count = sum(1 for char in text if _is_cjk(char))
-    index = 0
-    while index < len(text):
-        char = text[index]
-        if _is_cjk(char):
-            index += 1
-            continue
-        if _is_token_char(char):
-            token, index = _consume_word_like_token(text, index)
-            field = _token_count_field(token)
+    cjk_selected: list[bool] = []
+    latin_selected: list[bool] = []
+    cjk_no_spaces = cjk_with_spaces = latin_no_spaces = latin_with_spaces = 0
+    non_space_chars = 0
+
+    for kinds in segments:
+        han = kinds.count(_KIND_HAN)
+        kana = kinds.count(_KIND_KANA)
+        hangul = kinds.count(_KIND_HANGUL)
+        cjk_count = han + kana + hangul
+        counts["han_count"] += han
+        counts["kana_count"] += kana
+        counts["hangul_count"] += hangul
+        punct = kinds.count(_KIND_CJK_PUNCT)
+        latin_words = 0
+        other_words = 0
+        for match in _TOKEN_OR_PUNCT_PATTERN.finditer(kinds):
+            start, end = match.span()
+            if end - start == 1 and kinds[start] in (_KIND_CONTEXT_PUNCT, _KIND_CONNECTOR_QUOTE):
+                if (start > 0 and kinds[start - 1] in _CJK_KINDS) or (end < len(kinds) and kinds[end] in _CJK_KINDS):
+                    punct += 1
+                continue
+            field = _token_field_from_kinds(match.group())
+            counts[field] += 1
             if field in {"latin_word_count", "mixed_latin_number_count"}:
-                latin_word_count += 1
+                latin_words += 1
             elif field != "number_token_count":
-                other_language_count += 1
-            continue
-        index += 1
-    # 平票的混合片段归入中日韩候选，避免同一片段在两个字符候选中重复出现。
-    return latin_word_count > other_language_count
+                other_words += 1
+        counts["cjk_punct_count"] += punct
+
+        segment_non_space = len(kinds) - kinds.count(_KIND_SPACE)
+        non_space_chars += segment_non_space
+        is_cjk = cjk_count > 0 and cjk_count >= latin_words + other_words
+        is_latin = latin_words > cjk_count + other_words
+        cjk_selected.append(is_cjk)
+        latin_selected.append(is_latin)
+        if is_cjk:
+            cjk_no_spaces += segment_non_space
+            cjk_with_spaces += len(kinds)
+        if is_latin:
+            latin_no_spaces += segment_non_space
+            latin_with_spaces += len(kinds)
+
+    for index, separator in enumerate(separators):
+        if cjk_selected[index] and cjk_selected[index + 1]:
+            cjk_with_spaces += len(separator)
+        if latin_selected[index] and latin_selected[index + 1]:
+            latin_with_spaces += len(separator)
+
+    return TextMetrics(
+        word_count=sum(counts.values()),
+        non_space_chars=non_space_chars,
+        raw_chars=len(content),
+        cjk_char_count_no_spaces=cjk_no_spaces,
+        cjk_char_count_with_spaces=cjk_with_spaces,
+        latin_char_count_no_spaces=latin_no_spaces,
+        latin_char_count_with_spaces=latin_with_spaces,
+        **counts,
+    )
 
 
 def _quote_counts_from_script_counts(script_counts: dict[str, int]) -> dict[str, int]:
@@ -2925,9 +3274,11 @@ def _build_summary(file_results: list[dict[str, Any]], *, truncated: bool, start
         "total_image_count": sum(int(item.get("image_count") or 0) for item in file_results),
         "ocr_files": sum(1 for item in file_results if item.get("ocr_used")),
         "ocr_pages": sum(int(item.get("ocr_page_count") or 0) for item in file_results),
+        "ocr_cache_hit_pages": sum(int(item.get("ocr_cache_hit_pages") or 0) for item in file_results),
         "ocr_failed_files": sum(
             1 for item in file_results if item.get("ocr_used") and item.get("status") == STATUS_FAILED
         ),
+        "cache_hit_files": sum(1 for item in file_results if item.get("cache_hit")),
         "truncated": truncated,
         "started_at": started_at.isoformat(timespec="seconds"),
         "finished_at": datetime.now().isoformat(timespec="seconds"),
@@ -3016,6 +3367,7 @@ def _write_summary_sheet(sheet, payload: dict[str, Any]) -> None:
         ("图片数量合计", summary.get("total_image_count", 0)),
         ("OCR 文件数", summary.get("ocr_files", 0)),
         ("OCR 页数", summary.get("ocr_pages", 0)),
+        ("OCR 缓存命中页数", summary.get("ocr_cache_hit_pages", 0)),
         ("OCR 失败文件数", summary.get("ocr_failed_files", 0)),
         ("OCR 模式", payload.get("ocr_mode", OCR_MODE_AUTO)),
         ("OCR 模型", payload.get("ocr_model", "")),
@@ -3025,6 +3377,7 @@ def _write_summary_sheet(sheet, payload: dict[str, Any]) -> None:
         ("跳过文件数", summary.get("skipped_files", 0)),
         ("需 OCR 文件数", summary.get("needs_ocr_files", 0)),
         ("需 CAD 解析文件数", summary.get("needs_cad_parser_files", 0)),
+        ("复用缓存文件数", summary.get("cache_hit_files", 0)),
         ("是否截断", "是" if summary.get("truncated") else "否"),
         ("生成时间", payload.get("generated_at", "")),
     ]
@@ -3223,15 +3576,20 @@ def _preview_text(text: str, limit: int = 120) -> str:
 
 
 def _write_ocr_plain_text(*, ocr_text_dir: Path, relative_path: str, items: list[TextItem]) -> Path:
+    return _write_ocr_text_file(
+        ocr_text_dir=ocr_text_dir,
+        relative_path=relative_path,
+        text="\n\n".join(item.text.strip() for item in items if item.text.strip()),
+    )
+
+
+def _write_ocr_text_file(*, ocr_text_dir: Path, relative_path: str, text: str) -> Path:
     relative = Path(relative_path)
     safe_parts = [part for part in relative.parts if part not in {"", ".", "..", relative.anchor}]
     safe_relative = Path(*safe_parts) if safe_parts else Path("ocr_result")
     target = ocr_text_dir / safe_relative.parent / f"{safe_relative.name}.txt"
     target.parent.mkdir(parents=True, exist_ok=True)
-    target.write_text(
-        "\n\n".join(item.text.strip() for item in items if item.text.strip()),
-        encoding="utf-8",
-    )
+    target.write_text(text, encoding="utf-8")
     return target
 
 
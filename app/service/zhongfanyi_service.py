@@ -58,6 +58,8 @@ ZHONGFANYI_MODEL_ALIASES: Dict[str, str] = {
 
 _task_progress: Dict[str, Dict[str, Any]] = {}
 _specialist_import_lock = threading.Lock()
+# 专检子进程启动时预加载的 run_full_pipeline；主进程内为 None，每次任务仍按原方式导入
+_warm_run_full_pipeline = None
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 ZHONGFANYI_ROOT = REPO_ROOT / "专检" / "中翻译"
@@ -264,6 +266,23 @@ def _inject_runtime_env(gemini_route: str, model_name: str) -> None:
     os.environ["ZHONGFANYI_MODEL_NAME"] = resolve_model_for_route(model_name, GEMINI_ROUTE_OPENROUTER)
 
 
+def warm_up_specialist_worker() -> None:
+    """专检子进程初始化时调用：只准备一次导入路径并导入中翻译主流程。"""
+    global _warm_run_full_pipeline
+    with _specialist_import_lock:
+        _prepare_zhongfanyi_import_path()
+        from zhongfanyi.main import run_full_pipeline
+
+        _warm_run_full_pipeline = run_full_pipeline
+
+
+def _configure_worker_model(model_name: str) -> None:
+    """子进程内按次指定模型，替代写 ZHONGFANYI_MODEL_NAME 环境变量。"""
+    from llm_check.openrouter_config import set_model_name_override
+
+    set_model_name_override(resolve_model_for_route(model_name, GEMINI_ROUTE_OPENROUTER))
+
+
 def _collect_reports(report_paths: Optional[Dict[str, str]], excel_paths: Optional[Dict[str, str]]) -> tuple[Dict[str, str], Dict[str, int]]:
     reports: Dict[str, str] = {}
     report_counts: Dict[str, int] = {value: 0 for value in SECTION_COUNT_KEYS.values()}
@@ -361,10 +380,14 @@ def run_zhongfanyi_task(
     output_dir = Path(settings.OUTPUT_DIR) / "zhongfanyi" / folder_name
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    with _specialist_import_lock:
-        _prepare_zhongfanyi_import_path()
-        _inject_runtime_env(gemini_route, model_name)
-        from zhongfanyi.main import run_full_pipeline
+    if _warm_run_full_pipeline is not None:
+        run_full_pipeline = _warm_run_full_pipeline
+        _configure_worker_model(model_name)
+    else:
+        with _specialist_import_lock:
+            _prepare_zhongfanyi_import_path()
+            _inject_runtime_env(gemini_route, model_name)
+            from zhongfanyi.main import run_full_pipeline
 
     if not (single_path if normalized_mode == ZHONGFANYI_MODE_SINGLE else original_path):
         _complete_task(task_id, error="缺少输入文件")
@@ -402,6 +425,7 @@ def run_zhongfanyi_task(
         bilingual=normalized_mode == ZHONGFANYI_MODE_SINGLE,
         ai_rule_file_path=ai_rule_file_path or None,
         session_rule_text=session_rule_text,
+        chunk_concurrency=settings.ZHONGFANYI_CHUNK_CONCURRENCY,
     )
 
     if report_paths is None or excel_paths is None or stats is None:
@@ -0,0 +1,40 @@
+
+import json, os, subprocess, sys, time
+
+def emit(payload):
+    sys.stdout.write(json.dumps(payload) + "\n")
+    sys.stdout.flush()
+
+if os.environ.get("FAKE_BRIDGE_FAIL_START"):
+    sys.stderr.write("ModuleNotFoundError: No module named 'uno'\n")
+    sys.exit(1)
+if os.environ.get("FAKE_BRIDGE_HANG_START"):
+    sys.stdin.read()
+    sys.exit(0)
+office = subprocess.Popen(
+    [sys.executable, "-c", "import time; time.sleep(60)"],
+    stdin=subprocess.DEVNULL,
+    stdout=subprocess.DEVNULL,
+    stderr=subprocess.DEVNULL,
+)
+emit({"ready": True, "pid": office.pid})
+for line in sys.stdin:
+    request = json.loads(line)
+    if request.get("op") == "quit":
+        break
+    if request.get("op") == "convert":
+        if "crash" in request["input"]:
+            office.kill()
+            os._exit(3)
+        if "hang" in request["input"]:
+            # 模拟卡在 loadComponentFromURL：不再读 stdin，也就收不到 quit
+            with open(request["output"], "w", encoding="utf-8") as handle:
+                handle.write(str(office.pid))
+            time.sleep(60)
+        if "broken" in request["input"]:
+            emit({"id": request["id"], "ok": False, "error": "IOException: 无法打开文档"})
+            continue
+        with open(request["output"], "w", encoding="utf-8") as handle:
+            handle.write(f"{os.getpid()}|{request['filter']}|{request['input_filter']}")
+    emit({"id": request["id"], "ok": True})
+office.kill()
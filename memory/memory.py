@@ -1,8 +1,10 @@
+import bisect
 import os
 import re
-import shutil
 import threading
 import queue
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 import pandas as pd
 from lxml import etree
@@ -14,6 +16,7 @@ from pptx import Presentation
 from pptx.enum.shapes import MSO_SHAPE_TYPE
 import tkinter as tk
 from app.service.gemini_service import generate_text
+from app.service.docx_part_splitter import write_element_range_parts
 from tkinter import ttk, filedialog, scrolledtext, messagebox
 import websockets
 import asyncio
@@ -44,6 +47,8 @@ BUFFER_CHARS = 2000
 OUTPUT_DIR = "Result_Output"
 PART_TASK_MAX_RETRIES = 3
 PART_TASK_RETRY_DELAY_SECONDS = 5
+# 后处理分句 / 表格单元格分句的 AI 并发数（每行一次独立请求，结果按原顺序拼回；进程内所有分块共用）
+POST_SPLIT_CONCURRENCY = max(1, int(os.getenv("ALIGNMENT_POST_SPLIT_CONCURRENCY", "6")))
 
 # ==========================================
 # === 🤖 可用模型配置 ===
@@ -93,6 +98,8 @@ def set_gemini_route(route: str):
 
 def get_gemini_route() -> str:
     return getattr(_gemini_route_local, "route", os.getenv("GEMINI_ROUTE", "google"))
+
+
 DEFAULT_PROVIDER = "openrouter"  # 路智深已屏蔽，默认使用 OpenRouter
 
 
@@ -583,6 +590,7 @@ class LogManager:
         self.log_queue = queue.Queue()
         self.exception_queue = queue.Queue()
         self.stream_queue = queue.Queue()
+        self._local = threading.local()
 
     def log(self, message, level="INFO"):
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -596,8 +604,28 @@ class LogManager:
         self.exception_queue.put(exception_msg)
 
     def log_stream(self, content):
+        buffer = getattr(self._local, "stream_buffer", None)
+        if buffer is not None:
+            buffer.append(content)
+            return
         self.stream_queue.put(content)
 
+    def stream_buffered(self):
+        """当前线程的流式输出是否正在缓存（由 buffered_stream 统一写出）。"""
+        return getattr(self._local, "stream_buffer", None) is not None
+
+    @contextmanager
+    def buffered_stream(self):
+        """缓存当前线程的 log_stream，退出时整段写出，并发任务的输出不会互相穿插。"""
+        buffer = []
+        self._local.stream_buffer = buffer
+        try:
+            yield
+        finally:
+            self._local.stream_buffer = None
+            if buffer:
+                self.log_stream("".join(buffer))
+
 
 log_manager = LogManager()
 
@@ -1525,22 +1553,19 @@ def smart_split_with_buffer(src_path, num_parts, output_dir, lang_type, buffer_c
             element_counts[s - 1] if s > 0 else 0) if e > s else 0
         log_manager.log(f"  Part{i + 1}: 元素[{s}:{e}], 约 {part_chars:,} 字")
 
-    # 生成分割后的文件
+    # 生成分割后的文件：源文档只解析这一次，各份直接从同一棵树按区间写出
     generated_files = []
     part_info = []
+    dest_paths = [
+        os.path.join(output_dir, f"{base_name}_Part{i + 1}.docx") for i in range(len(split_ranges))
+    ]
+    write_element_range_parts(
+        doc, src_path, [elem._element for elem in elements], split_ranges, dest_paths
+    )
 
     for i, (start_idx, end_idx) in enumerate(split_ranges):
-        part_num = i + 1
-        dest_filename = f"{base_name}_Part{part_num}.docx"
-        dest_path = os.path.join(output_dir, dest_filename)
-
-        shutil.copy2(src_path, dest_path)
-        doc_copy = Document(dest_path)
-
-        total_elems = len(get_all_content_elements(doc_copy))
-        delete_elements_in_range(doc_copy, end_idx, total_elems + 5000)
-        delete_elements_in_range(doc_copy, 0, start_idx)
-        doc_copy.save(dest_path)
+        dest_path = dest_paths[i]
+        dest_filename = os.path.basename(dest_path)
 
         first_text = extract_text_from_elements(elements, start_idx, min(start_idx + 3, end_idx))
         last_text = extract_text_from_elements(elements, max(start_idx, end_idx - 3), end_idx)
@@ -1724,20 +1749,64 @@ def _coverage_match_status(match):
     return "否"
 
 
+class _ConsumedSpans:
+    """已消费的字符区间 [start, end)，有序且互不相接（相交或首尾相接即合并），按起点二分。"""
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+
+    def blocking_end(self, start, end):
+        """[start, end) 与已消费区间重叠时，返回重叠区间中最靠右者的终点；否则 None。"""
+        i = bisect.bisect_left(self.starts, end) - 1
+        if i >= 0 and self.ends[i] > start:
+            return self.ends[i]
+        return None
+
+    def add(self, start, end):
+        lo = bisect.bisect_left(self.ends, start)
+        hi = bisect.bisect_right(self.starts, end, lo)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+
+    def first_free(self):
+        """从 0 起连续消费到的位置；匹配搜索可直接从这里开始。"""
+        return self.ends[0] if self.starts and self.starts[0] == 0 else 0
+
+
 class CoverageTextConsumer:
-    """按顺序消费源文本，支持完全匹配和纯空白差异匹配。"""
+    """
+    按顺序消费源文本，支持完全匹配和纯空白差异匹配。
+
+    源文本与去空白文本（及其到源文本的下标映射）只在构造时生成一次；已消费部分记为区间，
+    匹配时用 str.find 找候选，落在已消费区间上的候选整段跳过，结果与逐字打标记的实现一致：
+    取最靠前的、不含任何已消费字符的出现位置。
+    """
 
     def __init__(self, text):
-        self.original_chars = list(str(text or ""))
-        self.chars = list(str(text or ""))
+        self.text = str(text or "")
+        norm_chars = []
+        self._norm_index = []
+        for idx, ch in enumerate(self.text):
+            if not _coverage_ignorable_char(ch):
+                norm_chars.append(ch)
+                self._norm_index.append(idx)
+        self._norm_text = "".join(norm_chars)
+        self._consumed = _ConsumedSpans()
 
     def find_match(self, fragment):
         fragment = str(fragment or "").strip()
         if not fragment:
             return {"ok": True, "start": None, "end": None, "actual": "", "mode": "empty"}
+        if _COVERAGE_CONSUMED_MARK in fragment:
+            return self._find_match_with_marks(fragment)
 
-        current = "".join(self.chars)
-        exact_pos = current.find(fragment)
+        exact_pos = self._find_exact(fragment)
         if exact_pos >= 0:
             return self._build_match(exact_pos, exact_pos + len(fragment), "exact")
 
@@ -1745,44 +1814,89 @@ class CoverageTextConsumer:
         if not needle:
             return {"ok": False, "mode": "not_found"}
 
-        norm_pos, index_map = self._find_normalized(self.chars, needle)
-        if norm_pos >= 0:
-            start = index_map[norm_pos]
-            end = index_map[norm_pos + len(needle) - 1] + 1
-            return self._build_match(start, end, "whitespace")
-
-        full_pos, _ = self._find_normalized(self.original_chars, needle)
-        if full_pos >= 0:
+        span, seen = self._find_normalized(needle)
+        if span:
+            return self._build_match(span[0], span[1], "whitespace")
+        if seen:
             return {"ok": False, "mode": "already_consumed"}
-
         return {"ok": False, "mode": "not_found"}
 
-    def _find_normalized(self, chars, needle):
+    def _find_exact(self, fragment):
+        text = self.text
+        size = len(fragment)
+        pos = text.find(fragment, self._consumed.first_free())
+        while pos >= 0:
+            blocked_until = self._consumed.blocking_end(pos, pos + size)
+            if blocked_until is None:
+                return pos
+            # 起点早于 blocked_until 的出现都会覆盖同一已消费区间
+            pos = text.find(fragment, blocked_until)
+        return -1
+
+    def _find_normalized(self, needle):
+        """返回 ((start, end) 或 None, 去空白文本中是否出现过 needle)。"""
+        norm_text = self._norm_text
+        norm_index = self._norm_index
+        size = len(needle)
+        norm_pos = norm_text.find(needle, bisect.bisect_left(norm_index, self._consumed.first_free()))
+        while norm_pos >= 0:
+            start = norm_index[norm_pos]
+            end = norm_index[norm_pos + size - 1] + 1
+            # 区间内夹着的已消费空白同样会打断匹配，与区间重叠判定一致
+            blocked_until = self._consumed.blocking_end(start, end)
+            if blocked_until is None:
+                return (start, end), True
+            norm_pos = norm_text.find(needle, bisect.bisect_left(norm_index, blocked_until))
+        return None, norm_text.find(needle) >= 0
+
+    def _find_match_with_marks(self, fragment):
+        """片段自带标记字符（极少见）：还原逐字打标记的文本，按原逐字算法匹配。"""
+        chars = list(self.text)
+        for start, end in zip(self._consumed.starts, self._consumed.ends):
+            chars[start:end] = _COVERAGE_CONSUMED_MARK * (end - start)
+        current = "".join(chars)
+        exact_pos = current.find(fragment)
+        if exact_pos >= 0:
+            return self._build_match(exact_pos, exact_pos + len(fragment), "exact", current)
+
+        needle = "".join(ch for ch in fragment if not _coverage_ignorable_char(ch))
+        if not needle:
+            return {"ok": False, "mode": "not_found"}
+
         hay_chars = []
         index_map = []
-        for idx, ch in enumerate(chars):
-            if ch == _COVERAGE_CONSUMED_MARK:
-                hay_chars.append(_COVERAGE_CONSUMED_MARK)
-                index_map.append(idx)
-            elif not _coverage_ignorable_char(ch):
+        for idx, ch in enumerate(current):
+            if ch == _COVERAGE_CONSUMED_MARK or not _coverage_ignorable_char(ch):
                 hay_chars.append(ch)
                 index_map.append(idx)
+        norm_pos = "".join(hay_chars).find(needle)
+        if norm_pos >= 0:
+            return self._build_match(
+                index_map[norm_pos], index_map[norm_pos + len(needle) - 1] + 1, "whitespace", current
+            )
+        if needle in self._norm_text:
+            return {"ok": False, "mode": "already_consumed"}
+        return {"ok": False, "mode": "not_found"}
 
-        hay = "".join(hay_chars)
-        return hay.find(needle), index_map
-
-    def _build_match(self, start, end, mode):
-        actual = "".join(ch for ch in self.chars[start:end] if ch != _COVERAGE_CONSUMED_MARK)
+    def _build_match(self, start, end, mode, current=None):
+        actual = (self.text if current is None else current)[start:end].replace(_COVERAGE_CONSUMED_MARK, "")
         return {"ok": True, "start": start, "end": end, "actual": actual.strip(), "mode": mode}
 
     def consume(self, match):
         if not match.get("ok") or match.get("start") is None:
             return
-        for idx in range(match["start"], match["end"]):
-            self.chars[idx] = _COVERAGE_CONSUMED_MARK
+        if match["end"] > match["start"]:
+            self._consumed.add(match["start"], match["end"])
 
     def remaining_text(self):
-        text = "".join("\n" if ch == _COVERAGE_CONSUMED_MARK else ch for ch in self.chars)
+        pieces = []
+        prev = 0
+        for start, end in zip(self._consumed.starts, self._consumed.ends):
+            pieces.append(self.text[prev:start])
+            pieces.append("\n" * (end - start))
+            prev = end
+        pieces.append(self.text[prev:])
+        text = "".join(pieces).replace(_COVERAGE_CONSUMED_MARK, "\n")
         text = re.sub(r"\n{2,}", "\n", text)
         lines = [line.strip() for line in text.splitlines() if line.strip()]
         return "\n".join(lines)
@@ -2530,6 +2644,61 @@ def needs_post_split(orig_text, source_lang):
     return needs_english_post_split(orig_text, source_lang)
 
 
+# 调用方（如 alignment_service）登记的线程上下文钩子：capture() 在提交任务的线程执行，
+# 返回的 apply() 在工作线程执行，用于把日志路由等 threading.local 状态带进线程池。
+_thread_context_hooks = []
+# 进程内同时在途的 AI 分句请求数；多个分块并发对齐时共用同一上限，不按分块成倍放大
+_ai_split_cond = threading.Condition()
+_ai_split_active = 0
+
+
+def register_thread_context_hook(capture):
+    if capture not in _thread_context_hooks:
+        _thread_context_hooks.append(capture)
+
+
+@contextmanager
+def _ai_split_slot():
+    global _ai_split_active
+    with _ai_split_cond:
+        _ai_split_cond.wait_for(lambda: _ai_split_active < POST_SPLIT_CONCURRENCY)
+        _ai_split_active += 1
+    try:
+        yield
+    finally:
+        with _ai_split_cond:
+            _ai_split_active -= 1
+            _ai_split_cond.notify()
+
+
+def run_ai_jobs_concurrently(jobs, worker, max_workers=None):
+    """
+    以有限并发对 jobs 逐个执行 worker(job)，结果按 jobs 原顺序返回。
+    单个任务抛异常时记录日志并返回 None，不影响其他任务；max_workers<=1 时顺序执行。
+    所有调用共享 POST_SPLIT_CONCURRENCY 个全局名额；每个任务的流式输出先缓存，结束后整段写出。
+    """
+    jobs = list(jobs)
+    max_workers = POST_SPLIT_CONCURRENCY if max_workers is None else max_workers
+    route = get_gemini_route()
+    applies = [capture() for capture in _thread_context_hooks]
+
+    def _run(job):
+        set_gemini_route(route)
+        for apply in applies:
+            apply()
+        with _ai_split_slot(), log_manager.buffered_stream():
+            try:
+                return worker(job)
+            except Exception as e:
+                log_manager.log_exception("AI 分句任务异常", str(e))
+                return None
+
+    if max_workers <= 1 or len(jobs) <= 1:
+        return [_run(job) for job in jobs]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs)), thread_name_prefix="ai-split") as pool:
+        return list(pool.map(_run, jobs))
+
+
 def post_process_sentence_split(data, model_id, source_lang="英语", target_lang="中文", enable_ai_split=True):
     """
     后处理：对已形成键值对的行做进一步细粒度分句。
@@ -2550,32 +2719,35 @@ def post_process_sentence_split(data, model_id, source_lang="英语", target_lan
     if not data:
         return data
 
+    # 先收集候选行，再并发调用 AI，最后按原顺序拼回
+    candidates = [idx for idx, row in enumerate(data) if needs_post_split(row.get('原文', ''), source_lang)]
+    split_map = {}
+    if enable_ai_split and candidates:
+        log_manager.log(f"后处理分句: {len(candidates)} 行需要进一步细分（并发 {POST_SPLIT_CONCURRENCY}）")
+
+        def _split(idx):
+            row = data[idx]
+            log_manager.log(f"后处理分句: 第 {idx + 1} 行需要进一步细分")
+            return split_row_with_ai(row.get('原文', ''), row.get('译文', ''), model_id,
+                                     f"后处理-{idx + 1}", source_lang)
+
+        split_map = dict(zip(candidates, run_ai_jobs_concurrently(candidates, _split)))
+    elif candidates:
+        # 不启用AI，只记录需要分句的行
+        for idx in candidates:
+            log_manager.log_exception(f"第 {idx + 1} 行可能需要进一步分句", data[idx].get('原文', '')[:100])
+
     result = []
     split_count = 0
 
     for idx, row in enumerate(data):
-        orig = row.get('原文', '')
-        trans = row.get('译文', '')
-
-        # 检查是否需要分句
-        if needs_post_split(orig, source_lang):
-            if enable_ai_split:
-                # 调用AI进行分句
-                log_manager.log(f"后处理分句: 第 {idx + 1} 行需要进一步细分")
-                split_results = split_row_with_ai(orig, trans, model_id, f"后处理-{idx + 1}", source_lang)
-
-                if split_results and len(split_results) > 1:
-                    result.extend(split_results)
-                    split_count += 1
-                    log_manager.log(f"  ✅ 1 行 → {len(split_results)} 行")
-                else:
-                    # AI分句失败，保留原数据
-                    result.append(row)
-            else:
-                # 不启用AI，只记录需要分句的行
-                log_manager.log_exception(f"第 {idx + 1} 行可能需要进一步分句", orig[:100])
-                result.append(row)
+        split_results = split_map.get(idx)
+        if split_results and len(split_results) > 1:
+            result.extend(split_results)
+            split_count += 1
+            log_manager.log(f"  ✅ 第 {idx + 1} 行: 1 行 → {len(split_results)} 行")
         else:
+            # 无需分句或AI分句失败，保留原数据
             result.append(row)
 
     if split_count > 0:
@@ -3113,6 +3285,53 @@ def split_table_cell_with_ai(orig_text, trans_text, model_id, cell_ref, source_l
         return None
 
 
+def split_table_cells_concurrently(cell_pairs, model_id, source_lang="中文"):
+    """
+    对按位置配对好的单元格 [(cell_ref, 原文, 译文), ...] 做细粒度分句：
+    先找出需要分句的单元格，AI 分句并发执行，再按单元格原顺序输出带“来源”的行。
+
+    返回: (结果行列表, 被细分的单元格数)
+    """
+    split_candidates = [
+        idx for idx, (_cell_ref, orig_text, trans_text) in enumerate(cell_pairs)
+        if orig_text and trans_text and needs_table_cell_split(orig_text, source_lang)
+    ]
+
+    def _split_cell(idx):
+        cell_ref, orig_text, trans_text = cell_pairs[idx]
+        log_manager.log(f"  {cell_ref}: 需要细粒度分句")
+        return split_table_cell_with_ai(orig_text, trans_text, model_id, cell_ref, source_lang)
+
+    split_map = dict(zip(split_candidates, run_ai_jobs_concurrently(split_candidates, _split_cell)))
+
+    rows = []
+    split_count = 0
+    for idx, (cell_ref, orig_text, trans_text) in enumerate(cell_pairs):
+        # 跳过原文和译文都为空的情况
+        if not orig_text and not trans_text:
+            continue
+
+        split_results = split_map.get(idx)
+        if split_results and len(split_results) > 1:
+            # 分句成功，添加所有分句结果
+            for result in split_results:
+                result['来源'] = cell_ref
+            rows.extend(split_results)
+            split_count += 1
+            continue
+
+        # 无需分句、分句失败或只有一句，保留原内容
+        rows.append({
+            "原文": orig_text,
+            "译文": trans_text,
+            "来源": cell_ref
+        })
+        if idx not in split_map and orig_text and trans_text:
+            log_manager.log_stream(f"[{cell_ref}] 直接配对\n")
+
+    return rows, split_count
+
+
 def extract_docx_tables_with_position(doc_path):
     """
     从 Word 文档中提取所有表格，保留单元格位置信息
@@ -3176,60 +3395,21 @@ def process_docx_tables_alignment(orig_docx_path, trans_docx_path, model_id,
         key = (cell['table_idx'], cell['row_idx'], cell['col_idx'])
         trans_cell_map[key] = cell
 
-    all_results = []
-    total_cells_processed = 0
-    total_cells_split = 0
-
     log_manager.log_stream("\n" + "=" * 60 + "\n")
     log_manager.log_stream(f"📄 开始处理 Word 文档表格（非Excel）\n")
     log_manager.log_stream(f"📝 共 {len(orig_cells)} 个 Word 表格单元格待处理\n")
     log_manager.log_stream("=" * 60 + "\n")
 
+    # 按位置配对后统一分句：需要细粒度分句的单元格并发调用 AI，结果按单元格顺序输出
+    cell_pairs = []
     for orig_cell in orig_cells:
         key = (orig_cell['table_idx'], orig_cell['row_idx'], orig_cell['col_idx'])
-        cell_ref = orig_cell['cell_ref']
-        orig_text = orig_cell['text']
-
         # 查找对应位置的译文单元格
         trans_cell = trans_cell_map.get(key)
-        trans_text = trans_cell['text'] if trans_cell else ""
-
-        total_cells_processed += 1
+        cell_pairs.append((orig_cell['cell_ref'], orig_cell['text'], trans_cell['text'] if trans_cell else ""))
+    total_cells_processed = len(cell_pairs)
 
-        # 跳过原文和译文都为空的情况
-        if not orig_text and not trans_text:
-            continue
-
-        # 判断是否需要细粒度分句
-        if orig_text and trans_text and needs_table_cell_split(orig_text, source_lang):
-            log_manager.log(f"  {cell_ref}: 需要细粒度分句")
-            split_results = split_table_cell_with_ai(
-                orig_text, trans_text, model_id, cell_ref, source_lang
-            )
-
-            if split_results and len(split_results) > 1:
-                # 分句成功，添加所有分句结果
-                for result in split_results:
-                    result['来源'] = cell_ref
-                all_results.extend(split_results)
-                total_cells_split += 1
-            else:
-                # 分句失败或只有一句，保留原内容
-                all_results.append({
-                    "原文": orig_text,
-                    "译文": trans_text,
-                    "来源": cell_ref
-                })
-        else:
-            # 不需要分句，直接添加
-            if orig_text or trans_text:
-                all_results.append({
-                    "原文": orig_text,
-                    "译文": trans_text,
-                    "来源": cell_ref
-                })
-                if orig_text and trans_text:
-                    log_manager.log_stream(f"[{cell_ref}] 直接配对\n")
+    all_results, total_cells_split = split_table_cells_concurrently(cell_pairs, model_id, source_lang)
 
     log_manager.log_stream("\n" + "=" * 60 + "\n")
     log_manager.log_stream(f"✅ Word 文档表格处理完成！\n")
@@ -3436,8 +3616,8 @@ def process_excel_dual_file_alignment(orig_excel_path, trans_excel_path, output_
         log_manager.log(f"  译文表格: {df_trans.shape[0]} 行 x {df_trans.shape[1]} 列")
         log_manager.log(f"  处理范围: {max_rows} 行 x {max_cols} 列")
 
-        # 遍历所有单元格位置
-        cell_num = 0
+        # 遍历所有单元格位置，整个工作簿配对完成后统一分句
+        cell_pairs = []
         for row_idx in range(max_rows):
             for col_idx in range(max_cols):
                 # 获取原文单元格内容
@@ -3458,40 +3638,14 @@ def process_excel_dual_file_alignment(orig_excel_path, trans_excel_path, output_
                 if not orig_text and not trans_text:
                     continue
 
-                cell_num += 1
-                total_cells_processed += 1
-                cell_ref = f"[{orig_sheet_name}] R{row_idx + 1}C{col_idx + 1}"
+                cell_pairs.append((f"[{orig_sheet_name}] R{row_idx + 1}C{col_idx + 1}", orig_text, trans_text))
 
-                # 判断是否需要分句（根据原文语言检测标点、换行、序号等）
-                if orig_text and trans_text and needs_table_cell_split(orig_text, source_lang):
-                    log_manager.log(f"  {cell_ref}: 需要细粒度分句")
-                    split_results = split_table_cell_with_ai(
-                        orig_text, trans_text, model_id, cell_ref, source_lang
-                    )
-
-                    if split_results and len(split_results) > 1:
-                        # 分句成功，添加所有分句结果
-                        for result in split_results:
-                            result['来源'] = cell_ref
-                        all_results.extend(split_results)
-                        total_rows_split += 1
-                    else:
-                        # 分句失败或只有一句，保留原内容
-                        all_results.append({
-                            "原文": orig_text,
-                            "译文": trans_text,
-                            "来源": cell_ref
-                        })
-                else:
-                    # 不需要分句，直接添加
-                    if orig_text or trans_text:
-                        all_results.append({
-                            "原文": orig_text,
-                            "译文": trans_text,
-                            "来源": cell_ref
-                        })
-                        if orig_text and trans_text:
-                            log_manager.log_stream(f"[{cell_ref}] 直接配对\n")
+        cell_num = len(cell_pairs)
+        total_cells_processed += cell_num
+        # 判断是否需要分句（根据原文语言检测标点、换行、序号等），需要的单元格并发调用 AI
+        sheet_results, sheet_split = split_table_cells_concurrently(cell_pairs, model_id, source_lang)
+        all_results.extend(sheet_results)
+        total_rows_split += sheet_split
 
         log_manager.log(f"  工作簿 '{orig_sheet_name}' 处理完成，有效单元格: {cell_num}")
 
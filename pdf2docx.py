@@ -7,11 +7,14 @@ import io
 import re
 import sys
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Sized
 
 from app.core.config import settings
+from app.core.rate_limit import RouteRateLimiter
 from app.service.gemini_service import (
     GEMINI_ROUTE_AISTUDIO,
     GEMINI_ROUTE_GOOGLE,
@@ -25,6 +28,13 @@ from app.service.libreoffice_service import (
     convert_to_docx_via_libreoffice,
     resolve_libreoffice_path,
 )
+from app.service.ocr_cache_service import (
+    OcrResultCache,
+    build_ocr_cache_key,
+    build_prompt_version,
+    get_ocr_result_cache,
+)
+from app.service.sqlite_lru_store import CacheHitStats
 
 # ============================================================
 # 依赖检查与导入
@@ -148,6 +158,13 @@ OCR_BLANK_HINTS = {
 }
 
 
+# 提示词内容摘要参与缓存键，改动 SYS_PROMPT 后旧缓存自然失效
+SYS_PROMPT_VERSION = build_prompt_version(SYS_PROMPT)
+
+# 同一路由的 OCR 请求在所有并发页面/任务之间共享发起间隔
+_OCR_ROUTE_RATE_LIMITER = RouteRateLimiter()
+
+
 class OCRIncompleteResultError(RuntimeError):
     pass
 
@@ -343,9 +360,27 @@ def _ocr_single_image(
     gemini_route: str = GEMINI_ROUTE_OPENROUTER,
     retries: int = 3,
     status_callback=None,
+    cache: OcrResultCache | None = None,
+    cache_stats: CacheHitStats | None = None,
 ) -> str:
-    """对单张图片调用 OCR，失败时按“原路线 -> 备用路线 -> 轻量模型”逐级降级。"""
+    """对单张图片调用 OCR，失败时按“原路线 -> 备用路线 -> 轻量模型”逐级降级。
+
+    传入 ``cache`` 时先按图片内容、请求模型与提示词版本查询缓存，成功识别的结果按实际产出的模型写回缓存。
+    """
     image_bytes = base64.standard_b64decode(img_b64)
+    cache_key = ""
+    if cache is not None:
+        cache_key = build_ocr_cache_key(image_bytes, model, SYS_PROMPT_VERSION)
+        try:
+            cached_text = cache.get(cache_key)
+        except Exception as exc:
+            print(f"[ocr-cache] 读取缓存失败，改为直接识别: {exc}", flush=True)
+            cached_text = None
+        if cache_stats is not None:
+            cache_stats.record(cached_text is not None)
+        if cached_text is not None:
+            return cached_text
+
     image_has_visible_content = _image_has_visible_text_like_content(image_bytes)
     attempt_plan = _build_ocr_attempt_plan(model, gemini_route, retries)
 
@@ -362,6 +397,7 @@ def _ocr_single_image(
 
         for attempt in range(stage_retries):
             try:
+                _OCR_ROUTE_RATE_LIMITER.wait(route, settings.OCR_ROUTE_MIN_INTERVAL_SECONDS)
                 response_text = generate_vision_html(
                     system_prompt=SYS_PROMPT,
                     image_bytes=image_bytes,
@@ -375,6 +411,13 @@ def _ocr_single_image(
                 if image_has_visible_content and _is_blank_ocr_result(response_text):
                     raise OCRIncompleteResultError("OCR 输出为空，但图片包含明显可见内容")
                 print(response_text, end="", flush=True)
+                if cache is not None:
+                    try:
+                        # 按实际产出结果的模型写入；降级到轻量模型的结果不能冒充请求模型的结果
+                        produced_key = build_ocr_cache_key(image_bytes, candidate_model, SYS_PROMPT_VERSION)
+                        cache.put(produced_key, response_text)
+                    except Exception as exc:
+                        print(f"[ocr-cache] 写入缓存失败: {exc}", flush=True)
                 if stage_index > 0:
                     _emit_ocr_status(
                         f"OCR 已恢复：{_route_display_name(route)} / {candidate_model}",
@@ -458,6 +501,7 @@ def _build_ocr_metadata(
     page_results: list[dict[str, Any]],
     total_pages: int,
     requested_pages: list[int],
+    cache_stats: CacheHitStats | None = None,
 ) -> dict[str, Any]:
     successful = [item for item in page_results if not item.get("error")]
     blank_pages = [int(item["page_number"]) for item in successful if item.get("blank")]
@@ -470,9 +514,193 @@ def _build_ocr_metadata(
         "blank_pages": blank_pages,
         "failed_pages": failed_pages,
         "page_results": page_results,
+        "cache": (cache_stats or CacheHitStats()).to_dict(),
     }
 
 
+def _resolve_ocr_concurrency(max_concurrency: int | None, page_count: int) -> int:
+    if max_concurrency is None:
+        max_concurrency = getattr(settings, "OCR_PAGE_CONCURRENCY", 1)
+    try:
+        value = int(max_concurrency)
+    except (TypeError, ValueError):
+        value = 1
+    return max(1, min(value, max(page_count, 1)))
+
+
+def _run_ocr_page_pipeline(
+    selected_pages: Iterable[int],
+    *,
+    load_page,
+    ocr_page,
+    on_dispatch=None,
+    max_concurrency: int = 1,
+    continue_on_error: bool = False,
+) -> list[dict[str, Any]]:
+    """按页并发 OCR：调用线程负责渲染并提前备页，工作线程识别，结果按页码顺序返回。
+
+    ``load_page(page_no)`` 只在调用线程中执行（PyMuPDF 文档对象不是线程安全的），
+    ``ocr_page(page_no, image_b64, mime_type)`` 在工作线程中执行。在途页数（含已渲染
+    待识别的页）最多为并发数的两倍，避免大文件一次性渲染占满内存。
+    ``selected_pages`` 可以是边探测边产出页码的迭代器，迭代同样发生在调用线程中。
+    """
+    workers = max(1, int(max_concurrency))
+    slots = threading.BoundedSemaphore(workers * 2)
+    stop_event = threading.Event()
+    futures = []
+
+    def run_page(page_no: int, img_b64: str, mime_type: str) -> dict[str, Any] | None:
+        # 已有页面失败且不允许继续时，排队中的页面不再发起请求
+        if stop_event.is_set():
+            return None
+        return ocr_page(page_no, img_b64, mime_type)
+
+    def release_slot(future) -> None:
+        slots.release()
+        if not continue_on_error and not future.cancelled() and future.exception() is not None:
+            stop_event.set()
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-page")
+    try:
+        for page_no in selected_pages:
+            slots.acquire()
+            if stop_event.is_set():
+                slots.release()
+                break
+            try:
+                img_b64, mime_type = load_page(page_no)
+            except BaseException:
+                slots.release()
+                raise
+            if on_dispatch:
+                on_dispatch(page_no)
+            future = executor.submit(run_page, page_no, img_b64, mime_type)
+            future.add_done_callback(release_slot)
+            futures.append(future)
+
+        return [future.result() for future in futures]
+    except BaseException:
+        stop_event.set()
+        for future in futures:
+            future.cancel()
+        raise
+    finally:
+        # 排队中的页面直接取消；已在识别的页面要等它结束，否则返回后它们仍在调用 OCR 接口、触发状态回调
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _iter_pdf_page_numbers(page_numbers: Iterable[int] | None, total_pages: int):
+    """逐个产出有效页码（越界、重复的跳过），不预先展开，便于调用方边探测边派发。"""
+    if page_numbers is None:
+        yield from range(1, total_pages + 1)
+        return
+
+    seen: set[int] = set()
+    for value in page_numbers:
+        try:
+            page_no = int(value)
+        except (TypeError, ValueError):
+            continue
+        if 1 <= page_no <= total_pages and page_no not in seen:
+            seen.add(page_no)
+            yield page_no
+
+
+def _failed_ocr_page(page_no: int, total_pages: int, exc: Exception, emit_status) -> dict[str, Any]:
+    error = _ocr_exception_message(exc)
+    _emit_ocr_status(f"第 {page_no}/{total_pages} 页 OCR 失败：{error}", emit_status)
+    return {"page_number": page_no, "text": "", "blank": False, "error": error}
+
+
+def _locked_status_emitter(ocr_status_callback):
+    status_lock = threading.Lock()
+
+    def emit_status(message: str) -> None:
+        if ocr_status_callback:
+            with status_lock:
+                ocr_status_callback(message)
+
+    return emit_status
+
+
+def ocr_pdf_document(
+    doc,
+    model: str = "google/gemini-3.1-pro-preview",
+    gemini_route: str = GEMINI_ROUTE_OPENROUTER,
+    page_progress_callback=None,
+    ocr_status_callback=None,
+    page_numbers: Iterable[int] | None = None,
+    continue_on_error: bool = False,
+    max_concurrency: int | None = None,
+    use_cache: bool = True,
+) -> dict[str, Any]:
+    """对调用方已打开的 PyMuPDF 文档按页 OCR，返回与 ``ocr_file(return_metadata=True)`` 相同的元数据。
+
+    ``page_numbers`` 可以是惰性迭代器：调用方可以一边扫描文本层一边产出需要 OCR 的页码，
+    页码一产出就在同一文档句柄上渲染并派发识别，不必等整份文档扫描结束，也不再二次打开文件。
+    渲染与迭代都在调用线程中进行；``processed_pages`` 按实际派发顺序记录。
+    """
+    import fitz  # PyMuPDF
+
+    total = len(doc)
+    emit_status = _locked_status_emitter(ocr_status_callback)
+    cache = get_ocr_result_cache() if use_cache else None
+    cache_stats = CacheHitStats(enabled=cache is not None)
+    dispatched_pages: list[int] = []
+
+    def render_pdf_page(page_no: int) -> tuple[str, str]:
+        pix = doc[page_no - 1].get_pixmap(matrix=fitz.Matrix(1.5, 1.5))
+        return base64.standard_b64encode(pix.tobytes("jpeg", jpg_quality=85)).decode("utf-8"), "image/jpeg"
+
+    def dispatch_pdf_page(page_no: int) -> None:
+        dispatched_pages.append(page_no)
+        print(f"\n正在处理第 {page_no}/{total} 页...")
+        if page_progress_callback:
+            page_progress_callback(page_no, total)
+
+    def ocr_pdf_page(page_no: int, img_b64: str, mime_type: str) -> dict[str, Any]:
+        def page_status(message: str) -> None:
+            emit_status(f"第 {page_no}/{total} 页：{message}")
+
+        try:
+            text = _ocr_single_image(
+                img_b64,
+                mime_type,
+                model,
+                gemini_route=gemini_route,
+                status_callback=page_status,
+                cache=cache,
+                cache_stats=cache_stats,
+            )
+        except Exception as exc:
+            if not continue_on_error:
+                raise
+            return _failed_ocr_page(page_no, total, exc, emit_status)
+
+        is_blank = _is_blank_ocr_result(text)
+        if is_blank:
+            _emit_ocr_status(f"第 {page_no}/{total} 页 OCR 输出为空，已计为空白页", emit_status)
+        return {"page_number": page_no, "text": text, "blank": is_blank, "error": ""}
+
+    planned_count = len(page_numbers) if isinstance(page_numbers, Sized) else total
+    page_results = _run_ocr_page_pipeline(
+        _iter_pdf_page_numbers(page_numbers, total),
+        load_page=render_pdf_page,
+        ocr_page=ocr_pdf_page,
+        on_dispatch=dispatch_pdf_page,
+        max_concurrency=_resolve_ocr_concurrency(max_concurrency, planned_count),
+        continue_on_error=continue_on_error,
+    )
+
+    print(f"\nPDF OCR 完成（缓存命中 {cache_stats.hits} 页）" if cache_stats.hits else "\nPDF OCR 完成")
+    return _build_ocr_metadata(
+        page_results=page_results,
+        total_pages=total,
+        requested_pages=dispatched_pages,
+        cache_stats=cache_stats,
+    )
+
+
 def ocr_file(
     file_path: str,
     api_key: str = "",
@@ -483,11 +711,18 @@ def ocr_file(
     ocr_status_callback=None,
     page_numbers: Iterable[int] | None = None,
     continue_on_error: bool = False,
+    max_concurrency: int | None = None,
+    use_cache: bool = True,
 ) -> str | dict[str, Any]:
     """调用 LLM 对图片或 PDF 进行 OCR，并可返回逐页结果。
 
     PDF 支持通过 ``page_numbers`` 仅识别指定页。默认遇到任一页面失败即抛错，
     保持原有 PDF2DOCX 行为；字数统计可启用 ``continue_on_error`` 保留诊断信息。
+    多页文件按 ``max_concurrency``（默认 ``OCR_PAGE_CONCURRENCY``）并发识别，
+    同一路由的请求间隔由 ``OCR_ROUTE_MIN_INTERVAL_SECONDS`` 统一限流，结果仍按页码顺序汇总。
+    ``page_progress_callback`` 按页码顺序在页面开始识别时回调。
+    ``use_cache=False`` 可跳过 OCR 结果缓存（全局开关见 ``OCR_CACHE``），
+    命中情况记录在返回元数据的 ``cache`` 字段中。
     """
     ext = Path(file_path).suffix.lower()
 
@@ -499,104 +734,77 @@ def ocr_file(
 
         doc = fitz.open(file_path)
         try:
-            total = len(doc)
-            selected_pages = _normalized_page_numbers(page_numbers, total)
-            page_results: list[dict[str, Any]] = []
-
-            for selected_index, page_no in enumerate(selected_pages, start=1):
-                page = doc[page_no - 1]
-                print(f"\n正在处理第 {page_no}/{total} 页...")
-                if page_progress_callback:
-                    page_progress_callback(page_no, total)
-
-                def page_status(message: str, current_page: int = page_no, total_pages: int = total):
-                    if ocr_status_callback:
-                        ocr_status_callback(f"第 {current_page}/{total_pages} 页：{message}")
-
-                try:
-                    pix = page.get_pixmap(matrix=fitz.Matrix(1.5, 1.5))
-                    img_b64 = base64.standard_b64encode(pix.tobytes("jpeg", jpg_quality=85)).decode("utf-8")
-                    text = _ocr_single_image(
-                        img_b64,
-                        "image/jpeg",
-                        model,
-                        gemini_route=gemini_route,
-                        status_callback=page_status,
-                    )
-                    is_blank = _is_blank_ocr_result(text)
-                    page_results.append(
-                        {"page_number": page_no, "text": text, "blank": is_blank, "error": ""}
-                    )
-                    if is_blank:
-                        _emit_ocr_status(
-                            f"第 {page_no}/{total} 页 OCR 输出为空，已计为空白页",
-                            ocr_status_callback,
-                        )
-                except Exception as exc:
-                    if not continue_on_error:
-                        raise
-                    error = _ocr_exception_message(exc)
-                    page_results.append(
-                        {"page_number": page_no, "text": "", "blank": False, "error": error}
-                    )
-                    _emit_ocr_status(f"第 {page_no}/{total} 页 OCR 失败：{error}", ocr_status_callback)
-
-                if selected_index < len(selected_pages):
-                    time.sleep(1)
+            metadata = ocr_pdf_document(
+                doc,
+                model=model,
+                gemini_route=gemini_route,
+                page_progress_callback=page_progress_callback,
+                ocr_status_callback=ocr_status_callback,
+                page_numbers=_normalized_page_numbers(page_numbers, len(doc)),
+                continue_on_error=continue_on_error,
+                max_concurrency=max_concurrency,
+                use_cache=use_cache,
+            )
         finally:
             close = getattr(doc, "close", None)
             if callable(close):
                 close()
-
-        print("\nPDF OCR 完成")
-        metadata = _build_ocr_metadata(
-            page_results=page_results,
-            total_pages=total,
-            requested_pages=selected_pages,
-        )
         return metadata if return_metadata else metadata["text"]
 
+    emit_status = _locked_status_emitter(ocr_status_callback)
+    cache = get_ocr_result_cache() if use_cache else None
+    cache_stats = CacheHitStats(enabled=cache is not None)
+
     frames = _image_frames_for_ocr(file_path)
     total = len(frames)
     selected_pages = _normalized_page_numbers(page_numbers, total)
-    page_results: list[dict[str, Any]] = []
-    for selected_index, page_no in enumerate(selected_pages, start=1):
+
+    def load_frame(page_no: int) -> tuple[str, str]:
         image_bytes, mime_type = frames[page_no - 1]
+        return base64.standard_b64encode(image_bytes).decode("utf-8"), mime_type
+
+    def dispatch_frame(page_no: int) -> None:
         if page_progress_callback:
             page_progress_callback(page_no, total)
         print(f"正在调用 LLM 进行 OCR{f'（第 {page_no}/{total} 页）' if total > 1 else ''}...")
+
+    def ocr_frame(page_no: int, img_b64: str, mime_type: str) -> dict[str, Any]:
         try:
             result = _ocr_single_image(
-                base64.standard_b64encode(image_bytes).decode("utf-8"),
+                img_b64,
                 mime_type,
                 model,
                 gemini_route=gemini_route,
-                status_callback=ocr_status_callback,
-            )
-            page_results.append(
-                {
-                    "page_number": page_no,
-                    "text": result,
-                    "blank": _is_blank_ocr_result(result),
-                    "error": "",
-                }
+                status_callback=emit_status if ocr_status_callback else None,
+                cache=cache,
+                cache_stats=cache_stats,
             )
         except Exception as exc:
             if not continue_on_error:
                 raise
-            error = _ocr_exception_message(exc)
-            page_results.append(
-                {"page_number": page_no, "text": "", "blank": False, "error": error}
-            )
-            _emit_ocr_status(f"第 {page_no}/{total} 页 OCR 失败：{error}", ocr_status_callback)
-        if selected_index < len(selected_pages):
-            time.sleep(1)
+            return _failed_ocr_page(page_no, total, exc, emit_status)
+        return {
+            "page_number": page_no,
+            "text": result,
+            "blank": _is_blank_ocr_result(result),
+            "error": "",
+        }
+
+    page_results = _run_ocr_page_pipeline(
+        selected_pages,
+        load_page=load_frame,
+        ocr_page=ocr_frame,
+        on_dispatch=dispatch_frame,
+        max_concurrency=_resolve_ocr_concurrency(max_concurrency, len(selected_pages)),
+        continue_on_error=continue_on_error,
+    )
 
     print("\nOCR 完成")
     metadata = _build_ocr_metadata(
         page_results=page_results,
         total_pages=total,
         requested_pages=selected_pages,
+        cache_stats=cache_stats,
     )
     return metadata if return_metadata else metadata["text"]
 
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""对比驾驶证流水线每个任务的模型加载开销：
+  - 每任务新建：每次都创建 TranslatorPipeline 并首次加载 MTCNN（改造前的行为）
+  - 常驻实例：DRIVERS_LICENSE_PIPELINES 个预热好的实例，任务只借用
+只统计流水线创建 + 一次人脸检测，不调用 OCR/翻译接口；--image 缺省时用空白图。"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.service import drivers_license_service  # noqa: E402
+
+
+def _detect_once(pipeline, rgb_image: np.ndarray) -> None:
+    pipeline.image_extractor.mtcnn.detect_faces(rgb_image)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--image", type=Path, help="驾驶证图片；缺省用 640x400 空白图")
+    parser.add_argument("--tasks", type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        import mtcnn  # noqa: F401
+    except ImportError:
+        print("未安装 mtcnn（及 tensorflow），无法测量人脸检测模型加载耗时")
+        return 1
+
+    if args.image:
+        bgr = cv2.imread(str(args.image))
+        if bgr is None:
+            print(f"无法读取图片: {args.image}")
+            return 1
+        rgb_image = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+    else:
+        rgb_image = np.zeros((400, 640, 3), dtype=np.uint8)
+
+    # 只测本地模型，占位密钥即可
+    api_keys = ("benchmark", "benchmark")
+    cold: list[float] = []
+    for _ in range(args.tasks):
+        started = time.perf_counter()
+        pipeline = drivers_license_service._build_pipeline(*api_keys)
+        _detect_once(pipeline, rgb_image)
+        cold.append(time.perf_counter() - started)
+    print(f"per-task build   : first {cold[0]:6.2f} s  mean {sum(cold) / len(cold):6.2f} s")
+
+    pool = drivers_license_service.DriversLicensePipelinePool(
+        1, lambda: drivers_license_service._build_pipeline(*api_keys), api_keys=api_keys
+    )
+    started = time.perf_counter()
+    pool.warm_up()
+    print(f"warm pool (warm-up): {time.perf_counter() - started:6.2f} s")
+    warm: list[float] = []
+    for _ in range(args.tasks):
+        started = time.perf_counter()
+        with pool.checkout() as (pipeline, _load_seconds):
+            _detect_once(pipeline, rgb_image)
+        warm.append(time.perf_counter() - started)
+    pool.shutdown()
+    mean_warm = sum(warm) / len(warm)
+    print(f"warm pool        : first {warm[0]:6.2f} s  mean {mean_warm:6.2f} s  ({sum(cold) / sum(warm):4.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
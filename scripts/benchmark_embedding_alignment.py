@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""对比逐格带状 DP 与反对角线向量化 DP 的耗时，并校验两者对齐结果一致。"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.service.embedding_alignment import (  # noqa: E402
+    _dp_align_embeddings_cellwise,
+    dp_align_embeddings,
+)
+
+
+def _synthetic_bitext(size: int, dimensions: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """构造近似平行的句向量：译文比原文多约 10% 句子，并带噪声与少量重复句。"""
+    rng = np.random.default_rng(seed)
+    src = rng.standard_normal((size, dimensions)).astype(np.float32)
+    tgt_size = size + size // 10
+    mapping = np.minimum((np.arange(tgt_size) * size / tgt_size).astype(np.int64), size - 1)
+    tgt = src[mapping] + 0.6 * rng.standard_normal((tgt_size, dimensions)).astype(np.float32)
+    src[::50] = src[0]
+    return src, tgt.astype(np.float32)
+
+
+def _timed(fn, *args) -> tuple[float, list]:
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--dimensions", type=int, default=768)
+    parser.add_argument("--seed", type=int, default=20260901)
+    parser.add_argument(
+        "--legacy-max",
+        type=int,
+        default=1000,
+        help="逐格实现只跑到该句数（其时间与内存随句数平方增长，5k 约需半小时）",
+    )
+    args = parser.parse_args()
+
+    print(f"{'sentences':>10} {'legacy_s':>10} {'banded_s':>10} {'speedup':>8} {'links':>8} identical")
+    for size in args.sizes:
+        src, tgt = _synthetic_bitext(size, args.dimensions, args.seed)
+        new_seconds, new_links = _timed(dp_align_embeddings, src, tgt)
+        if size <= args.legacy_max:
+            old_seconds, old_links = _timed(_dp_align_embeddings_cellwise, src, tgt)
+            identical = "yes" if old_links == new_links else "NO"
+            legacy = f"{old_seconds:10.2f}"
+            speedup = f"{old_seconds / max(new_seconds, 1e-9):7.1f}x"
+        else:
+            identical = "-"
+            legacy = f"{'skipped':>10}"
+            speedup = f"{'-':>8}"
+        print(f"{size:>10} {legacy} {new_seconds:10.2f} {speedup} {len(new_links):>8} {identical}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
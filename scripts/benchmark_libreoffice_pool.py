@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""对比 .doc→.docx 的两种转换方式的吞吐：
+  - 命令行：每个文件启动一次 soffice --headless --convert-to（临时 profile）
+  - 常驻池：LIBREOFFICE_WORKERS 个预热好的 soffice，经 UNO 下发转换
+未给 --doc-dir 时，先用 python-docx 生成 DOCX，再用 LibreOffice 转成 .doc 作为样本（不计时）。"""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from docx import Document
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.service import libreoffice_service  # noqa: E402
+
+
+def _build_doc_samples(target_dir: Path, count: int, soffice: str) -> list[Path]:
+    docx_dir = target_dir / "docx"
+    docx_dir.mkdir(parents=True)
+    for index in range(count):
+        doc = Document()
+        doc.add_heading(f"样本文档 {index + 1}", level=1)
+        for paragraph in range(20):
+            doc.add_paragraph(f"第{paragraph + 1}段：本合同自双方签字之日起生效。The agreement takes effect on signing.")
+        table = doc.add_table(rows=5, cols=4)
+        for r, row in enumerate(table.rows):
+            for c, cell in enumerate(row.cells):
+                cell.text = f"{r}-{c}"
+        doc.save(str(docx_dir / f"sample_{index:04d}.docx"))
+    subprocess.run(
+        [soffice, "--headless", "--convert-to", "doc:MS Word 97", "--outdir", str(target_dir), *map(str, sorted(docx_dir.glob("*.docx")))],
+        check=True,
+        capture_output=True,
+    )
+    return sorted(target_dir.glob("*.doc"))
+
+
+def _convert_all(doc_files: list[Path], output_dir: Path, concurrency: int) -> float:
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    def convert(path: Path) -> None:
+        libreoffice_service.convert_doc_to_docx_via_libreoffice(path, output_dir / f"{path.stem}.docx")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(convert, doc_files))
+    elapsed = time.perf_counter() - started
+    missing = [path.name for path in doc_files if not (output_dir / f"{path.stem}.docx").exists()]
+    assert not missing, f"未生成 DOCX: {missing[:5]}"
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--doc-dir", type=Path, help="待转换 .doc 目录；缺省生成样本")
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=libreoffice_service.settings.LIBREOFFICE_WORKERS or 2)
+    args = parser.parse_args()
+
+    soffice = libreoffice_service.resolve_libreoffice_path()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp = Path(temp_dir)
+        if args.doc_dir:
+            doc_files = sorted(args.doc_dir.glob("*.doc"))[: args.count]
+        else:
+            doc_files = _build_doc_samples(temp / "samples", args.count, soffice)
+        print(f"files={len(doc_files)} workers={args.workers} soffice={soffice}")
+
+        settings = libreoffice_service.settings
+        settings.LIBREOFFICE_WORKERS = 0
+        cli_seconds = _convert_all(doc_files, temp / "cli", concurrency=1)
+        print(f"command line (serial)  : {cli_seconds:8.1f} s  {len(doc_files) / cli_seconds:6.2f} files/s")
+
+        settings.LIBREOFFICE_WORKERS = args.workers
+        libreoffice_service._cli_slots = None
+        pool = libreoffice_service.get_libreoffice_worker_pool(soffice)
+        if pool is None:
+            print("常驻池不可用（未找到带 uno 模块的 Python），请设置 LIBREOFFICE_UNO_PYTHON")
+            return 1
+        started = time.perf_counter()
+        pool.warm_up()
+        warm_seconds = time.perf_counter() - started
+        pool_seconds = _convert_all(doc_files, temp / "pool", concurrency=args.workers)
+        libreoffice_service.shutdown_libreoffice_pool()
+        print(f"warm pool (warm-up)    : {warm_seconds:8.1f} s")
+        print(
+            f"warm pool              : {pool_seconds:8.1f} s  {len(doc_files) / pool_seconds:6.2f} files/s"
+            f"  ({cli_seconds / pool_seconds:4.1f}x)"
+        )
+        shutil.rmtree(temp / "cli", ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""数检规则检查阶段的数值提取基准：
+对一份对齐表（原文/译文两列）逐行调用 normalizer_total.extract_numbers，比较
+  - 基线实现（--baseline-rev 指定的 git 版本，缺省不跑）
+  - 预编译实现、不走缓存（extract_numbers.uncached）
+  - 预编译实现 + 按文本缓存（extract_numbers，对齐表真实调用路径）
+三者的耗时，并断言提取结果逐行一致。未给 --workbook 时生成一份合成对齐表。"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+NUMBER_CHECK_ROOT = REPO_ROOT / "专检" / "数检_程序-AIV2"
+if str(NUMBER_CHECK_ROOT) not in sys.path:
+    sys.path.insert(0, str(NUMBER_CHECK_ROOT))
+
+import normalizer_total  # noqa: E402
+
+# 合成对齐表素材：年报/招股书常见句式，页眉页脚与单位说明在真实表格中大量重复
+_SYNTHETIC_PAIRS = [
+    ("单位：万元", "Unit: RMB10,000"),
+    ("2023年年度报告", "2023 Annual Report"),
+    ("第{n}页", "Page {n}"),
+    ("报告期内，公司实现营业收入{a}万元，同比增长{p}%。",
+     "During the reporting period, the Company achieved revenue of RMB{b} million, up {p}% year on year."),
+    ("截至2023年12月31日，总资产为人民币{a}亿元。",
+     "As of December 31, 2023, total assets amounted to RMB{b} billion."),
+    ("公司于二〇二三年三月十五日召开第三届董事会第十二次会议。",
+     "The Company held the 12th meeting of the third session of the Board on March 15, 2023."),
+    ("第三季度净利润较上年同期增加{p}个百分点。",
+     "Net profit in the third quarter increased by {p} percentage points over the same period last year."),
+    ("项目总投资{a}万元，其中自有资金占三分之二。",
+     "The total investment of the project is RMB{b} million, of which two-thirds is self-funded."),
+    ("（一）主要会计数据和财务指标", "(I) Key accounting data and financial indicators"),
+    ("年产能{a}吨，年发电量5亿千瓦时，占地14.06万平方米。",
+     "Annual capacity of {a} tons, annual power generation of 500 million kWh, covering 140,600 square meters."),
+]
+
+
+def _synthetic_rows(count: int, seed: int) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    rows = []
+    for index in range(count):
+        src, tgt = rng.choice(_SYNTHETIC_PAIRS)
+        a = rng.randint(1, 99999)
+        values = {"n": index // 40 + 1, "a": f"{a:,}", "b": f"{a / 100:,.2f}", "p": rng.choice(["3.5", "12", "0.8"])}
+        rows.append((src.format(**values), tgt.format(**values)))
+    return rows
+
+
+def _workbook_rows(path: Path) -> list[tuple[str, str]]:
+    import pandas as pd
+
+    df = pd.read_excel(path)
+    return [(str(row.get("原文", "")), str(row.get("译文", ""))) for _, row in df.iterrows()]
+
+
+def _load_baseline(rev: str):
+    """从 git 取指定版本的 normalizer_total.py 作为独立模块加载。"""
+    relative = (NUMBER_CHECK_ROOT / "normalizer_total.py").relative_to(REPO_ROOT).as_posix()
+    source = subprocess.run(
+        ["git", "show", f"{rev}:{relative}"],
+        cwd=REPO_ROOT, check=True, capture_output=True,
+    ).stdout
+    with tempfile.NamedTemporaryFile("wb", suffix=".py", delete=False) as handle:
+        handle.write(source)
+    spec = importlib.util.spec_from_file_location("normalizer_total_baseline", handle.name)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _time_pass(extract, rows, repeat: int) -> tuple[float, list]:
+    best = float("inf")
+    results = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = [(extract(src), extract(tgt)) for src, tgt in rows]
+        best = min(best, time.perf_counter() - started)
+    return best, results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workbook", type=Path, help="对齐表 xlsx（含 原文/译文 列）；缺省生成合成数据")
+    parser.add_argument("--rows", type=int, default=3000, help="合成对齐表行数")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3, help="每种实现重复次数，取最快一次")
+    parser.add_argument("--baseline-rev", help="与指定 git 版本的 normalizer_total 对比，如 HEAD~1")
+    args = parser.parse_args()
+
+    rows = _workbook_rows(args.workbook) if args.workbook else _synthetic_rows(args.rows, args.seed)
+    distinct = len({text for pair in rows for text in pair})
+    print(f"rows={len(rows)} distinct_texts={distinct}")
+
+    extract = normalizer_total.extract_numbers
+    timings = {}
+    timings["uncached"], expected = _time_pass(extract.uncached, rows, args.repeat)
+
+    def _cold_cached(text):
+        return extract(text)
+
+    extract.cache_clear()
+    started = time.perf_counter()
+    cached_results = [(_cold_cached(src), _cold_cached(tgt)) for src, tgt in rows]
+    timings["cached (cold)"] = time.perf_counter() - started
+    assert cached_results == expected, "缓存结果与未缓存结果不一致"
+    timings["cached (warm)"], _ = _time_pass(extract, rows, args.repeat)
+
+    if args.baseline_rev:
+        baseline = _load_baseline(args.baseline_rev)
+        timings[f"baseline {args.baseline_rev}"], baseline_results = _time_pass(
+            baseline.extract_numbers, rows, args.repeat
+        )
+        mismatched = sum(1 for a, b in zip(baseline_results, expected) if a != b)
+        assert mismatched == 0, f"{mismatched} 行提取结果与基线不一致"
+
+    reference = timings.get(f"baseline {args.baseline_rev}", timings["uncached"])
+    for name, seconds in timings.items():
+        print(f"{name:>24}: {seconds * 1000:9.1f} ms  ({reference / seconds:5.1f}x)")
+    print("outputs identical")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""对比“每次扫库挑候选 + 逐条读后更新”与“内存就绪队列 + UPDATE ... RETURNING”两种调度方式：
+在临时 SQLite 库中排入 N 个任务，逐个认领，统计每次调度的耗时与 SQL 语句数。"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.db.database import Base  # noqa: E402
+from app.model.entity import Task  # noqa: E402
+from app.repository import task_repo  # noqa: E402
+from app.service import task_queue_service as queue_module  # noqa: E402
+
+LEGACY_CANDIDATE_BATCH_SIZE = 20
+
+
+class StatementCounter:
+    def __init__(self, engine) -> None:
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *_args, **_kwargs) -> None:
+        self.count += 1
+
+
+def _seed_tasks(session_factory, count: int, blocked_type: str, other_type: str) -> None:
+    """前 count-1 个为同一类型（模拟批量提交），最后一个是另一类型。"""
+    started = datetime(2026, 1, 1)
+    with session_factory() as db:
+        for index in range(count):
+            task_type = blocked_type if index < count - 1 else other_type
+            db.add(
+                Task(
+                    task_id=f"task-{index:05d}",
+                    display_no=f"T{index:05d}",
+                    task_type=task_type,
+                    filename=f"{index}.bin",
+                    status="queued",
+                    progress=0,
+                    input_files_json='{"input_path": "x"}',
+                    created_at=started + timedelta(seconds=index),
+                )
+            )
+        db.commit()
+
+
+def _legacy_claim(service, session_factory):
+    """旧实现：每次调度新开会话查询前 N 个候选，再逐条“读一行 + UPDATE”认领。"""
+    with session_factory() as db:
+        for queued_task in task_repo.list_queued_tasks(db, limit=LEGACY_CANDIDATE_BATCH_SIZE):
+            if not service._can_start_task_type(queued_task.task_type):
+                continue
+            claimed_task = task_repo.claim_queued_task_by_task_id(db, queued_task.task_id)
+            if claimed_task:
+                return claimed_task
+    return None
+
+
+def _run(strategy: str, count: int) -> dict:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = create_engine(f"sqlite:///{Path(temp_dir) / 'tasks.db'}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        queue_module.SessionLocal = session_factory
+        _seed_tasks(session_factory, count, "word_count", "pdf_merge")
+
+        service = queue_module.TaskQueueService()
+        counter = StatementCounter(engine)
+        setup_statements = 0
+        if strategy == "indexed":
+            service._rebuild_ready_index()
+            setup_statements = counter.count
+        claim = (lambda: _legacy_claim(service, session_factory)) if strategy == "legacy" else service._claim_next_dispatchable_task
+
+        # 先占住 word_count 的唯一并发槽：此时唯一能启动的是队尾的 pdf_merge
+        service._reserve_task_slot("busy-word-count", "word_count")
+        counter.count = 0
+        started = time.perf_counter()
+        blocked_claim = claim()
+        blocked_seconds = time.perf_counter() - started
+        blocked_statements = counter.count
+        service._release_task_slot("busy-word-count")
+
+        latencies: list[float] = []
+        statements: list[int] = []
+        while True:
+            counter.count = 0
+            started = time.perf_counter()
+            claimed = claim()
+            elapsed = time.perf_counter() - started
+            if claimed is None:
+                break
+            latencies.append(elapsed)
+            statements.append(counter.count)
+        engine.dispose()
+
+    return {
+        "strategy": strategy,
+        "dispatched": len(latencies),
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": (sorted(latencies)[int(len(latencies) * 0.95) - 1] * 1000) if latencies else 0.0,
+        "stmts_per_dispatch": statistics.fmean(statements) if statements else 0.0,
+        "setup_stmts": setup_statements,
+        "blocked_found": "yes" if blocked_claim is not None else "no",
+        "blocked_ms": blocked_seconds * 1000,
+        "blocked_stmts": blocked_statements,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(
+        f"{'strategy':>9} {'dispatched':>10} {'mean_ms':>8} {'p95_ms':>8} {'stmts/disp':>10} "
+        f"{'setup':>6} | {'tail-task found':>15} {'ms':>7} {'stmts':>6}"
+    )
+    for strategy in ("legacy", "indexed"):
+        row = _run(strategy, args.tasks)
+        print(
+            f"{row['strategy']:>9} {row['dispatched']:>10} {row['mean_ms']:8.2f} {row['p95_ms']:8.2f} "
+            f"{row['stmts_per_dispatch']:10.1f} {row['setup_stmts']:>6} | {row['blocked_found']:>15} "
+            f"{row['blocked_ms']:7.2f} {row['blocked_stmts']:>6}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""字数统计文本计数基准：
+对一份中日韩/拉丁混排语料逐段调用 word_count_service._count_text，比较
+  - 基线实现（--baseline-rev 指定的 git 版本，缺省不跑）
+  - 当前单遍查表实现
+的耗时，并断言每段的 TextMetrics 全部字段一致。未给 --text-dir 时生成合成语料。"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import importlib.util
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.service import word_count_service  # noqa: E402
+
+# 合成语料素材：年报、说明书、合同中常见的中英日韩混排段落与表格行
+_SYNTHETIC_PARAGRAPHS = [
+    "报告期内，公司实现营业收入{a}万元，同比增长{p}%；归属于上市公司股东的净利润为人民币{b}亿元。",
+    "During the reporting period, the Company achieved revenue of RMB{b} million, up {p}% year-on-year.",
+    "第{n}条　本合同自双方签字（盖章）之日起生效，有效期为“{n}年”。",
+    "Model No. XR-{a}/B 型号：XR-{a}/B\t规格：{p}mm × {n}mm\t数量：{n}",
+    "本製品は、{n}年{n}月に発売されたモデルです。詳しくは www.example.co.jp をご覧ください。",
+    "이 제품은 {n}년에 출시되었습니다. 자세한 내용은 웹사이트를 참조하십시오.",
+    "The Board's decision—approved on 15 March 2023—covers items (i) to (iv) of Section {n}.2.",
+    "注：1. 上述数据未经审计；2. “Q{n}” 指第{n}季度…",
+    "Ingrédients : eau, sucre, café arabica {p}% — Продукт сертифицирован, ISO 9001:2015.",
+    "项目\t2023年\t2022年\t变动比例\n营业收入\t{a}\t{b}\t{p}%\n净利润\t{b}\t{a}\t-{p}%",
+]
+
+
+def _synthetic_corpus(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(count):
+        template = rng.choice(_SYNTHETIC_PARAGRAPHS)
+        a = rng.randint(1, 999999)
+        values = {"n": index % 40 + 1, "a": f"{a:,}", "b": f"{a / 100:,.2f}", "p": rng.choice(["3.5", "12", "0.8"])}
+        corpus.append(template.format(**values))
+    return corpus
+
+
+def _directory_corpus(path: Path) -> list[str]:
+    """读取目录下的 .txt 文件，按空行切段，模拟逐段统计。"""
+    corpus = []
+    for file_path in sorted(path.rglob("*.txt")):
+        text = file_path.read_text(encoding="utf-8", errors="ignore")
+        corpus.extend(part for part in text.split("\n\n") if part.strip())
+    return corpus
+
+
+def _load_baseline(rev: str):
+    relative = "app/service/word_count_service.py"
+    source = subprocess.run(
+        ["git", "show", f"{rev}:{relative}"],
+        cwd=REPO_ROOT, check=True, capture_output=True,
+    ).stdout
+    with tempfile.NamedTemporaryFile("wb", suffix=".py", delete=False) as handle:
+        handle.write(source)
+    spec = importlib.util.spec_from_file_location("word_count_service_baseline", handle.name)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _time_pass(count_text, corpus, repeat: int) -> tuple[float, list]:
+    best = float("inf")
+    results = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = [count_text(text) for text in corpus]
+        best = min(best, time.perf_counter() - started)
+    return best, [dataclasses.asdict(metrics) for metrics in results]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--text-dir", type=Path, help="语料目录（递归读取 .txt）；缺省生成合成语料")
+    parser.add_argument("--paragraphs", type=int, default=20000, help="合成语料段落数")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3, help="每种实现重复次数，取最快一次")
+    parser.add_argument("--baseline-rev", help="与指定 git 版本的 _count_text 对比，如 HEAD~1")
+    args = parser.parse_args()
+
+    corpus = _directory_corpus(args.text_dir) if args.text_dir else _synthetic_corpus(args.paragraphs, args.seed)
+    total_chars = sum(len(text) for text in corpus)
+    print(f"paragraphs={len(corpus)} chars={total_chars}")
+
+    timings = {}
+    timings["current"], expected = _time_pass(word_count_service._count_text, corpus, args.repeat)
+    if args.baseline_rev:
+        baseline = _load_baseline(args.baseline_rev)
+        timings[f"baseline {args.baseline_rev}"], baseline_results = _time_pass(
+            baseline._count_text, corpus, args.repeat
+        )
+        mismatched = sum(1 for a, b in zip(baseline_results, expected) if a != b)
+        assert mismatched == 0, f"{mismatched} 段统计结果与基线不一致"
+
+    reference = timings.get(f"baseline {args.baseline_rev}", timings["current"])
+    for name, seconds in timings.items():
+        rate = total_chars / seconds / 1_000_000
+        print(f"{name:>20}: {seconds * 1000:9.1f} ms  {rate:6.2f} M chars/s  ({reference / seconds:5.1f}x)")
+    if args.baseline_rev:
+        print("metrics identical")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
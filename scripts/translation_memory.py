@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""句段翻译记忆的导出/导入，用于多台机器、多个批次之间共享已译句段。
+
+  python scripts/translation_memory.py export tm.jsonl [--target-lang en]
+  python scripts/translation_memory.py import tm.jsonl
+  python scripts/translation_memory.py stats
+记忆库路径取 TRANSLATION_MEMORY_PATH，可用 --db 临时指定。"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.service.translation_memory_service import TranslationMemory  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", type=Path, default=Path(settings.TRANSLATION_MEMORY_PATH))
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="导出为 JSONL")
+    export_parser.add_argument("path", type=Path)
+    export_parser.add_argument("--target-lang", help="只导出某个目标语种")
+    import_parser = subparsers.add_parser("import", help="从 JSONL 导入（同键以导入内容为准）")
+    import_parser.add_argument("path", type=Path)
+    subparsers.add_parser("stats", help="查看条数与占用")
+    args = parser.parse_args()
+
+    memory = TranslationMemory(args.db, max(int(settings.TRANSLATION_MEMORY_MAX_MB), 0) * 1024 * 1024)
+    try:
+        if args.command == "export":
+            count = memory.export_jsonl(args.path, target_lang=args.target_lang)
+            print(f"已导出 {count} 条到 {args.path}")
+        elif args.command == "import":
+            count = memory.import_jsonl(args.path)
+            print(f"已从 {args.path} 导入 {count} 条")
+        else:
+            stats = memory.stats()
+            print(f"{args.db}: {stats['entries']} 条, {stats['size_bytes'] / 1024 / 1024:.1f} MB")
+    finally:
+        memory.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
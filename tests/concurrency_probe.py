@@ -0,0 +1,36 @@
+"""并发测试共用的探针：用屏障证明作业确实同时在途，不依赖 sleep 时长或墙钟耗时。"""
+import threading
+from contextlib import contextmanager
+
+
+class ConcurrencyProbe:
+    """
+    统计同时在途的作业数。
+
+    expected > 0 时，最先进入的 expected 个作业要在屏障处会合后才继续：只要测试通过，就说明
+    至少有 expected 个作业同时在途；并发不足时屏障超时（BrokenBarrierError），测试立即失败而不是变慢。
+    并发上限由 peak 断言：屏障保证 peak >= expected，实现若超出上限 peak 会更大。
+    """
+
+    def __init__(self, expected: int = 0, timeout: float = 5.0) -> None:
+        self.expected = expected
+        self.in_flight = 0
+        self.peak = 0
+        self._entered = 0
+        self._lock = threading.Lock()
+        self._barrier = threading.Barrier(expected, timeout=timeout) if expected > 0 else None
+
+    @contextmanager
+    def track(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self._entered += 1
+            rendezvous = self._barrier is not None and self._entered <= self.expected
+        try:
+            if rendezvous:
+                self._barrier.wait()
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
@@ -0,0 +1,119 @@
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.service import alignment_service
+from tests.concurrency_probe import ConcurrencyProbe
+
+
+class _FakeMemory:
+    """模拟 memory.py：4 个分块耗时不同，乱序完成；记录各线程看到的日志路由与合并顺序。"""
+
+    def __init__(self, delays, failing=(), probe=None):
+        self.delays = delays
+        self.failing = set(failing)
+        self.lock = threading.Lock()
+        self.probe = probe or ConcurrencyProbe()
+        self.calls = []
+        self.routed_task_ids = set()
+        self.merged = None
+        self.log_manager = types.SimpleNamespace(log=self._log, log_exception=self._log, log_stream=self._log)
+
+    def _log(self, *_args, **_kwargs):
+        self.routed_task_ids.add(getattr(alignment_service._stream_task_id, "task_id", None))
+
+    def get_file_type(self, _path):
+        return "docx"
+
+    def analyze_document_structure(self, _path, _lang):
+        return 90_000, None
+
+    def smart_split_with_buffer(self, path, parts, temp_dir, _lang, _buffer, split_element_ratios=None):
+        files = [str(Path(temp_dir) / f"{Path(path).stem}_part{i + 1}.docx") for i in range(parts)]
+        return files, None, [0.25, 0.5, 0.75]
+
+    def read_file_content(self, path):
+        return path
+
+    def set_gemini_route(self, _route):
+        pass
+
+    def run_hybrid_alignment(self, original, trans, output, *_args, **_kwargs):
+        part = Path(output).name.split("_")[0]
+        with self.lock:
+            self.calls.append(part)
+        with self.probe.track():
+            self._log("aligning")
+            time.sleep(self.delays[part])
+            if part in self.failing:
+                return False
+            pd.DataFrame([{"原文": part, "译文": part}]).to_excel(output, index=False)
+            return True
+
+    def merge_and_deduplicate_excels(self, paths, final_path, **_kwargs):
+        self.merged = [Path(path).name.split("_")[0] for path in paths]
+        pd.DataFrame([{"原文": name, "译文": name} for name in self.merged]).to_excel(final_path, index=False)
+
+
+def _run(monkeypatch, tmp_path, memory, **kwargs):
+    monkeypatch.setattr(alignment_service, "_get_memory_module", lambda: memory)
+    monkeypatch.setattr(alignment_service, "_install_log_patches", lambda: None)
+    monkeypatch.setattr(alignment_service, "ensure_gemini_route_configured", lambda route: route)
+    monkeypatch.setattr(alignment_service, "OUTPUT_DIR", str(tmp_path / "out"))
+    monkeypatch.setattr(alignment_service, "PART_TASK_RETRY_DELAY_SECONDS", 0.05)
+    monkeypatch.setattr(alignment_service.settings, "ALIGNMENT_PART_CONCURRENCY", 4)
+    for name in ("original.docx", "translated.docx"):
+        (tmp_path / name).write_bytes(b"docx")
+
+    alignment_service._run_alignment_sync(
+        str(tmp_path / "original.docx"), str(tmp_path / "translated.docx"),
+        "task-1", "T0001", "中文", "英语", alignment_service.DEFAULT_MODEL, "openrouter", False,
+        **kwargs,
+    )
+    return alignment_service.get_alignment_progress("task-1")
+
+
+def test_parts_run_concurrently_and_merge_in_part_order(monkeypatch, tmp_path):
+    # 4 个分块同时在途才能越过探针屏障；会合后按不同耗时乱序完成
+    memory = _FakeMemory({"Part1": 0.2, "Part2": 0.05, "Part3": 0.15, "Part4": 0.1}, probe=ConcurrencyProbe(4))
+
+    status = _run(monkeypatch, tmp_path, memory)
+
+    assert status["status"] == "done"
+    assert memory.merged == ["Part1", "Part2", "Part3", "Part4"]
+    assert memory.probe.peak == 4
+    assert memory.routed_task_ids == {"task-1"}
+
+
+def test_failed_part_does_not_block_other_parts(monkeypatch, tmp_path):
+    memory = _FakeMemory({"Part1": 0.05, "Part2": 0.05, "Part3": 0.2, "Part4": 0.2}, failing={"Part2"})
+
+    status = _run(monkeypatch, tmp_path, memory)
+
+    assert status["status"] == "failed"
+    assert "Part2_对齐结果.xlsx" in status["error"]
+    assert status["result"]["successful_parts"] == ["Part1_对齐结果.xlsx", "Part3_对齐结果.xlsx", "Part4_对齐结果.xlsx"]
+    assert memory.calls.count("Part2") == alignment_service.PART_TASK_MAX_RETRIES
+    assert memory.merged is None
+
+
+def test_fail_fast_cancels_parts_that_have_not_started(tmp_path):
+    memory = _FakeMemory({"Part1": 0.05, "Part2": 0.3, "Part3": 0.05, "Part4": 0.05}, failing={"Part1"})
+
+    results = alignment_service._run_parts_concurrently(
+        4,
+        lambda idx, stop_event: memory.run_hybrid_alignment("", "", str(tmp_path / f"Part{idx + 1}_x.xlsx")),
+        2,
+        fail_fast=True,
+    )
+
+    assert results[0] is False
+    assert results[1] is True
+    assert None in results[2:]
+    assert memory.calls.count("Part1") == 1
@@ -0,0 +1,123 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.service import directory_scan_service as scan_module
+from app.service import word_count_service
+
+
+@pytest.fixture(autouse=True)
+def _fresh_listing_cache(monkeypatch):
+    monkeypatch.setattr(scan_module.settings, "DIRECTORY_SCAN_CACHE_SECONDS", 60)
+    scan_module.get_directory_listing_cache().clear()
+    yield
+    scan_module.get_directory_listing_cache().clear()
+
+
+def _build_tree(root: Path) -> None:
+    for index in range(4):
+        folder = root / f"Dir{index}" / f"sub{index % 2}"
+        folder.mkdir(parents=True)
+        for name in ("b.docx", "A.txt", "c.png", "~$lock.docx"):
+            (folder / name).write_text(name, encoding="utf-8")
+        (root / f"Dir{index}" / "z.pdf").write_bytes(b"%PDF-1.4")
+    (root / ".hidden").mkdir()
+    (root / ".hidden" / "secret.docx").write_text("x", encoding="utf-8")
+    (root / "top.DOCX").write_text("top", encoding="utf-8")
+    os.symlink(root / "top.DOCX", root / "link.docx")
+    os.symlink(root / "Dir0", root / "LinkedDir")
+
+
+def _walk_reference(root: Path, extensions: set[str]) -> list[str]:
+    """旧实现：os.walk + 每个文件单独 is_symlink，目录与文件名按小写排序。"""
+    found = []
+    for current_dir, dir_names, file_names in os.walk(root, followlinks=False):
+        dir_names[:] = sorted(
+            (name for name in dir_names if not word_count_service._is_hidden_name(name)),
+            key=str.lower,
+        )
+        for file_name in sorted(file_names, key=str.lower):
+            file_path = Path(current_dir) / file_name
+            if word_count_service._is_hidden_name(file_name) or file_path.suffix.lower() not in extensions:
+                continue
+            if file_path.is_symlink():
+                continue
+            found.append(file_path.relative_to(root).as_posix())
+    return found
+
+
+def test_parallel_scan_matches_walk_order_and_filters(tmp_path):
+    _build_tree(tmp_path)
+    extensions = {".docx", ".txt", ".pdf"}
+
+    scanned = list(
+        scan_module.iter_directory_files(
+            tmp_path,
+            recursive=True,
+            skip_name=word_count_service._is_hidden_name,
+            match_file=lambda name: os.path.splitext(name)[1].lower() in extensions,
+            max_workers=4,
+        )
+    )
+
+    assert [item.relative_path for item in scanned] == _walk_reference(tmp_path, extensions)
+    assert all(item.path == tmp_path / item.relative_path for item in scanned)
+    assert all(item.size == (tmp_path / item.relative_path).stat().st_size for item in scanned)
+
+    top_level = scan_module.iter_directory_files(
+        tmp_path,
+        recursive=False,
+        skip_name=word_count_service._is_hidden_name,
+        match_file=lambda name: os.path.splitext(name)[1].lower() in extensions,
+    )
+    assert [item.relative_path for item in top_level] == ["top.DOCX"]
+
+
+def test_cached_listing_is_replayed_and_reused_for_selected_files(tmp_path, monkeypatch):
+    _build_tree(tmp_path)
+    monkeypatch.setattr(word_count_service.settings, "WORD_COUNT_ALLOWED_ROOTS_JSON", f'["{tmp_path.as_posix()}"]')
+    monkeypatch.setattr(word_count_service.settings, "WORD_COUNT_ALLOW_LOCAL_PATHS", "True")
+
+    first = word_count_service.discover_word_count_files(directory_path=str(tmp_path), extensions=[".docx"])
+    assert [item["relative_path"] for item in first["files"]][:2] == ["top.DOCX", "Dir0/sub0/b.docx"]
+
+    def offline_scandir(_path):
+        raise AssertionError("缓存有效期内不应重新列举目录")
+
+    monkeypatch.setattr(scan_module.os, "scandir", offline_scandir)
+    second = word_count_service.discover_word_count_files(directory_path=str(tmp_path), extensions=[".docx"])
+    assert second["files"] == first["files"]
+
+    # 提交时勾选的文件直接从扫描结果校验，不再逐个访问磁盘
+    monkeypatch.setattr(Path, "is_symlink", lambda _self: pytest.fail("不应逐级检查符号链接"))
+    selected = word_count_service._resolve_selected_word_count_files(
+        tmp_path.resolve(),
+        ["Dir2/sub0/b.docx", "top.DOCX"],
+        extensions={".docx"},
+        include_hidden=False,
+        recursive=True,
+    )
+    assert selected == [tmp_path / "Dir2" / "sub0" / "b.docx", tmp_path / "top.DOCX"]
+
+
+def test_limited_scan_stops_early_and_caches_prefix(tmp_path):
+    _build_tree(tmp_path)
+    options = dict(
+        recursive=True,
+        skip_name=word_count_service._is_hidden_name,
+        match_file=lambda name: name.endswith(".txt"),
+    )
+
+    head = list(scan_module.scan_directory_files(tmp_path, cache_key="prefix", limit=2, **options))
+    assert [item.relative_path for item in head] == ["Dir0/sub0/A.txt", "Dir1/sub1/A.txt"]
+    cache = scan_module.get_directory_listing_cache()
+    assert cache.lookup("prefix", limit=2) == head
+    assert cache.lookup("prefix") is None
+
+    full = list(scan_module.scan_directory_files(tmp_path, cache_key="prefix", **options))
+    assert len(full) == 4
+    assert cache.lookup("prefix") == full
@@ -0,0 +1,72 @@
+import io
+import shutil
+import sys
+import zipfile
+from pathlib import Path
+
+from docx import Document
+from docx.shared import Inches
+from lxml import etree
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.service.docx_part_splitter import write_element_range_parts
+
+_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+    "0000000d4944415478da63fccf3c0d0f000485018084a98c210000000049454e44ae426082"
+)
+
+
+def _build_docx(path):
+    doc = Document()
+    for index in range(6):
+        doc.add_paragraph(f"第{index + 1}段 正文内容")
+        table = doc.add_table(rows=2, cols=2)
+        for r, row in enumerate(table.rows):
+            for c, cell in enumerate(row.cells):
+                cell.text = f"{index}-{r}-{c}"
+        if index == 2:
+            doc.add_picture(io.BytesIO(_PNG), width=Inches(1))
+    doc.save(str(path))
+
+
+def _content_elements(doc):
+    return [child for child in doc.element.body if child.tag.endswith(("}p", "}tbl"))]
+
+
+def _legacy_part(src, start, end, dest):
+    shutil.copy2(src, dest)
+    doc = Document(str(dest))
+    elements = _content_elements(doc)
+    for element in elements[:start] + elements[end:]:
+        element.getparent().remove(element)
+    doc.save(str(dest))
+
+
+def _read(path, name):
+    with zipfile.ZipFile(path) as package:
+        return package.read(name)
+
+
+def test_parts_match_copy_and_delete_and_source_tree_is_untouched(tmp_path):
+    src = tmp_path / "src.docx"
+    _build_docx(src)
+    doc = Document(str(src))
+    before = etree.tostring(doc.element)
+    elements = _content_elements(doc)
+    ranges = [(0, 5), (5, 11), (11, len(elements))]
+    dest_paths = [str(tmp_path / f"part{i + 1}.docx") for i in range(len(ranges))]
+
+    written = write_element_range_parts(doc, str(src), elements, ranges, dest_paths)
+
+    assert written == dest_paths
+    assert etree.tostring(doc.element) == before
+    for (start, end), dest in zip(ranges, dest_paths):
+        legacy = tmp_path / f"legacy_{Path(dest).name}"
+        _legacy_part(src, start, end, legacy)
+        assert _read(dest, "word/document.xml") == _read(legacy, "word/document.xml")
+        assert _read(dest, "word/styles.xml") == _read(src, "word/styles.xml")
+        part_doc = Document(dest)
+        assert len(_content_elements(part_doc)) == end - start
+        assert bool(part_doc.inline_shapes) == (start <= 6 < end)
@@ -0,0 +1,103 @@
+import json
+import re
+import sys
+import threading
+from pathlib import Path
+
+from docx import Document
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.service import docx_structured_translation as structured
+from tests.concurrency_probe import ConcurrencyProbe
+
+
+def _write_docx(path: Path, paragraphs: list[str]) -> Path:
+    document = Document()
+    for text in paragraphs:
+        document.add_paragraph(text)
+    document.save(str(path))
+    return path
+
+
+def _requested_sentences(messages) -> list[dict]:
+    payload = re.search(r"输入：\n(.*?)\n\n输出格式", messages[1]["content"], re.S).group(1)
+    return json.loads(payload)["sentences"]
+
+
+def _answer(sentences: list[dict]) -> str:
+    return json.dumps(
+        {
+            "translations": {
+                item["sentence_id"]: {"source_hash": item["source_hash"], "target_text": f"T{item['source_text']}"}
+                for item in sentences
+            }
+        },
+        ensure_ascii=False,
+    )
+
+
+def test_groups_are_dispatched_concurrently_and_applied_in_place(tmp_path):
+    paragraphs = [f"第{index}段。第{index}段第二句。" for index in range(6)]
+    source = _write_docx(tmp_path / "source.docx", paragraphs)
+    # 3 组句段同时在途才能越过探针屏障
+    probe = ConcurrencyProbe(3)
+
+    def call_llm(messages, _require_json):
+        with probe.track():
+            return _answer(_requested_sentences(messages))
+
+    result = structured.translate_docx_preserving_format(
+        source,
+        tmp_path / "out.docx",
+        source_language="中文",
+        target_language="英文",
+        call_llm=call_llm,
+        max_concurrency=3,
+    )
+
+    assert probe.peak == 3
+    assert [p.text for p in Document(str(tmp_path / "out.docx")).paragraphs] == [
+        f"T第{index}段。T第{index}段第二句。" for index in range(6)
+    ]
+    assert list(result.translations) == [sentence.sentence_id for sentence in result.source_sentences]
+
+
+def test_failing_group_is_bisected_instead_of_sent_one_by_one(tmp_path):
+    text = "".join(f"第{index}句{'坏' if index == 5 else ''}。" for index in range(8))
+    source = _write_docx(tmp_path / "source.docx", [text])
+    group_sizes = []
+    lock = threading.Lock()
+
+    def call_llm(messages, _require_json):
+        sentences = _requested_sentences(messages)
+        with lock:
+            group_sizes.append(len(sentences))
+        if len(sentences) > 1 and any("坏" in item["source_text"] for item in sentences):
+            return "{}"
+        return _answer(sentences)
+
+    structured.translate_docx_preserving_format(
+        source,
+        tmp_path / "out.docx",
+        source_language="中文",
+        target_language="英文",
+        call_llm=call_llm,
+        retries=1,
+    )
+
+    # 8 → 4 + 4(含坏句) → 2 + 2(含坏句) → 1 + 1
+    assert sorted(group_sizes, reverse=True) == [8, 4, 4, 2, 2, 1, 1]
+    expected = "".join(f"T第{index}句{'坏' if index == 5 else ''}。" for index in range(8))
+    assert Document(str(tmp_path / "out.docx")).paragraphs[0].text == expected
+
+
+def test_group_sizer_shrinks_on_failure_and_latency_then_grows_back():
+    sizer = structured._GroupSizer(max_items=10, max_chars=1000, latency_target_seconds=30)
+    sizer.record_failure(8)
+    assert (sizer.items_limit, sizer.chars_limit) == (4, 400)
+    for _ in range(structured.GROUP_GROWTH_STREAK):
+        sizer.record_success(4, 1.0)
+    assert sizer.items_limit == 5
+    sizer.record_success(5, 75.0)
+    assert sizer.items_limit == 2
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.service import drivers_license_service as drivers_license
+
+
+class _FakePipeline:
+    created = 0
+
+    def __init__(self, glm_api_key: str, deepseek_api_key: str):
+        type(self).created += 1
+        self.api_keys = (glm_api_key, deepseek_api_key)
+        self.images: list[str] = []
+
+    def translate_batch(self, input_paths, output_dir):
+        self.images.extend(input_paths)
+        print(f"batch {len(input_paths)}")
+        return {path: f"ERROR: {id(self)}" for path in input_paths}
+
+
+def _run_batch(tmp_path: Path, name: str, count: int) -> dict:
+    return asyncio.run(
+        drivers_license.execute_drivers_license_task(
+            task_id=name,
+            display_no=name,
+            input_paths=[str(tmp_path / f"{name}-{index}.png") for index in range(count)],
+            original_filenames=[f"{name}-{index}.png" for index in range(count)],
+            processing_mode="batch",
+        )
+    )
+
+
+def test_tasks_reuse_one_warm_pipeline_with_explicit_keys(tmp_path, monkeypatch):
+    monkeypatch.setattr(drivers_license.settings, "OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setattr(drivers_license.settings, "DRIVERS_LICENSE_PIPELINES", 1)
+    monkeypatch.setattr(drivers_license.settings, "GLM_API_KEY", "glm-key")
+    monkeypatch.setattr(drivers_license.settings, "DEEPSEEK_API_KEY", "deepseek-key")
+    monkeypatch.delenv("GLM_API_KEY", raising=False)
+    monkeypatch.delenv("DEEPSEEK_API_KEY", raising=False)
+    monkeypatch.setattr(drivers_license, "_build_pipeline", _FakePipeline)
+    _FakePipeline.created = 0
+    drivers_license.shutdown_drivers_license_pipelines()
+
+    drivers_license.warm_up_drivers_license_pipelines()
+    first = _run_batch(tmp_path, "a", 3)
+    second = _run_batch(tmp_path, "b", 2)
+    drivers_license.shutdown_drivers_license_pipelines()
+
+    assert _FakePipeline.created == 1
+    assert first["pipeline_load_seconds"] == second["pipeline_load_seconds"] == 0
+    assert first["items"][0]["error"] == second["items"][0]["error"]
+    assert first["stream_log"] == "batch 3\n"
+    assert "GLM_API_KEY" not in os.environ and "DEEPSEEK_API_KEY" not in os.environ
+
+
+def test_pool_lends_each_pipeline_to_one_task_at_a_time():
+    created = []
+
+    def factory():
+        created.append(_FakePipeline("g", "d"))
+        return created[-1]
+
+    pool = drivers_license.DriversLicensePipelinePool(2, factory)
+    # 每个借到实例的任务都要等另一个任务也借到实例才归还，所以第二个实例必然被创建
+    both_checked_out = threading.Barrier(2, timeout=5)
+    active: dict[int, int] = {}
+    overlaps = []
+    lock = threading.Lock()
+
+    def task():
+        with pool.checkout() as (pipeline, _load_seconds):
+            with lock:
+                active[id(pipeline)] = active.get(id(pipeline), 0) + 1
+                overlaps.append(active[id(pipeline)])
+            both_checked_out.wait()
+            with lock:
+                active[id(pipeline)] -= 1
+
+    threads = [threading.Thread(target=task) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(overlaps) == 6 and max(overlaps) == 1
+    assert len(created) == 2
+
+
+def test_waiting_task_retries_after_another_build_fails():
+    building = threading.Event()
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            # 模拟启动预热时 TensorFlow 加载失败
+            building.set()
+            time.sleep(0.2)
+            raise ImportError("tensorflow")
+        return _FakePipeline("g", "d")
+
+    pool = drivers_license.DriversLicensePipelinePool(1, factory)
+    warm_up = threading.Thread(target=lambda: pytest.raises(ImportError, pool.warm_up))
+    warm_up.start()
+    assert building.wait(5)
+    borrowed = []
+
+    def task():
+        with pool.checkout() as (pipeline, load_seconds):
+            borrowed.append((pipeline, load_seconds))
+
+    waiter = threading.Thread(target=task, daemon=True)
+    waiter.start()
+    warm_up.join(5)
+    waiter.join(5)
+
+    assert not waiter.is_alive()
+    assert len(attempts) == 2 and isinstance(borrowed[0][0], _FakePipeline)
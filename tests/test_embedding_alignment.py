@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from app.service.embedding_alignment import (
+    _dp_align_embeddings_cellwise,
+    dp_align_embeddings,
+)
+
+
+def _parallel_vectors(rng, src_size: int, tgt_size: int, dimensions: int, noise: float):
+    base = rng.standard_normal((max(src_size, 1), dimensions)).astype(np.float32)
+    src = base[:src_size] + noise * rng.standard_normal((src_size, dimensions)).astype(np.float32)
+    mapping = np.minimum((np.arange(tgt_size) * max(src_size, 1) / max(tgt_size, 1)).astype(np.int64), len(base) - 1)
+    tgt = base[mapping] + noise * rng.standard_normal((tgt_size, dimensions)).astype(np.float32)
+    return src.astype(np.float32), tgt.astype(np.float32)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_banded_dp_matches_cellwise_reference(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(20):
+        src_size = int(rng.integers(0, 45))
+        tgt_size = int(rng.integers(0, 45))
+        src, tgt = _parallel_vectors(rng, src_size, tgt_size, int(rng.integers(1, 24)), float(rng.uniform(0, 2.5)))
+        if rng.random() < 0.3:
+            src[::3] = src[:1]
+        if rng.random() < 0.2:
+            src = -src
+        options = {
+            "band_ratio": float(rng.uniform(0.0, 0.4)),
+            "min_band": int(rng.integers(1, 9)),
+        }
+
+        assert dp_align_embeddings(src, tgt, **options) == _dp_align_embeddings_cellwise(src, tgt, **options)
+
+
+def test_banded_dp_matches_reference_when_end_is_unreachable():
+    # 极窄带宽 + 长短悬殊时终点常不可达，需走“最大可达格 + 尾部补齐”分支
+    rng = np.random.default_rng(7)
+    for _ in range(30):
+        src_size = int(rng.integers(1, 30)) * 5
+        tgt_size = int(rng.integers(1, 6))
+        src = rng.standard_normal((src_size, 2)).astype(np.float32)
+        tgt = rng.standard_normal((tgt_size, 2)).astype(np.float32)
+        for left, right in ((src, tgt), (tgt, src)):
+            expected = _dp_align_embeddings_cellwise(left, right, band_ratio=0.0, min_band=1)
+            assert dp_align_embeddings(left, right, band_ratio=0.0, min_band=1) == expected
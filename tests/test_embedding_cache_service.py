@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.service import embedding_cache_service, gemini_service
+from app.service.embedding_cache_service import EmbeddingVectorStore, embedding_text_hash
+
+
+@pytest.fixture
+def embedding_cache_dir(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "embedding_cache"
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE", "True")
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(gemini_service, "resolve_embedding_route", lambda _route=None: "aistudio")
+    monkeypatch.setattr(gemini_service, "_get_pooled_embedding_client", lambda _route, _timeout: object())
+    yield cache_dir
+    store = embedding_cache_service.get_embedding_vector_store()
+    if store is not None:
+        store.close()
+
+
+def _fake_vector(text: str, dimensions: int) -> list[float]:
+    rng = np.random.default_rng(abs(hash(text)) % (2**32))
+    vector = rng.standard_normal(dimensions).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).astype(float).tolist()
+
+
+def test_text_hash_ignores_whitespace_and_unicode_form():
+    assert embedding_text_hash("  Hello \n world ") == embedding_text_hash("Hello world")
+    assert embedding_text_hash("caf\u00e9") == embedding_text_hash("cafe\u0301")
+    assert embedding_text_hash("Hello world") != embedding_text_hash("hello world")
+
+
+def test_store_appends_rows_and_survives_reopen(tmp_path):
+    store = EmbeddingVectorStore(tmp_path)
+    store.store("m|4|T", 4, [("a", [1.0, 0.0, 0.0, 0.0]), ("b", [0.0, 1.0, 0.0, 0.0])])
+    store.store("m|4|T", 4, [("a", [9.0, 9.0, 9.0, 9.0]), ("c", [0.0, 0.0, 1.0, 0.0])])
+    store.close()
+
+    reopened = EmbeddingVectorStore(tmp_path)
+    try:
+        found = reopened.lookup("m|4|T", 4, ["a", "b", "c", "missing"])
+        assert found == {
+            "a": [1.0, 0.0, 0.0, 0.0],
+            "b": [0.0, 1.0, 0.0, 0.0],
+            "c": [0.0, 0.0, 1.0, 0.0],
+        }
+        assert reopened.lookup("m|8|T", 8, ["a"]) == {}
+    finally:
+        reopened.close()
+
+
+def test_embed_texts_only_sends_cache_misses(monkeypatch, embedding_cache_dir):
+    requested: list[list[str]] = []
+
+    def fake_embed_google_batch(*, texts, dimensions, **_kwargs):
+        requested.append(list(texts))
+        return [_fake_vector(text, dimensions) for text in texts]
+
+    monkeypatch.setattr(gemini_service, "_embed_google_batch", fake_embed_google_batch)
+    logs: list[str] = []
+
+    first = gemini_service.embed_texts(["alpha", "beta", "alpha"], dimensions=8, log_callback=logs.append)
+    second = gemini_service.embed_texts(
+        ["beta", " alpha ", "gamma"], dimensions=8, batch_size=1, log_callback=logs.append
+    )
+
+    assert requested == [["alpha", "beta"], ["gamma"]]
+    assert np.allclose(first[0], first[2])
+    assert np.allclose(second[0], first[1], atol=1e-7)
+    assert np.allclose(second[1], first[0], atol=1e-7)
+    assert "cache_hits=0/3 (0.0%)" in logs[0]
+    assert any("cache_hits=2/3 (66.7%)" in line for line in logs)
+
+    gemini_service.embed_texts(["alpha"], dimensions=16)
+    gemini_service.embed_texts(["alpha"], dimensions=8, task_type="RETRIEVAL_DOCUMENT")
+    gemini_service.embed_texts(["alpha"], dimensions=8, use_cache=False)
+    assert requested[2:] == [["alpha"], ["alpha"], ["alpha"]]
+
+
+def test_stores_sharing_a_directory_agree_on_row_numbers(tmp_path):
+    # 两个实例之间没有共享的内存状态，等同于两个进程共用缓存目录
+    first = EmbeddingVectorStore(tmp_path)
+    second = EmbeddingVectorStore(tmp_path)
+    try:
+        first.store("m|2|T", 2, [("a", [1.0, 0.0])])
+        second.store("m|2|T", 2, [("b", [0.0, 1.0])])
+        first.store("m|2|T", 2, [("c", [1.0, 1.0])])
+
+        expected = {"a": [1.0, 0.0], "b": [0.0, 1.0], "c": [1.0, 1.0]}
+        assert first.lookup("m|2|T", 2, ["a", "b", "c"]) == expected
+        assert second.lookup("m|2|T", 2, ["a", "b", "c"]) == expected
+    finally:
+        first.close()
+        second.close()
+
+
+def test_concurrent_writers_on_separate_stores_keep_index_consistent(tmp_path):
+    import threading
+
+    stores = [EmbeddingVectorStore(tmp_path) for _ in range(4)]
+    start = threading.Barrier(len(stores), timeout=5)
+
+    def write(worker: int, store: EmbeddingVectorStore) -> None:
+        start.wait()
+        for item in range(20):
+            store.store("m|2|T", 2, [(f"{worker}-{item}", [float(worker), float(item)])])
+
+    threads = [threading.Thread(target=write, args=(index, store)) for index, store in enumerate(stores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reader = EmbeddingVectorStore(tmp_path)
+    try:
+        keys = [f"{worker}-{item}" for worker in range(4) for item in range(20)]
+        found = reader.lookup("m|2|T", 2, keys)
+        assert found == {key: [float(part) for part in key.split("-")] for key in keys}
+    finally:
+        reader.close()
+        for store in stores:
+            store.close()
@@ -0,0 +1,197 @@
+import json
+import os
+import stat
+import sys
+import textwrap
+import threading
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.service import fixed_layout_docx_service as fixed_layout
+
+# 模拟 Chrome 的 DevTools 接口：HTTP 开关标签页 + 页面级 websocket；布局结果里带上进程 pid 与并发峰值
+_FAKE_BROWSER = textwrap.dedent(
+    """
+    import json, os, sys, threading, uuid
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from pathlib import Path
+    from urllib.parse import unquote
+    from websockets.sync.server import serve
+
+    PNG = "iVBORw0KGgoAAAANSUhEUgAAAAQAAAAECAIAAAAmkwkpAAAAFElEQVR4nGP8//8/AwwwMSAB3BwAlm4DBfIlvvkAAAAASUVORK5CYII="
+    profile = Path(next(arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--user-data-dir=")))
+    targets = {}
+    state = {"active": 0, "peak": 0}
+    lock = threading.Condition()
+
+    def handle(ws):
+        target_id = ws.request.path.rsplit("/", 1)[-1]
+        for message in ws:
+            request = json.loads(message)
+            result = {}
+            if request["method"] == "Runtime.evaluate":
+                value = True
+                if "PAGE_WIDTH" in request["params"]["expression"]:
+                    marker = os.environ.get("FAKE_BROWSER_CRASH_MARKER")
+                    if marker and "crash" in targets[target_id] and not os.path.exists(marker):
+                        Path(marker).write_text("x")
+                        os._exit(1)
+                    with lock:
+                        state["active"] += 1
+                        state["peak"] = max(state["peak"], state["active"])
+                        lock.notify_all()
+                        # 并发测试中先等到另一个标签页也在排版，保证两个标签页确实同时打开过
+                        if os.environ.get("FAKE_BROWSER_PAIR_UP"):
+                            lock.wait_for(lambda: state["peak"] >= 2, timeout=5)
+                    with lock:
+                        state["active"] -= 1
+                    text = f"{os.getpid()}|{targets[target_id]}|{state['peak']}"
+                    value = {"pages": [[{"text": text, "x": 10, "y": 10, "width": 100, "height": 20}]]}
+                result = {"result": {"value": value}}
+            elif request["method"] == "Page.captureScreenshot":
+                result = {"data": PNG}
+            ws.send(json.dumps({"id": request["id"], "result": result}))
+
+    ws_server = serve(handle, "127.0.0.1", 0)
+    ws_port = ws_server.socket.getsockname()[1]
+    threading.Thread(target=ws_server.serve_forever, daemon=True).start()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *_args):
+            pass
+
+        def reply(self, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.startswith("/json/close/"):
+                targets.pop(self.path.rsplit("/", 1)[-1], None)
+                self.reply("Target is closing")
+            elif self.path == "/json/list":
+                self.reply([{"id": key, "url": url} for key, url in targets.items()])
+            else:
+                self.reply({"Browser": "Fake"})
+
+        def do_PUT(self):
+            target_id = uuid.uuid4().hex
+            targets[target_id] = unquote(self.path.split("?", 1)[1])
+            self.reply({"id": target_id, "webSocketDebuggerUrl": f"ws://127.0.0.1:{ws_port}/devtools/page/{target_id}"})
+
+    http_server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    (profile / "DevToolsActivePort").write_text(f"{http_server.server_address[1]}\\n/devtools/browser/fake")
+    http_server.serve_forever()
+    """
+)
+
+
+@pytest.fixture
+def fake_browser(tmp_path, monkeypatch):
+    script = tmp_path / "fake-chrome"
+    script.write_text(f"#!{sys.executable}\n{_FAKE_BROWSER}", encoding="utf-8")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setattr(fixed_layout.settings, "FIXED_LAYOUT_BROWSERS", 1)
+    monkeypatch.setattr(fixed_layout.settings, "FIXED_LAYOUT_BROWSER_MAX_TABS", 2)
+    fixed_layout.shutdown_browser_pool()
+    yield str(script)
+    fixed_layout.shutdown_browser_pool()
+
+
+def _layout_text(tmp_path: Path, browser: str, name: str) -> list[str]:
+    html_file = tmp_path / f"{name}.html"
+    html_file.write_text("<html><body><p>x</p></body></html>", encoding="utf-8")
+    background_dir = tmp_path / f"{name}-bg"
+    background_dir.mkdir()
+    layout = fixed_layout._extract_browser_layout(
+        html_file=html_file,
+        background_dir=background_dir,
+        browser_path=browser,
+        page_width_px=fixed_layout.DEFAULT_PAGE_WIDTH_PX,
+        page_height_px=fixed_layout.DEFAULT_PAGE_HEIGHT_PX,
+    )
+    assert [path.name for path in layout.background_images] == ["page-1.png"]
+    return layout.pages[0][0].text.split("|")
+
+
+def _open_tabs(pool) -> list:
+    with urllib.request.urlopen(f"http://127.0.0.1:{pool._processes[0].port}/json/list", timeout=5) as response:
+        return json.loads(response.read())
+
+
+@pytest.mark.skipif(os.name == "nt", reason="模拟浏览器依赖 shebang 可执行脚本")
+def test_conversions_reuse_one_browser_and_recover_after_crash(tmp_path, fake_browser, monkeypatch):
+    # 浏览器只在打开 crash.html 时崩溃一次
+    monkeypatch.setenv("FAKE_BROWSER_CRASH_MARKER", str(tmp_path / "crashed"))
+    first_pid, first_url, _ = _layout_text(tmp_path, fake_browser, "a")
+    second_pid, second_url, _ = _layout_text(tmp_path, fake_browser, "b")
+    assert first_pid == second_pid
+    assert first_url.endswith("/a.html") and second_url.endswith("/b.html")
+    pool = fixed_layout.get_browser_pool(fake_browser)
+    assert _open_tabs(pool) == []
+
+    recovered_pid, recovered_url, _ = _layout_text(tmp_path, fake_browser, "crash")
+    assert (tmp_path / "crashed").exists()
+    assert recovered_pid != first_pid and recovered_url.endswith("/crash.html")
+
+
+@pytest.mark.skipif(os.name == "nt", reason="模拟浏览器依赖 shebang 可执行脚本")
+def test_concurrent_conversions_are_capped_by_max_tabs(tmp_path, fake_browser, monkeypatch):
+    monkeypatch.setenv("FAKE_BROWSER_PAIR_UP", "1")
+    results = []
+    threads = [
+        threading.Thread(target=lambda i=i: results.append(_layout_text(tmp_path, fake_browser, f"p{i}")))
+        for i in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 5
+    assert len({pid for pid, _, _ in results}) == 1
+    assert max(int(peak) for _, _, peak in results) == 2
+
+
+class _SlowStartingBrowser:
+    def __init__(self, started: bool, release: threading.Event):
+        self.started = started
+        self.release = release
+        self.tabs_opened = 0
+
+    def alive(self) -> bool:
+        return self.started
+
+    def stop(self) -> None:
+        self.started = False
+
+    def start(self) -> None:
+        assert self.release.wait(5)
+        self.started = True
+
+
+def test_restarting_browser_does_not_block_healthy_ones(tmp_path):
+    release = threading.Event()
+    pool = fixed_layout.BrowserPool(2, "unused", max_tabs=2, profile_root=tmp_path)
+    pool._processes = [_SlowStartingBrowser(False, release), _SlowStartingBrowser(True, release)]
+    restarting = threading.Thread(target=pool._acquire)
+    restarting.start()
+    for _ in range(500):
+        if pool._active[0]:
+            break
+        threading.Event().wait(0.01)
+
+    # 第 0 个浏览器还卡在启动中，第 1 个照常可用、可归还
+    index, browser = pool._acquire()
+    assert index == 1 and browser is pool._processes[1]
+    pool._release(index)
+    assert restarting.is_alive()
+    release.set()
+    restarting.join(5)
+    assert pool._processes[0].started and pool._active == [1, 0]
@@ -0,0 +1,180 @@
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.service import libreoffice_service
+
+# 与 libreoffice_uno_worker.py 相同的 JSON 行协议；“转换”即把输入复制为输出并写入本进程 pid
+_FAKE_BRIDGE = textwrap.dedent(
+    """
+    import json, os, subprocess, sys, time
+
+    def emit(payload):
+        sys.stdout.write(json.dumps(payload) + "\\n")
+        sys.stdout.flush()
+
+    if os.environ.get("FAKE_BRIDGE_FAIL_START"):
+        sys.stderr.write("ModuleNotFoundError: No module named 'uno'\\n")
+        sys.exit(1)
+    if os.environ.get("FAKE_BRIDGE_HANG_START"):
+        sys.stdin.read()
+        sys.exit(0)
+    office = subprocess.Popen(
+        [sys.executable, "-c", "import time; time.sleep(60)"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    emit({"ready": True, "pid": office.pid})
+    for line in sys.stdin:
+        request = json.loads(line)
+        if request.get("op") == "quit":
+            break
+        if request.get("op") == "convert":
+            if "crash" in request["input"]:
+                office.kill()
+                os._exit(3)
+            if "hang" in request["input"]:
+                # 模拟卡在 loadComponentFromURL：不再读 stdin，也就收不到 quit
+                with open(request["output"], "w", encoding="utf-8") as handle:
+                    handle.write(str(office.pid))
+                time.sleep(60)
+            if "broken" in request["input"]:
+                emit({"id": request["id"], "ok": False, "error": "IOException: 无法打开文档"})
+                continue
+            with open(request["output"], "w", encoding="utf-8") as handle:
+                handle.write(f"{os.getpid()}|{request['filter']}|{request['input_filter']}")
+        emit({"id": request["id"], "ok": True})
+    office.kill()
+    """
+)
+
+
+@pytest.fixture
+def fake_bridge(tmp_path, monkeypatch):
+    script = tmp_path / "fake_bridge.py"
+    script.write_text(_FAKE_BRIDGE, encoding="utf-8")
+    monkeypatch.setattr(libreoffice_service, "_UNO_WORKER_SCRIPT", script)
+    pools = []
+
+    def make_pool(**kwargs):
+        pool = libreoffice_service.LibreOfficeWorkerPool(
+            kwargs.pop("size", 1),
+            sys.executable,
+            sys.executable,
+            profile_root=tmp_path / "profiles",
+            **kwargs,
+        )
+        pools.append(pool)
+        return pool
+
+    yield make_pool
+    for pool in pools:
+        pool.shutdown()
+    libreoffice_service.shutdown_libreoffice_pool()
+
+
+def _source(tmp_path: Path, name: str) -> Path:
+    path = tmp_path / name
+    path.write_text("doc", encoding="utf-8")
+    return path
+
+
+def test_pool_reuses_warm_worker_and_restarts_after_crash(tmp_path, fake_bridge):
+    pool = fake_bridge()
+    outputs = []
+    for index in range(3):
+        output = tmp_path / f"out{index}.docx"
+        result = pool.convert(_source(tmp_path, f"in{index}.doc"), output, "MS Word 2007 XML")
+        assert result.returncode == 0
+        outputs.append(output.read_text(encoding="utf-8"))
+    pids = {text.split("|")[0] for text in outputs}
+    assert len(pids) == 1
+    assert outputs[0].endswith("|MS Word 2007 XML|")
+
+    failed = pool.convert(_source(tmp_path, "broken.doc"), tmp_path / "broken.docx", "MS Word 2007 XML")
+    assert failed.returncode == 1 and "无法打开文档" in failed.stderr
+
+    assert pool.convert(_source(tmp_path, "crash.doc"), tmp_path / "crash.docx", "MS Word 2007 XML") is None
+
+    output = tmp_path / "after.docx"
+    assert pool.convert(_source(tmp_path, "after.html"), output, "MS Word 2007 XML").returncode == 0
+    pid, _, input_filter = output.read_text(encoding="utf-8").split("|")
+    assert pid not in pids
+    assert input_filter == "HTML (StarWriter)"
+    assert list((tmp_path / "profiles").iterdir()) != []
+
+
+def test_worker_is_recycled_after_max_jobs(tmp_path, fake_bridge):
+    pool = fake_bridge(max_jobs_per_worker=2)
+    pids = []
+    for index in range(4):
+        output = tmp_path / f"out{index}.xlsx"
+        pool.convert(_source(tmp_path, f"in{index}.xls"), output, "Calc MS Excel 2007 XML")
+        pids.append(output.read_text(encoding="utf-8").split("|")[0])
+    assert pids[0] == pids[1] != pids[2] == pids[3]
+
+
+def test_start_failure_falls_back_to_command_line(tmp_path, fake_bridge, monkeypatch):
+    monkeypatch.setenv("FAKE_BRIDGE_FAIL_START", "1")
+    pool = fake_bridge()
+
+    assert pool.convert(_source(tmp_path, "a.doc"), tmp_path / "a.docx", "MS Word 2007 XML") is None
+    assert pool.available() is False
+
+
+def test_start_timeout_stops_bridge_process(tmp_path, fake_bridge, monkeypatch):
+    monkeypatch.setenv("FAKE_BRIDGE_HANG_START", "1")
+    monkeypatch.setattr(libreoffice_service, "_WORKER_START_TIMEOUT_SECONDS", 0.5)
+    worker = libreoffice_service._UnoConversionWorker(0, sys.executable, sys.executable, tmp_path / "profiles")
+
+    with pytest.raises(TimeoutError):
+        worker.start()
+    assert worker.alive() is False
+
+
+def _process_running(pid: int) -> bool:
+    # 孤儿进程被回收前是僵尸，按 /proc 状态判断而不是 os.kill(pid, 0)
+    try:
+        status = Path(f"/proc/{pid}/status").read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return False
+    return "\nState:\tZ" not in status
+
+
+@pytest.mark.skipif(not Path("/proc").is_dir(), reason="需要 /proc 检查进程状态")
+def test_hung_conversion_stops_soffice_with_bridge(tmp_path, fake_bridge, monkeypatch):
+    monkeypatch.setattr(libreoffice_service, "_WORKER_QUIT_TIMEOUT_SECONDS", 0.5)
+    pool = fake_bridge(timeout_seconds=1)
+    output = tmp_path / "hang.docx"
+
+    assert pool.convert(_source(tmp_path, "hang.doc"), output, "MS Word 2007 XML") is None
+    office_pid = int(output.read_text(encoding="utf-8"))
+    deadline = time.monotonic() + 5
+    while _process_running(office_pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _process_running(office_pid)
+
+
+def test_convert_helpers_dispatch_to_shared_pool(tmp_path, fake_bridge, monkeypatch):
+    monkeypatch.setattr(libreoffice_service.settings, "LIBREOFFICE_WORKERS", 1)
+    monkeypatch.setattr(libreoffice_service.settings, "LIBREOFFICE_UNO_PYTHON", sys.executable)
+
+    def unexpected_cli(*_args, **_kwargs):
+        raise AssertionError("常驻进程可用时不应启动 soffice 命令行")
+
+    monkeypatch.setattr(libreoffice_service.subprocess, "run", unexpected_cli)
+    source = _source(tmp_path, "report.doc")
+    output = libreoffice_service.convert_doc_to_docx_via_libreoffice(
+        source,
+        tmp_path / "converted" / "report.docx",
+        libreoffice_path=sys.executable,
+    )
+
+    assert Path(output).read_text(encoding="utf-8").endswith("|Office Open XML Text|")
+    assert libreoffice_service.get_libreoffice_worker_pool(sys.executable) is not None
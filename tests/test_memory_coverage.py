@@ -139,3 +139,30 @@ def test_final_repair_appended_rows_can_be_highlighted(monkeypatch, tmp_path):
     assert ws.cell(row=2, column=1).fill.start_color.rgb != f"00{repair_fill}"
     assert ws.cell(row=3, column=1).fill.start_color.rgb == f"00{repair_fill}"
     assert ws.cell(row=4, column=2).fill.start_color.rgb == f"00{repair_fill}"
+
+
+def test_coverage_skips_consumed_occurrences_and_keeps_leftmost_free_match():
+    consumer = memory_module.CoverageTextConsumer("A B\nA B\nA B")
+
+    second = consumer.find_match("A B")
+    consumer.consume({"ok": True, "start": 4, "end": 7})
+    first = consumer.find_match("A B")
+    consumer.consume(first)
+    third = consumer.find_match("AB")
+    consumer.consume(third)
+
+    assert (second["start"], second["end"]) == (0, 3)
+    assert (first["start"], first["end"], first["mode"]) == (0, 3, "exact")
+    assert (third["start"], third["end"], third["mode"]) == (8, 11, "whitespace")
+    assert consumer.find_match("A B") == {"ok": False, "mode": "already_consumed"}
+    assert consumer.remaining_text() == ""
+
+
+def test_coverage_whitespace_match_does_not_bridge_consumed_gap():
+    consumer = memory_module.CoverageTextConsumer("AB C​D")
+    consumer.consume({"ok": True, "start": 4, "end": 5})
+
+    assert consumer.find_match("ABCD") == {"ok": False, "mode": "already_consumed"}
+    match = consumer.find_match("AB C")
+    assert (match["start"], match["end"], match["actual"]) == (0, 4, "AB C")
+    assert consumer.remaining_text() == "AB C\nD"
@@ -0,0 +1,114 @@
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from memory import memory as memory_module
+from tests.concurrency_probe import ConcurrencyProbe
+
+
+def _fake_splitter(probe, failing=()):
+    routes = set()
+
+    def split(orig_text, trans_text, _model_id, _row_num, _source_lang="中文"):
+        with probe.track():
+            routes.add(memory_module.get_gemini_route())
+            if orig_text in failing:
+                raise RuntimeError("upstream error")
+            parts = orig_text.split(". ")
+            return [{"原文": part, "译文": f"{trans_text}#{i}"} for i, part in enumerate(parts)]
+
+    return split, routes
+
+
+def test_post_split_runs_candidates_concurrently_and_keeps_row_order(monkeypatch):
+    rows = [
+        {"原文": "Title", "译文": "标题"},
+        {"原文": "First one. First two.", "译文": "甲"},
+        {"原文": "Plain row", "译文": "普通"},
+        {"原文": "Second one. Second two.", "译文": "乙"},
+        {"原文": "Third one. Third two.", "译文": "丙"},
+    ]
+    # 3 个候选行同时在途才能越过探针屏障
+    probe = ConcurrencyProbe(3)
+    split, routes = _fake_splitter(probe)
+    monkeypatch.setattr(memory_module, "split_row_with_ai", split)
+    monkeypatch.setattr(memory_module, "POST_SPLIT_CONCURRENCY", 4)
+    monkeypatch.setattr(memory_module._gemini_route_local, "route", "vertex", raising=False)
+
+    result = memory_module.post_process_sentence_split(rows, "model", "英语", "中文")
+
+    assert [row["原文"] for row in result] == [
+        "Title", "First one", "First two.", "Plain row",
+        "Second one", "Second two.", "Third one", "Third two.",
+    ]
+    assert probe.peak == 3
+    assert routes == {"vertex"}
+
+
+def test_failed_cell_split_keeps_original_cell(monkeypatch):
+    cells = [
+        ("A1", "第一句。第二句。", "One. Two."),
+        ("A2", "单句", "Single"),
+        ("A3", "第三句。第四句。", "Three. Four."),
+    ]
+
+    def split_cell(orig_text, trans_text, _model_id, cell_ref, _source_lang="中文"):
+        if cell_ref == "A1":
+            raise RuntimeError("timeout")
+        return [{"原文": "第三句。", "译文": "Three."}, {"原文": "第四句。", "译文": "Four."}]
+
+    monkeypatch.setattr(memory_module, "split_table_cell_with_ai", split_cell)
+
+    rows, split_count = memory_module.split_table_cells_concurrently(cells, "model", "中文")
+
+    assert split_count == 1
+    assert rows == [
+        {"原文": "第一句。第二句。", "译文": "One. Two.", "来源": "A1"},
+        {"原文": "单句", "译文": "Single", "来源": "A2"},
+        {"原文": "第三句。", "译文": "Three.", "来源": "A3"},
+        {"原文": "第四句。", "译文": "Four.", "来源": "A3"},
+    ]
+
+
+def _drain_stream_queue() -> list[str]:
+    items = []
+    while not memory_module.log_manager.stream_queue.empty():
+        items.append(memory_module.log_manager.stream_queue.get_nowait())
+    return items
+
+
+def test_concurrent_jobs_flush_their_stream_output_in_one_piece():
+    _drain_stream_queue()
+    both_started = threading.Barrier(2, timeout=5)
+
+    def job(name):
+        memory_module.log_manager.log_stream(f"[{name}] 开始\n")
+        both_started.wait()
+        memory_module.log_manager.log_stream(f"[{name}] 结束\n")
+        return name
+
+    assert memory_module.run_ai_jobs_concurrently(["a", "b"], job, max_workers=2) == ["a", "b"]
+    assert sorted(_drain_stream_queue()) == ["[a] 开始\n[a] 结束\n", "[b] 开始\n[b] 结束\n"]
+
+
+def test_ai_split_limit_is_shared_across_concurrent_callers(monkeypatch):
+    monkeypatch.setattr(memory_module, "POST_SPLIT_CONCURRENCY", 2)
+    probe = ConcurrencyProbe(2)
+
+    def job(_item):
+        with probe.track():
+            pass
+
+    # 模拟两个分块同时做后处理分句，各自要 2 路并发
+    callers = [
+        threading.Thread(target=memory_module.run_ai_jobs_concurrently, args=([1, 2], job), kwargs={"max_workers": 2})
+        for _ in range(2)
+    ]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+
+    assert probe.peak == 2
@@ -1,11 +1,15 @@
 import inspect
+import random
 import sys
+import threading
+import time
 import types
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from app.service import number_check_service
+from tests.concurrency_probe import ConcurrencyProbe
 
 
 def test_number_check_service_uses_v2_specialist_root():
@@ -47,6 +51,9 @@ def test_v2_main_keeps_system_integration_contract(monkeypatch):
         "use_total_normalizer",
         "force_mode_b",
         "ai_check_all",
+        "ai_concurrency",
+        "ai_provider_rpm",
+        "progress_callback",
     }.issubset(parameters)
 
 
@@ -92,3 +99,133 @@ def test_docx_revised_output_is_initialized_before_v2_run(tmp_path, monkeypatch)
     revised_path = captured["revised_path"]
     assert result["corrected_docx"].endswith(revised_path.name)
     assert revised_path.read_bytes() == target_content
+
+
+def test_block_review_runs_blocks_concurrently_with_ordered_results_and_retries(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    number_check_service._load_latest_main_module()
+    block_review = sys.modules["block_review"]
+
+    blocks = [[(b * 10 + i, {"原文": str(i)}) for i in range(3)] for b in range(6)]
+    attempts = {}
+    # 前 3 块同时在途才能越过探针屏障
+    probe = ConcurrencyProbe(3)
+    lock = threading.Lock()
+
+    def fake_check(block):
+        first = block[0][0]
+        with lock:
+            attempts[first] = attempts.get(first, 0) + 1
+        with probe.track():
+            # 倒序完成，验证写回顺序与完成先后无关
+            time.sleep(0.02 * (6 - first // 10))
+        if first == 20 and attempts[first] == 1:
+            return [dict(block_review._PENDING_RESULT, _error_status="api_error") for _ in block]
+        if first == 30 and attempts[first] == 1:
+            raise TimeoutError("rate limited")
+        return [{"is_correct": True, "errors": [], "source_issues": [], "idx": idx} for idx, _ in block]
+
+    progress = []
+    ai_map = block_review.review_blocks(
+        blocks,
+        fake_check,
+        label="正文",
+        concurrency=3,
+        backoff=0.01,
+        progress_callback=lambda label, done, total: progress.append((label, done, total)),
+    )
+
+    assert list(ai_map) == [idx for block in blocks for idx, _ in block]
+    assert all(result["idx"] == idx for idx, result in ai_map.items())
+    assert attempts[20] == 2 and attempts[30] == 2 and attempts[0] == 1
+    assert probe.peak == 3
+    assert progress == [("正文", done, 6) for done in range(1, 7)]
+
+
+def test_block_review_rate_limiter_spaces_requests_per_provider(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    number_check_service._load_latest_main_module()
+    block_review = sys.modules["block_review"]
+
+    limiter = block_review.ProviderRateLimiter("deepseek=600, google=0")
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.acquire("deepseek/deepseek-v4-pro")
+    limited = time.monotonic() - started
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.acquire("google/gemini-3.5-flash")
+    unlimited = time.monotonic() - started
+
+    assert limited >= 0.29
+    assert unlimited < 0.05
+
+
+def test_extract_engine_span_set_matches_linear_overlap_scan(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    number_check_service._load_latest_main_module()
+    extract_engine = sys.modules["extract_engine"]
+
+    rng = random.Random(3)
+    for _ in range(200):
+        spans = extract_engine.SpanSet()
+        consumed = []
+        for _ in range(30):
+            start = rng.randint(0, 60)
+            end = start + rng.randint(0, 6)
+            expected = any(start < ce and end > cs for cs, ce in consumed)
+            assert spans.overlaps(start, end) == expected
+            if rng.random() < 0.6:
+                spans.add(start, end)
+                consumed.append((start, end))
+
+
+def test_extract_numbers_is_memoized_without_sharing_result_lists(monkeypatch):
+    monkeypatch.setenv("API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    number_check_service._load_latest_main_module()
+    normalizer_total = sys.modules["normalizer_total"]
+    extract = normalizer_total.extract_numbers
+    text = "单位：万元。2023年营业收入14.06万元，同比增长12.5%，第三季度（II）three point one four"
+
+    extract.cache_clear()
+    first = extract(text)
+    first.append("mutated")
+    second = extract(text)
+    no_roman = dict(normalizer_total.DEFAULT_STRATEGIES, roman=False)
+
+    assert second == extract.uncached(text, None) == ["RMB 10000", "2023", "RMB 140600", "12.5", "Q3", "2", "3.14"]
+    assert extract.cache_info().hits == 1
+    assert extract(text, no_roman) == ["RMB 10000", "2023", "RMB 140600", "12.5", "Q3", "3.14"]
+
+
+def test_task_log_writer_keeps_lines_from_concurrent_threads_whole(monkeypatch):
+    import io
+
+    monkeypatch.setitem(number_check_service._task_progress, "task-log", {"stream_log": ""})
+    writer = number_check_service._TaskLogWriter("task-log", io.StringIO())
+    # 每个线程先写半行，等所有线程都写了半行再补完，未加隔离时各线程的半行会拼到一起
+    halfway = threading.Barrier(4, timeout=5)
+
+    def emit(worker: int) -> None:
+        for item in range(20):
+            writer.write(f"线程{worker}-")
+            if item == 0:
+                halfway.wait()
+            writer.write(f"第{item}行\n")
+        writer.write(f"线程{worker}-收尾")
+
+    threads = [threading.Thread(target=emit, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+
+    lines = number_check_service._task_progress["task-log"]["stream_log"].splitlines()
+    expected = {f"线程{worker}-第{item}行" for worker in range(4) for item in range(20)}
+    expected |= {f"线程{worker}-收尾" for worker in range(4)}
+    assert len(lines) == len(expected) and set(lines) == expected
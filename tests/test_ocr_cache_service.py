@@ -0,0 +1,118 @@
+import base64
+
+import fitz
+import pytest
+
+import pdf2docx as pdf2docx_module
+from app.core.config import settings
+from app.service import ocr_cache_service
+from app.service.ocr_cache_service import OcrResultCache, build_ocr_cache_key
+
+
+@pytest.fixture
+def ocr_cache_path(tmp_path, monkeypatch):
+    cache_path = tmp_path / "ocr_cache.sqlite3"
+    monkeypatch.setattr(settings, "OCR_CACHE", "True")
+    monkeypatch.setattr(settings, "OCR_CACHE_PATH", str(cache_path))
+    monkeypatch.setattr(settings, "OCR_CACHE_MAX_MB", 16)
+    monkeypatch.setattr(settings, "OCR_ROUTE_MIN_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(pdf2docx_module, "_route_is_available", lambda _route: True)
+    yield cache_path
+    cache = ocr_cache_service.get_ocr_result_cache()
+    if cache is not None:
+        cache.close()
+
+
+def test_cache_key_depends_on_image_model_and_prompt_version():
+    base = build_ocr_cache_key(b"image", "model-a", "v1")
+
+    assert base == build_ocr_cache_key(b"image", "model-a", "v1")
+    assert base != build_ocr_cache_key(b"image2", "model-a", "v1")
+    assert base != build_ocr_cache_key(b"image", "model-b", "v1")
+    assert base != build_ocr_cache_key(b"image", "model-a", "v2")
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = OcrResultCache(tmp_path / "cache.sqlite3", max_bytes=25)
+    try:
+        cache.put("a", "x" * 10)
+        cache.put("b", "y" * 10)
+        assert cache.get("a") == "x" * 10
+        cache.put("c", "z" * 10)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "x" * 10
+        assert cache.get("c") == "z" * 10
+        assert cache.stats()["size_bytes"] == 20
+    finally:
+        cache.close()
+
+
+def test_ocr_file_reuses_cached_pages_across_runs(tmp_path, monkeypatch, ocr_cache_path):
+    pdf_path = tmp_path / "scan.pdf"
+    pdf = fitz.open()
+    for index in range(3):
+        page = pdf.new_page()
+        page.insert_text((72, 72), f"Page {index + 1}")
+    pdf.save(pdf_path)
+    pdf.close()
+
+    calls: list[bytes] = []
+
+    def fake_generate_vision_html(*, image_bytes, **_kwargs):
+        calls.append(image_bytes)
+        return f"<p>page {len(calls)}</p>"
+
+    monkeypatch.setattr(pdf2docx_module, "generate_vision_html", fake_generate_vision_html)
+
+    first = pdf2docx_module.ocr_file(str(pdf_path), return_metadata=True, max_concurrency=1)
+    second = pdf2docx_module.ocr_file(str(pdf_path), return_metadata=True, max_concurrency=1)
+
+    assert len(calls) == 3
+    assert first["cache"] == {"enabled": True, "hits": 0, "misses": 3}
+    assert second["cache"] == {"enabled": True, "hits": 3, "misses": 0}
+    assert second["text"] == first["text"]
+
+    uncached = pdf2docx_module.ocr_file(str(pdf_path), return_metadata=True, use_cache=False)
+    assert len(calls) == 6
+    assert uncached["cache"] == {"enabled": False, "hits": 0, "misses": 0}
+
+
+def test_failed_ocr_is_not_cached(monkeypatch, ocr_cache_path):
+    image_b64 = base64.standard_b64encode(b"not really an image").decode("utf-8")
+    cache = ocr_cache_service.get_ocr_result_cache()
+
+    def failing_generate_vision_html(**_kwargs):
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(pdf2docx_module, "generate_vision_html", failing_generate_vision_html)
+    monkeypatch.setattr(pdf2docx_module, "_build_ocr_attempt_plan", lambda *_args: [
+        {"route": "openrouter", "model": "model-a", "retries": 1}
+    ])
+
+    with pytest.raises(RuntimeError):
+        pdf2docx_module._ocr_single_image(image_b64, "image/png", "model-a", cache=cache)
+    assert cache.stats()["entries"] == 0
+
+
+def test_fallback_result_is_cached_under_the_model_that_produced_it(monkeypatch, ocr_cache_path):
+    image_bytes = b"not really an image"
+    image_b64 = base64.standard_b64encode(image_bytes).decode("utf-8")
+    cache = ocr_cache_service.get_ocr_result_cache()
+
+    def generate_vision_html(*, model, **_kwargs):
+        if model == "model-a":
+            raise RuntimeError("upstream down")
+        return "<html><body>light</body></html>"
+
+    monkeypatch.setattr(pdf2docx_module, "generate_vision_html", generate_vision_html)
+    monkeypatch.setattr(pdf2docx_module, "_build_ocr_attempt_plan", lambda *_args: [
+        {"route": "openrouter", "model": "model-a", "retries": 1},
+        {"route": "openrouter", "model": "model-light", "retries": 1},
+    ])
+
+    result = pdf2docx_module._ocr_single_image(image_b64, "image/png", "model-a", cache=cache)
+    assert result == "<html><body>light</body></html>"
+    prompt_version = pdf2docx_module.SYS_PROMPT_VERSION
+    assert cache.get(build_ocr_cache_key(image_bytes, "model-a", prompt_version)) is None
+    assert cache.get(build_ocr_cache_key(image_bytes, "model-light", prompt_version)) == result
@@ -0,0 +1,86 @@
+import os
+import time
+
+import anyio
+import pytest
+
+from app.service.specialist_worker_pool import SpecialistJobSpec, SpecialistWorkerPool
+
+_task_progress = {}
+_warmed_pid = None
+
+FAKE_JOB = SpecialistJobSpec(
+    kind="fake",
+    module=__name__,
+    function="fake_specialist_job",
+    warm_up="fake_warm_up",
+)
+
+
+def fake_warm_up():
+    global _warmed_pid
+    _warmed_pid = os.getpid()
+
+
+def fake_specialist_job(*, task_id, hold_seconds=0.0, fail=False):
+    _task_progress[task_id]["stream_log"] += "\n[worker] started"
+    _task_progress[task_id].update(progress=50, message="halfway", updated_at=time.time())
+    time.sleep(hold_seconds)
+    if fail:
+        raise ValueError(f"broken input for {task_id}")
+    _task_progress[task_id].update(progress=100, message="done", updated_at=time.time())
+    return {"task_id": task_id, "pid": os.getpid(), "warmed_pid": _warmed_pid}
+
+
+@pytest.fixture
+def fake_pool():
+    pool = SpecialistWorkerPool(FAKE_JOB, max_workers=2)
+    yield pool
+    pool.shutdown()
+
+
+def test_jobs_run_in_parallel_warm_workers_and_stream_progress(fake_pool):
+    for task_id in ("a", "b"):
+        _task_progress[task_id] = {"progress": 5, "message": "saved uploads", "stream_log": "[parent] queued"}
+    fake_pool.warm_up()
+    seen_midway = []
+
+    async def scenario():
+        results = {}
+
+        async def run(task_id):
+            results[task_id] = await fake_pool.run(task_id, {"hold_seconds": 2.0})
+
+        async def watch():
+            with anyio.fail_after(10):
+                while _task_progress["a"]["progress"] != 50:
+                    await anyio.sleep(0.05)
+            seen_midway.append(_task_progress["a"]["stream_log"])
+
+        started = time.perf_counter()
+        async with anyio.create_task_group() as group:
+            group.start_soon(run, "a")
+            group.start_soon(run, "b")
+            group.start_soon(watch)
+        return results, time.perf_counter() - started
+
+    results, elapsed = anyio.run(scenario)
+
+    assert results["a"]["pid"] != results["b"]["pid"]
+    assert all(item["pid"] == item["warmed_pid"] != os.getpid() for item in results.values())
+    assert elapsed < 3.8
+    assert seen_midway == ["[parent] queued\n[worker] started"]
+    assert _task_progress["a"]["progress"] == 100
+    assert _task_progress["b"]["message"] == "done"
+
+
+def test_worker_errors_are_raised_in_parent_with_final_progress(fake_pool):
+    _task_progress["c"] = {"progress": 0, "message": "queued", "stream_log": ""}
+
+    async def scenario():
+        await fake_pool.run("c", {"fail": True})
+
+    with pytest.raises(ValueError, match="broken input for c"):
+        anyio.run(scenario)
+    assert _task_progress["c"]["progress"] == 50
+    assert _task_progress["c"]["stream_log"].endswith("[worker] started")
@@ -0,0 +1,186 @@
+import io
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import anyio
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import UploadFile
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db.database import Base
+from app.model.entity import Task
+from app.repository import task_repo
+from app.service import task_queue_service as queue_module
+
+
+def _build_test_service(tmp_path, monkeypatch):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'tasks.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    testing_session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(queue_module, "SessionLocal", testing_session)
+    monkeypatch.setattr(queue_module.settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    return queue_module.TaskQueueService(), testing_session
+
+
+def _create_queued_task(db, task_type, minutes, *, input_files_json='{"input_path": "x"}'):
+    task = task_repo.create_task(
+        db,
+        task_id=f"{task_type}-{minutes}",
+        task_type=task_type,
+        filename=f"{task_type}.bin",
+        input_files_json=input_files_json,
+    )
+    task.created_at = datetime(2026, 1, 1) + timedelta(minutes=minutes)
+    db.commit()
+    return task.task_id
+
+
+def test_ready_index_is_rebuilt_from_db_and_claims_in_fifo_order(tmp_path, monkeypatch):
+    service, testing_session = _build_test_service(tmp_path, monkeypatch)
+    with testing_session() as db:
+        _create_queued_task(db, "pdf_merge", 3)
+        _create_queued_task(db, "pdf_tools", 1)
+        _create_queued_task(db, "msg_convert", 2)
+        _create_queued_task(db, "word_count", 0, input_files_json="{}")
+
+    service._rebuild_ready_index()
+    claimed = [service._claim_next_dispatchable_task() for _ in range(4)]
+
+    assert [row.task_id if row else None for row in claimed] == ["pdf_tools-1", "msg_convert-2", "pdf_merge-3", None]
+    with testing_session() as db:
+        statuses = {task.task_id: task.status for task in db.query(Task).all()}
+    assert statuses == {
+        "pdf_tools-1": "running",
+        "msg_convert-2": "running",
+        "pdf_merge-3": "running",
+        "word_count-0": "queued",
+    }
+
+
+def test_busy_task_type_does_not_block_other_types(tmp_path, monkeypatch):
+    service, testing_session = _build_test_service(tmp_path, monkeypatch)
+    with testing_session() as db:
+        for minute in range(50):
+            _create_queued_task(db, "word_count", minute)
+        _create_queued_task(db, "pdf_merge", 100)
+    service._rebuild_ready_index()
+    service._reserve_task_slot("running-word-count", "word_count")
+
+    claimed = service._claim_next_dispatchable_task()
+
+    assert claimed.task_id == "pdf_merge-100"
+    assert service._claim_next_dispatchable_task() is None
+    service._release_task_slot("running-word-count")
+    assert service._claim_next_dispatchable_task().task_id == "word_count-0"
+
+
+def test_cancelled_tasks_are_skipped(tmp_path, monkeypatch):
+    service, testing_session = _build_test_service(tmp_path, monkeypatch)
+    with testing_session() as db:
+        _create_queued_task(db, "pdf_tools", 0)
+        _create_queued_task(db, "pdf_tools", 1)
+        _create_queued_task(db, "pdf_tools", 2)
+    service._rebuild_ready_index()
+
+    with testing_session() as db:
+        task_repo.cancel_task(db, "pdf_tools-0")
+        task_repo.cancel_task(db, "pdf_tools-1")
+    # 只有一条经过取消接口从内存移除；另一条依赖认领语句里的 cancel_requested 条件
+    service.forget_ready_task("pdf_tools-0")
+
+    assert service._claim_next_dispatchable_task().task_id == "pdf_tools-2"
+    assert service._claim_next_dispatchable_task() is None
+
+
+def test_submitted_task_enters_ready_index(tmp_path, monkeypatch):
+    service, _testing_session = _build_test_service(tmp_path, monkeypatch)
+
+    async def scenario():
+        return await service.submit_pdf2docx_task(
+            file=UploadFile(filename="a.pdf", file=io.BytesIO(b"pdf")),
+            model="model-a",
+            gemini_route="openrouter",
+        )
+
+    submitted = anyio.run(scenario)
+
+    assert service._ready_task_types == {submitted.task_id: "pdf2docx"}
+    claimed = service._claim_next_dispatchable_task()
+    assert claimed.task_id == submitted.task_id
+    assert claimed.task_type == "pdf2docx"
+
+
+def test_progress_writer_coalesces_updates_and_keeps_terminal_state(tmp_path, monkeypatch):
+    service, testing_session = _build_test_service(tmp_path, monkeypatch)
+    with testing_session() as db:
+        _create_queued_task(db, "pdf_tools", 0)
+        _create_queued_task(db, "pdf_tools", 1)
+    service._rebuild_ready_index()
+    service._claim_next_dispatchable_task()
+    service._claim_next_dispatchable_task()
+    writer = service._progress_writer
+
+    for index in range(100):
+        writer.record("pdf_tools-0", index, f"step {index}")
+    writer.record("pdf_tools-1", 40, "halfway")
+    with testing_session() as db:
+        task_repo.complete_task(db, "pdf_tools-1")
+
+    assert service.get_task_status("pdf_tools-0")["progress"] == 99
+    assert writer.flush() == 2
+    assert writer.flush() == 0
+    with testing_session() as db:
+        first = task_repo.get_task_by_task_id(db, "pdf_tools-0")
+        second = task_repo.get_task_by_task_id(db, "pdf_tools-1")
+        assert (first.progress, first.message) == (99, "step 99")
+        assert (second.status, second.progress) == ("done", 100)
+
+
+def test_running_task_sees_in_memory_cancel_flag(tmp_path, monkeypatch):
+    service, testing_session = _build_test_service(tmp_path, monkeypatch)
+    monkeypatch.setattr(queue_module.settings, "TASK_QUEUE_RESYNC_INTERVAL_SECONDS", 60)
+    monkeypatch.setattr(queue_module.settings, "SPECIALIST_WORKER_PROCESSES", 0)
+    with testing_session() as db:
+        _create_queued_task(db, "pdf_tools", 0)
+    reached_after_cancel = []
+
+    async def fake_execute_pdf_tools(task_id, display_no, input_files, params, update):
+        await update(10, "started")
+        started.set()
+        await resume.wait()
+        await update(50, "should stop here")
+        reached_after_cancel.append(True)
+        return {}
+
+    monkeypatch.setattr(service, "_execute_pdf_tools", fake_execute_pdf_tools)
+    monkeypatch.setattr(service, "_get_missing_input_fields", lambda *_args: [])
+
+    async def scenario():
+        await service.start()
+        try:
+            with anyio.fail_after(5):
+                await started.wait()
+            assert service.get_task_status("pdf_tools-0")["progress"] == 10
+            with testing_session() as db:
+                task_repo.cancel_task(db, "pdf_tools-0")
+            service.request_cancel("pdf_tools-0")
+            resume.set()
+            with anyio.fail_after(5):
+                while "pdf_tools-0" in service._running_tasks:
+                    await anyio.sleep(0.01)
+        finally:
+            await service.stop()
+
+    started = queue_module.asyncio.Event()
+    resume = queue_module.asyncio.Event()
+    anyio.run(scenario)
+
+    assert reached_after_cancel == []
+    with testing_session() as db:
+        assert task_repo.get_task_by_task_id(db, "pdf_tools-0").status == "cancelled"
@@ -0,0 +1,89 @@
+import json
+import re
+import sys
+from pathlib import Path
+
+from docx import Document
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.service.docx_structured_translation import translate_docx_preserving_format
+from app.service.translation_memory_service import TranslationMemory
+
+
+def _write_docx(path: Path, paragraphs: list[str]) -> Path:
+    document = Document()
+    for text in paragraphs:
+        document.add_paragraph(text)
+    document.save(str(path))
+    return path
+
+
+class _FakeLLM:
+    def __init__(self):
+        self.requested: list[str] = []
+
+    def __call__(self, messages, _require_json):
+        payload = json.loads(re.search(r"输入：\n(.*?)\n\n输出格式", messages[1]["content"], re.S).group(1))
+        translations = {}
+        for item in payload["sentences"]:
+            self.requested.append(item["source_text"])
+            translations[item["sentence_id"]] = {
+                "source_hash": item["source_hash"],
+                "target_text": f"EN<{item['source_text']}>",
+            }
+        return json.dumps({"translations": translations}, ensure_ascii=False)
+
+
+def _translate(source: Path, output: Path, llm, memory, rules=""):
+    return translate_docx_preserving_format(
+        source,
+        output,
+        source_language="中文",
+        target_language="英文",
+        call_llm=llm,
+        translation_rules=rules,
+        translation_memory=memory.scoped(
+            source_lang="zh", target_lang="en", engine="deepseek-chat", translation_rules=rules
+        ),
+    )
+
+
+def test_repeated_sentences_skip_llm_and_only_misses_are_sent(tmp_path):
+    memory = TranslationMemory(tmp_path / "tm.sqlite3", max_bytes=0)
+    first_llm = _FakeLLM()
+    v1 = _write_docx(tmp_path / "v1.docx", ["第一条 甲方负责付款。", "第二条 乙方负责交付。"])
+    first = _translate(v1, tmp_path / "v1_en.docx", first_llm, memory)
+    assert (first.memory_hits, first.memory_misses) == (0, 2)
+    assert len(first_llm.requested) == 2
+
+    second_llm = _FakeLLM()
+    v2 = _write_docx(
+        tmp_path / "v2.docx",
+        ["第一条  甲方负责付款。", "第二条 乙方负责交付。", "第三条 争议提交仲裁。"],
+    )
+    second = _translate(v2, tmp_path / "v2_en.docx", second_llm, memory)
+    assert (second.memory_hits, second.memory_misses) == (2, 1)
+    assert second_llm.requested == ["第三条 争议提交仲裁。"]
+    output_text = [paragraph.text for paragraph in Document(str(tmp_path / "v2_en.docx")).paragraphs]
+    assert output_text == ["EN<第一条 甲方负责付款。>", "EN<第二条 乙方负责交付。>", "EN<第三条 争议提交仲裁。>"]
+
+    # 规则不同视为不同记忆
+    third_llm = _FakeLLM()
+    third = _translate(v1, tmp_path / "v1_rules.docx", third_llm, memory, rules="甲方译为 Party A")
+    assert third.memory_hits == 0 and len(third_llm.requested) == 2
+
+
+def test_export_import_shares_memory_between_stores(tmp_path):
+    source = TranslationMemory(tmp_path / "a.sqlite3", max_bytes=0)
+    scope = dict(source_lang="zh", target_lang="en", engine="deepseek-chat", rules_hash="r1")
+    source.store([("合同 生效。", "The contract takes effect."), ("  ", "ignored")], **scope)
+    source.store([("合同 生效。", "Le contrat entre en vigueur.")], **{**scope, "target_lang": "fr"})
+
+    exported = tmp_path / "tm.jsonl"
+    assert source.export_jsonl(exported, target_lang="en") == 1
+
+    target = TranslationMemory(tmp_path / "b.sqlite3", max_bytes=0)
+    assert target.import_jsonl(exported) == 1
+    assert target.lookup(["合同\n生效。", "未翻译"], **scope) == {"合同 生效。": "The contract takes effect."}
+    assert target.lookup(["合同 生效。"], **{**scope, "target_lang": "fr"}) == {}
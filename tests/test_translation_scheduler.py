@@ -0,0 +1,104 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.rate_limit import TokenBudget, parse_provider_limits
+from app.service import doc_translate_service, translation_scheduler
+from app.service.translation_scheduler import TranslationJob, run_translation_jobs
+from tests.concurrency_probe import ConcurrencyProbe
+
+
+def test_jobs_run_concurrently_and_failed_job_is_requeued_without_blocking_others():
+    # 前 4 个作业同时在途才能越过探针屏障
+    probe = ConcurrencyProbe(4)
+    lock = threading.Lock()
+    calls = {}
+
+    def make_job(index):
+        def run():
+            with lock:
+                calls[index] = calls.get(index, 0) + 1
+                attempt = calls[index]
+            with probe.track():
+                if index == 0 and attempt == 1:
+                    raise TimeoutError("超时")
+                return f"译文{index}"
+
+        return TranslationJob(key=("en", index), provider="deepseek", run=run)
+
+    progress = []
+    results = run_translation_jobs(
+        [make_job(index) for index in range(8)],
+        concurrency=4,
+        retry_backoff_seconds=0.2,
+        progress_callback=lambda done, total: progress.append((done, total)),
+    )
+
+    assert results == {("en", index): f"译文{index}" for index in range(8)}
+    assert probe.peak == 4
+    assert calls[0] == 2
+    assert progress[-1] == (8, 8)
+    # 失败的作业退避期间其它作业照常完成，重试的作业最后才完成
+    assert [done for done, _ in progress] == list(range(1, 9))
+    assert list(results)[-1] == ("en", 0)
+
+
+def test_job_failing_every_attempt_raises_after_retries():
+    def run():
+        raise ConnectionError("连接被重置")
+
+    with pytest.raises(RuntimeError, match="已重试 2 次"):
+        run_translation_jobs(
+            [TranslationJob(key="a", provider="gemini", run=run)],
+            retries=2,
+            retry_backoff_seconds=0,
+        )
+
+
+def test_token_budget_blocks_when_minute_quota_is_spent(monkeypatch):
+    assert parse_provider_limits("DeepSeek=60, gemini=0, bad") == {"deepseek": 60.0}
+    budget = TokenBudget()
+    assert budget.acquire("deepseek", 600, tokens_per_minute=600) == 0
+    sleeps = []
+    monkeypatch.setattr("app.core.rate_limit.time.sleep", sleeps.append)
+    waited = budget.acquire("deepseek", 100, tokens_per_minute=600)
+    assert waited == pytest.approx(10, rel=0.05)
+    assert sleeps and sleeps[0] == pytest.approx(10, rel=0.05)
+
+
+def test_multi_language_chunks_are_translated_in_one_batch_and_reassembled(monkeypatch):
+    monkeypatch.setattr(doc_translate_service, "DOC_TRANSLATE_CHUNK_SIZE", 40)
+    monkeypatch.setattr(translation_scheduler.settings, "DOC_TRANSLATE_PROVIDER_RPM", "")
+    monkeypatch.setattr(translation_scheduler.settings, "DOC_TRANSLATE_PROVIDER_TPM", "")
+    seen_prompts = []
+
+    def fake_request(chunk_text, *, system_prompt, **_kwargs):
+        seen_prompts.append(system_prompt)
+        return chunk_text.replace("页", "page")
+
+    monkeypatch.setattr(doc_translate_service, "_request_chunk_translation", fake_request)
+    text = "<page_break/>".join(f"第{index}页：" + "原文" * 12 for index in range(3))
+
+    slots_by_lang = {}
+    jobs = []
+    for lang in ("en", "ja"):
+        slots, lang_jobs = doc_translate_service._plan_text_translation(
+            text,
+            key=(lang, 0),
+            source_lang="zh",
+            target_lang=lang,
+            translation_engine="deepseek-chat",
+        )
+        slots_by_lang[lang] = slots
+        jobs.extend(lang_jobs)
+
+    assert len(jobs) == 6
+    results = run_translation_jobs(jobs, concurrency=6)
+    for lang, slots in slots_by_lang.items():
+        translated = doc_translate_service._assemble_text_translation(slots, results)
+        assert [part.split("：")[0] for part in translated.split("\n\n")] == ["第0page", "第1page", "第2page"]
+    assert len(seen_prompts) == 6
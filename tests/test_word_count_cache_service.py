@@ -0,0 +1,102 @@
+import json
+import os
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.service import word_count_cache_service, word_count_service
+from app.service.word_count_cache_service import WordCountResultCache, build_word_count_cache_key
+
+
+@pytest.fixture
+def word_count_root(tmp_path, monkeypatch):
+    root = tmp_path / "share"
+    root.mkdir()
+    monkeypatch.setattr(settings, "WORD_COUNT_ALLOWED_ROOTS_JSON", json.dumps([str(root)]))
+    monkeypatch.setattr(settings, "WORD_COUNT_UNC_MOUNT_MAP_JSON", "")
+    monkeypatch.setattr(settings, "WORD_COUNT_ALLOW_LOCAL_PATHS", "False")
+    monkeypatch.setattr(settings, "OUTPUT_DIR", str(tmp_path / "outputs"))
+    monkeypatch.setattr(settings, "WORD_COUNT_CACHE", "True")
+    monkeypatch.setattr(settings, "WORD_COUNT_CACHE_PATH", str(tmp_path / "word_count_cache.sqlite3"))
+    yield root
+    cache = word_count_cache_service.get_word_count_result_cache()
+    if cache is not None:
+        cache.close()
+
+
+def _key(**overrides):
+    fields = {
+        "resolved_path": "/share/a.docx",
+        "size_bytes": 10,
+        "mtime_ns": 1,
+        "content_sha256": "",
+        "rules_version": "v1",
+        "options": {"ocr_enabled": False},
+    }
+    fields.update(overrides)
+    return build_word_count_cache_key(**fields)
+
+
+def test_cache_key_depends_on_file_identity_rules_and_options():
+    base = _key()
+
+    assert base == _key()
+    assert base != _key(size_bytes=11)
+    assert base != _key(mtime_ns=2)
+    assert base != _key(content_sha256="abc")
+    assert base != _key(rules_version="v2")
+    assert base != _key(options={"ocr_enabled": True})
+
+
+def test_cache_evicts_by_age_and_total_size(tmp_path):
+    cache = WordCountResultCache(tmp_path / "cache.sqlite3", max_bytes=40, max_age_seconds=3600)
+    try:
+        cache.put("a", {"v": "x" * 10})
+        cache.put("b", {"v": "y" * 10})
+        assert cache.get("a") == {"v": "x" * 10}
+        cache.put("c", {"v": "z" * 10})
+        assert cache.get("b") is None
+
+        old = time.time() - 7200
+        cache._connection().execute("UPDATE word_count_result SET last_access = ? WHERE cache_key = 'a'", (old,))
+        assert cache.get("a") is None
+        assert cache.get("c") == {"v": "z" * 10}
+        assert cache.stats()["entries"] == 1
+    finally:
+        cache.close()
+
+
+def test_unchanged_files_are_served_from_cache(word_count_root):
+    for index in range(3):
+        (word_count_root / f"note{index}.txt").write_text(f"第{index}份说明 sample text {index}", encoding="utf-8")
+
+    def run(display_no):
+        return word_count_service.run_word_count_task_sync(
+            task_id=f"task-{display_no}",
+            display_no=display_no,
+            directory_path=str(word_count_root),
+            recursive=True,
+            include_hidden=False,
+            extensions=[".txt"],
+        )
+
+    first = run("000201")
+    second = run("000202")
+
+    assert first["summary"]["cache_hit_files"] == 0
+    assert second["summary"]["cache_hit_files"] == 3
+    assert [item["cache_hit"] for item in second["files"]] == [True, True, True]
+    strip = lambda report: [
+        {key: value for key, value in item.items() if key not in {"counted_at", "cache_hit"}} for item in report["files"]
+    ]
+    assert strip(second) == strip(first)
+    assert second["source_details"] == first["source_details"]
+
+    changed = word_count_root / "note1.txt"
+    changed.write_text("改过的内容 changed text", encoding="utf-8")
+    os.utime(changed, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+    third = run("000203")
+
+    assert [item["cache_hit"] for item in third["files"]] == [True, False, True]
+    assert third["files"][1]["main_word_count"] != first["files"][1]["main_word_count"]
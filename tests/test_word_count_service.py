@@ -1,5 +1,8 @@
+import dataclasses
 import io
 import json
+import random
+import re
 import sys
 from pathlib import Path
 from types import SimpleNamespace
@@ -52,6 +55,11 @@ def _set_docx_app_props(path: Path, updates: dict[str, str]) -> None:
     temp_path.rename(path)
 
 
+@pytest.fixture(autouse=True)
+def _isolated_word_count_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(word_count_service.settings, "WORD_COUNT_CACHE_PATH", str(tmp_path / "word_count_cache.sqlite3"))
+
+
 def _allow_root(monkeypatch, root: Path):
     monkeypatch.setattr(word_count_service.settings, "WORD_COUNT_ALLOWED_ROOTS_JSON", json.dumps([str(root)]))
     monkeypatch.setattr(word_count_service.settings, "WORD_COUNT_UNC_MOUNT_MAP_JSON", "")
@@ -233,6 +241,83 @@ def test_word_like_counter_handles_edge_punctuation():
     assert word_count_service.count_words_word_like("中文…") == 3
 
 
+def _reference_count_text(text: str) -> dict:
+    """逐字符参考实现（单遍查表引擎之前的算法），用于对拍。"""
+    wcs = word_count_service
+
+    def walk(segment):
+        counts = {field: 0 for field in wcs.SCRIPT_COUNT_FIELDS}
+        index = 0
+        while index < len(segment):
+            char = segment[index]
+            cjk_field = wcs._cjk_script_field(char)
+            if cjk_field:
+                counts[cjk_field] += 1
+                index += 1
+                continue
+            if wcs._is_token_char(char):
+                token, index = wcs._consume_word_like_token(segment, index)
+                counts[wcs._token_count_field(token)] += 1
+                continue
+            previous_char = segment[index - 1] if index > 0 else ""
+            next_char = segment[index + 1] if index + 1 < len(segment) else ""
+            if wcs._is_word_count_cjk_punctuation(char, previous_char, next_char):
+                counts["cjk_punct_count"] += 1
+            index += 1
+        return counts
+
+    def candidates(is_selected):
+        parts = re.split(r"([\t\r\n]+)", text)
+        segments, separators = parts[::2], parts[1::2]
+        selected = [is_selected(walk(segment)) for segment in segments]
+        no_spaces = sum(sum(1 for c in seg if not c.isspace()) for seg, ok in zip(segments, selected) if ok)
+        with_spaces = sum(len(seg) for seg, ok in zip(segments, selected) if ok)
+        with_spaces += sum(len(sep) for i, sep in enumerate(separators) if selected[i] and selected[i + 1])
+        return no_spaces, with_spaces
+
+    def cjk_count(counts):
+        return counts["han_count"] + counts["kana_count"] + counts["hangul_count"]
+
+    def word_tokens(counts, fields):
+        return sum(counts[field] for field in fields)
+
+    non_cjk_fields = [
+        field for field in wcs.SCRIPT_COUNT_FIELDS
+        if field not in {"han_count", "kana_count", "hangul_count", "cjk_punct_count", "number_token_count"}
+    ]
+    latin_fields = ["latin_word_count", "mixed_latin_number_count"]
+    other_fields = [field for field in non_cjk_fields if field not in latin_fields]
+    counts = walk(text)
+    cjk = candidates(lambda c: cjk_count(c) > 0 and cjk_count(c) >= word_tokens(c, non_cjk_fields))
+    latin = candidates(lambda c: word_tokens(c, latin_fields) > cjk_count(c) + word_tokens(c, other_fields))
+    return {
+        "word_count": sum(counts.values()),
+        "non_space_chars": sum(1 for char in text if not char.isspace()),
+        "raw_chars": len(text),
+        "cjk_char_count_no_spaces": cjk[0],
+        "cjk_char_count_with_spaces": cjk[1],
+        "latin_char_count_no_spaces": latin[0],
+        "latin_char_count_with_spaces": latin[1],
+        **counts,
+    }
+
+
+def test_table_driven_counter_matches_per_character_reference():
+    alphabet = list(
+        "abcXYZé0129²½ \t\r\n\u3000\x0b'’-_./“”‘—–…·。，！？（）【】、：；©$%中文漢字〇かなカナーﾊ한국어ПриветΑλφαשלוםสวัสดีمرحبا"
+    ) + ["𠀀", "😀", "Ａ", "１"]
+    rng = random.Random(20261017)
+    samples = [
+        "",
+        "“中文”",
+        "It’s a test’s case — 中文’s",
+        "型号：XR-200/B\t规格：3.5mm\n\nModel XR-200/B",
+    ] + ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 30))) for _ in range(3000)]
+
+    for sample in samples:
+        assert dataclasses.asdict(word_count_service._count_text(sample)) == _reference_count_text(sample), repr(sample)
+
+
 def test_ocr_markup_to_plain_text_removes_html_and_markdown():
     raw = """# 标题
 
@@ -507,6 +592,81 @@ def test_office_pdf_txt_and_blank_pdf_statuses(tmp_path, monkeypatch):
     assert result["summary"]["total_image_count"] >= 2
 
 
+def test_parallel_word_count_matches_serial_order(tmp_path, monkeypatch):
+    root = tmp_path / "share"
+    for folder in ("a", "b"):
+        (root / folder).mkdir(parents=True)
+        for index in range(3):
+            (root / folder / f"note{index}.txt").write_text(
+                f"{folder} 第{index}份说明 sample text {index}\n日本語のテキスト", encoding="utf-8"
+            )
+        document = Document()
+        document.add_paragraph(f"{folder} 报告正文 report body")
+        document.sections[0].header.paragraphs[0].text = f"{folder} 页眉"
+        document.save(root / folder / "report.docx")
+    _allow_root(monkeypatch, root)
+    monkeypatch.setattr(word_count_service.settings, "OUTPUT_DIR", str(tmp_path / "outputs"))
+    monkeypatch.setattr(word_count_service, "PARALLEL_COUNT_MIN_FILES", 2)
+    monkeypatch.setattr(word_count_service.settings, "WORD_COUNT_CACHE", "False")
+
+    def run(workers: int, display_no: str, messages: list[str]) -> dict:
+        monkeypatch.setattr(word_count_service.settings, "WORD_COUNT_PROCESS_WORKERS", workers)
+        return word_count_service.run_word_count_task_sync(
+            task_id=f"task-{display_no}",
+            display_no=display_no,
+            directory_path=str(root),
+            recursive=True,
+            include_hidden=False,
+            extensions=[".txt", ".docx"],
+            progress_callback=lambda _progress, message: messages.append(message),
+        )
+
+    def comparable(report: dict) -> dict:
+        files = [{key: value for key, value in item.items() if key != "counted_at"} for item in report["files"]]
+        return {
+            "files": files,
+            "source_details": report["source_details"],
+            "language_exports": [(item["language"], item["fragment_count"]) for item in report["language_exports"]],
+        }
+
+    serial_messages: list[str] = []
+    parallel_messages: list[str] = []
+    serial = run(1, "000101", serial_messages)
+    parallel = run(2, "000102", parallel_messages)
+
+    assert len(parallel["files"]) == 8
+    assert comparable(parallel) == comparable(serial)
+    assert any(message.startswith("正在统计 8/8") for message in serial_messages)
+    assert any(message.startswith("已统计 8/8") for message in parallel_messages)
+
+
+def test_parallel_fallback_keeps_reporting_ocr_progress(tmp_path, monkeypatch):
+    image_path = tmp_path / "scan.png"
+    _make_png(image_path)
+    calls: list[str] = []
+
+    def count_file(file_path, options):
+        calls.append(file_path.name)
+        if len(calls) == 1:
+            raise RuntimeError("worker crashed")
+        options["ocr_status_callback"]("正在识别")
+        return {"file": file_path.name}, [], None, []
+
+    monkeypatch.setattr(word_count_service, "_count_file_with_fragments", count_file)
+    messages: list[str] = []
+    outcomes = word_count_service._count_candidates_in_parallel(
+        [image_path],
+        {"ocr_enabled": True, "converted_dir": str(tmp_path / "converted")},
+        process_workers=1,
+        ocr_workers=1,
+        progress_callback=lambda _progress, message: messages.append(message),
+    )
+
+    assert calls == ["scan.png", "scan.png"]
+    assert outcomes == [({"file": "scan.png"}, [], None, [])]
+    assert "scan.png: 正在识别" in messages
+
+
 def test_ocr_auto_mode_depends_on_input_kind(tmp_path, monkeypatch):
     _allow_root(monkeypatch, tmp_path)
     image_path = tmp_path / "scan.png"
@@ -625,6 +785,8 @@ def test_mixed_pdf_only_ocrs_scanned_page(tmp_path, monkeypatch):
 
     def fake_extract_ocr_plain_text(**kwargs):
         captured.update(kwargs)
+        # 页码由文本层探测边扫描边产出，需在调用期间消费
+        captured["page_numbers"] = list(kwargs["page_numbers"])
         return {
             "text": "扫描页 Scan",
             "total_pages": 2,
@@ -646,13 +808,68 @@ def test_mixed_pdf_only_ocrs_scanned_page(tmp_path, monkeypatch):
     )
 
     file_result = result["files"][0]
-    assert list(captured["page_numbers"]) == [2]
+    assert captured["page_numbers"] == [2]
+    assert captured["pdf_document"] is not None
     assert file_result["status"] == "counted"
     assert file_result["ocr_page_count"] == 1
     assert file_result["main_word_count"] == 8
     assert file_result["source_counts"] == {"pdf_page": 1, "pdf_ocr_page": 1}
 
 
+def test_pdf_probe_streams_scanned_pages_to_ocr_before_scan_finishes(tmp_path, monkeypatch):
+    import threading
+
+    import fitz
+
+    _allow_root(monkeypatch, tmp_path)
+    monkeypatch.setattr(word_count_service.settings, "OUTPUT_DIR", str(tmp_path / "outputs"))
+    monkeypatch.setattr(word_count_service.settings, "OCR_CACHE", "False")
+    monkeypatch.setattr(word_count_service.settings, "OCR_PAGE_CONCURRENCY", 2)
+
+    pdf_path = tmp_path / "streaming.pdf"
+    pdf = fitz.open()
+    for index in range(6):
+        page = pdf.new_page()
+        if index not in (1, 3):
+            page.insert_text((72, 72), f"Text layer page {index + 1}")
+    pdf.save(pdf_path)
+    pdf.close()
+
+    first_ocr_started = threading.Event()
+    seen_before_last_probe = {}
+    ocr_threads = set()
+    original_coverage = word_count_service._max_pdf_page_image_coverage
+
+    def probing_coverage(page):
+        # 扫描到最后一页时，第 2 页的 OCR 应已在工作线程中开始
+        if page.number == 5:
+            seen_before_last_probe["started"] = first_ocr_started.wait(timeout=5)
+        return original_coverage(page)
+
+    def fake_ocr(_img_b64, _mime_type, _model, **_kwargs):
+        ocr_threads.add(threading.current_thread().name)
+        first_ocr_started.set()
+        return "<p>扫描 Scan</p>"
+
+    monkeypatch.setattr(word_count_service, "_max_pdf_page_image_coverage", probing_coverage)
+    monkeypatch.setattr(pdf2docx_module, "_ocr_single_image", fake_ocr)
+    result = word_count_service.run_word_count_task_sync(
+        task_id="task-streaming-pdf",
+        display_no="000-streaming-pdf",
+        directory_path=str(pdf_path),
+        recursive=True,
+        include_hidden=False,
+        extensions=[".pdf"],
+    )
+
+    file_result = result["files"][0]
+    assert seen_before_last_probe == {"started": True}
+    assert all(name.startswith("ocr-page") for name in ocr_threads)
+    assert file_result["status"] == "counted"
+    assert file_result["ocr_page_count"] == 2
+    assert file_result["source_counts"] == {"pdf_page": 4, "pdf_ocr_page": 2}
+
+
 def test_partial_ocr_failure_is_excluded_but_text_is_kept(tmp_path, monkeypatch):
     _allow_root(monkeypatch, tmp_path)
     monkeypatch.setattr(word_count_service.settings, "OUTPUT_DIR", str(tmp_path / "outputs"))
@@ -723,6 +940,117 @@ def test_pdf2docx_ocr_supports_selected_pages_and_image_frames(tmp_path, monkeyp
     assert len(pdf2docx_module._image_frames_for_ocr(str(gif_path))) == 1
 
 
+def _write_pages_of_distinct_widths(pdf_path, count: int) -> None:
+    import fitz
+
+    pdf = fitz.open()
+    for page_no in range(1, count + 1):
+        pdf.new_page(width=100 + 10 * page_no, height=100)
+    pdf.save(pdf_path)
+    pdf.close()
+
+
+def _ocr_page_number(img_b64: str) -> int:
+    import base64
+
+    from PIL import Image
+
+    # 每页宽度不同，按渲染图宽度反推页码，不依赖识别调用的先后顺序
+    with Image.open(io.BytesIO(base64.standard_b64decode(img_b64))) as image:
+        return round((image.width / 1.5 - 100) / 10)
+
+
+def test_pdf2docx_ocr_runs_pages_concurrently_and_keeps_page_order(tmp_path, monkeypatch):
+    import threading
+
+    pdf_path = tmp_path / "pages.pdf"
+    _write_pages_of_distinct_widths(pdf_path, 5)
+
+    # 前三页必须同时在识别才能越过屏障；第 1 页等第 3 页返回后才返回，确认结果仍按页码汇总
+    first_three_in_flight = threading.Barrier(3, timeout=5)
+    third_page_done = threading.Event()
+    calls: list[int] = []
+    lock = threading.Lock()
+
+    def fake_ocr(img_b64, _mime_type, _model, **_kwargs):
+        page_no = _ocr_page_number(img_b64)
+        with lock:
+            calls.append(page_no)
+        if page_no <= 3:
+            first_three_in_flight.wait()
+        if page_no == 1:
+            assert third_page_done.wait(5)
+        if page_no == 3:
+            third_page_done.set()
+        if page_no == 4:
+            raise RuntimeError("boom")
+        return f"<p>page {page_no}</p>"
+
+    progress: list[int] = []
+    monkeypatch.setattr(pdf2docx_module, "_ocr_single_image", fake_ocr)
+    payload = pdf2docx_module.ocr_file(
+        str(pdf_path),
+        return_metadata=True,
+        continue_on_error=True,
+        max_concurrency=3,
+        page_progress_callback=lambda page_no, _total: progress.append(page_no),
+    )
+
+    assert sorted(calls) == [1, 2, 3, 4, 5]
+    assert progress == [1, 2, 3, 4, 5]
+    assert [item["page_number"] for item in payload["page_results"]] == [1, 2, 3, 4, 5]
+    assert payload["failed_pages"] == [4]
+    assert payload["text"].split("\n\n<page_break/>\n\n") == [
+        "<p>page 1</p>",
+        "<p>page 2</p>",
+        "<p>page 3</p>",
+        "<p>page 5</p>",
+    ]
+
+    def serial_ocr(img_b64, *_args, **_kwargs):
+        calls.append(_ocr_page_number(img_b64))
+        if calls[-1] == 4:
+            raise RuntimeError("boom")
+        return "<p>ok</p>"
+
+    calls.clear()
+    monkeypatch.setattr(pdf2docx_module, "_ocr_single_image", serial_ocr)
+    with pytest.raises(RuntimeError, match="boom"):
+        pdf2docx_module.ocr_file(str(pdf_path), max_concurrency=1)
+    assert calls == [1, 2, 3, 4]
+
+
+def test_pdf2docx_ocr_failure_waits_for_pages_in_flight(tmp_path, monkeypatch):
+    import threading
+    import time
+
+    pdf_path = tmp_path / "pages.pdf"
+    _write_pages_of_distinct_widths(pdf_path, 3)
+    all_in_flight = threading.Barrier(3, timeout=5)
+    finished: list[int] = []
+    statuses: list[str] = []
+
+    def fake_ocr(img_b64, _mime_type, _model, status_callback=None, **_kwargs):
+        page_no = _ocr_page_number(img_b64)
+        all_in_flight.wait()
+        if page_no == 1:
+            raise RuntimeError("boom")
+        time.sleep(0.2)
+        status_callback("仍在识别")
+        finished.append(page_no)
+        return "<p>ok</p>"
+
+    monkeypatch.setattr(pdf2docx_module, "_ocr_single_image", fake_ocr)
+    with pytest.raises(RuntimeError, match="boom"):
+        pdf2docx_module.ocr_file(str(pdf_path), max_concurrency=3, ocr_status_callback=statuses.append)
+
+    # 失败返回时在途页面已经结束，之后不会再有识别请求或状态回调
+    assert sorted(finished) == [2, 3]
+    assert len(statuses) == 2
+    time.sleep(0.3)
+    assert len(statuses) == 2
+
+
 def test_directory_must_be_inside_allowed_roots(tmp_path, monkeypatch):
     allowed = tmp_path / "allowed"
     outside = tmp_path / "outside"
@@ -0,0 +1,83 @@
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.service import zhongfanyi_service
+from tests.concurrency_probe import ConcurrencyProbe
+
+
+def _load_zhongfanyi_main(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    zhongfanyi_service._prepare_zhongfanyi_import_path()
+    import zhongfanyi.main as zhongfanyi_main
+
+    return zhongfanyi_main
+
+
+def _error(value, context, suggestion):
+    return {"译文数值": value, "译文上下文": context, "译文修改建议值": suggestion}
+
+
+class _FakeMatcher:
+    """按块返回固定结果；各块耗时不同使其乱序完成，第 2 块首调失败。"""
+
+    def __init__(self, delays, payloads, fail_once=(), probe=None):
+        self.delays = delays
+        self.payloads = payloads
+        self.fail_once = set(fail_once)
+        self.lock = threading.Lock()
+        self.probe = probe or ConcurrencyProbe()
+
+    def compare_texts(self, orig_chunk, trans_chunk, rule_text):
+        with self.lock:
+            should_fail = orig_chunk in self.fail_once
+            self.fail_once.discard(orig_chunk)
+        with self.probe.track():
+            time.sleep(self.delays[orig_chunk])
+            if should_fail:
+                raise TimeoutError("upstream timeout")
+            return json.dumps(self.payloads[orig_chunk], ensure_ascii=False)
+
+
+def test_all_parts_are_compared_concurrently_and_merged_in_chunk_order(monkeypatch):
+    main = _load_zhongfanyi_main(monkeypatch)
+    chunk_executor = sys.modules["llm_check.chunk_executor"]
+    monkeypatch.setattr(chunk_executor, "DEFAULT_BASE_DELAY", 0.05)
+    body_pairs = [(f"body-{i}", f"trans-{i}") for i in range(1, 5)]
+    monkeypatch.setattr(
+        main,
+        "split_text_pair",
+        lambda orig, tran: body_pairs if orig == "BODY" else [(orig, tran)],
+    )
+    shared = _error("10 million", "overlap context", "100 million")
+    matcher = _FakeMatcher(
+        delays={"body-1": 0.3, "body-2": 0.05, "body-3": 0.2, "body-4": 0.1, "HEADER": 0.1},
+        payloads={
+            "body-1": [_error("5%", "rate rose 5%", "6%"), shared],
+            "body-2": [shared, _error("2019", "in 2019", "2020")],
+            "body-3": [],
+            "body-4": [_error("same", "unchanged", "same")],
+            "HEADER": [_error("Q3", "Q3 report", "Q4")],
+        },
+        fail_once={"body-2"},
+        # 全部 5 个块同时在途才能越过探针屏障
+        probe=ConcurrencyProbe(5),
+    )
+
+    results = main._compare_parts(
+        matcher,
+        [("正文", "BODY", "TRANS"), ("页眉", "HEADER", "HEADER-T"), ("页脚", "", "")],
+        "rules",
+        False,
+        chunk_concurrency=5,
+    )
+
+    assert [item["译文数值"] for item in results["正文"]] == ["5%", "10 million", "2019"]
+    assert [item["错误编号"] for item in results["正文"]] == ["1", "2", "3"]
+    assert results["页眉"] == [_error("Q3", "Q3 report", "Q4")]
+    assert results["页脚"] == []
+    assert matcher.probe.peak == 5
@@ -0,0 +1,79 @@
+"""
+分块对比并发执行器
+
+一篇文档的正文/页眉/页脚各自切块后，所有块互不依赖，统一在这里并发调用 LLM：
+  - 同时在途的调用数由 concurrency 控制（默认读环境变量 ZHONGFANYI_CHUNK_CONCURRENCY，缺省 6）
+  - 调用失败按指数退避重试（base_delay * 2^attempt），退避期间用 asyncio.sleep 让出并发名额，
+    不占用线程，其他块照常执行
+  - 返回值与输入 jobs 一一对应（顺序与完成先后无关）；重试耗尽的块返回 None
+"""
+import asyncio
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_CONCURRENCY = 6
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BASE_DELAY = 10.0
+
+
+def resolve_concurrency(concurrency=None) -> int:
+    if concurrency:
+        return max(1, int(concurrency))
+    try:
+        return max(1, int(os.getenv("ZHONGFANYI_CHUNK_CONCURRENCY", "") or DEFAULT_CONCURRENCY))
+    except ValueError:
+        return DEFAULT_CONCURRENCY
+
+
+async def _run_one(loop, executor, semaphore, call, tag, args, max_retries, base_delay):
+    for attempt in range(max_retries + 1):
+        async with semaphore:
+            try:
+                return await loop.run_in_executor(executor, lambda: call(*args))
+            except Exception as e:
+                error = e
+        if attempt < max_retries:
+            wait = base_delay * (2 ** attempt) * (1 + random.random() * 0.2)
+            print(f"      ⚠️ {tag} 第 {attempt + 1} 次调用失败: {error}")
+            print(f"      ⏳ {tag} 等待 {wait:.1f} 秒后重试（不阻塞其他块）...")
+            await asyncio.sleep(wait)
+        else:
+            print(f"      ❌ {tag} 调用 API 失败（已重试 {max_retries} 次）: {error}")
+            print(f"      ⚠️ 跳过该块，继续处理剩余块")
+    return None
+
+
+async def _run_all(call, jobs, concurrency, max_retries, base_delay):
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    done = 0
+    total = len(jobs)
+
+    async def _tracked(tag, args):
+        nonlocal done
+        result = await _run_one(loop, executor, semaphore, call, tag, args, max_retries, base_delay)
+        done += 1
+        print(f"      ✓ {tag} 完成（{done}/{total}）")
+        return result
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="zfy-chunk") as executor:
+        return await asyncio.gather(*(_tracked(tag, args) for tag, args in jobs))
+
+
+def run_chunk_jobs(call, jobs, concurrency=None, max_retries=DEFAULT_MAX_RETRIES, base_delay=None):
+    """
+    并发执行 call(*args)。
+
+    Args:
+        call: 同步调用，如 matcher.compare_texts
+        jobs: [(tag, args_tuple), ...]，tag 仅用于日志
+    Returns:
+        list — 与 jobs 等长，失败的块为 None
+    """
+    if not jobs:
+        return []
+    concurrency = min(resolve_concurrency(concurrency), len(jobs))
+    base_delay = DEFAULT_BASE_DELAY if base_delay is None else base_delay
+    print(f"  🚀 共 {len(jobs)} 块并发对比（并发 {concurrency}）")
+    return asyncio.run(_run_all(call, jobs, concurrency, max_retries, base_delay))
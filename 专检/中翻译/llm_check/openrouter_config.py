@@ -7,6 +7,8 @@ from openai import OpenAI
 
 DEFAULT_OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 
+_model_name_override: str | None = None
+
 
 def _load_project_env() -> None:
     """加载项目根目录 .env，兼容从模块目录直接运行脚本的情况。"""
@@ -47,5 +49,11 @@ def create_openrouter_client() -> OpenAI:
     return OpenAI(api_key=api_key, base_url=base_url)
 
 
+def set_model_name_override(model_name: str | None) -> None:
+    """由调用方按次指定模型（常驻子进程内串行执行任务时使用），优先于环境变量。"""
+    global _model_name_override
+    _model_name_override = model_name or None
+
+
 def get_model_name(default_model: str) -> str:
-    return os.getenv("ZHONGFANYI_MODEL_NAME") or default_model
+    return _model_name_override or os.getenv("ZHONGFANYI_MODEL_NAME") or default_model
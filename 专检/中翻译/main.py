@@ -22,6 +22,7 @@ from utils.txt_files import write_txt_with_timestamp
 from parsers.excel.excel装载 import ExcelReportGenerator
 from parsers.pptx.pptx_parser import parse_pptx
 from divide.text_splitter import split_text_pair, split_bilingual_text, _count_chars
+from llm_check.chunk_executor import run_chunk_jobs
 
 # 如果不想用命令行参数，可以直接修改下面的变量
 USE_AI_RULE_CONFIG = False  # 👈 改为 True 使用 AI 生成规则
@@ -151,110 +152,86 @@ def _fix_suggestion_overlap(context: str, anchor: str, suggestion: str) -> str:
 
     return actual_sug
 
-def _compare_with_split(matcher, orig_txt, tran_txt, rule_text, name):
-    """对一组原文/译文文本进行分块对比，合并结果。
-
-    如果文本较短则直接对比；较长则自动分割为对齐的块，
-    逐块调用 LLM，最后合并去重返回完整结果列表。
+def _plan_part_chunks(orig_txt, tran_txt, name, bilingual):
+    """把一个部分（正文/页眉/页脚）切成待对比的块。
 
     Returns:
-        list[dict] — 始终返回解析后的错误列表（可能为空列表）
+        (chunk_args, split) — chunk_args 为 [(块序号, compare_texts 的文本参数), ...]，
+        已跳过空块；split 表示是否走了分块（短文本直接整段对比）
     """
-    from parsers.json.clean_json import parse_json_content
-    import time
+    if bilingual:
+        chunks = split_bilingual_text(orig_txt)
+        if len(chunks) <= 1:
+            print(f"  📄 {name}文本较短（{len(orig_txt)} 字符），直接对比")
+            return [(1, (orig_txt,))], False
+        print(f"  📄 {name}文本较长（{len(orig_txt)} 字符），分割为 {len(chunks)} 块进行对比")
+        pairs = [(chunk,) for chunk in chunks]
+    else:
+        pairs = split_text_pair(orig_txt, tran_txt)
+        if len(pairs) <= 1:
+            print(f"  📄 {name}文本较短（{_count_chars(orig_txt)} 字），直接对比")
+            return [(1, (orig_txt, tran_txt))], False
+        print(f"  📄 {name}文本较长（原文 {_count_chars(orig_txt)} 字），分割为 {len(pairs)} 块进行对比")
+
+    chunk_args = []
+    for i, texts in enumerate(pairs, 1):
+        if not all(text.strip() for text in texts):
+            print(f"      ⚠️ {name} 第 {i}/{len(pairs)} 块内容为空，跳过")
+            continue
+        chunk_args.append((i, texts))
+    return chunk_args, True
 
-    pairs = split_text_pair(orig_txt, tran_txt)
-    num_parts = len(pairs)
 
-    if num_parts <= 1:
-        print(f"  📄 {name}文本较短（{_count_chars(orig_txt)} 字），直接对比")
-        raw = None
-        for attempt in range(3):
-            try:
-                raw = matcher.compare_texts(orig_txt, tran_txt, rule_text)
-                break
-            except Exception as e:
-                if attempt < 2:
-                    wait = (attempt + 1) * 10
-                    print(f"  ⚠️ 调用失败: {e}，{wait}秒后重试...")
-                    time.sleep(wait)
-                else:
-                    print(f"  ❌ 调用 API 失败（已重试 2 次）: {e}")
-        if raw:
-            parsed, status = parse_json_content(raw)
-            if isinstance(parsed, list):
-                if status == "parse_error":
-                    _warn_empty_parse(raw, indent="  ")
-                elif status == "no_error":
-                    print("  ✅ 模型确认：该段落无翻译问题")
-                return parsed
-            return []
+def _parse_chunk_result(raw, indent, ok_message):
+    from parsers.json.clean_json import parse_json_content
+
+    if not raw:
         return []
+    parsed, status = parse_json_content(raw)
+    if not isinstance(parsed, list):
+        return []
+    if status == "parse_error":
+        _warn_empty_parse(raw, indent=indent)
+    elif status == "no_error":
+        print(f"{indent}✅ {ok_message}")
+    return parsed
+
 
-    print(f"  📄 {name}文本较长（原文 {_count_chars(orig_txt)} 字），分割为 {num_parts} 块进行对比")
+def _merge_chunk_errors(name, chunk_results):
+    """按块顺序合并各块结果：修正建议值重叠、过滤无效建议，并按 (译文数值, 译文上下文[:50]) 去重。
 
+    chunk_results: [(块序号, 原始返回或 None), ...]，须已按块序号排好
+    """
     all_errors = []
     seen_keys = set()
 
-    for i, (orig_chunk, trans_chunk) in enumerate(pairs, 1):
-        print(f"\n  --- {name} 第 {i}/{num_parts} 块 ---")
-        print(f"      原文块: {_count_chars(orig_chunk)} 字, 译文块: {_count_chars(trans_chunk)} 字")
-
-        if not orig_chunk.strip() or not trans_chunk.strip():
-            print(f"      ⚠️ 块内容为空，跳过")
-            continue
-
-        max_retries = 2
-        chunk_result = None
-        for attempt in range(max_retries + 1):
-            try:
-                chunk_result = matcher.compare_texts(orig_chunk, trans_chunk, rule_text)
-                break
-            except Exception as e:
-                if attempt < max_retries:
-                    wait = (attempt + 1) * 10
-                    print(f"      ⚠️ 第 {i} 块第 {attempt + 1} 次调用失败: {e}")
-                    print(f"      ⏳ 等待 {wait} 秒后重试...")
-                    time.sleep(wait)
-                else:
-                    print(f"      ❌ 第 {i} 块调用 API 失败（已重试 {max_retries} 次）: {e}")
-                    print(f"      ⚠️ 跳过该块，继续处理剩余块")
-                    chunk_result = None
-
-        chunk_count = 0
-        if chunk_result:
-            parsed, status = parse_json_content(chunk_result)
-            if isinstance(parsed, list):
-                if status == "parse_error":
-                    _warn_empty_parse(chunk_result, indent="      ")
-                elif status == "no_error":
-                    print(f"      ✅ 模型确认：第 {i} 块无翻译问题")
-                chunk_count = len(parsed)
-                for item in parsed:
-                    dedup_key = (
-                        (item.get("译文数值") or "").strip(),
-                        (item.get("译文上下文") or "").strip()[:50]
-                    )
-                    tran_val = (item.get("译文数值") or "").strip()
-                    tran_sug = (item.get("译文修改建议值") or "").strip()
-                    context = (item.get("译文上下文") or "").strip()
-                    # 方案B：先修正重叠，再统一过滤
-                    fixed = _fix_suggestion_overlap(context, tran_val, tran_sug)
-                    if fixed != tran_sug:
-                        print(f"      ⚙ 建议值修正: '{tran_sug}' → '{fixed}'")
-                        tran_sug = fixed
-                        item["译文修改建议值"] = fixed
-                    if not tran_sug or tran_sug == tran_val:
-                        print(f"      ⊘ 过滤: 建议值无效或与原文一致 '{tran_val}'，跳过")
-                        print(f"         原始数据: {item}")
-                        continue
-                    if dedup_key not in seen_keys:
-                        seen_keys.add(dedup_key)
-                        all_errors.append(item)
-                    else:
-                        print(f"      ⚠️ 去重: '{dedup_key[0]}' (缓冲区重叠)")
+    for i, raw in chunk_results:
+        parsed = _parse_chunk_result(raw, "      ", f"模型确认：{name}第 {i} 块无翻译问题")
+        for item in parsed:
+            dedup_key = (
+                (item.get("译文数值") or "").strip(),
+                (item.get("译文上下文") or "").strip()[:50]
+            )
+            tran_val = (item.get("译文数值") or "").strip()
+            tran_sug = (item.get("译文修改建议值") or "").strip()
+            context = (item.get("译文上下文") or "").strip()
+            # 方案B：先修正重叠，再统一过滤
+            fixed = _fix_suggestion_overlap(context, tran_val, tran_sug)
+            if fixed != tran_sug:
+                print(f"      ⚙ 建议值修正: '{tran_sug}' → '{fixed}'")
+                tran_sug = fixed
+                item["译文修改建议值"] = fixed
+            if not tran_sug or tran_sug == tran_val:
+                print(f"      ⊘ 过滤: 建议值无效或与原文一致 '{tran_val}'，跳过")
+                print(f"         原始数据: {item}")
+                continue
+            if dedup_key not in seen_keys:
+                seen_keys.add(dedup_key)
+                all_errors.append(item)
+            else:
+                print(f"      ⚠️ 去重: '{dedup_key[0]}' (缓冲区重叠)")
 
-        print(f"      ✓ 本块发现 {chunk_count} 个问题，累计 {len(all_errors)} 个")
+        print(f"      ✓ {name}第 {i} 块发现 {len(parsed)} 个问题，累计 {len(all_errors)} 个")
 
     print(f"\n  📊 {name}合并完成: 共 {len(all_errors)} 个不重复问题")
 
@@ -264,114 +241,59 @@ def _compare_with_split(matcher, orig_txt, tran_txt, rule_text, name):
     return all_errors
 
 
-def _compare_bilingual_with_split(matcher, text, rule_text, name):
-    """对双语对照文本进行分块对比，合并结果。
+def _compare_parts(matcher, parts, rule_text, bilingual, chunk_concurrency=None):
+    """对文档所有部分统一分块、并发对比，再按部分、按块顺序合并结果。
 
+    parts: [(name, orig_txt, tran_txt), ...]；内容为空的部分直接得到 []
     Returns:
-        list[dict] — 始终返回解析后的错误列表（可能为空列表）
+        dict[name, list[dict]]
     """
-    from parsers.json.clean_json import parse_json_content
-    import time
-
-    chunks = split_bilingual_text(text)
-    num_parts = len(chunks)
-
-    if num_parts <= 1:
-        print(f"  📄 {name}文本较短（{len(text)} 字符），直接对比")
-        raw = None
-        for attempt in range(3):
-            try:
-                raw = matcher.compare_texts(text, rule_text)
-                break
-            except Exception as e:
-                if attempt < 2:
-                    wait = (attempt + 1) * 10
-                    print(f"  ⚠️ 调用失败: {e}，{wait}秒后重试...")
-                    time.sleep(wait)
-                else:
-                    print(f"  ❌ 调用 API 失败（已重试 2 次）: {e}")
-        if raw:
-            parsed, status = parse_json_content(raw)
-            if isinstance(parsed, list):
-                if status == "parse_error":
-                    _warn_empty_parse(raw, indent="  ")
-                elif status == "no_error":
-                    print("  ✅ 模型确认：该段落无翻译问题")
-                return parsed
-            return []
-        return []
+    plans = {}
+    jobs = []
+    for name, orig_txt, tran_txt in parts:
+        if not orig_txt or (not bilingual and not tran_txt):
+            print(f"⚠️ {name}内容为空" if bilingual else f"⚠️ {name}原文或译文为空")
+            continue
+        chunk_args, split = _plan_part_chunks(orig_txt, tran_txt, name, bilingual)
+        plans[name] = (split, [i for i, _ in chunk_args], len(jobs))
+        jobs.extend((f"{name} 第 {i} 块", (*texts, rule_text)) for i, texts in chunk_args)
 
-    print(f"  📄 {name}文本较长（{len(text)} 字符），分割为 {num_parts} 块进行对比")
+    raw_results = run_chunk_jobs(matcher.compare_texts, jobs, concurrency=chunk_concurrency)
 
-    all_errors = []
-    seen_keys = set()
+    results = {}
+    for name, _, _ in parts:
+        if name not in plans:
+            results[name] = []
+            continue
+        split, indexes, offset = plans[name]
+        part_raw = raw_results[offset:offset + len(indexes)]
+        if not split:
+            # 短文本整段对比：与原流程一致，直接返回模型结果
+            results[name] = _parse_chunk_result(part_raw[0], "  ", "模型确认：该段落无翻译问题")
+        else:
+            results[name] = _merge_chunk_errors(name, list(zip(indexes, part_raw)))
+    return results
 
-    for i, chunk in enumerate(chunks, 1):
-        print(f"\n  --- {name} 第 {i}/{num_parts} 块 ---")
-        print(f"      块大小: {len(chunk)} 字符")
 
-        if not chunk.strip():
-            print(f"      ⚠️ 块内容为空，跳过")
-            continue
+def _compare_with_split(matcher, orig_txt, tran_txt, rule_text, name, chunk_concurrency=None):
+    """对一组原文/译文文本进行分块对比，合并结果。
 
-        max_retries = 2
-        chunk_result = None
-        for attempt in range(max_retries + 1):
-            try:
-                chunk_result = matcher.compare_texts(chunk, rule_text)
-                break
-            except Exception as e:
-                if attempt < max_retries:
-                    wait = (attempt + 1) * 10
-                    print(f"      ⚠️ 第 {i} 块第 {attempt + 1} 次调用失败: {e}")
-                    print(f"      ⏳ 等待 {wait} 秒后重试...")
-                    time.sleep(wait)
-                else:
-                    print(f"      ❌ 第 {i} 块调用 API 失败（已重试 {max_retries} 次）: {e}")
-                    print(f"      ⚠️ 跳过该块，继续处理剩余块")
-                    chunk_result = None
-
-        chunk_count = 0
-        if chunk_result:
-            parsed, status = parse_json_content(chunk_result)
-            if isinstance(parsed, list):
-                if status == "parse_error":
-                    _warn_empty_parse(chunk_result, indent="      ")
-                elif status == "no_error":
-                    print(f"      ✅ 模型确认：第 {i} 块无翻译问题")
-                chunk_count = len(parsed)
-                for item in parsed:
-                    dedup_key = (
-                        (item.get("译文数值") or "").strip(),
-                        (item.get("译文上下文") or "").strip()[:50]
-                    )
-                    tran_val = (item.get("译文数值") or "").strip()
-                    tran_sug = (item.get("译文修改建议值") or "").strip()
-                    context = (item.get("译文上下文") or "").strip()
-                    # 方案B：先修正重叠，再统一过滤
-                    fixed = _fix_suggestion_overlap(context, tran_val, tran_sug)
-                    if fixed != tran_sug:
-                        print(f"      ⚙ 建议值修正: '{tran_sug}' → '{fixed}'")
-                        tran_sug = fixed
-                        item["译文修改建议值"] = fixed
-                    if not tran_sug or tran_sug == tran_val:
-                        print(f"      ⊘ 过滤: 建议值无效或与原文一致 '{tran_val}'，跳过")
-                        print(f"         原始数据: {item}")
-                        continue
-                    if dedup_key not in seen_keys:
-                        seen_keys.add(dedup_key)
-                        all_errors.append(item)
-                    else:
-                        print(f"      ⚠️ 去重: '{dedup_key[0]}' (缓冲区重叠)")
+    如果文本较短则直接对比；较长则自动分割为对齐的块，
+    并发调用 LLM，最后按块顺序合并去重返回完整结果列表。
 
-        print(f"      ✓ 本块发现 {chunk_count} 个问题，累计 {len(all_errors)} 个")
+    Returns:
+        list[dict] — 始终返回解析后的错误列表（可能为空列表）
+    """
+    return _compare_parts(matcher, [(name, orig_txt, tran_txt)], rule_text, False, chunk_concurrency)[name]
 
-    print(f"\n  📊 {name}合并完成: 共 {len(all_errors)} 个不重复问题")
 
-    for idx, item in enumerate(all_errors, 1):
-        item["错误编号"] = str(idx)
+def _compare_bilingual_with_split(matcher, text, rule_text, name, chunk_concurrency=None):
+    """对双语对照文本进行分块对比，合并结果。
 
-    return all_errors
+    Returns:
+        list[dict] — 始终返回解析后的错误列表（可能为空列表）
+    """
+    return _compare_parts(matcher, [(name, text, None)], rule_text, True, chunk_concurrency)[name]
 
 
 SECTION_DIRS = {
@@ -419,6 +341,7 @@ def run_comparison(
         output_base_dir=None,
         ai_rule_file_path=None,
         session_rule_text=None,
+        chunk_concurrency=None,
 ):
     """
     第一阶段：提取文本并调用 AI/Matcher 进行对比，生成 JSON 报告
@@ -431,6 +354,7 @@ def run_comparison(
         output_base_dir: Web 任务输出根目录，不传则使用模块内默认输出目录
         ai_rule_file_path: 用户上传的规则文件路径，用于 AI 总结规则
         session_rule_text: 前端规则编辑器本次提交的规则文本，不写入磁盘
+        chunk_concurrency: 正文/页眉/页脚所有块共用的 LLM 并发数，不传则读 ZHONGFANYI_CHUNK_CONCURRENCY
     """
     print("\n--- 阶段 1: 文本提取与 AI 对比 ---")
     if bilingual:
@@ -530,35 +454,23 @@ def run_comparison(
         print(f"--- 规则内容预览 (前200字符) ---")
         print(rule_text[:200] + "..." if len(rule_text) > 200 else rule_text)
 
-    for name, orig_txt, tran_txt, out_dir in parts:
-        print(f"====== 正在检查{name} ===========")
-        if bilingual:
-            # 双语对照模式：分块后逐块调用
-            if orig_txt:
-                try:
-                    res = _compare_bilingual_with_split(matcher, orig_txt, rule_text, name)
-                except Exception as e:
-                    print(f"❌ 调用 API 失败: {e}")
-                    print("   请检查账户余额、API Key 有效性或网络环境是否正常。")
-                    return None, None
-            else:
-                res = []
-                print(f"⚠️ {name}内容为空")
-        else:
-            # 原文+译文分开模式：分块后逐块调用
-            if orig_txt and tran_txt:
-                try:
-                    res = _compare_with_split(matcher, orig_txt, tran_txt, rule_text, name)
-                except Exception as e:
-                    print(f"❌ 调用 API 失败: {e}")
-                    print("   请检查账户余额、API Key 有效性或网络环境是否正常。")
-                    return None, None
-            else:
-                res = []
-                print(f"⚠️ {name}原文或译文为空")
+    print(f"====== 正在检查{'、'.join(name for name, *_ in parts)} ===========")
+    try:
+        section_results = _compare_parts(
+            matcher,
+            [(name, orig_txt, tran_txt) for name, orig_txt, tran_txt, _ in parts],
+            rule_text,
+            bilingual,
+            chunk_concurrency,
+        )
+    except Exception as e:
+        print(f"❌ 调用 API 失败: {e}")
+        print("   请检查账户余额、API Key 有效性或网络环境是否正常。")
+        return None, None
 
+    for name, _, _, out_dir in parts:
         # 写入 JSON
-        _, path = write_json_with_timestamp(res, out_dir)
+        _, path = write_json_with_timestamp(section_results[name], out_dir)
         report_paths[name] = path
 
     return report_paths, rule_text
@@ -826,6 +738,7 @@ def run_full_pipeline(
         bilingual=False,
         ai_rule_file_path=None,
         session_rule_text=None,
+        chunk_concurrency=None,
 ):
     """
     完整流程：对比、导出报告、修复或批注。供 Web 前端任务调用。
@@ -844,6 +757,7 @@ def run_full_pipeline(
         output_base_dir=output_base_dir,
         ai_rule_file_path=ai_rule_file_path,
         session_rule_text=session_rule_text,
+        chunk_concurrency=chunk_concurrency,
     )
     if report_paths is None:
         return None, None, None, None
@@ -0,0 +1,184 @@
+"""
+AI 复核块并发执行器
+
+规则检查后的待复核行按 block_size 切块，每块一次 LLM 调用。块之间互不依赖，
+这里用线程池并发提交，结果按块序号、块内位置写回 ai_map，与串行执行完全一致。
+
+环境变量（也可由调用方参数覆盖）：
+  AI_BLOCK_CONCURRENCY : 同时在途的块数，默认 4；1 等价于原串行流程
+  AI_PROVIDER_RPM      : 按模型提供方限速（每分钟请求数），如 "deepseek=60,google=120"；
+                         提供方取模型名 "/" 前缀，未列出的提供方不限速
+  AI_BLOCK_MAX_ATTEMPTS: 单块最多尝试次数（含首次），默认 3
+  AI_BLOCK_BACKOFF     : 重试退避基数（秒），第 n 次重试等待 base * 2^(n-1)，默认 2
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BACKOFF_SECONDS = 2.0
+
+_PENDING_RESULT = {"is_correct": True, "errors": [], "source_issues": [], "_pending": True}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def parse_provider_rpm(spec) -> dict:
+    """ "deepseek=60, google=120" → {"deepseek": 60.0, "google": 120.0}；dict 原样规范化。"""
+    if not spec:
+        return {}
+    if isinstance(spec, dict):
+        items = spec.items()
+    else:
+        items = (part.split("=", 1) for part in str(spec).split(",") if "=" in part)
+    limits = {}
+    for provider, rpm in items:
+        try:
+            value = float(rpm)
+        except (TypeError, ValueError):
+            continue
+        if value > 0:
+            limits[str(provider).strip().lower()] = value
+    return limits
+
+
+def provider_of(model_name: str) -> str:
+    """OpenRouter 风格模型名 "deepseek/deepseek-v4-pro" → "deepseek"。"""
+    name = (model_name or "").strip().lower()
+    return name.split("/", 1)[0] if "/" in name else name
+
+
+class ProviderRateLimiter:
+    """按提供方的最小请求间隔限速：预约下一个可用时间点，在锁外等待。"""
+
+    def __init__(self, rpm_by_provider: dict = None):
+        self._lock = threading.Lock()
+        self._next_at = {}
+        self.configure(rpm_by_provider)
+
+    def configure(self, rpm_by_provider: dict = None):
+        with self._lock:
+            self._intervals = {p: 60.0 / rpm for p, rpm in parse_provider_rpm(rpm_by_provider).items()}
+
+    def acquire(self, model_name: str) -> float:
+        """阻塞到该提供方允许下一次请求，返回实际等待秒数。"""
+        provider = provider_of(model_name)
+        with self._lock:
+            interval = self._intervals.get(provider)
+            if not interval:
+                return 0.0
+            now = time.monotonic()
+            start_at = max(now, self._next_at.get(provider, 0.0))
+            self._next_at[provider] = start_at + interval
+        wait = start_at - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+# 进程内共享：同一提供方的所有块（含正文/页眉/页脚各阶段）共用一个限速器
+rate_limiter = ProviderRateLimiter(os.getenv("AI_PROVIDER_RPM"))
+
+
+def _needs_retry(results: list) -> bool:
+    """整块都因 API 异常/空响应落为待确认时，视为瞬时故障（限流、网络）整块重试。"""
+    return bool(results) and all(
+        r.get("_pending") and r.get("_error_status") in ("api_error", "empty_content")
+        for r in results
+    )
+
+
+def _review_one(check_block, block: list, max_attempts: int, backoff: float, tag: str) -> list:
+    results, last_error = None, None
+    for attempt in range(1, max_attempts + 1):
+        try:
+            results = check_block(block)
+            last_error = None
+            if not _needs_retry(results):
+                return results
+        except Exception as e:
+            last_error = e
+        if attempt < max_attempts:
+            delay = backoff * (2 ** (attempt - 1)) * (1 + random.random() * 0.25)
+            reason = f"{type(last_error).__name__}: {last_error}" if last_error else "整块无有效结果"
+            print(f"    ⚠️  {tag} 第 {attempt} 次复核失败（{reason}），{delay:.1f}s 后重试")
+            time.sleep(delay)
+    if results is not None:
+        return results
+    print(f"    ❌ {tag} 重试 {max_attempts} 次仍异常，整块标记为待确认: {last_error}")
+    pending = dict(_PENDING_RESULT, _error_status="api_error")
+    return [dict(pending) for _ in block]
+
+
+def review_blocks(blocks: list, check_block,
+                  label: str = "",
+                  concurrency: int = None,
+                  max_attempts: int = None,
+                  backoff: float = None,
+                  progress_callback=None) -> dict:
+    """
+    并发复核所有块，返回 ai_map {原行号: 结果}。
+
+    blocks           : [[(orig_idx, row), ...], ...]
+    check_block      : 单块复核函数，返回与块等长的结果列表（即 _llm_check_block）
+    progress_callback: callback(label, done, total)，每完成一块调用一次（在调用方线程中）
+    """
+    total = len(blocks)
+    if total == 0:
+        return {}
+    concurrency = max(1, concurrency or _env_int("AI_BLOCK_CONCURRENCY", DEFAULT_CONCURRENCY))
+    max_attempts = max(1, max_attempts or _env_int("AI_BLOCK_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS))
+    backoff = _env_float("AI_BLOCK_BACKOFF", DEFAULT_BACKOFF_SECONDS) if backoff is None else backoff
+    prefix = f"[{label}] " if label else ""
+
+    results_by_block = [None] * total
+    done = 0
+
+    def _report(b_idx: int):
+        print(f"    {prefix}Block {b_idx + 1} 完成，进度 {done}/{total}")
+        if progress_callback is not None:
+            try:
+                progress_callback(label, done, total)
+            except Exception as e:
+                print(f"    ⚠️  进度回调异常: {e}")
+
+    workers = min(concurrency, total)
+    if workers == 1:
+        for b_idx, block in enumerate(blocks):
+            results_by_block[b_idx] = _review_one(check_block, block, max_attempts, backoff, f"Block {b_idx + 1}")
+            done += 1
+            _report(b_idx)
+    else:
+        print(f"    {prefix}并发复核 {total} 块（并发 {workers}）...")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-block") as pool:
+            futures = {
+                pool.submit(_review_one, check_block, block, max_attempts, backoff, f"Block {b_idx + 1}"): b_idx
+                for b_idx, block in enumerate(blocks)
+            }
+            for future in as_completed(futures):
+                b_idx = futures[future]
+                results_by_block[b_idx] = future.result()
+                done += 1
+                _report(b_idx)
+
+    # 按块序号 + 块内位置写回，结果与完成先后无关
+    ai_map = {}
+    for block, results in zip(blocks, results_by_block):
+        for pos, (idx, _) in enumerate(block):
+            ai_map[idx] = results[pos]
+    return ai_map
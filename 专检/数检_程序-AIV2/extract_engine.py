@@ -0,0 +1,84 @@
+"""
+数值提取引擎公共组件（normalizer / normalizer_total 共用）
+
+  SpanSet            — 已消费字符区间集合。区间按起点有序、互不重叠（相交即合并），
+                       重叠查询二分定位，单次 O(log n)，取代逐个扫描列表的 O(n)。
+  memoize_extractor  — 按 (text, 策略开关) 缓存提取结果。对齐表中页眉页脚、表头、
+                       单位说明等重复文本很多，同一文本只解析一次。
+"""
+from bisect import bisect_left, bisect_right
+from functools import lru_cache, wraps
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_CACHE_SIZE = 65536
+
+
+class SpanSet:
+    """
+    半开区间 [start, end) 集合，重叠判定与原实现 any(a < e and b > s) 完全一致：
+      - 新区间与已有区间相交（严格重叠）时合并为一个区间，对任何查询的结果不变；
+      - 仅首尾相接的区间不合并（原判定下二者不算重叠）；
+      - 长度为 0 的区间同样参与判定（原实现中它会阻挡严格包含它的查询）。
+    合并后区间两两不重叠，按起点排序时终点也单调不减，因此可对终点二分。
+    """
+
+    __slots__ = ("_starts", "_ends")
+
+    def __init__(self):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+
+    def overlaps(self, start: int, end: int) -> bool:
+        # 第一个终点 > start 的区间是唯一需要检查的候选：其后区间的起点只会更大
+        i = bisect_right(self._ends, start)
+        return i < len(self._starts) and self._starts[i] < end
+
+    def add(self, start: int, end: int) -> None:
+        starts, ends = self._starts, self._ends
+        lo = bisect_right(ends, start)
+        hi = bisect_left(starts, end, lo)
+        # [lo, hi) 为与新区间相交的已有区间：终点 > start 且起点 < end
+        # 无相交时 lo 处之前的区间都满足 end <= start、之后的都满足 start >= end，直接插入即保持双序
+        if lo < hi:
+            start = min(start, starts[lo])
+            end = max(end, ends[hi - 1])
+        starts[lo:hi] = [start]
+        ends[lo:hi] = [end]
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+
+def _strategies_key(strategies: Dict[str, bool]) -> tuple:
+    return tuple(sorted(strategies.items()))
+
+
+def memoize_extractor(default_strategies: Dict[str, bool], maxsize: int = DEFAULT_CACHE_SIZE):
+    """
+    装饰 extract_numbers(text, strategies=None)：
+      - 策略为空时按调用当时的 default_strategies 取键，与原来 `strategies or DEFAULT` 一致；
+      - 每次返回新列表，调用方修改结果不会污染缓存；
+      - 被装饰函数的 cache_info() / cache_clear() 供基准脚本与测试使用。
+    """
+
+    def decorator(func: Callable[[str, Optional[Dict[str, bool]]], List[str]]):
+        @lru_cache(maxsize=maxsize)
+        def _cached(text: str, key: tuple) -> tuple:
+            return tuple(func(text, dict(key)))
+
+        @wraps(func)
+        def wrapper(text: str, strategies: Optional[Dict[str, bool]] = None) -> List[str]:
+            s = strategies or default_strategies
+            try:
+                key = _strategies_key(s)
+                hash(text)
+            except TypeError:
+                return func(text, s)
+            return list(_cached(text, key))
+
+        wrapper.cache_info = _cached.cache_info
+        wrapper.cache_clear = _cached.cache_clear
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
@@ -4,6 +4,7 @@ from pathlib import Path
 from report_generator import generate_combined_report
 from extract_values import merge_ai_results, run_number_check, check_text_pairs
 from program_check import _llm_check_block
+from block_review import rate_limiter, review_blocks
 from normalizer import DEFAULT_STRATEGIES as _DEFAULT_STRATEGIES_BASIC
 from normalizer_total import DEFAULT_STRATEGIES as _DEFAULT_STRATEGIES_TOTAL
 
@@ -430,12 +431,15 @@ def apply_revisions_pdf(
 
 def _check_region(label: str, pairs: list,
                   block_size: int, normalize_strategies: dict,
-                  check_all: bool = False) -> tuple:
+                  check_all: bool = False,
+                  ai_concurrency: int = None,
+                  progress_callback=None) -> tuple:
     """
     对 [(src, tgt), ...] 做规则检查 + AI 复核。
 
     check_all=True  → 全部行送 AI（页眉/页脚段落少）
     check_all=False → 只对规则错误行送 AI（正文）
+    ai_concurrency / progress_callback 见 block_review.review_blocks
 
     返回 (final_rows, ai_map)
     """
@@ -451,12 +455,8 @@ def _check_region(label: str, pairs: list,
     blocks = [candidates[i:i + block_size] for i in range(0, len(candidates), block_size)]
     print(f"  [{label}] AI复核 {len(candidates)} 行，共 {len(blocks)} 块...")
 
-    ai_map = {}
-    for b_idx, block in enumerate(blocks):
-        print(f"    Block {b_idx + 1}/{len(blocks)}")
-        results = _llm_check_block(block)
-        for pos, (idx, _) in enumerate(block):
-            ai_map[idx] = results[pos]
+    ai_map = review_blocks(blocks, _llm_check_block, label=label,
+                           concurrency=ai_concurrency, progress_callback=progress_callback)
 
     final_rows = merge_ai_results(rows, ai_map)
     ai_err = sum(1 for r in final_rows if r.get("AI是否正确") == "❗错误")
@@ -637,7 +637,10 @@ def run(alignment_path: str = None,
         ai_check_all: bool = False,
         use_total_normalizer: bool = False,
         use_legacy_mode: bool = False,
-        bilingual_mode: bool = False):
+        bilingual_mode: bool = False,
+        ai_concurrency: int = None,
+        ai_provider_rpm=None,
+        progress_callback=None):
     """
     两种输入模式（二选一，也可由格式自动推断）：
 
@@ -668,7 +671,12 @@ def run(alignment_path: str = None,
                              False（默认）= 双文件模式：分别上传 原文(src_docx_path) + 译文(tgt_docx_path)。
                              True         = 单文件双语对照模式：只上传一个文件(src_docx_path)，
                                             文档内中英段落交替排列，无需 tgt_docx_path。
+      ai_concurrency   : AI 复核同时在途的块数；None 时读环境变量 AI_BLOCK_CONCURRENCY（默认 4）
+      ai_provider_rpm  : 按模型提供方限速，如 "deepseek=60" 或 {"deepseek": 60}；None 时沿用 AI_PROVIDER_RPM
+      progress_callback: callback(区域名, 已完成块数, 总块数)，每完成一个 AI 复核块调用一次
     """
+    if ai_provider_rpm is not None:
+        rate_limiter.configure(ai_provider_rpm)
     if use_legacy_mode:
         return _run_legacy_mode(
             src_docx_path=src_docx_path,
@@ -781,12 +789,8 @@ def run(alignment_path: str = None,
     blocks = [candidates[i:i + block_size] for i in range(0, len(candidates), block_size)]
     print(f"  [正文] AI复核 {len(candidates)} 行（{mode_label}），共 {len(blocks)} 块...")
 
-    body_ai_map = {}
-    for b_idx, block in enumerate(blocks):
-        print(f"    Block {b_idx + 1}/{len(blocks)}")
-        results = _llm_check_block(block)
-        for pos, (idx, _) in enumerate(block):
-            body_ai_map[idx] = results[pos]
+    body_ai_map = review_blocks(blocks, _llm_check_block, label="正文",
+                                concurrency=ai_concurrency, progress_callback=progress_callback)
 
     body_final = merge_ai_results(body_rows, body_ai_map)
     body_ai_err = sum(1 for r in body_final if r.get("AI是否正确") == "❗错误")
@@ -816,7 +820,8 @@ def run(alignment_path: str = None,
             print(f"  [页眉] 原文 {len(src_h)} 段 / 译文 {len(tgt_h)} 段")
             header_pairs = _align_hf(src_h, tgt_h, "页眉")
             header_final, header_ai_map = _check_region(
-                "页眉", header_pairs, block_size, normalize_strategies, check_all=True)
+                "页眉", header_pairs, block_size, normalize_strategies, check_all=True,
+                ai_concurrency=ai_concurrency, progress_callback=progress_callback)
 
         if check_footer:
             print("\n" + "="*60)
@@ -827,7 +832,8 @@ def run(alignment_path: str = None,
             print(f"  [页脚] 原文 {len(src_f)} 段 / 译文 {len(tgt_f)} 段")
             footer_pairs = _align_hf(src_f, tgt_f, "页脚")
             footer_final, footer_ai_map = _check_region(
-                "页脚", footer_pairs, block_size, normalize_strategies, check_all=True)
+                "页脚", footer_pairs, block_size, normalize_strategies, check_all=True,
+                ai_concurrency=ai_concurrency, progress_callback=progress_callback)
 
     # ── 阶段3：保存 AI 原始结果 JSON（供调试定位）─────────────────────
     def _save_json(data, filename):
@@ -13,6 +13,8 @@ import re
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 
+from extract_engine import SpanSet, memoize_extractor
+
 
 # ─────────────────────────────────────────
 # 策略开关默认值
@@ -143,6 +145,78 @@ _CIRCLED_NUM_MAP = {
 }
 _CIRCLED_NUM_PATTERN = re.compile("[①②③④⑤⑥⑦⑧⑨⑩⑪⑫⑬⑭⑮⑯⑰⑱⑲⑳]")
 
+# ── extract_numbers 用到的正则与字符集，模块加载时编译一次 ──
+
+_NUM_CN_SCALE_PATTERN = re.compile(
+    r'(\d[\d,]*\.?\d*)\s*([' + "".join(_CHINESE_SCALE_MAP.keys()) + r'])'
+)
+
+# 中文逐字读年份（二〇二六年三月）
+_CN_YEAR_DIGIT = {"零": 0, "〇": 0, "一": 1, "二": 2, "三": 3, "四": 4,
+                  "五": 5, "六": 6, "七": 7, "八": 8, "九": 9}
+_CN_YEAR_CHARS = "".join(_CN_YEAR_DIGIT.keys())
+_CN_MONTH_MAP = {"一": 1, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6,
+                 "七": 7, "八": 8, "九": 9, "十": 10, "十一": 11, "十二": 12}
+_CN_YEAR_MONTH_PATTERN = re.compile(
+    rf"([{_CN_YEAR_CHARS}]{{4}})年(十[一二]|[一二三四五六七八九十])月"
+    r"(?:([一二三四五六七八九十]{1,2}|二十[一二三四五六七八九]?|三十[一]?)日)?"
+)
+_CN_YEAR_ONLY_PATTERN = re.compile(rf"([{_CN_YEAR_CHARS}]{{4}})年")
+
+# 纯中文数字串的联合字符集，按 (chinese_upper, chinese_trad) 开关预先合并
+_ZERO_CHARS = frozenset({"零", "〇"})
+_COMBINED_CN_CHARS = {
+    (True, True): frozenset(_CHINESE_UPPER_ALL) | frozenset(_CHINESE_TRAD_ALL),
+    (True, False): frozenset(_CHINESE_UPPER_ALL),
+    (False, True): frozenset(_CHINESE_TRAD_ALL),
+}
+
+_NUM_EN_SCALE_PATTERN = re.compile(
+    r'(\d[\d,]*\.?\d*)\s*(' + "|".join(_ENGLISH_SCALE_WORDS.keys()) + r')\b',
+    re.IGNORECASE
+)
+_ENGLISH_WORD_ALT = "|".join(
+    re.escape(w) for w in sorted(_ENGLISH_NUMBER_WORDS.keys(), key=len, reverse=True)
+)
+_WORD_SCALE_PATTERN = re.compile(
+    r'\b(' + _ENGLISH_WORD_ALT + r')\s+('
+    + "|".join(re.escape(w) for w in sorted(_ENGLISH_SCALE_WORDS.keys(), key=len, reverse=True))
+    + r')\b',
+    re.IGNORECASE
+)
+_ENGLISH_WORD_PATTERN = re.compile(r'\b(' + _ENGLISH_WORD_ALT + r')\b', re.IGNORECASE)
+
+_MONTH_NAME_PATTERN = re.compile(
+    r'\b(January|February|March|April|May|June|July|August|'
+    r'September|October|November|December|'
+    r'Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)\.?\b',
+    re.IGNORECASE
+)
+_PLAIN_NUMBER_PATTERN = re.compile(r'-?\d[\d,]*\.?\d*')
+
+# C/D/M 单字母作序号极不常见（c=100,d=500,m=1000），排除误识别
+_SINGLE_ROMAN_UPPER = frozenset("IVXL")
+_SINGLE_ROMAN_LOWER = frozenset("ivxl")
+
+
+def _is_single_roman_context(txt: str, start: int, end: int) -> bool:
+    """
+    单字母罗马数字需满足序号上下文：
+      前面：行首 / '(' / 空白
+      后面：'.' / ')' / ',' / 行尾 / 空白+大写字母
+    排除缩写（i.e. / e.g.）：后面是 '.' 且 '.' 后紧跟字母
+    只看匹配两侧各一两个字符，不切片整段文本。
+    """
+    n = len(txt)
+    nxt = txt[end] if end < n else ""
+    nxt2 = txt[end + 1] if end + 1 < n else ""
+    # 排除缩写：后面是 '.' 且 '.' 后紧跟字母（如 i.e. / e.g.）
+    if nxt == "." and nxt2.isalpha():
+        return False
+    pre_ok = start == 0 or txt[start - 1] in "( \t\n"
+    post_ok = (not nxt) or nxt in ").," or (nxt in " \t" and nxt2.isupper())
+    return pre_ok and post_ok
+
 
 # ─────────────────────────────────────────
 # 内部转换函数
@@ -231,6 +305,7 @@ def _format_number(value: float) -> str:
 # 提取数值列表（核心功能）
 # ─────────────────────────────────────────
 
+@memoize_extractor(DEFAULT_STRATEGIES)
 def extract_numbers(text: str, strategies: Optional[Dict[str, bool]] = None) -> List[str]:
     """
     从文本中提取所有数值，返回字符串列表。
@@ -244,6 +319,9 @@ def extract_numbers(text: str, strategies: Optional[Dict[str, bool]] = None) ->
       6. 处理英文月份（如 January → 1）
       7. 最后提取所有剩余的纯阿拉伯数字
 
+    正则均在模块加载时编译；结果按 (text, 策略开关) 缓存，
+    调用方可用 extract_numbers.uncached 绕过缓存。
+
     Args:
         text:       输入文本
         strategies: 策略开关字典，缺省使用 DEFAULT_STRATEGIES
@@ -259,25 +337,13 @@ def extract_numbers(text: str, strategies: Optional[Dict[str, bool]] = None) ->
     # 用 (position, value_str) 收集所有找到的数值，最后按位置排序
     found: List[Tuple[int, str]] = []
     # 记录已被消费的字符区间，避免重复提取
-    consumed: List[Tuple[int, int]] = []
-
-    def _is_consumed(start: int, end: int) -> bool:
-        """检查区间是否与已消费区间重叠。"""
-        for cs, ce in consumed:
-            if start < ce and end > cs:
-                return True
-        return False
-
-    def _mark_consumed(start: int, end: int) -> None:
-        consumed.append((start, end))
+    consumed = SpanSet()
+    _is_consumed = consumed.overlaps
+    _mark_consumed = consumed.add
 
     # ─── 步骤1：阿拉伯数字 + 中文量级词 ───
     if s.get("chinese_upper") or s.get("chinese_trad"):
-        scale_chars = "".join(_CHINESE_SCALE_MAP.keys())
-        pattern_num_cn_scale = re.compile(
-            r'(\d[\d,]*\.?\d*)\s*([' + scale_chars + r'])'
-        )
-        for m in pattern_num_cn_scale.finditer(text):
+        for m in _NUM_CN_SCALE_PATTERN.finditer(text):
             num_str = m.group(1).replace(",", "")
             scale_char = m.group(2)
             scale_val = _CHINESE_SCALE_MAP.get(scale_char, 1)
@@ -291,25 +357,15 @@ def extract_numbers(text: str, strategies: Optional[Dict[str, bool]] = None) ->
 
     # ─── 步骤1b：中文逐字读年份（二〇二六年三月 → 2026-03，优先于步骤2）───
     if s.get("chinese_trad"):
-        _cn_yr_digit = {"零": 0, "〇": 0, "一": 1, "二": 2, "三": 3, "四": 4,
-                        "五": 5, "六": 6, "七": 7, "八": 8, "九": 9}
-        _cn_yr_chars = "".join(_cn_yr_digit.keys())
-        _cn_mon_map  = {"一": 1, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6,
-                        "七": 7, "八": 8, "九": 9, "十": 10, "十一": 11, "十二": 12}
-
         def _cn_year_to_int(s4: str) -> int:
-            return sum(_cn_yr_digit.get(c, 0) * (10 ** (3 - i)) for i, c in enumerate(s4))
+            return sum(_CN_YEAR_DIGIT.get(c, 0) * (10 ** (3 - i)) for i, c in enumerate(s4))
 
         # 带月（带日可选）
-        for m in re.finditer(
-            rf"([{_cn_yr_chars}]{{4}})年(十[一二]|[一二三四五六七八九十])月"
-            r"(?:([一二三四五六七八九十]{1,2}|二十[一二三四五六七八九]?|三十[一]?)日)?",
-            text
-        ):
+        for m in _CN_YEAR_MONTH_PATTERN.finditer(text):
             year = _cn_year_to_int(m.group(1))
             if not (1000 <= year <= 2100):
                 continue
-            mon = _cn_mon_map.get(m.group(2), 0)
+            mon = _CN_MONTH_MAP.get(m.group(2), 0)
             day_str = m.group(3)
             if mon and day_str:
                 day = _chinese_to_int(day_str, _CHINESE_TRAD_ALL) or 0
@@ -321,7 +377,7 @@ def extract_numbers(text: str, strategies: Optional[Dict[str, bool]] = None) ->
             _mark_consumed(m.start(), m.end())
 
         # 仅年份（二〇二六年）
-        for m in re.finditer(rf"([{_cn_yr_chars}]{{4}})年", text):
+        for m in _CN_YEAR_ONLY_PATTERN.finditer(text):
             if _is_consumed(m.start(), m.end()):
                 continue
             year = _cn_year_to_int(m.group(1))
@@ -331,14 +387,10 @@ def extract_numbers(text: str, strategies: Optional[Dict[str, bool]] = None) ->
 
     # ─── 步骤2：纯中文数字串（合并两张表的字符集一次性分词，避免零桥接冲突）───
     if s.get("chinese_upper") or s.get("chinese_trad"):
-        # 构建联合字符集（含零/〇）
-        combined_chars: set = set()
-        if s.get("chinese_upper"):
-            combined_chars |= set(_CHINESE_UPPER_ALL.keys())
-        if s.get("chinese_trad"):
-            combined_chars |= set(_CHINESE_TRAD_ALL.keys())
+        # 联合字符集（含零/〇）
+        combined_chars = _COMBINED_CN_CHARS[(bool(s.get("chinese_upper")), bool(s.get("chinese_trad")))]
 
-        ZERO_CHARS = {"零", "〇"}
+        ZERO_CHARS = _ZERO_CHARS
         n = len(text)
         i = 0
         while i < n:
@@ -377,12 +429,7 @@ def extract_numbers(text: str, strategies: Optional[Dict[str, bool]] = None) ->
 
     # ─── 步骤3：阿拉伯数字 + 英文量级词 ───
     if s.get("english_number"):
-        scale_words = "|".join(_ENGLISH_SCALE_WORDS.keys())
-        pattern_num_en_scale = re.compile(
-            r'(\d[\d,]*\.?\d*)\s*(' + scale_words + r')\b',
-            re.IGNORECASE
-        )
-        for m in pattern_num_en_scale.finditer(text):
+        for m in _NUM_EN_SCALE_PATTERN.finditer(text):
             if _is_consumed(m.start(), m.end()):
                 continue
             num_str = m.group(1).replace(",", "")
@@ -398,13 +445,7 @@ def extract_numbers(text: str, strategies: Optional[Dict[str, bool]] = None) ->
 
     # ─── 步骤3b：英文数字单词 + 英文量级词（如 one hundred, ten thousand）───
     if s.get("english_number"):
-        word_keys = "|".join(re.escape(w) for w in sorted(_ENGLISH_NUMBER_WORDS.keys(), key=len, reverse=True))
-        scale_keys = "|".join(re.escape(w) for w in sorted(_ENGLISH_SCALE_WORDS.keys(), key=len, reverse=True))
-        pattern_word_scale = re.compile(
-            r'\b(' + word_keys + r')\s+(' + scale_keys + r')\b',
-            re.IGNORECASE
-        )
-        for m in pattern_word_scale.finditer(text):
+        for m in _WORD_SCALE_PATTERN.finditer(text):
             if _is_consumed(m.start(), m.end()):
                 continue
             base_word = m.group(1).lower()
@@ -418,12 +459,7 @@ def extract_numbers(text: str, strategies: Optional[Dict[str, bool]] = None) ->
 
     # ─── 步骤4：英文数字单词（独立词，不含量级词） ───
     if s.get("english_number"):
-        word_list = sorted(_ENGLISH_NUMBER_WORDS.keys(), key=len, reverse=True)
-        word_pat = re.compile(
-            r'\b(' + '|'.join(re.escape(w) for w in word_list) + r')\b',
-            re.IGNORECASE
-        )
-        for m in word_pat.finditer(text):
+        for m in _ENGLISH_WORD_PATTERN.finditer(text):
             if _is_consumed(m.start(), m.end()):
                 continue
             key = m.group(0).lower()
@@ -442,28 +478,6 @@ def extract_numbers(text: str, strategies: Optional[Dict[str, bool]] = None) ->
 
     # ─── 步骤5：罗马数字（大写独立词 + 小写序号/引用） ───
     if s.get("roman"):
-        # C/D/M 单字母作序号极不常见（c=100,d=500,m=1000），排除误识别
-        _single_roman_upper = set("IVXL")
-        _single_roman_lower = set("ivxl")
-
-        def _is_single_roman_context(m, txt):
-            """
-            单字母罗马数字需满足序号上下文：
-              前面：行首 / '(' / 空白
-              后面：'.' / ')' / ',' / 行尾 / 空白+大写字母
-            排除缩写（i.e. / e.g.）：后面是 '.' 且 '.' 后紧跟字母
-            """
-            start, end = m.start(), m.end()
-            before = txt[:start]
-            after  = txt[end:]
-            pre_ok  = (not before) or before[-1] in "( \t\n"
-            post_ok = (not after)  or after[0] in ").," or \
-                      (after and after[0] in " \t" and len(after) > 1 and after[1].isupper())
-            # 排除缩写：后面是 '.' 且 '.' 后紧跟字母（如 i.e. / e.g.）
-            if after and after[0] == "." and len(after) > 1 and after[1].isalpha():
-                return False
-            return pre_ok and post_ok
-
         # 5a. 大写罗马数字
         for m in _ROMAN_PATTERN.finditer(text):
             if _is_consumed(m.start(), m.end()):
@@ -471,8 +485,8 @@ def extract_numbers(text: str, strategies: Optional[Dict[str, bool]] = None) ->
             s_val = m.group(1)
             if not s_val:
                 continue
-            if len(s_val) == 1 and s_val in _single_roman_upper:
-                if not _is_single_roman_context(m, text):
+            if len(s_val) == 1 and s_val in _SINGLE_ROMAN_UPPER:
+                if not _is_single_roman_context(text, m.start(), m.end()):
                     continue
             val = _roman_to_int(s_val)
             if val > 0:
@@ -495,8 +509,8 @@ def extract_numbers(text: str, strategies: Optional[Dict[str, bool]] = None) ->
             start, end = m.start(1), m.end(1)
             if _is_consumed(start, end):
                 continue
-            if len(s_val) == 1 and s_val in _single_roman_lower:
-                if not _is_single_roman_context(m, text):
+            if len(s_val) == 1 and s_val in _SINGLE_ROMAN_LOWER:
+                if not _is_single_roman_context(text, m.start(), m.end()):
                     continue
             val = _roman_to_int(s_val)
             if val > 0:
@@ -505,13 +519,7 @@ def extract_numbers(text: str, strategies: Optional[Dict[str, bool]] = None) ->
 
     # ─── 步骤6：英文月份 ───
     if s.get("month_name"):
-        month_pat = re.compile(
-            r'\b(January|February|March|April|May|June|July|August|'
-            r'September|October|November|December|'
-            r'Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)\.?\b',
-            re.IGNORECASE
-        )
-        for m in month_pat.finditer(text):
+        for m in _MONTH_NAME_PATTERN.finditer(text):
             if _is_consumed(m.start(), m.end()):
                 continue
             key = m.group(1).lower()
@@ -520,8 +528,7 @@ def extract_numbers(text: str, strategies: Optional[Dict[str, bool]] = None) ->
                 _mark_consumed(m.start(), m.end())
 
     # ─── 步骤7：剩余的纯阿拉伯数字 ───
-    num_pat = re.compile(r'-?\d[\d,]*\.?\d*')
-    for m in num_pat.finditer(text):
+    for m in _PLAIN_NUMBER_PATTERN.finditer(text):
         if _is_consumed(m.start(), m.end()):
             continue
         num_str = m.group(0).replace(",", "")
@@ -29,6 +29,8 @@ import re
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 
+from extract_engine import SpanSet, memoize_extractor
+
 # ─────────────────────────────────────────
 # 策略开关
 # ─────────────────────────────────────────
@@ -491,29 +493,192 @@ _CN_NUM_SIMPLE = {
     "六": 6, "七": 7, "八": 8, "九": 9, "十": 10,
 }
 
+# ─────────────────────────────────────────
+# 提取流程用到的预编译正则与映射表（模块加载时构建一次）
+# ─────────────────────────────────────────
+
+_MONTH_ALT = (
+    r"January|February|March|April|May|June|July|August|"
+    r"September|October|November|December|"
+    r"Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec"
+)
+_CN_YEAR_DIGIT_CHARS = "零〇一二三四五六七八九"
+
+_CN_UNIT_NORM = {
+    "微克/立方米": "μg/m3", "微克/平方米": "μg/m2",
+    "微克": "μg", "毫克": "mg", "千克": "kg",
+    "平方千米": "square kilometers", "立方米": "cubic meters",
+    "千米": "kilometers", "公里": "kilometers",
+    "千瓦时": "kWh",
+}
+
+_ENGLISH_DIGIT_WORDS = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4",
+    "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9",
+}
+_DIGIT_WORD_ALT = "|".join(_ENGLISH_DIGIT_WORDS.keys())
+
+EXTRACT_PATTERNS = {
+    # 单位说明行：单位：[量级]元 / Unit: RMB10,000
+    "unit_decl_cn": re.compile(
+        r"单位[：:]\s*(百万|千万|百亿|千亿|亿|千|百|万)?\s*(美元|欧元|元人民币|元|人民币)",
+        re.I
+    ),
+    "unit_decl_en": re.compile(
+        r"[Uu]nit[：:]\s*(USD|RMB|EUR)\s*(\d[\d,]*(?:\.\d+)?)?"
+        r"(?:\s*(million|billion|thousand))?\b",
+        re.I
+    ),
+    # 年份范围（允许后跟"年"字）
+    "year_range_cn": re.compile(r"\b(\d{4})\s*[–—\-]\s*(\d{4})(?:年)?"),
+    # 中文逐字读年份：二〇二六年三月[五日] / 二〇二六年
+    "cn_year_month": re.compile(
+        rf"([{_CN_YEAR_DIGIT_CHARS}]{{4}})年(十[一二]|[一二三四五六七八九十])月(?:([一二三四五六七八九十]{{1,2}}|二十[一二三四五六七八九]?|三十[一]?)日)?"
+    ),
+    "cn_year_only": re.compile(rf"([{_CN_YEAR_DIGIT_CHARS}]{{4}})年"),
+    "date_cn": re.compile(r"(\d{4})年(\d{1,2})月(\d{1,2})日"),
+    "date_en_mdy": re.compile(
+        r"\b(" + _MONTH_ALT + r")\.?\s+(\d{1,2}),?\s+(\d{4})\b", re.I
+    ),
+    "date_en_dmy": re.compile(
+        r"\b(\d{1,2})\s+(" + _MONTH_ALT + r")\.?\s+(\d{4})\b", re.I
+    ),
+    # 中文复合量级 + 单位（1377亿立方米）/ 复合量级（3.5百万）/ 亿千瓦时 / 普通万亿
+    "cn_scale_unit": re.compile(
+        r"(\d[\d,]*(?:\.\d+)?)\s*(百万|千万|百亿|千亿|[万亿])\s*("
+        + "|".join(re.escape(u) for u in sorted(_CN_UNIT_NORM, key=len, reverse=True)) + r")"
+    ),
+    "cn_compound_scale": re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*(百万|千万|百亿|千亿)"),
+    "cn_scale_kwh": re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*([万亿])\s*(千瓦时)"),
+    "cn_scale_plain": re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*([万亿百千])(?![米克瓦升焦帕牛安伏欧赫兹])"),
+    # 英文量级 + 单位（500 million kWh）
+    "unit_en_scaled": re.compile(
+        r"(\d[\d,]*(?:\.\d+)?)\s*(million|billion|thousand)\s+"
+        r"(μg/m[²2³3]?|mg/m[²2³3]?|μg|mg|kg(?!\w)|"
+        r"square\s+kilometers?|cubic\s+meters?|"
+        r"kilometers?|metres?|meters?|m²|m[²2]|m[³3]|kWh)\b",
+        re.I
+    ),
+    # 千分位数字（允许后跟中文字符，故不要求右侧 \b）
+    "thousand_loose": re.compile(r"\d{1,3}(?:,\d{3})+(?:\.\d+)?"),
+    "fraction_num": re.compile(r"(?<!\d)(\d+)/(\d+)(?!\d)"),
+    "half_cn": re.compile(r"一半"),
+    # 英文小数读法：three point one four
+    "point_decimal_en": re.compile(
+        rf"\b({_DIGIT_WORD_ALT})\s+point\s+((?:(?:{_DIGIT_WORD_ALT})\s*)+)\b", re.I
+    ),
+    "digit_word_en": re.compile(rf"\b({_DIGIT_WORD_ALT})\b", re.I),
+    # 英文数字词 + 量级（one hundred / ten thousand）
+    "word_scale_en": re.compile(
+        r"\b(" + "|".join(re.escape(w) for w in sorted(_ENGLISH_NUMBER_WORDS, key=len, reverse=True))
+        + r")\s+(" + "|".join(re.escape(w) for w in sorted(_ENGLISH_SCALE_WORDS, key=len, reverse=True))
+        + r")\b",
+        re.IGNORECASE
+    ),
+    "standalone_scale": re.compile(r"[百千万亿]"),
+}
+
+_UNIT_DECL_CN_MUL = {
+    "百万": 1e6, "千万": 1e7, "百亿": 1e10, "千亿": 1e11,
+    "亿": 1e8, "千": 1e3, "百": 1e2, "万": 1e4, "": 1,
+}
+_CN_CURRENCY_SYM = {"美元": "USD", "欧元": "EUR", "元人民币": "RMB", "元": "RMB", "人民币": "RMB"}
+_EN_SCALE_MUL = {"million": 1e6, "billion": 1e9, "thousand": 1e3}
+_CN_CURRENCY_MUL = {"百万": 1e6, "千万": 1e7, "百亿": 1e10, "千亿": 1e11, "万": 1e4, "亿": 1e8, "": 1}
+_CN_COMPOUND_MUL = {"百万": 1e6, "千万": 1e7, "百亿": 1e10, "千亿": 1e11}
+_QUARTER_WORD = {"first": 1, "second": 2, "third": 3, "fourth": 4}
+_CN_YEAR_DIGIT_VAL = {
+    "零": 0, "〇": 0,
+    "一": 1, "二": 2, "三": 3, "四": 4, "五": 5,
+    "六": 6, "七": 7, "八": 8, "九": 9,
+}
+_CN_MONTH_MAP = {
+    "一": 1, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6,
+    "七": 7, "八": 8, "九": 9, "十": 10,
+    "十一": 11, "十二": 12,
+}
+_CIRCLED_NUM_MAP = {
+    "①": 1, "②": 2, "③": 3, "④": 4, "⑤": 5,
+    "⑥": 6, "⑦": 7, "⑧": 8, "⑨": 9, "⑩": 10,
+    "⑪": 11, "⑫": 12, "⑬": 13, "⑭": 14, "⑮": 15,
+    "⑯": 16, "⑰": 17, "⑱": 18, "⑲": 19, "⑳": 20,
+}
+_STANDALONE_SCALE = {"百": 100, "千": 1000, "万": 10000, "亿": 100000000}
+
+# 普通英文数字词：长词优先逐个匹配（保持原有优先级），每个词的正则只编译一次
+_ENGLISH_NUM_WORD_PATTERNS = [
+    (w, str(v), re.compile(rf"\b{re.escape(w)}\b", re.I))
+    for w, v in sorted(_ENGLISH_NUM.items(), key=lambda x: -len(x[0]))
+]
+# re.I 下与 ASCII 字母大小写折叠等价的非 ASCII 字符（ſ→s、K→k、İ/ı→i）
+_CASEFOLD_SPECIALS = frozenset("ſKİı")
+_ASCII_LETTER = re.compile(r"[A-Za-z]")
+
+_SINGLE_ROMAN_UPPER = frozenset("IVXL")
+_SINGLE_ROMAN_LOWER = frozenset("ivxl")
+
+
+def _cn_year_str_to_int(s4: str) -> int:
+    return sum(_CN_YEAR_DIGIT_VAL.get(c, 0) * (10 ** (3 - i)) for i, c in enumerate(s4))
+
+
+def _is_single_roman_context(txt: str, start: int, end: int) -> bool:
+    """
+    单字母罗马数字需满足序号上下文：
+      前面：行首 / '(' / '（' / 空白
+      后面：'.' / ')' / '）' / ',' / 行尾 / 空白+字母或数字
+    排除缩写（i.e. / e.g.）：后面是 '.' 且 '.' 后紧跟字母
+    排除字母序号（c) 等）：后面是 ')' 或 '）'（已在调用处过滤）
+    直接按下标取相邻字符，不再切出前后子串（长文本里每个候选都要复制一次）。
+    """
+    n = len(txt)
+    pre_ok = start == 0 or txt[start - 1] in "（( \t\n"
+    nxt = txt[end] if end < n else ""
+    nxt2 = txt[end + 1] if end + 1 < n else ""
+    post_ok = (not nxt) or nxt in ").，," or (nxt in " \t" and nxt2 != "" and nxt2.isalpha())
+    # 排除缩写：后面是 '.' 且 '.' 后紧跟字母（如 i.e. / e.g.）
+    if nxt == "." and nxt2 != "" and nxt2.isalpha():
+        return False
+    return pre_ok and post_ok
+
+
+def _english_word_candidates(text: str):
+    """
+    预筛普通英文数字词：没有 ASCII 字母（及其大小写折叠字符）的文本直接跳过；
+    纯 ASCII 文本用小写子串快速排除不可能命中的词。非 ASCII 文本保守地全部检查。
+    """
+    if not _ASCII_LETTER.search(text) and not (_CASEFOLD_SPECIALS & set(text)):
+        return ()
+    if text.isascii():
+        lowered = text.lower()
+        return [item for item in _ENGLISH_NUM_WORD_PATTERNS if item[0] in lowered]
+    return _ENGLISH_NUM_WORD_PATTERNS
+
+
 # ─────────────────────────────────────────
 # 主提取函数
 # ─────────────────────────────────────────
 
+@memoize_extractor(DEFAULT_STRATEGIES)
 def extract_numbers(text: str, strategies=None) -> List[str]:
     """
     从文本中提取所有数值，统一规范化后返回字符串列表（按出现位置排序）。
     中英文均支持。
+
+    正则均在模块加载时编译；已消费区间用 SpanSet 二分判定；
+    结果按 (text, 策略开关) 缓存，对齐表中重复出现的文本只解析一次。
     """
     s = strategies or DEFAULT_STRATEGIES
+    P = PATTERNS
+    X = EXTRACT_PATTERNS
     found: List[Tuple[int, str]] = []
-    consumed: List[Tuple[int, int]] = []
-
-    def used(a: int, b: int) -> bool:
-        return any(a < e and b > st for st, e in consumed)
-
-    def mark(a: int, b: int):
-        consumed.append((a, b))
+    consumed = SpanSet()
+    used = consumed.overlaps
 
     def add(pos: int, val: str, end: int):
-        if not used(pos, end):
+        if not consumed.overlaps(pos, end):
             found.append((pos, val))
-            mark(pos, end)
+            consumed.add(pos, end)
 
     # ══════════════════════════════════════
     # 最高优先级：单位说明行（单位：万元 / Unit: RMB10,000）
@@ -521,32 +686,17 @@ def extract_numbers(text: str, strategies=None) -> List[str]:
     # ══════════════════════════════════════
 
     # 中文：单位：[量级]元  →  RMB <面值>
-    _cn_unit_decl_pat = re.compile(
-        r"单位[：:]\s*(百万|千万|百亿|千亿|亿|千|百|万)?\s*(美元|欧元|元人民币|元|人民币)",
-        re.I
-    )
-    _cn_unit_mul = {
-        "百万": 1e6, "千万": 1e7, "百亿": 1e10, "千亿": 1e11,
-        "亿": 1e8, "千": 1e3, "百": 1e2, "万": 1e4, "": 1,
-    }
-    _cn_unit_sym = {"美元": "USD", "欧元": "EUR", "元人民币": "RMB", "元": "RMB", "人民币": "RMB"}
-    for m in _cn_unit_decl_pat.finditer(text):
-        mul = _cn_unit_mul.get(m.group(1) or "", 1)
-        sym = _cn_unit_sym.get(m.group(2), "RMB")
+    for m in X["unit_decl_cn"].finditer(text):
+        mul = _UNIT_DECL_CN_MUL.get(m.group(1) or "", 1)
+        sym = _CN_CURRENCY_SYM.get(m.group(2), "RMB")
         add(m.start(), f"{sym} {_fmt(mul)}", m.end())
 
     # 英文：Unit: [USD/RMB/EUR][可选数字+量级]
     # 无数字时面值取 1（与中文"单位：元"→ RMB 1 对齐）
-    _en_unit_decl_pat = re.compile(
-        r"[Uu]nit[：:]\s*(USD|RMB|EUR)\s*(\d[\d,]*(?:\.\d+)?)?"
-        r"(?:\s*(million|billion|thousand))?\b",
-        re.I
-    )
-    _en_unit_mul = {"million": 1e6, "billion": 1e9, "thousand": 1e3}
-    for m in _en_unit_decl_pat.finditer(text):
+    for m in X["unit_decl_en"].finditer(text):
         sym = m.group(1).upper()
         num = float(_strip_commas(m.group(2))) if m.group(2) else 1.0
-        mul = _en_unit_mul.get((m.group(3) or "").lower(), 1)
+        mul = _EN_SCALE_MUL.get((m.group(3) or "").lower(), 1)
         add(m.start(), f"{sym} {_fmt(num * mul)}", m.end())
 
     # ══════════════════════════════════════
@@ -555,46 +705,39 @@ def extract_numbers(text: str, strategies=None) -> List[str]:
 
     # ── 百分点 ──
     if s.get("percentage"):
-        for m in PATTERNS["percentage_point_en"].finditer(text):
+        for m in P["percentage_point_en"].finditer(text):
             add(m.start(), _fmt(_strip_commas(m.group(1))), m.end())
-        for m in PATTERNS["percentage_point_cn"].finditer(text):
+        for m in P["percentage_point_cn"].finditer(text):
             add(m.start(), _fmt(_strip_commas(m.group(1))), m.end())
 
     # ── 百分比 ──
     if s.get("percentage"):
-        for m in PATTERNS["percent_en"].finditer(text):
+        for m in P["percent_en"].finditer(text):
             add(m.start(), _fmt(_strip_commas(m.group(1))), m.end())
-        for m in PATTERNS["percent_sym"].finditer(text):
+        for m in P["percent_sym"].finditer(text):
             add(m.start(), _fmt(_strip_commas(m.group(1))), m.end())
 
     # ── 货币（英文：USD/RMB/EUR + 数字 + 可选 million/billion/thousand）──
     if s.get("currency"):
-        _mul = {"million": 1e6, "billion": 1e9, "thousand": 1e3}
-        for m in PATTERNS["currency"].finditer(text):
+        for m in P["currency"].finditer(text):
             symbol = m.group(1).upper()
             num = float(_strip_commas(m.group(2)))
-            mul = _mul.get((m.group(3) or "").lower(), 1)
+            mul = _EN_SCALE_MUL.get((m.group(3) or "").lower(), 1)
             add(m.start(), f"{symbol} {_fmt(num * mul)}", m.end())
         # 中文货币：统一映射到对应货币符号
-        _cn_currency_sym = {
-            "美元": "USD", "欧元": "EUR",
-            "元人民币": "RMB", "元": "RMB", "人民币": "RMB",
-        }
-        _cn_mul = {"百万": 1e6, "千万": 1e7, "百亿": 1e10, "千亿": 1e11,
-                   "万": 1e4, "亿": 1e8, "": 1}
-        for m in PATTERNS["currency_cn"].finditer(text):
+        for m in P["currency_cn"].finditer(text):
             num = float(_strip_commas(m.group(1)))
-            mul = _cn_mul.get(m.group(2) or "", 1)
-            sym = _cn_currency_sym.get(m.group(3), "RMB")
+            mul = _CN_CURRENCY_MUL.get(m.group(2) or "", 1)
+            sym = _CN_CURRENCY_SYM.get(m.group(3), "RMB")
             add(m.start(), f"{sym} {_fmt(num * mul)}", m.end())
 
     # ── 经纬度 ──
     if s.get("coordinate"):
-        for m in PATTERNS["coordinate_en"].finditer(text):
+        for m in P["coordinate_en"].finditer(text):
             add(m.start(),
                 f"{m.group(1)}°{m.group(2)}'{m.group(3)}'' {m.group(4).upper()}",
                 m.end())
-        for m in PATTERNS["coordinate_cn_dir"].finditer(text):
+        for m in P["coordinate_cn_dir"].finditer(text):
             direction = _DIR_MAP.get(m.group(1), "?")
             add(m.start(),
                 f"{m.group(2)}°{m.group(3)}'{m.group(4)}'' {direction}",
@@ -602,23 +745,23 @@ def extract_numbers(text: str, strategies=None) -> List[str]:
 
     # ── 财年 ──
     if s.get("fiscal_year"):
-        for m in PATTERNS["fiscal_year_en"].finditer(text):
+        for m in P["fiscal_year_en"].finditer(text):
             add(m.start(), f"FY{m.group(1)}", m.end())
-        for m in PATTERNS["fiscal_year_cn"].finditer(text):
+        for m in P["fiscal_year_cn"].finditer(text):
             add(m.start(), f"FY{m.group(1)}", m.end())
 
     # ── 世纪 ──
     if s.get("century"):
-        for m in PATTERNS["century_en"].finditer(text):
+        for m in P["century_en"].finditer(text):
             add(m.start(), f"{m.group(1)}th century", m.end())
-        for m in PATTERNS["century_cn"].finditer(text):
+        for m in P["century_cn"].finditer(text):
             add(m.start(), f"{m.group(1)}th century", m.end())
 
     # ── 年代 ──
     if s.get("decade"):
-        for m in PATTERNS["decade_en"].finditer(text):
+        for m in P["decade_en"].finditer(text):
             add(m.start(), f"{m.group(1)}s", m.end())
-        for m in PATTERNS["decade_cn"].finditer(text):
+        for m in P["decade_cn"].finditer(text):
             # 20世纪30年代 → 1930s
             century = int(m.group(1))
             decade = int(m.group(2))
@@ -627,60 +770,43 @@ def extract_numbers(text: str, strategies=None) -> List[str]:
 
     # ── 公元前/公元 ──
     if s.get("bc_ad"):
-        for m in PATTERNS["bc_en"].finditer(text):
+        for m in P["bc_en"].finditer(text):
             add(m.start(), f"{m.group(1)} BC", m.end())
-        for m in PATTERNS["ad_en"].finditer(text):
+        for m in P["ad_en"].finditer(text):
             add(m.start(), f"AD {m.group(1)}", m.end())
-        for m in PATTERNS["bc_cn"].finditer(text):
+        for m in P["bc_cn"].finditer(text):
             add(m.start(), f"{m.group(1)} BC", m.end())
-        for m in PATTERNS["ad_cn"].finditer(text):
+        for m in P["ad_cn"].finditer(text):
             add(m.start(), f"AD {m.group(1)}", m.end())
 
     # ── 季度 ──
     if s.get("quarter"):
-        _qmap = {"first": 1, "second": 2, "third": 3, "fourth": 4}
-        for m in PATTERNS["quarter_q"].finditer(text):
+        for m in P["quarter_q"].finditer(text):
             add(m.start(), f"Q{m.group(1)}", m.end())
-        for m in PATTERNS["quarter_word_en"].finditer(text):
-            add(m.start(), f"Q{_qmap[m.group(1).lower()]}", m.end())
-        for m in PATTERNS["quarter_cn"].finditer(text):
+        for m in P["quarter_word_en"].finditer(text):
+            add(m.start(), f"Q{_QUARTER_WORD[m.group(1).lower()]}", m.end())
+        for m in P["quarter_cn"].finditer(text):
             n = _CN_NUM_SIMPLE.get(m.group(1), 0)
             if n:
                 add(m.start(), f"Q{n}", m.end())
 
     # ── 年份范围（允许后跟"年"字）──
     if s.get("year_range"):
-        for m in re.finditer(r"\b(\d{4})\s*[–—\-]\s*(\d{4})(?:年)?", text):
+        for m in X["year_range_cn"].finditer(text):
             add(m.start(), f"{m.group(1)}-{m.group(2)}", m.end())
 
     # ── 完整日期 ──
     if s.get("date"):
-        for m in PATTERNS["date_full"].finditer(text):
+        for m in P["date_full"].finditer(text):
             add(m.start(),
                 f"{m.group(1)}-{m.group(2).zfill(2)}-{m.group(3).zfill(2)}",
                 m.end())
         # 中文逐字读年份：二〇二六年三月 / 二〇二五年 → 2026-03 / 2026
-        _cn_digit_char = "零〇一二三四五六七八九"
-        _cn_digit_val  = {
-            "零": 0, "〇": 0,
-            "一": 1, "二": 2, "三": 3, "四": 4, "五": 5,
-            "六": 6, "七": 7, "八": 8, "九": 9,
-        }
-        def _cn_year_str_to_int(s4: str) -> int:
-            return sum(_cn_digit_val.get(c, 0) * (10 ** (3 - i)) for i, c in enumerate(s4))
-        _cn_month_map = {
-            "一": 1, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6,
-            "七": 7, "八": 8, "九": 9, "十": 10,
-            "十一": 11, "十二": 12,
-        }
         # 带月日
-        for m in re.finditer(
-            rf"([{_cn_digit_char}]{{4}})年(十[一二]|[一二三四五六七八九十])月(?:([一二三四五六七八九十]{{1,2}}|二十[一二三四五六七八九]?|三十[一]?)日)?",
-            text
-        ):
+        for m in X["cn_year_month"].finditer(text):
             year = _cn_year_str_to_int(m.group(1))
             if 1000 <= year <= 2100:
-                mon = _cn_month_map.get(m.group(2), 0)
+                mon = _CN_MONTH_MAP.get(m.group(2), 0)
                 day_str = m.group(3)
                 if mon and day_str:
                     day = _cn_to_int(day_str) or 0
@@ -690,40 +816,26 @@ def extract_numbers(text: str, strategies=None) -> List[str]:
                 else:
                     add(m.start(), str(year), m.end())
         # 仅年份（二〇二六年）
-        for m in re.finditer(rf"([{_cn_digit_char}]{{4}})年", text):
+        for m in X["cn_year_only"].finditer(text):
             if not used(m.start(), m.end()):
                 year = _cn_year_str_to_int(m.group(1))
                 if 1000 <= year <= 2100:
                     add(m.start(), str(year), m.end())
         # 中文日期格式：YYYY年M月D日
-        for m in re.finditer(r"(\d{4})年(\d{1,2})月(\d{1,2})日", text):
+        for m in X["date_cn"].finditer(text):
             add(m.start(),
                 f"{m.group(1)}-{m.group(2).zfill(2)}-{m.group(3).zfill(2)}",
                 m.end())
         # 英文日期格式：Month DD, YYYY（如 July 12, 2028）
-        _all_months = {**{k: v for k, v in _MONTH_MAP.items()}}
-        for m in re.finditer(
-            r"\b(January|February|March|April|May|June|July|August|"
-            r"September|October|November|December|"
-            r"Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)\.?\s+"
-            r"(\d{1,2}),?\s+(\d{4})\b",
-            text, re.I
-        ):
-            mon = _all_months.get(m.group(1).lower().rstrip("."), 0)
+        for m in X["date_en_mdy"].finditer(text):
+            mon = _MONTH_MAP.get(m.group(1).lower().rstrip("."), 0)
             if mon:
                 add(m.start(),
                     f"{m.group(3)}-{str(mon).zfill(2)}-{m.group(2).zfill(2)}",
                     m.end())
         # 英文日期格式：DD Month YYYY（如 12 July 2028）
-        for m in re.finditer(
-            r"\b(\d{1,2})\s+"
-            r"(January|February|March|April|May|June|July|August|"
-            r"September|October|November|December|"
-            r"Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)\.?\s+"
-            r"(\d{4})\b",
-            text, re.I
-        ):
-            mon = _all_months.get(m.group(2).lower().rstrip("."), 0)
+        for m in X["date_en_dmy"].finditer(text):
+            mon = _MONTH_MAP.get(m.group(2).lower().rstrip("."), 0)
             if mon:
                 add(m.start(),
                     f"{m.group(3)}-{str(mon).zfill(2)}-{m.group(1).zfill(2)}",
@@ -731,64 +843,42 @@ def extract_numbers(text: str, strategies=None) -> List[str]:
 
     # ── X+Y 结构 ──
     if s.get("plus_expr"):
-        for m in PATTERNS["plus_expr"].finditer(text):
+        for m in P["plus_expr"].finditer(text):
             add(m.start(), f"{m.group(1)}+{m.group(2)}", m.end())
 
     # ── 中文大写金额 ──
     if s.get("chinese_upper"):
-        for m in PATTERNS["cn_upper_amount"].finditer(text):
+        for m in P["cn_upper_amount"].finditer(text):
             val = _cn_upper_to_float(m.group(0))
             if val is not None:
                 add(m.start(), _fmt(val), m.end())
 
     # ── 中文单位（长度/重量/面积等，优先于纯数量单位）──
     if s.get("unit"):
-        _cn_unit_norm = {
-            "微克/立方米": "μg/m3", "微克/平方米": "μg/m2",
-            "微克": "μg", "毫克": "mg", "千克": "kg",
-            "平方千米": "square kilometers", "立方米": "cubic meters",
-            "千米": "kilometers", "公里": "kilometers",
-            "千瓦时": "kWh",
-        }
-        for m in PATTERNS["unit_cn"].finditer(text):
+        for m in P["unit_cn"].finditer(text):
             num = _strip_commas(m.group(1))
-            unit = _cn_unit_norm.get(m.group(2), m.group(2))
+            unit = _CN_UNIT_NORM.get(m.group(2), m.group(2))
             add(m.start(), f"{num} {unit}", m.end())
 
     # ── 中文万/亿单位数字（14.06万，复合单位优先）──
     if s.get("chinese_unit"):
-        _compound_mul = {"百万": 1e6, "千万": 1e7, "百亿": 1e10, "千亿": 1e11}
         # 带中文单位的复合量级（如 1377亿立方米、14.06万平方千米）
-        _cn_unit_norm = {
-            "微克/立方米": "μg/m3", "微克/平方米": "μg/m2",
-            "微克": "μg", "毫克": "mg", "千克": "kg",
-            "平方千米": "square kilometers", "立方米": "cubic meters",
-            "千米": "kilometers", "公里": "kilometers",
-            "千瓦时": "kWh",
-        }
-        _cn_units_pat = "|".join(re.escape(u) for u in sorted(_cn_unit_norm, key=len, reverse=True))
-        for m in re.finditer(
-            r"(\d[\d,]*(?:\.\d+)?)\s*(百万|千万|百亿|千亿|[万亿])\s*(" + _cn_units_pat + r")",
-            text
-        ):
+        for m in X["cn_scale_unit"].finditer(text):
             num = float(_strip_commas(m.group(1)))
-            mul = _compound_mul.get(m.group(2)) or _CN_LARGE_UNIT.get(m.group(2), 1)
-            unit = _cn_unit_norm.get(m.group(3), m.group(3))
+            mul = _CN_COMPOUND_MUL.get(m.group(2)) or _CN_LARGE_UNIT.get(m.group(2), 1)
+            unit = _CN_UNIT_NORM.get(m.group(3), m.group(3))
             add(m.start(), f"{_fmt(num * mul)} {unit}", m.end())
-        for m in re.finditer(r"(\d[\d,]*(?:\.\d+)?)\s*(百万|千万|百亿|千亿)", text):
-            mul = _compound_mul[m.group(2)]
+        for m in X["cn_compound_scale"].finditer(text):
+            mul = _CN_COMPOUND_MUL[m.group(2)]
             add(m.start(), _fmt(float(_strip_commas(m.group(1))) * mul), m.end())
         # 带千瓦时的亿/万（如 5亿千瓦时）
-        for m in re.finditer(r"(\d[\d,]*(?:\.\d+)?)\s*([万亿])\s*(千瓦时)", text):
+        for m in X["cn_scale_kwh"].finditer(text):
             num = float(_strip_commas(m.group(1)))
             mul = _CN_LARGE_UNIT.get(m.group(2), 1)
             add(m.start(), f"{_fmt(num * mul)} kWh", m.end())
         # 普通万/亿单位（排除后跟长度/单位词的情况）
         # 千后面跟米/克/瓦/升/焦等时不作为数量单位
-        for m in re.finditer(
-            r"(\d[\d,]*(?:\.\d+)?)\s*([万亿百千])(?![米克瓦升焦帕牛安伏欧赫兹])",
-            text
-        ):
+        for m in X["cn_scale_plain"].finditer(text):
             num = float(_strip_commas(m.group(1)))
             mul = _CN_LARGE_UNIT.get(m.group(2), 1)
             add(m.start(), _fmt(num * mul), m.end())
@@ -796,50 +886,37 @@ def extract_numbers(text: str, strategies=None) -> List[str]:
     # ── 英文单位（含 million/billion 前缀）──
     if s.get("unit"):
         # 先匹配带 million/billion/thousand 的单位（如 500 million kWh）
-        _en_mul = {"million": 1e6, "billion": 1e9, "thousand": 1e3}
-        for m in re.finditer(
-            r"(\d[\d,]*(?:\.\d+)?)\s*(million|billion|thousand)\s+"
-            r"(μg/m[²2³3]?|mg/m[²2³3]?|μg|mg|kg(?!\w)|"
-            r"square\s+kilometers?|cubic\s+meters?|"
-            r"kilometers?|metres?|meters?|m²|m[²2]|m[³3]|kWh)\b",
-            text, re.I
-        ):
+        for m in X["unit_en_scaled"].finditer(text):
             num = float(_strip_commas(m.group(1)))
-            mul = _en_mul.get(m.group(2).lower(), 1)
+            mul = _EN_SCALE_MUL.get(m.group(2).lower(), 1)
             unit = m.group(3).strip()
             add(m.start(), f"{_fmt(num * mul)} {unit}", m.end())
         # 普通英文单位
-        for m in PATTERNS["unit_en"].finditer(text):
+        for m in P["unit_en"].finditer(text):
             num = _strip_commas(m.group(1))
             unit = m.group(2).strip()
             add(m.start(), f"{num} {unit}", m.end())
 
     # ── 千分位数字（允许后跟中文字符）──
-    for m in re.finditer(r"\d{1,3}(?:,\d{3})+(?:\.\d+)?", text):
+    for m in X["thousand_loose"].finditer(text):
         add(m.start(), _fmt(float(_strip_commas(m.group(0)))), m.end())
 
     # ── 下标数字（PM2.5 / CO2 / H2O，优先于小数）──
     if s.get("subscript"):
-        for m in PATTERNS["subscript"].finditer(text):
+        for m in P["subscript"].finditer(text):
             add(m.start(), f"{m.group(1)}{m.group(2)}", m.end())
 
     # ── 小数 ──
     if s.get("decimal"):
-        for m in PATTERNS["decimal"].finditer(text):
+        for m in P["decimal"].finditer(text):
             add(m.start(), m.group(0), m.end())
 
     # ── 大数（5位+） ──
-    for m in PATTERNS["big_number"].finditer(text):
+    for m in P["big_number"].finditer(text):
         add(m.start(), m.group(0), m.end())
 
     # ── 带圈数字 ①~⑳ ──
-    _CIRCLED_NUM_MAP = {
-        "①": 1, "②": 2, "③": 3, "④": 4, "⑤": 5,
-        "⑥": 6, "⑦": 7, "⑧": 8, "⑨": 9, "⑩": 10,
-        "⑪": 11, "⑫": 12, "⑬": 13, "⑭": 14, "⑮": 15,
-        "⑯": 16, "⑰": 17, "⑱": 18, "⑲": 19, "⑳": 20,
-    }
-    for m in PATTERNS["circled_number"].finditer(text):
+    for m in P["circled_number"].finditer(text):
         val = _CIRCLED_NUM_MAP.get(m.group(0), 0)
         if val > 0:
             add(m.start(), str(val), m.end())
@@ -847,125 +924,88 @@ def extract_numbers(text: str, strategies=None) -> List[str]:
     # ── 罗马数字 ──
     if s.get("roman"):
         # C/D/M 单字母作序号极不常见（c=100,d=500,m=1000），排除误识别
-        _single_roman_upper = set("IVXL")
-        _single_roman_lower = set("ivxl")
-
-        def _is_single_roman_context(m, txt):
-            """
-            单字母罗马数字需满足序号上下文：
-              前面：行首 / '(' / '（' / 空白
-              后面：'.' / ')' / '）' / ',' / 行尾 / 空白+字母或数字
-            排除缩写（i.e. / e.g.）：后面是 '.' 且 '.' 后紧跟字母
-            排除字母序号（c) 等）：后面是 ')' 或 '）'（已在调用处过滤）
-            """
-            start, end = m.start(), m.end()
-            before = txt[:start]
-            after  = txt[end:]
-            pre_ok  = (not before) or before[-1] in "（( \t\n"
-            post_ok = (not after) or after[0] in ").，," or \
-                      (after and after[0] in " \t" and len(after) > 1 and after[1].isalpha())
-            # 排除缩写：后面是 '.' 且 '.' 后紧跟字母（如 i.e. / e.g.）
-            if after and after[0] == "." and len(after) > 1 and after[1].isalpha():
-                return False
-            return pre_ok and post_ok
-
         # 大写罗马数字
-        for m in PATTERNS["roman"].finditer(text):
+        for m in P["roman"].finditer(text):
             s_val = m.group(1)
             if not s_val:
                 continue
             # 单字母：需要序号上下文
-            if len(s_val) == 1 and s_val in _single_roman_upper:
-                if not _is_single_roman_context(m, text):
+            if len(s_val) == 1 and s_val in _SINGLE_ROMAN_UPPER:
+                if not _is_single_roman_context(text, m.start(), m.end()):
                     continue
             val = _roman_to_int(s_val)
             if val > 0:
                 add(m.start(), str(val), m.end())
 
         # 小写罗马数字
-        for m in PATTERNS["roman_lower"].finditer(text):
+        for m in P["roman_lower"].finditer(text):
             s_val = m.group(1)
             if not s_val:
                 continue
-            if len(s_val) == 1 and s_val in _single_roman_lower:
-                if not _is_single_roman_context(m, text):
+            if len(s_val) == 1 and s_val in _SINGLE_ROMAN_LOWER:
+                if not _is_single_roman_context(text, m.start(), m.end()):
                     continue
             val = _roman_to_int(s_val)
             if val > 0:
                 add(m.start(), str(val), m.end())
 
         # 全角/Unicode（Ⅰ~Ⅻ / ⅰ~ⅻ）— 全角字符本身就是独立符号，无需上下文限制
-        for m in PATTERNS["roman_fullwidth"].finditer(text):
+        for m in P["roman_fullwidth"].finditer(text):
             val = _FULLWIDTH_ROMAN_MAP.get(m.group(0), 0)
             if val > 0:
                 add(m.start(), str(val), m.end())
 
     # ── 月份名 ──
     if s.get("month_name"):
-        for m in PATTERNS["month"].finditer(text):
+        for m in P["month"].finditer(text):
             key = m.group(1).lower().rstrip(".")
             if key in _MONTH_MAP:
                 add(m.start(), str(_MONTH_MAP[key]), m.end())
 
     # ── 数字分数（N/N 格式，优先于单独数字）──
     if s.get("fraction"):
-        for m in re.finditer(r"(?<!\d)(\d+)/(\d+)(?!\d)", text):
+        for m in X["fraction_num"].finditer(text):
             add(m.start(), f"{m.group(1)}/{m.group(2)}", m.end())
 
     # ── 分数词（one sixth / two-thirds，优先于序数词和英文数字词）──
     if s.get("fraction"):
-        for m in PATTERNS["fraction_word"].finditer(text):
+        for m in P["fraction_word"].finditer(text):
             num = _FRAC_NUM_MAP.get(m.group(1).lower(), 1)
             denom = _FRAC_DENOM_MAP.get(m.group(2).lower(), 1)
             add(m.start(), f"{num}/{denom}", m.end())
         # 中文分数：三分之二 → 2/3
-        for m in PATTERNS["fraction_cn"].finditer(text):
+        for m in P["fraction_cn"].finditer(text):
             denom = _cn_to_int(m.group(1))
             num = _cn_to_int(m.group(2))
             if denom and num:
                 add(m.start(), f"{num}/{denom}", m.end())
         # 中文"一半" → 1/2
-        for m in re.finditer(r"一半", text):
+        for m in X["half_cn"].finditer(text):
             add(m.start(), "1/2", m.end())
 
     # ── 序数词（英文词形）──
     if s.get("ordinal"):
-        for m in PATTERNS["ordinal_word"].finditer(text):
+        for m in P["ordinal_word"].finditer(text):
             key = m.group(1).lower()
             if key in _ORDINAL_MAP:
                 add(m.start(), str(_ORDINAL_MAP[key]), m.end())
 
     # ── 数字序数（1st/2nd）──
     if s.get("ordinal"):
-        for m in PATTERNS["ordinal_num"].finditer(text):
+        for m in P["ordinal_num"].finditer(text):
             add(m.start(), m.group(1), m.end())
 
     # ── 英文数字词 ──
     if s.get("english_number"):
         # 先匹配 "X point Y Z..." 小数读法（如 three point one four → 3.14）
-        _digit_words = {
-            "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4",
-            "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9",
-        }
-        _dw_pat = "|".join(_digit_words.keys())
-        for m in re.finditer(
-            rf"\b({_dw_pat})\s+point\s+((?:(?:{_dw_pat})\s*)+)\b",
-            text, re.I
-        ):
-            int_part = str(_digit_words[m.group(1).lower()])
-            frac_parts = re.findall(rf"\b({_dw_pat})\b", m.group(2), re.I)
-            frac_str = "".join(_digit_words[w.lower()] for w in frac_parts)
+        for m in X["point_decimal_en"].finditer(text):
+            int_part = str(_ENGLISH_DIGIT_WORDS[m.group(1).lower()])
+            frac_parts = X["digit_word_en"].findall(m.group(2))
+            frac_str = "".join(_ENGLISH_DIGIT_WORDS[w.lower()] for w in frac_parts)
             add(m.start(), f"{int_part}.{frac_str}", m.end())
 
         # 量级组合：word + scale（如 one hundred → 100，ten thousand → 10000）
-        _word_keys = "|".join(re.escape(w) for w in sorted(
-            _ENGLISH_NUMBER_WORDS.keys(), key=len, reverse=True))
-        _scale_keys = "|".join(re.escape(w) for w in sorted(
-            _ENGLISH_SCALE_WORDS.keys(), key=len, reverse=True))
-        _pat_word_scale = re.compile(
-            rf"\b({_word_keys})\s+({_scale_keys})\b", re.IGNORECASE
-        )
-        for m in _pat_word_scale.finditer(text):
+        for m in X["word_scale_en"].finditer(text):
             base_val = _ENGLISH_NUMBER_WORDS.get(m.group(1).lower(), 0)
             scale_val = _ENGLISH_SCALE_WORDS.get(m.group(2).lower(), 1)
             num_val = base_val * scale_val
@@ -973,13 +1013,13 @@ def extract_numbers(text: str, strategies=None) -> List[str]:
                 add(m.start(), str(num_val), m.end())
 
         # 普通英文数字词
-        for w, v in sorted(_ENGLISH_NUM.items(), key=lambda x: -len(x[0])):
-            for m in re.finditer(rf"\b{re.escape(w)}\b", text, re.I):
-                add(m.start(), str(v), m.end())
+        for _w, v, pat in _english_word_candidates(text):
+            for m in pat.finditer(text):
+                add(m.start(), v, m.end())
 
     # ── 中文数字（兜底）──
     if s.get("chinese_trad"):
-        for m in PATTERNS["cn_number"].finditer(text):
+        for m in P["cn_number"].finditer(text):
             if used(m.start(), m.end()):
                 continue
             val = _cn_to_int(m.group(0))
@@ -987,16 +1027,15 @@ def extract_numbers(text: str, strategies=None) -> List[str]:
                 add(m.start(), str(val), m.end())
 
     # ── 普通整数（1-4位，最后兜底）──
-    for m in PATTERNS["integer"].finditer(text):
+    for m in P["integer"].finditer(text):
         add(m.start(), m.group(0), m.end())
 
     # ── 兜底：扫描未被消费的区间，提取其中单独的万/亿/千/百 ──
     # 所有策略执行完后，consumed 之外的字符里可能还有单独的量级词
-    _standalone_scale = {"百": 100, "千": 1000, "万": 10000, "亿": 100000000}
-    for m in re.finditer(r"[百千万亿]", text):
+    for m in X["standalone_scale"].finditer(text):
         pos = m.start()
         if not used(pos, pos + 1):
-            mul = _standalone_scale[m.group(0)]
+            mul = _STANDALONE_SCALE[m.group(0)]
             add(pos, _fmt(mul), pos + 1)
 
     found.sort(key=lambda x: x[0])
@@ -15,9 +15,11 @@ from openai import OpenAI
 
 from extract_values import run_number_check, merge_ai_results
 from report_generator import generate_combined_report
+from block_review import rate_limiter, review_blocks
 
 load_dotenv()
 client = OpenAI(api_key=os.getenv("API_KEY"), base_url=os.getenv("BASE_URL"))
+MODEL_NAME = "deepseek/deepseek-v4-pro"  # google/gemini-3.5-flash
 
 
 _ERROR_SCHEMA = """{
@@ -119,9 +121,10 @@ def _call_llm(seqs_rows: list) -> dict:
 待检查内容：
 {combined}
 """
+    rate_limiter.acquire(MODEL_NAME)
     try:
         resp = client.chat.completions.create(
-            model="deepseek/deepseek-v4-pro",  # google/gemini-3.5-flash
+            model=MODEL_NAME,
             messages=[{"role": "system", "content": "只输出JSON数组"},
                       {"role": "user",   "content": prompt}],
             temperature=0,
@@ -181,7 +184,8 @@ def _llm_check_block(block: list, max_retry: int = 1) -> list:
 
 def run(alignment_path: str,
         output_path: str = "reports/final_checked.xlsx",
-        block_size: int = 20):
+        block_size: int = 20,
+        ai_concurrency: int = None):
 
     # 1. 规则检查 → JSON
     print("📄 规则检查...")
@@ -194,12 +198,7 @@ def run(alignment_path: str,
     blocks = [error_rows[i:i + block_size] for i in range(0, len(error_rows), block_size)]
     print(f"🤖 AI复核，共 {len(blocks)} 块...")
 
-    ai_map = {}
-    for b_idx, block in enumerate(blocks):
-        print(f"  Block {b_idx + 1}/{len(blocks)}")
-        results = _llm_check_block(block)
-        for pos, (idx, _) in enumerate(block):
-            ai_map[idx] = results[pos]
+    ai_map = review_blocks(blocks, _llm_check_block, concurrency=ai_concurrency)
 
     # 3. 合并 → JSON
     final_rows = merge_ai_results(rows, ai_map)